@@ -0,0 +1,185 @@
+"""
+Streaming account source
+Reads the accounts CSV one row at a time instead of loading it up front:
+every row is validated as it is read (a bad row is reported and skipped,
+not fatal), repeated and already finished accounts are skipped, and with
+a shard only this runner's share of the file is returned.
+
+    validation   required fields present, email and phone plausible; the
+                 email is normalised (stripped, lower case) once, and that
+                 value is what every check below compares
+    duplicates   a repeated email is skipped; emails seen so far are kept
+                 in a temporary SQLite table, not in memory
+    shard i/n    crc32(email) % n == i, so n runners given the same file
+                 split it deterministically, whatever the row order
+    completed    success in the results history or FINAL_STEP checkpointed,
+                 looked up LOOKUP_BATCH rows at a time (indexed queries, no
+                 set of every email in memory)
+
+Memory stays constant however long the file is, and the first account is
+available as soon as the first batch has been read.
+
+Usage:
+    source = AccountSource("accounts.csv", shard=(0, 4), results=store, checkpoints=checkpoints)
+    for account in source:
+        ...
+    print(source.describe())
+"""
+
+import re
+import csv
+import zlib
+import sqlite3
+import argparse
+from contextlib import closing
+from itertools import islice
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+ACCOUNT_FIELDS = ['full_name', 'email', 'company', 'phone', 'password']
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+MIN_PHONE_DIGITS = 7
+LOOKUP_BATCH = 500  # rows checked against the results/checkpoint history per query
+MAX_REPORTED_REJECTS = 20  # invalid rows printed individually; the rest are only counted
+FINAL_STEP = 'post_login'  # an account with this step checkpointed is finished
+
+
+def shard_spec(value):
+    """
+    --shard value "i/n": this runner takes shard i (0-based) of n
+
+    Returns:
+        tuple: (index, count)
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/n (e.g. 0/4), got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got '{value}'")
+    return index, count
+
+
+def shard_of(email, count):
+    """Shard an email belongs to (stable across machines and Python runs)"""
+    return zlib.crc32(email.strip().lower().encode('utf-8')) % count
+
+
+def validate_account(row):
+    """
+    Clean one CSV row into an account dict
+
+    Returns:
+        tuple: (account, None) or (None, reason)
+    """
+    if None in row:
+        return None, "more cells than header columns"
+    account = {}
+    for field in ACCOUNT_FIELDS:
+        value = (row.get(field) or '').strip()
+        if not value:
+            return None, f"missing {field}"
+        account[field] = value
+    # Mailbox addresses are case-insensitive; one spelling for dedupe, shards and history
+    account['email'] = account['email'].lower()
+    if not EMAIL_PATTERN.match(account['email']):
+        return None, f"invalid email '{account['email']}'"
+    if sum(ch.isdigit() for ch in account['phone']) < MIN_PHONE_DIGITS:
+        return None, f"invalid phone '{account['phone']}'"
+    return account, None
+
+
+class AccountSource:
+    """
+    Lazily validated, deduplicated and sharded accounts from a CSV file
+
+    Iterate it once; counters in `stats` are final when iteration ends.
+    """
+
+    def __init__(self, path, shard=None, results=None, checkpoints=None, batch_size=LOOKUP_BATCH):
+        """
+        Args:
+            path: Accounts CSV (ACCOUNT_FIELDS columns)
+            shard: Optional (index, count) from shard_spec
+            results: Optional ResultsStore; emails with a success are skipped
+            checkpoints: Optional CheckpointStore; emails with FINAL_STEP done are skipped
+            batch_size: Rows looked up against the history per query
+        """
+        self.path = path
+        self.shard = shard
+        self.results = results
+        self.checkpoints = checkpoints
+        self.batch_size = batch_size
+        self.stats = {'rows': 0, 'invalid': 0, 'duplicates': 0, 'other_shards': 0, 'completed': 0, 'accounts': 0}
+
+    def __iter__(self):
+        # '' opens a temporary on-disk database, removed again on close
+        seen = sqlite3.connect('', check_same_thread=False)
+        seen.execute("CREATE TABLE seen (email TEXT PRIMARY KEY)")
+        with open(self.path, 'r', encoding='utf-8', newline='') as f, closing(seen):
+            reader = csv.DictReader(f)
+            missing = [field for field in ACCOUNT_FIELDS if field not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"{self.path} is missing column(s): {', '.join(missing)}")
+
+            rows = self._valid_rows(reader, seen)
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                completed = self._completed([account['email'] for account in batch])
+                for account in batch:
+                    if account['email'] in completed:
+                        self.stats['completed'] += 1
+                        continue
+                    self.stats['accounts'] += 1
+                    yield account
+
+    def _valid_rows(self, reader, seen):
+        for row in reader:
+            self.stats['rows'] += 1
+            account, reason = validate_account(row)
+            if account is None:
+                self.stats['invalid'] += 1
+                if self.stats['invalid'] <= MAX_REPORTED_REJECTS:
+                    print(f"⚠️  Skipping {self.path} line {reader.line_num}: {reason}")
+                elif self.stats['invalid'] == MAX_REPORTED_REJECTS + 1:
+                    print(f"⚠️  More invalid rows in {self.path}; only counting them from here on")
+                continue
+            if self.shard and shard_of(account['email'], self.shard[1]) != self.shard[0]:
+                self.stats['other_shards'] += 1
+                continue
+            if not seen.execute("INSERT OR IGNORE INTO seen VALUES (?)", (account['email'],)).rowcount:
+                self.stats['duplicates'] += 1
+                continue
+            yield account
+
+    def _completed(self, emails):
+        completed = set()
+        if self.results is not None:
+            completed |= self.results.emails_with_status('success', among=emails)
+        if self.checkpoints is not None:
+            completed |= self.checkpoints.emails_with_step(FINAL_STEP, among=emails)
+        return completed
+
+    def describe(self):
+        """One-line summary of what was read and skipped"""
+        stats = self.stats
+        parts = [f"{stats['accounts']} accounts from {stats['rows']} rows"]
+        if self.shard:
+            parts.append(f"shard {self.shard[0]}/{self.shard[1]} ({stats['other_shards']} rows in other shards)")
+        if stats['completed']:
+            parts.append(f"{stats['completed']} already completed")
+        if stats['duplicates']:
+            parts.append(f"{stats['duplicates']} duplicates")
+        if stats['invalid']:
+            parts.append(f"{stats['invalid']} invalid")
+        return ", ".join(parts)
+
+
+def account_label(idx, total=None):
+    """'idx/total', or just 'idx' while the total is not known yet"""
+    return f"{idx}/{total}" if total else f"{idx}"
@@ -0,0 +1,454 @@
+"""
+Shared static-asset cache
+Every uc.Chrome starts with a throwaway profile, so each new session
+downloads the admin portal's Angular bundles and OWA's script payloads
+again. This cache keeps those responses on disk for every worker:
+
+    objects/ab/abcdef...   response bodies, content-addressed by SHA-256
+    index.db               url -> digest, ETag/Last-Modified, headers,
+                           freshness and last use (SQLite WAL, shared by
+                           all worker processes)
+
+An AssetInterceptor hooks a browser tab through CDP Fetch: scripts,
+stylesheets and fonts are answered from disk while fresh, revalidated with
+If-None-Match/If-Modified-Since once stale (a 304 is answered from disk),
+and stored after a cacheable 200. Bodies are checked against their digest
+on every read, and the folder is kept under a byte budget by evicting the
+least recently used entries.
+
+Usage:
+    python asset_cache.py --stats
+    python asset_cache.py --clear
+"""
+
+import os
+import re
+import time
+import json
+import base64
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+from cdp_session import CdpConnection, CdpError
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+ASSET_CACHE = os.environ.get("WORLDPOSTA_ASSET_CACHE", "0") == "1"
+ASSET_CACHE_DIR = os.environ.get("WORLDPOSTA_ASSET_CACHE_DIR", ".asset_cache")
+ASSET_CACHE_MB = int(os.environ.get("WORLDPOSTA_ASSET_CACHE_MB", "512"))
+
+# App bundles only: documents and XHR/fetch are per-user and never cached
+CACHED_RESOURCE_TYPES = ('Script', 'Stylesheet', 'Font')
+
+REVALIDATE_AFTER = 300  # seconds an entry with a validator but no max-age is trusted
+IMMUTABLE_TTL = 30 * 24 * 3600  # hashed bundle names (main.3f2a9c1e.js) never change
+
+# Angular/webpack output hashing in the file name
+HASHED_NAME_RE = re.compile(r'[.-][0-9a-f]{8,}\.(?:js|css|woff2?|ttf)(?:\?|$)', re.IGNORECASE)
+
+# Headers that describe the transfer, not the content (bodies are stored decoded)
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive',
+                   'set-cookie', 'date', 'age', 'expires', 'alt-svc', 'report-to', 'nel'}
+
+
+def header_map(headers):
+    """CDP header list or dict -> {lower-case name: value}"""
+    if isinstance(headers, dict):
+        return {name.lower(): value for name, value in headers.items()}
+    return {header['name'].lower(): header['value'] for header in headers or []}
+
+
+def freshness(url, headers):
+    """
+    Seconds a response may be served without revalidation
+
+    Returns:
+        float, or None when the response must not be cached
+    """
+    cache_control = headers.get('cache-control', '').lower()
+    if 'no-store' in cache_control or 'set-cookie' in headers:
+        return None
+    if 'immutable' in cache_control or HASHED_NAME_RE.search(url):
+        return IMMUTABLE_TTL
+    if 'no-cache' in cache_control:
+        return 0.0
+    match = re.search(r'max-age=(\d+)', cache_control)
+    if match:
+        return float(match.group(1))
+    # Without max-age a copy is only usable if the server can confirm it
+    if 'etag' in headers or 'last-modified' in headers:
+        return float(REVALIDATE_AFTER)
+    return None
+
+
+# =====================================================
+# STORE
+# =====================================================
+
+class AssetCache:
+    """
+    Content-addressed response bodies with an LRU-bounded SQLite index
+
+    Usage:
+        cache = AssetCache()
+        entry = cache.lookup(url)
+        body = cache.read(entry) if entry else None
+    """
+
+    def __init__(self, directory=ASSET_CACHE_DIR, max_bytes=ASSET_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, 'index.db'), timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                url TEXT PRIMARY KEY,
+                digest TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                size INTEGER,
+                stored_at REAL,
+                fresh_until REAL,
+                last_used REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS assets_last_used ON assets (last_used)")
+        self.db.commit()
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def lookup(self, url):
+        """Index entry for a URL with a 'fresh' flag, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT digest, etag, last_modified, headers, fresh_until FROM assets WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'url': url, 'digest': row[0], 'etag': row[1], 'last_modified': row[2],
+            'headers': json.loads(row[3]), 'fresh': row[4] > time.time(),
+        }
+
+    def read(self, entry):
+        """Body for an entry, or None if it is missing or corrupt (the entry is dropped)"""
+        try:
+            with open(self._object_path(entry['digest']), 'rb') as f:
+                body = f.read()
+        except OSError:
+            body = None
+        if body is None or hashlib.sha256(body).hexdigest() != entry['digest']:
+            self.forget(entry['url'])
+            return None
+        return body
+
+    def store(self, url, body, headers):
+        """
+        Keep a 200 response if its headers allow it
+
+        Args:
+            url: Request URL
+            body: Decoded response body (bytes)
+            headers: {lower-case name: value}
+
+        Returns:
+            bool: True if the response was stored
+        """
+        ttl = freshness(url, headers)
+        if ttl is None or len(body) > self.max_bytes // 4:
+            return False
+
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Other workers may read the object at any time: publish it atomically
+            temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp, 'wb') as f:
+                f.write(body)
+            os.replace(temp, path)
+
+        kept = {name: value for name, value in headers.items() if name not in DROPPED_HEADERS}
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets (url, digest, etag, last_modified, headers, size, stored_at, "
+                "fresh_until, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, headers.get('etag'), headers.get('last-modified'), json.dumps(kept), len(body),
+                 now, now + ttl, now)
+            )
+            self.db.commit()
+        self.evict()
+        return True
+
+    def touch(self, url, headers=None):
+        """Mark an entry used; with the headers of a 304, extend its freshness"""
+        now = time.time()
+        with self.lock:
+            if headers is None:
+                self.db.execute("UPDATE assets SET last_used = ? WHERE url = ?", (now, url))
+            else:
+                ttl = freshness(url, headers) or 0.0
+                self.db.execute(
+                    "UPDATE assets SET last_used = ?, fresh_until = ?, etag = COALESCE(?, etag) WHERE url = ?",
+                    (now, now + ttl, headers.get('etag'), url)
+                )
+            self.db.commit()
+
+    def forget(self, url):
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM assets WHERE url = ?", (url,)).fetchone()
+            self.db.execute("DELETE FROM assets WHERE url = ?", (url,))
+            self.db.commit()
+        if row:
+            self._drop_unreferenced([row[0]])
+
+    def _drop_unreferenced(self, digests):
+        for digest in digests:
+            with self.lock:
+                referenced = self.db.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not referenced:
+                try:
+                    os.remove(self._object_path(digest))
+                except OSError:
+                    pass
+
+    def total_bytes(self):
+        """Bytes on disk (each distinct body counted once)"""
+        with self.lock:
+            row = self.db.execute("SELECT SUM(size) FROM (SELECT DISTINCT digest, size FROM assets)").fetchone()
+        return row[0] or 0
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its budget"""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        with self.lock:
+            rows = self.db.execute("SELECT url, digest, size FROM assets ORDER BY last_used").fetchall()
+        dropped = []
+        for url, digest, size in rows:
+            if total <= self.max_bytes:
+                break
+            with self.lock:
+                self.db.execute("DELETE FROM assets WHERE url = ?", (url,))
+                shared = self.db.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+            if not shared:
+                total -= size
+            dropped.append(digest)
+            evicted += 1
+        with self.lock:
+            self.db.commit()
+        self._drop_unreferenced(dropped)
+        return evicted
+
+    def stats(self):
+        with self.lock:
+            entries, fresh = self.db.execute(
+                "SELECT COUNT(*), SUM(fresh_until > ?) FROM assets", (time.time(),)
+            ).fetchone()
+        return {'entries': entries, 'fresh': fresh or 0, 'bytes': self.total_bytes(), 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self.lock:
+            digests = [row[0] for row in self.db.execute("SELECT DISTINCT digest FROM assets")]
+            self.db.execute("DELETE FROM assets")
+            self.db.commit()
+        self._drop_unreferenced(digests)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# =====================================================
+# INTERCEPTION
+# =====================================================
+
+class AssetInterceptor:
+    """
+    Serves a browser tab's scripts, stylesheets and fonts from an AssetCache
+
+    Every paused request is always resumed, fulfilled or continued: a
+    handler error falls back to the network, never to a hung page.
+    """
+
+    def __init__(self, cache, target, connection=None):
+        self.cache = cache
+        self.target = target
+        self.connection = connection
+        self.revalidating = {}  # request id -> entry sent with validators
+        self.counts = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+    def start(self):
+        self.target.on('Fetch.requestPaused', self.paused)
+        patterns = [{'urlPattern': '*', 'resourceType': resource_type, 'requestStage': stage}
+                    for resource_type in CACHED_RESOURCE_TYPES for stage in ('Request', 'Response')]
+        self.target.send('Fetch.enable', {'patterns': patterns})
+        return self
+
+    def paused(self, params):
+        request_id = params['requestId']
+        try:
+            if 'responseStatusCode' in params or 'responseErrorReason' in params:
+                self.on_response(params)
+            else:
+                self.on_request(params)
+        except Exception as e:
+            print(f"⚠ Asset cache skipped {params['request']['url'][:80]}: {e}")
+            self.revalidating.pop(request_id, None)
+            self.resume(request_id)
+
+    def resume(self, request_id, headers=None):
+        params = {'requestId': request_id}
+        if headers is not None:
+            params['headers'] = [{'name': name, 'value': value} for name, value in headers.items()]
+        self.target.send_nowait('Fetch.continueRequest', params)
+
+    def fulfill(self, request_id, entry, body):
+        headers = [{'name': name, 'value': value} for name, value in entry['headers'].items()]
+        headers.append({'name': 'Content-Length', 'value': str(len(body))})
+        self.target.send_nowait('Fetch.fulfillRequest', {
+            'requestId': request_id, 'responseCode': 200, 'responseHeaders': headers,
+            'body': base64.b64encode(body).decode('ascii'),
+        })
+
+    def on_request(self, params):
+        request_id, request = params['requestId'], params['request']
+        url = request['url']
+        entry = self.cache.lookup(url) if request.get('method') == 'GET' else None
+        if entry is None:
+            self.counts['misses'] += 1
+            self.resume(request_id)
+            return
+
+        if entry['fresh']:
+            body = self.cache.read(entry)
+            if body is not None:
+                self.counts['hits'] += 1
+                self.cache.touch(url)
+                self.fulfill(request_id, entry, body)
+                return
+            self.counts['misses'] += 1
+            self.resume(request_id)
+            return
+
+        # Stale: let the server confirm our copy instead of resending it
+        headers = dict(request.get('headers', {}))
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        self.revalidating[request_id] = entry
+        self.resume(request_id, headers)
+
+    def on_response(self, params):
+        request_id, url = params['requestId'], params['request']['url']
+        status = params.get('responseStatusCode')
+        headers = header_map(params.get('responseHeaders'))
+        entry = self.revalidating.pop(request_id, None)
+
+        if status == 304 and entry is not None:
+            body = self.cache.read(entry)
+            if body is not None:
+                self.counts['revalidated'] += 1
+                self.cache.touch(url, headers)
+                self.fulfill(request_id, entry, body)
+                return
+
+        if status == 200 and params['request'].get('method') == 'GET' and freshness(url, headers) is not None:
+            result = self.target.send('Fetch.getResponseBody', {'requestId': request_id})
+            body = base64.b64decode(result['body']) if result.get('base64Encoded') else result['body'].encode('utf-8')
+            if self.cache.store(url, body, headers):
+                self.counts['stored'] += 1
+        # At the response stage continueRequest passes the response on unchanged
+        self.resume(request_id)
+
+    def close(self):
+        try:
+            self.target.send('Fetch.disable', timeout=5)
+        except CdpError:
+            pass
+        self.target.off('Fetch.requestPaused', self.paused)
+        if self.connection is not None:
+            self.connection.close()
+        counts = self.counts
+        if any(counts.values()):
+            print(f"📦 Asset cache: {counts['hits']} hits, {counts['revalidated']} revalidated, "
+                  f"{counts['misses']} misses, {counts['stored']} stored")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_asset_cache():
+    """The process-wide AssetCache for ASSET_CACHE_DIR"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AssetCache()
+        return _shared_cache
+
+
+def attach_asset_cache(driver, cache=None):
+    """
+    Serve a driver's current tab from the asset cache
+
+    Args:
+        driver: Selenium driver with a remote-debugging address
+        cache: AssetCache (default: the shared one)
+
+    Returns:
+        AssetInterceptor, or None if CDP events are unavailable
+    """
+    try:
+        connection = CdpConnection.for_driver(driver)
+    except (CdpError, OSError, ValueError, KeyError) as e:
+        print(f"⚠ Asset cache not attached: {e}")
+        return None
+    try:
+        target = connection.attach(driver.current_window_handle)
+        return AssetInterceptor(cache or shared_asset_cache(), target, connection).start()
+    except (CdpError, OSError) as e:
+        print(f"⚠ Asset cache not attached: {e}")
+        connection.close()
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared static-asset cache")
+    parser.add_argument("--dir", default=ASSET_CACHE_DIR, help="Cache folder")
+    parser.add_argument("--stats", action="store_true", help="Entry count and size")
+    parser.add_argument("--evict", action="store_true", help="Apply the size budget now")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached asset")
+    args = parser.parse_args()
+
+    cache = AssetCache(args.dir)
+    try:
+        if args.clear:
+            cache.clear()
+            print("🧹 Asset cache cleared")
+        if args.evict:
+            print(f"🧹 Evicted {cache.evict()} entries")
+        stats = cache.stats()
+        print(f"📦 {stats['entries']} assets ({stats['fresh']} fresh), "
+              f"{stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
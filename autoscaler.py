@@ -0,0 +1,133 @@
+"""
+Admission control for browser workers
+Decides how many Chrome workers may run at once from measured headroom
+instead of a fixed --workers number. Each decision samples available
+memory, CPU utilisation, load average and the RSS of the running workers'
+process trees:
+
+    scale up    pending accounts, memory for one more worker (observed peak
+                RSS per worker + reserve), CPU and load below their limits,
+                and the last worker has had time to ramp up
+    scale down  available memory under the reserve: one worker finishes its
+                current account and exits (nothing is killed mid-account)
+"""
+
+import os
+import time
+
+from resource_monitor import CpuMeter, system_memory, tree_usage, load_per_cpu
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+WORKER_MB_ESTIMATE = 700  # assumed Chrome tree size until a worker has been measured
+RESERVE_MB = int(os.environ.get("WORLDPOSTA_MEMORY_RESERVE_MB", "1024"))  # never admit into this
+CPU_LIMIT = 85.0  # % system CPU above which no worker is added
+LOAD_LIMIT = 1.5  # 1-minute load per CPU above which no worker is added
+DECISION_INTERVAL = 5.0  # seconds between decisions
+RAMP_UP_SECONDS = 20.0  # wait after a scale-up before judging headroom again
+SCALE_DOWN_COOLDOWN = 15.0
+
+
+class AdmissionController:
+    """
+    Grows and shrinks the worker count with system headroom
+
+    Usage:
+        controller = AdmissionController(max_workers=8)
+        action = controller.decide(active_workers, pending_accounts, worker_pids)
+        # +1 start a worker, -1 stop one after its account, 0 keep
+    """
+
+    def __init__(self, max_workers=None, min_workers=1, worker_mb=WORKER_MB_ESTIMATE, reserve_mb=RESERVE_MB,
+                 cpu_limit=CPU_LIMIT, load_limit=LOAD_LIMIT, interval=DECISION_INTERVAL,
+                 ramp_up=RAMP_UP_SECONDS):
+        """
+        Args:
+            max_workers: Hard ceiling (defaults to the CPU count)
+            min_workers: Floor; the controller never stops the last workers
+            worker_mb: Initial per-worker memory estimate (MB), replaced by
+                       the largest measured worker tree
+            reserve_mb: Memory (MB) kept free for the OS and the parent
+            cpu_limit: System CPU % above which no worker is added
+            load_limit: Load average per CPU above which no worker is added
+            interval: Minimum seconds between decisions
+            ramp_up: Seconds a new worker gets before headroom is re-judged
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        self.worker_bytes = worker_mb * 1024 * 1024
+        self.reserve_bytes = reserve_mb * 1024 * 1024
+        self.cpu_limit = cpu_limit
+        self.load_limit = load_limit
+        self.interval = interval
+        self.ramp_up = ramp_up
+
+        self.cpu = CpuMeter()
+        self.last_decision = 0.0
+        self.last_scale_up = 0.0
+        self.last_scale_down = 0.0
+        self.peak_workers = 0
+
+    def sample(self, worker_pids=()):
+        """Current headroom figures"""
+        _, available = system_memory()
+        worker_rss = [tree_usage(pid)[0] for pid in worker_pids]
+        measured = max(worker_rss, default=0)
+        # A worker tree keeps growing over its first accounts: trust the largest seen
+        if measured > self.worker_bytes:
+            self.worker_bytes = measured
+        return {
+            'available': available,
+            'cpu': self.cpu.percent(),
+            'load': load_per_cpu(),
+            'worker_bytes': self.worker_bytes,
+        }
+
+    def initial_workers(self):
+        """Workers that fit right now (used for the first launch and fixed-size pools)"""
+        _, available = system_memory()
+        fit = int((available - self.reserve_bytes) // self.worker_bytes)
+        return max(self.min_workers, min(self.max_workers, fit))
+
+    def decide(self, active, pending, worker_pids=(), now=None):
+        """
+        One admission decision
+
+        Args:
+            active: Workers currently running
+            pending: Accounts not yet picked up by a worker
+            worker_pids: PIDs of the running workers (their trees are measured)
+
+        Returns:
+            int: +1 start a worker, -1 stop one, 0 no change
+        """
+        now = now or time.time()
+        if now - self.last_decision < self.interval:
+            return 0
+        self.last_decision = now
+        sample = self.sample(worker_pids)
+        free_mb = sample['available'] / 1024 / 1024
+
+        # Back off before the OOM killer has to
+        if sample['available'] < self.reserve_bytes and active > self.min_workers \
+                and now - self.last_scale_down >= SCALE_DOWN_COOLDOWN:
+            self.last_scale_down = now
+            print(f"📉 Autoscale: {free_mb:.0f} MB available (reserve {self.reserve_bytes / 1024 / 1024:.0f} MB), "
+                  f"stopping a worker ({active} -> {active - 1})")
+            return -1
+
+        if active >= self.max_workers or pending <= 0 or now - self.last_scale_up < self.ramp_up:
+            return 0
+        if sample['available'] - sample['worker_bytes'] < self.reserve_bytes:
+            return 0
+        if sample['cpu'] > self.cpu_limit or sample['load'] > self.load_limit:
+            return 0
+
+        self.last_scale_up = now
+        self.peak_workers = max(self.peak_workers, active + 1)
+        print(f"📈 Autoscale: {free_mb:.0f} MB free, CPU {sample['cpu']:.0f}%, load/CPU {sample['load']:.2f}, "
+              f"~{sample['worker_bytes'] / 1024 / 1024:.0f} MB/worker, starting a worker ({active} -> {active + 1})")
+        return 1
@@ -3,37 +3,52 @@ Batch runner for multiple account registrations
 Reads account data from CSV and processes each one
 """
 
+import os
 import csv
-import time
-from worldposta_automation import WorldPostaAutomationBot, random_delay
+import queue
+import argparse
+import threading
+import multiprocessing
+from itertools import chain, islice
+from concurrent.futures import ThreadPoolExecutor
+from worldposta_automation import (
+    WorldPostaAutomationBot, create_driver, random_delay, CSV_FILE, RESULTS_JSONL, RESULTS_DB, SCREENSHOT_DIR
+)
+from waits import TIMING_PROFILES
+from form_fill import FILL_STRATEGIES
+from mail_client import MAILBOX_BACKENDS
+from http_registration import REGISTRATION_ENGINES
+from results_store import ResultsStore, ResultsAggregator, QueueResultsSink
+from telemetry import create_tracer
+from checkpoints import CheckpointStore, CHECKPOINT_DB
+from pipeline import StagePipeline, MAIL_CONCURRENCY
+from autoscaler import AdmissionController
+from lean_profile import LOAD_PROFILES
+from browser_contexts import ContextPool
+from screenshots import ScreenshotService
+from account_source import AccountSource, ACCOUNT_FIELDS, shard_spec, account_label
+from work_queue import open_work_queue, print_stats, WorkQueueError, QUEUE_URL
 
 # Configuration
 INPUT_CSV = "accounts_to_register.csv"  # CSV with account data
 DELAY_BETWEEN_ACCOUNTS = (60, 120)  # Seconds to wait between accounts (min, max)
 HEADLESS_MODE = False  # Set to True to hide browser
+DEFAULT_WORKERS = 1  # Number of parallel browser processes (--workers N, or auto)
 # (Adjust other configurations as needed)
 
 def read_accounts_from_csv(filename):
     """
-    Read account data from CSV file
+    Read every valid account from a CSV file into a list
+    (batch runs stream the file through AccountSource instead)
 
     Expected CSV format:
     full_name,email,company,phone,password
     John Doe,john@worldposta.com,Acme Corp,+15551234567,SecurePass123
     """
-    accounts = []
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                accounts.append({
-                    'full_name': row['full_name'],
-                    'email': row['email'],
-                    'company': row['company'],
-                    'phone': row['phone'],
-                    'password': row['password']
-                })
-        print(f"✅ Loaded {len(accounts)} accounts from {filename}")
+        source = AccountSource(filename)
+        accounts = list(source)
+        print(f"✅ Loaded {source.describe()} from {filename}")
         return accounts
     except FileNotFoundError:
         print(f"❌ File not found: {filename}")
@@ -65,7 +80,7 @@ def create_sample_csv(filename):
     ]
 
     with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['full_name', 'email', 'company', 'phone', 'password'])
+        writer = csv.DictWriter(f, fieldnames=ACCOUNT_FIELDS)
         writer.writeheader()
         for row in sample_data:
             writer.writerow(row)
@@ -74,40 +89,509 @@ def create_sample_csv(filename):
     print(f"📝 Edit this file with your account data and run again")
 
 
-def run_batch_automation():
-    """Run automation for multiple accounts"""
+def print_account_header(idx, total_accounts, account_data, worker_id=None):
+    """Print the banner shown before an account is processed (total_accounts may be None)"""
+    print("\n" + "#"*60)
+    if worker_id is None:
+        print(f"🔄 PROCESSING ACCOUNT {account_label(idx, total_accounts)}")
+    else:
+        print(f"🔄 [worker {worker_id}] PROCESSING ACCOUNT {account_label(idx, total_accounts)}")
+    print("#"*60)
+    print(f"📧 Email: {account_data['email']}")
+    print(f"👤 Name: {account_data['full_name']}")
+    print(f"🏢 Company: {account_data['company']}")
+
+
+def print_summary(successful, failed, total_accounts):
+    """Print the final batch summary"""
+    print("\n" + "="*60)
+    print("📊 BATCH AUTOMATION COMPLETE")
     print("="*60)
-    print("🚀 WORLDPOSTA BATCH AUTOMATION")
+    print(f"✅ Successful: {successful}/{total_accounts}")
+    print(f"❌ Failed: {failed}/{total_accounts}")
+    print(f"📁 Results saved to: {CSV_FILE}, {RESULTS_JSONL} and {RESULTS_DB}")
     print("="*60)
 
-    # Read accounts from CSV
-    accounts = read_accounts_from_csv(INPUT_CSV)
 
-    if not accounts:
-        print("\n⚠️  No accounts to process. Exiting.")
-        return
+# =====================================================
+# WORKER POOL
+# =====================================================
+
+def account_worker(worker_id, job_queue, result_queue, records_queue, total_accounts, headless,
+                   timing_profile=None, fill_strategy=None, mailbox=None, checkpoint_db=None,
+                   registration_engine=None, stop_event=None, load_profile=None, asset_cache=None):
+    """
+    Worker process: owns one browser and pulls accounts until told to stop
+
+    Every worker builds its own WorldPostaAutomationBot, so browser,
+    status_log and account_data are never shared between processes.
+
+    Args:
+        worker_id: Number used in log lines
+        job_queue: Queue of (idx, account_data) tuples, None means stop
+        result_queue: Queue receiving ('result', worker_id, idx, email, success)
+                      and a final ('exit', worker_id, None, None, None)
+        records_queue: Queue feeding the parent's ResultsAggregator
+        total_accounts: Total accounts in the batch, None while streaming (log lines only)
+        headless: Run Chrome headless
+        timing_profile: Optional timing profile name for the bot
+        fill_strategy: Optional field-fill strategy name for the bot
+        mailbox: Optional mailbox backend name (browser, imap, ews)
+        checkpoint_db: Optional checkpoint database for resumable accounts
+        registration_engine: Optional registration engine (browser, http, auto)
+        stop_event: Optional multiprocessing.Event; when set the worker exits
+                    after its current account (autoscaler scale-down)
+        load_profile: Optional resource-loading profile (full, lean)
+        asset_cache: Serve app bundles from the shared on-disk cache
+    """
+    bot = None
+    checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+
+    try:
+        bot = WorldPostaAutomationBot(
+            headless=headless, timing_profile=timing_profile, fill_strategy=fill_strategy, mailbox=mailbox,
+            results=QueueResultsSink(records_queue), tracer=create_tracer(worker_id=worker_id),
+            checkpoints=checkpoints, registration_engine=registration_engine, load_profile=load_profile,
+            asset_cache=asset_cache
+        )
+        first_job = True
+
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                print(f"👋 [worker {worker_id}] Stopping to free resources (autoscale)")
+                break
+
+            job = job_queue.get()
+            if job is None:
+                break
+
+            # Pace this browser like the sequential runner does
+            if not first_job:
+                random_delay(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
+            first_job = False
+
+            idx, account_data = job
+            print_account_header(idx, total_accounts, account_data, worker_id)
+
+            try:
+                success = bot.run_full_workflow(account_data)
+            except Exception as e:
+                print(f"❌ [worker {worker_id}] Account {account_label(idx, total_accounts)} failed with error: {e}")
+                success = False
+
+            result_queue.put(('result', worker_id, idx, account_data['email'], success))
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"❌ [worker {worker_id}] Worker crashed: {e}")
+    finally:
+        if bot:
+            bot.close()
+        if checkpoints:
+            checkpoints.close()
+        result_queue.put(('exit', worker_id, None, None, None))
+
+
+def run_worker_pool(accounts, workers, headless, timing_profile=None, fill_strategy=None, mailbox=None,
+                    checkpoint_db=None, registration_engine=None, autoscale=None, load_profile=None,
+                    asset_cache=None):
+    """
+    Spread accounts across a pool of browser worker processes
+
+    Accounts are fed to the workers through a bounded queue as they are
+    read, so an AccountSource over a huge file is never held in memory.
+
+    Args:
+        accounts: Iterable of account dictionaries (a list or an AccountSource)
+        workers: Number of worker processes (each with its own Chrome); the
+                 starting count when autoscaling
+        headless: Run Chrome headless
+        timing_profile: Optional timing profile name for every bot
+        fill_strategy: Optional field-fill strategy name for every bot
+        mailbox: Optional mailbox backend name for every bot
+        checkpoint_db: Optional checkpoint database shared by all workers
+        registration_engine: Optional registration engine for every bot
+        autoscale: Optional AdmissionController that starts and stops
+                   workers with the machine's memory/CPU headroom
+        load_profile: Optional resource-loading profile for every bot
+        asset_cache: Serve app bundles from the shared on-disk cache
+
+    Returns:
+        tuple: (successful, failed) merged over all workers
+    """
+    total_accounts = len(accounts) if isinstance(accounts, list) else None
+    max_workers = autoscale.max_workers if autoscale else workers
+
+    # Never start more browsers than there are accounts
+    accounts = iter(accounts)
+    head = list(islice(accounts, max_workers))
+    max_workers = min(max_workers, len(head))
+    workers = min(workers, max_workers)
+    if not head:
+        return 0, 0
+
+    # A couple of accounts per worker buffered ahead; the rest stays in the file
+    job_queue = multiprocessing.Queue(maxsize=2 * max_workers)
+    result_queue = multiprocessing.Queue()
+
+    # One writer for CSV/JSONL/SQLite, fed by every worker
+    aggregator = ResultsAggregator(
+        multiprocessing.Queue(),
+        ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+    )
+    aggregator.start()
+
+    processes = {}  # worker_id -> (process, stop_event)
+    feed = {'queued': 0, 'done': False}
+    feed_lock = threading.Lock()
+
+    def feed_accounts():
+        try:
+            for idx, account_data in enumerate(chain(head, accounts), 1):
+                job_queue.put((idx, account_data))
+                feed['queued'] = idx
+        except Exception as e:
+            print(f"❌ Stopped reading accounts: {e}")
+        finally:
+            # Stop sentinels go behind the last account, one per worker
+            with feed_lock:
+                feed['done'] = True
+                for _ in processes:
+                    job_queue.put(None)
+
+    def start_worker():
+        with feed_lock:
+            worker_id = len(processes) + 1
+            stop_event = multiprocessing.Event()
+            process = multiprocessing.Process(
+                target=account_worker,
+                args=(worker_id, job_queue, result_queue, aggregator.records_queue, total_accounts, headless,
+                      timing_profile, fill_strategy, mailbox, checkpoint_db, registration_engine, stop_event,
+                      load_profile, asset_cache),
+                name=f"worldposta-worker-{worker_id}"
+            )
+            process.start()
+            processes[worker_id] = (process, stop_event)
+            if feed['done']:
+                job_queue.put(None)
+
+    for _ in range(workers):
+        start_worker()
+    feeder = threading.Thread(target=feed_accounts, name="account-feeder", daemon=True)
+    feeder.start()
+
+    if autoscale:
+        print(f"👷 Started {workers} worker processes (autoscaling up to {max_workers})")
+    else:
+        print(f"👷 Started {workers} worker processes")
 
-    total_accounts = len(accounts)
     successful = 0
     failed = 0
+    exited_workers = set()
+
+    try:
+        while not feed['done'] or successful + failed < feed['queued']:
+            running = [worker_id for worker_id in processes if worker_id not in exited_workers]
+            if not running:
+                break
+
+            if autoscale:
+                active = [worker_id for worker_id in running if not processes[worker_id][1].is_set()]
+                # Accounts in progress are roughly one per active worker; while the
+                # input is still being read there is always more work behind the queue
+                pending = feed['queued'] - successful - failed - len(active)
+                if not feed['done']:
+                    pending = max(pending, 1)
+                action = autoscale.decide(len(active), pending, [processes[w][0].pid for w in active])
+                if action > 0 and len(active) < max_workers:
+                    start_worker()
+                elif action < 0 and active:
+                    processes[active[-1]][1].set()
+
+            try:
+                kind, worker_id, idx, email, success = result_queue.get(timeout=5)
+            except queue.Empty:
+                # A worker killed hard never reports 'exit'
+                for worker_id, (process, _) in list(processes.items()):
+                    if not process.is_alive():
+                        exited_workers.add(worker_id)
+                continue
+
+            if kind == 'exit':
+                exited_workers.add(worker_id)
+                continue
+
+            if success:
+                successful += 1
+                print(f"✅ Account {account_label(idx, total_accounts)} ({email}) completed successfully [worker {worker_id}]")
+            else:
+                failed += 1
+                print(f"❌ Account {account_label(idx, total_accounts)} ({email}) failed [worker {worker_id}]")
+
+        # Accounts queued but never finished after every worker died count as failed
+        unprocessed = feed['queued'] - successful - failed
+        if unprocessed > 0:
+            print(f"⚠️  {unprocessed} queued accounts were not processed (all workers exited)")
+            failed += unprocessed
+        if not feed['done']:
+            print("⚠️  The rest of the input was not read (all workers exited)")
+
+        if autoscale:
+            print(f"📊 Autoscale: {len(processes)} workers started, peak {max(autoscale.peak_workers, workers)} at once")
+
+    finally:
+        for process, _ in processes.values():
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        aggregator.stop()
+        aggregator.store.close()
+        # Whatever is still buffered for dead workers is dropped, not flushed
+        job_queue.cancel_join_thread()
+
+    return successful, failed
+
+
+def run_context_pool(accounts, contexts, headless, timing_profile=None, fill_strategy=None, mailbox=None,
+                     checkpoint_db=None, registration_engine=None, load_profile=None, asset_cache=None):
+    """
+    Run accounts concurrently in isolated browser contexts of one Chrome
+
+    One thread per context slot; every account gets a fresh context (own
+    cookies and storage) from a ContextPool, so `contexts` accounts share
+    a single Chrome process tree instead of launching one each.
+
+    Args:
+        accounts: Iterable of account dictionaries (a list or an AccountSource)
+        contexts: Accounts running at once (browser contexts in the shared Chrome)
+        headless: Run Chrome headless
+        timing_profile: Optional timing profile name for every bot
+        fill_strategy: Optional field-fill strategy name for every bot
+        mailbox: Optional mailbox backend name for every bot
+        checkpoint_db: Optional checkpoint database shared by all slots
+        registration_engine: Optional registration engine for every bot
+        load_profile: Optional resource-loading profile for every bot
+        asset_cache: Serve app bundles from the shared on-disk cache
+
+    Returns:
+        tuple: (successful, failed)
+    """
+    total_accounts = len(accounts) if isinstance(accounts, list) else None
+    accounts = iter(accounts)
+    head = list(islice(accounts, contexts))
+    contexts = len(head)
+    if not contexts:
+        return 0, 0
+
+    # Slots pull the next account straight from the input as they free up
+    jobs = enumerate(chain(head, accounts), 1)
+    jobs_lock = threading.Lock()
+
+    results = ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+    screenshots = ScreenshotService(SCREENSHOT_DIR)
+    checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+    tracer = create_tracer()
+    pool = ContextPool(lambda: create_driver(headless, load_profile), size=contexts)
+    counts = {'successful': 0, 'failed': 0}
+    counts_lock = threading.Lock()
+
+    def context_slot(slot):
+        first_job = True
+        while True:
+            with jobs_lock:
+                job = next(jobs, None)
+            if job is None:
+                return
+            idx, account_data = job
 
-    print(f"\n📊 Total accounts to process: {total_accounts}")
-    print(f"⏱️  Delay between accounts: {DELAY_BETWEEN_ACCOUNTS[0]}-{DELAY_BETWEEN_ACCOUNTS[1]} seconds")
-    print(f"🖥️  Headless mode: {'Enabled' if HEADLESS_MODE else 'Disabled'}")
+            # Pace every slot like the sequential runner does
+            if not first_job:
+                random_delay(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
+            first_job = False
+            print_account_header(idx, total_accounts, account_data, slot)
 
+            try:
+                with pool.lease() as driver:
+                    bot = WorldPostaAutomationBot(
+                        driver=driver, timing_profile=timing_profile, fill_strategy=fill_strategy,
+                        mailbox=mailbox, results=results, tracer=tracer, checkpoints=checkpoints,
+                        screenshots=screenshots, registration_engine=registration_engine,
+                        load_profile=load_profile, asset_cache=asset_cache
+                    )
+                    try:
+                        success = bot.run_full_workflow(account_data)
+                    finally:
+                        bot.close()
+            except Exception as e:
+                print(f"❌ [context {slot}] Account {account_label(idx, total_accounts)} failed with error: {e}")
+                success = False
+
+            with counts_lock:
+                counts['successful' if success else 'failed'] += 1
+            if success:
+                print(f"✅ Account {account_label(idx, total_accounts)} ({account_data['email']}) completed successfully [context {slot}]")
+            else:
+                print(f"❌ Account {account_label(idx, total_accounts)} ({account_data['email']}) failed [context {slot}]")
+
+    try:
+        pool.start()
+        print(f"👷 Running {contexts} accounts at once in browser contexts of one Chrome")
+        with ThreadPoolExecutor(max_workers=contexts, thread_name_prefix="context") as executor:
+            for future in [executor.submit(context_slot, slot) for slot in range(1, contexts + 1)]:
+                future.result()
+    finally:
+        pool.close()
+        screenshots.close()
+        results.close()
+        if checkpoints:
+            checkpoints.close()
+        tracer.close()
+
+    return counts['successful'], counts['failed']
+
+
+# =====================================================
+# BATCH ENTRY POINT
+# =====================================================
+
+def run_batch_automation(workers=DEFAULT_WORKERS, headless=HEADLESS_MODE, input_csv=INPUT_CSV,
+                         timing_profile=None, fill_strategy=None, mailbox=None, checkpoint_db=CHECKPOINT_DB,
+                         use_pipeline=False, mail_concurrency=MAIL_CONCURRENCY, registration_engine=None,
+                         max_workers=None, load_profile=None, asset_cache=None, contexts=False, shard=None,
+                         rerun_completed=False):
+    """
+    Run automation for multiple accounts
+
+    Accounts stream from input_csv through AccountSource: invalid rows are
+    skipped, and so are accounts with a success in the results history
+    (unless rerun_completed) or, with checkpoint_db set, a finished
+    checkpoint; the rest resume at their first incomplete step. shard=(i, n)
+    runs only this runner's share of the file. With use_pipeline the
+    accounts go through StagePipeline, using `workers` as the number of
+    shared browsers. workers='auto' sizes the worker pool from memory/CPU
+    headroom (AdmissionController), up to max_workers.
+    load_profile='lean' blocks images, fonts, media and analytics per page;
+    asset_cache serves app bundles from the on-disk cache shared by workers.
+    With contexts, `workers` counts isolated browser contexts in one shared
+    Chrome (threads) instead of Chrome processes.
+    """
+    print("="*60)
+    print("🚀 WORLDPOSTA BATCH AUTOMATION")
+    print("="*60)
+
+    if not os.path.exists(input_csv):
+        print(f"❌ File not found: {input_csv}")
+        print(f"📝 Creating sample CSV file...")
+        create_sample_csv(input_csv)
+        return
+
+    checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+    history = None if rerun_completed else ResultsStore(db_path=RESULTS_DB, csv_path=None)
+    source = AccountSource(input_csv, shard=shard, results=history, checkpoints=checkpoints)
+
+    try:
+        # Reading stops at the first account; the rest streams in as workers free up
+        stream = iter(source)
+        try:
+            first = next(stream, None)
+        except (OSError, ValueError, csv.Error) as e:
+            print(f"❌ Error reading CSV: {e}")
+            return
+
+        if first is None:
+            print(f"\n📄 {source.describe()}")
+            if source.stats['completed']:
+                print("\n✅ Every account is already complete. Nothing to do.")
+            else:
+                print("\n⚠️  No accounts to process. Exiting.")
+            return
+        accounts = chain([first], stream)
+
+        # Start with half of what fits now and let the controller grow from there
+        autoscale = None
+        if workers == 'auto':
+            autoscale = AdmissionController(max_workers=max_workers)
+            fits = autoscale.initial_workers()
+            workers = fits if use_pipeline else max(1, fits // 2)
+
+        print(f"\n📊 Accounts: streaming from {input_csv}"
+              + (f" (shard {shard[0]}/{shard[1]})" if shard else ""))
+        print(f"⏱️  Delay between accounts: {DELAY_BETWEEN_ACCOUNTS[0]}-{DELAY_BETWEEN_ACCOUNTS[1]} seconds")
+        print(f"🖥️  Headless mode: {'Enabled' if headless else 'Disabled'}")
+        print(f"👷 Workers: {workers}" + (f" (auto, max {autoscale.max_workers})" if autoscale else "")
+              + (" browser contexts in one Chrome" if contexts else ""))
+
+        try:
+            if use_pipeline:
+                pipeline = StagePipeline(
+                    browsers=max(2, workers), headless=headless, timing_profile=timing_profile,
+                    fill_strategy=fill_strategy, mailbox=mailbox, checkpoints=checkpoints,
+                    mail_concurrency=mail_concurrency, registration_engine=registration_engine,
+                    load_profile=load_profile, asset_cache=asset_cache, contexts=contexts
+                )
+                successful, failed = pipeline.run(accounts)
+            elif contexts:
+                successful, failed = run_context_pool(
+                    accounts, workers, headless, timing_profile, fill_strategy, mailbox, checkpoint_db,
+                    registration_engine, load_profile, asset_cache
+                )
+            elif workers > 1 or autoscale:
+                successful, failed = run_worker_pool(
+                    accounts, workers, headless, timing_profile, fill_strategy, mailbox, checkpoint_db,
+                    registration_engine, autoscale, load_profile, asset_cache
+                )
+            else:
+                successful, failed = run_sequential(
+                    accounts, headless, timing_profile, fill_strategy, mailbox, checkpoints,
+                    registration_engine, load_profile, asset_cache
+                )
+        except KeyboardInterrupt:
+            print("\n⚠️  Batch processing interrupted by user")
+            print(f"📄 {source.describe()}")
+            return
+
+        # Accounts that finished in an earlier run count as successful
+        print(f"\n📄 {source.describe()}")
+        if source.stats['completed']:
+            print(f"⏩ {source.stats['completed']} accounts already completed in an earlier run")
+        successful += source.stats['completed']
+        print_summary(successful, failed, successful + failed)
+
+    finally:
+        if history:
+            history.close()
+        if checkpoints:
+            checkpoints.close()
+
+
+def run_sequential(accounts, headless, timing_profile=None, fill_strategy=None, mailbox=None, checkpoints=None,
+                   registration_engine=None, load_profile=None, asset_cache=None):
+    """
+    Run accounts one after another in a single browser
+
+    Returns:
+        tuple: (successful, failed)
+    """
+    successful = 0
+    failed = 0
     bot = None
 
     try:
         # Initialize bot once for all accounts
-        bot = WorldPostaAutomationBot(headless=HEADLESS_MODE)
+        bot = WorldPostaAutomationBot(
+            headless=headless, timing_profile=timing_profile, fill_strategy=fill_strategy, mailbox=mailbox,
+            checkpoints=checkpoints, registration_engine=registration_engine, load_profile=load_profile,
+            asset_cache=asset_cache
+        )
 
         for idx, account_data in enumerate(accounts, 1):
-            print("\n" + "#"*60)
-            print(f"🔄 PROCESSING ACCOUNT {idx}/{total_accounts}")
-            print("#"*60)
-            print(f"📧 Email: {account_data['email']}")
-            print(f"👤 Name: {account_data['full_name']}")
-            print(f"🏢 Company: {account_data['company']}")
+            # Wait before every account but the first
+            if idx > 1:
+                print(f"\n⏳ Waiting before next account...")
+                random_delay(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
+
+            print_account_header(idx, None, account_data)
 
             # Run workflow for this account
             try:
@@ -115,46 +599,144 @@ def run_batch_automation():
 
                 if success:
                     successful += 1
-                    print(f"✅ Account {idx}/{total_accounts} completed successfully")
+                    print(f"✅ Account {idx} completed successfully")
                 else:
                     failed += 1
-                    print(f"❌ Account {idx}/{total_accounts} failed")
+                    print(f"❌ Account {idx} failed")
 
             except Exception as e:
                 failed += 1
-                print(f"❌ Account {idx}/{total_accounts} failed with error: {e}")
-
-            # Wait before next account (if not last)
-            if idx < total_accounts:
-                wait_time = random_delay(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
-                print(f"\n⏳ Waiting before next account...")
-                time.sleep(wait_time)
-
-        # Final summary
-        print("\n" + "="*60)
-        print("📊 BATCH AUTOMATION COMPLETE")
-        print("="*60)
-        print(f"✅ Successful: {successful}/{total_accounts}")
-        print(f"❌ Failed: {failed}/{total_accounts}")
-        print(f"📁 Results saved to: registration_results.csv and registration_results.json")
-        print("="*60)
+                print(f"❌ Account {idx} failed with error: {e}")
 
         # Keep browser open for inspection
-        if not HEADLESS_MODE:
+        if not headless:
+            print(f"\n📊 Processed: {successful + failed} ({successful} successful)")
             print("\n⏸️  Browser will stay open. Press ENTER to close...")
             input("Press ENTER to close browser and exit...")
 
     except KeyboardInterrupt:
-        print("\n⚠️  Batch processing interrupted by user")
-        print(f"📊 Processed: {successful + failed}/{total_accounts}")
+        print(f"📊 Processed: {successful + failed}")
         print(f"✅ Successful: {successful}")
         print(f"❌ Failed: {failed}")
+        raise
     except Exception as e:
         print(f"\n❌ Fatal error in batch runner: {e}")
     finally:
         if bot:
             bot.close()
 
+    return successful, failed
+
+
+def enqueue_accounts(input_csv=INPUT_CSV, queue_url=QUEUE_URL, checkpoint_db=CHECKPOINT_DB, shard=None,
+                     rerun_completed=False):
+    """
+    Producer for the distributed work queue: stream the CSV into the queue
+
+    The same AccountSource filters apply (invalid rows, completed accounts,
+    shard). worker_daemon.py processes on any host then pull the accounts.
+    """
+    print("="*60)
+    print("📤 WORLDPOSTA ENQUEUE")
+    print("="*60)
+
+    if not os.path.exists(input_csv):
+        print(f"❌ File not found: {input_csv}")
+        return
+
+    checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+    history = None if rerun_completed else ResultsStore(db_path=RESULTS_DB, csv_path=None)
+    source = AccountSource(input_csv, shard=shard, results=history, checkpoints=checkpoints)
+    work_queue = None
+    try:
+        work_queue = open_work_queue(queue_url)
+        added, already_queued = work_queue.enqueue(source)
+        print(f"📄 {source.describe()}")
+        print(f"✅ Enqueued {added} accounts on {queue_url}"
+              + (f" ({already_queued} were already queued)" if already_queued else ""))
+        print_stats(work_queue.stats())
+    except (WorkQueueError, OSError, ValueError, csv.Error) as e:
+        print(f"❌ Could not enqueue accounts: {e}")
+    finally:
+        if work_queue:
+            work_queue.close()
+        if history:
+            history.close()
+        if checkpoints:
+            checkpoints.close()
+
+
+def worker_count(value):
+    """--workers value: a positive number or 'auto'"""
+    if value == 'auto':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got '{value}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta Batch Runner")
+
+    parser.add_argument("--workers", type=worker_count, default=DEFAULT_WORKERS,
+                        help="Number of parallel browser processes, or 'auto' to scale with free memory/CPU")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Upper bound for --workers auto (default: CPU count)")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS_MODE,
+                        help="Run without UI")
+    parser.add_argument("--input", default=INPUT_CSV, help="CSV file with accounts")
+    parser.add_argument("--timing", choices=sorted(TIMING_PROFILES), default=None,
+                        help="Cosmetic delay profile (staging removes them entirely)")
+    parser.add_argument("--fill", choices=sorted(FILL_STRATEGIES), default=None,
+                        help="How form fields are filled (keystroke, bulk or script)")
+    parser.add_argument("--mailbox", choices=sorted(MAILBOX_BACKENDS), default=None,
+                        help="How the verification email is received (browser, imap or ews)")
+    parser.add_argument("--engine", choices=REGISTRATION_ENGINES, default=None,
+                        help="Registration engine: browser form, http endpoint, or auto (http, browser fallback)")
+    parser.add_argument("--profile", choices=LOAD_PROFILES, default=None,
+                        help="Resource loading: full, or lean (block images, fonts, media and analytics)")
+    parser.add_argument("--asset-cache", action="store_true", default=None,
+                        help="Serve scripts, styles and fonts from the on-disk cache shared by all workers")
+    parser.add_argument("--contexts", action="store_true",
+                        help="Run --workers accounts as isolated browser contexts in one shared Chrome")
+    parser.add_argument("--shard", type=shard_spec, default=None, metavar="I/N",
+                        help="Run only shard I (0-based) of N; runners given the same file split it by email")
+    parser.add_argument("--rerun-completed", action="store_true",
+                        help="Also run accounts that already succeeded according to the results history")
+    parser.add_argument("--enqueue", nargs='?', const=QUEUE_URL, default=None, metavar="QUEUE_URL",
+                        help="Only put the accounts on a work queue for worker_daemon.py "
+                             f"(default URL: {QUEUE_URL})")
+    parser.add_argument("--checkpoints", default=CHECKPOINT_DB,
+                        help="Checkpoint database used to resume half-finished accounts")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Ignore checkpoints and run every account from registration")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Register further accounts while earlier ones wait for mail (--workers = browsers)")
+    parser.add_argument("--mail-concurrency", type=int, default=MAIL_CONCURRENCY,
+                        help="Accounts waiting for their verification email at once in --pipeline mode")
+
+    args = parser.parse_args()
+
+    if args.workers != 'auto' and args.workers < 1:
+        parser.error("--workers must be at least 1 or 'auto'")
+    if args.contexts and args.workers == 'auto':
+        parser.error("--contexts needs a fixed --workers count")
+
+    if args.enqueue:
+        enqueue_accounts(input_csv=args.input, queue_url=args.enqueue,
+                         checkpoint_db=None if args.no_resume else args.checkpoints, shard=args.shard,
+                         rerun_completed=args.rerun_completed)
+        return
+
+    run_batch_automation(workers=args.workers, headless=args.headless, input_csv=args.input,
+                         timing_profile=args.timing, fill_strategy=args.fill,
+                         mailbox=args.mailbox, checkpoint_db=None if args.no_resume else args.checkpoints,
+                         use_pipeline=args.pipeline, mail_concurrency=args.mail_concurrency,
+                         registration_engine=args.engine, max_workers=args.max_workers,
+                         load_profile=args.profile, asset_cache=args.asset_cache, contexts=args.contexts,
+                         shard=args.shard, rerun_completed=args.rerun_completed)
+
 
 if __name__ == "__main__":
-    run_batch_automation()
+    main()
@@ -0,0 +1,128 @@
+"""
+Microbenchmark: verification-link extraction
+Compares the old approach (BeautifulSoup html.parser over the whole OWA
+page_source, two find_all scans) with link_extractor on the same page and
+on the reading pane alone (what extract_from_driver actually receives).
+
+Usage:
+    python bench/bench_link_extractor.py                      # synthetic OWA page
+    python bench/bench_link_extractor.py recorded/*.html      # saved driver.page_source dumps
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+from bs4 import BeautifulSoup
+import lxml.html
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from link_extractor import extract_from_html  # noqa: E402
+
+
+CONFIRM_URL = "https://admin.worldposta.com/auth/ConfirmEmail?userId=8f2c1d&amp;code=CfDJ8Kx2Qm7vT0bench"
+
+MESSAGE_BODY = f"""
+<div aria-label="Message body" class="rps_4e2f">
+  <table width="100%"><tr><td>
+    <h1>Welcome To WorldPosta Business Email</h1>
+    <p>Thanks for registering. Please confirm your email address to activate your account.</p>
+    <p><a href="https://worldposta.com/" style="color:#679a41">WorldPosta</a></p>
+    <p><a href="{CONFIRM_URL}" style="background:#679a41;color:#fff;padding:12px 24px">Confirm Email Address</a></p>
+    <p>If you did not sign up, ignore this email.</p>
+  </td></tr></table>
+</div>
+"""
+
+
+def synthetic_owa_page(rows=400, script_kb=1500):
+    """OWA-sized document: big inline bundles, a long message list and one open message"""
+    script = "var __owa=[" + ('{"k":"' + "x" * 92 + '"},') * (script_kb * 1024 // 100) + "0];"
+    row = ('<div role="option" class="_lvv_3 ms-List-cell" aria-label="Message from WorldPosta {i}">'
+           '<div class="_lvv_E"><span class="lvHighlightAllClass">Newsletter {i}</span>'
+           '<span>Lorem ipsum dolor sit amet, consectetur adipiscing elit {i}</span>'
+           '<a href="https://mail.worldposta.com/owa/#item{i}">open</a></div></div>')
+    message_list = "".join(row.format(i=i) for i in range(rows))
+    styles = ".c{color:red}" * 5000
+    folders = '<a href="#">Folder</a>' * 50
+    return (f'<html><head><script>{script}</script><style>{styles}</style></head>'
+            f'<body><div id="app"><div role="navigation">{folders}</div>'
+            f'<div role="listbox">{message_list}</div>'
+            f'<div class="ReadingPaneContents">{MESSAGE_BODY}</div></div></body></html>')
+
+
+# XPath equivalents of READING_PANE_SELECTORS for offline recordings
+PANE_XPATHS = [
+    '//div[@aria-label="Message body"]',
+    '//div[@role="document"]',
+    '//div[contains(@class, "ReadingPaneContents")]',
+    '//div[starts-with(@id, "UniqueMessageBody")]',
+]
+
+
+def reading_pane(page_html):
+    """Reading-pane outerHTML, as READING_PANE_JS returns it in the browser"""
+    doc = lxml.html.fromstring(page_html)
+    for xpath in PANE_XPATHS:
+        for pane in doc.xpath(xpath):
+            if pane.xpath('.//a[contains(@href, "ConfirmEmail")]'):
+                return lxml.html.tostring(pane, encoding='unicode')
+    return page_html
+
+
+def legacy_extract(page_html):
+    """The pre-link_extractor implementation (methods 1 and 2)"""
+    soup = BeautifulSoup(page_html, "html.parser")
+    links = soup.find_all("a", string=lambda text: text and "Confirm Email" in text)
+    if links and links[0].get("href"):
+        return links[0]["href"]
+    links = soup.find_all("a", href=lambda href: href and "ConfirmEmail" in href)
+    if links and links[0].get("href"):
+        return links[0]["href"]
+    return None
+
+
+def fast_extract(html):
+    link = extract_from_html(html)
+    return link.url if link else None
+
+
+def measure(func, arg, iterations):
+    timings = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verification-link extraction benchmark")
+    parser.add_argument("pages", nargs="*", help="Recorded OWA page_source HTML files")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, encoding='utf-8').read()) for path in args.pages]
+    if not pages:
+        pages = [("synthetic OWA page", synthetic_owa_page())]
+
+    print(f"{'page':<28} {'size':>9} {'approach':<30} {'median ms':>10} {'speedup':>8}")
+    for name, page_html in pages:
+        pane_html = reading_pane(page_html)
+        legacy_ms, legacy_url = measure(legacy_extract, page_html, args.iterations)
+        rows = [
+            ("bs4 html.parser, page_source", legacy_ms, legacy_url, len(page_html)),
+            ("regex, page_source", *measure(fast_extract, page_html, args.iterations), len(page_html)),
+            ("regex, reading pane", *measure(fast_extract, pane_html, args.iterations), len(pane_html)),
+        ]
+        for approach, ms, url, size in rows:
+            match = "" if url == legacy_url else "  (different result!)"
+            print(f"{os.path.basename(name)[:28]:<28} {size / 1024:>7.0f}KB {approach:<30} {ms:>10.2f} "
+                  f"{legacy_ms / ms if ms else float('inf'):>7.0f}x{match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+End-to-end throughput benchmark
+Runs run_full_workflow for N generated accounts at several concurrency
+levels against local_standin.py, one browser worker process per slot, and
+reports accounts/minute, per-step latency percentiles, peak Chrome RSS per
+worker and per concurrent account, and CPU usage. With --contexts every
+slot is a browser context of one shared Chrome instead of its own browser.
+Results are written as JSON so runs can be compared between commits.
+
+Usage:
+    python bench/bench_throughput.py --accounts 20 --concurrency 1,2,4
+    python bench/bench_throughput.py --profile lean --output bench/results/lean.json
+    python bench/bench_throughput.py --mailbox imap --engine http --output bench/results/http.json
+    python bench/bench_throughput.py --contexts --output bench/results/contexts.json
+    python bench/bench_throughput.py --compare bench/results/base.json bench/results/http.json
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from local_standin import LocalStandin  # noqa: E402
+from resource_monitor import ResourceSampler  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_ACCOUNTS = 12
+DEFAULT_CONCURRENCY = "1,2,4"
+DEFAULT_MAIL_DELAY = 2.0
+WORKER_TIMEOUT = 600  # seconds without any finished account before a level is abandoned
+
+# Steps reported in the summary table, in workflow order
+REPORT_STEPS = ['register', 'email_login', 'find_email', 'extract_link', 'confirm_email', 'website_login',
+                'post_login', 'account']
+
+
+class SpanQueueExporter:
+    """Telemetry exporter sending finished spans to the parent process"""
+
+    def __init__(self, spans_queue, worker_id):
+        self.spans_queue = spans_queue
+        self.worker_id = worker_id
+
+    def export(self, spans):
+        for span in spans:
+            self.spans_queue.put(('span', self.worker_id, span.name, span.duration, span.status))
+
+    def close(self):
+        pass
+
+
+def bench_worker(worker_id, jobs, events, options, work_dir):
+    """One browser per worker: run accounts until the job queue says stop"""
+    # Imported here so the URL overrides in the environment are already set
+    from worldposta_automation import WorldPostaAutomationBot
+    from results_store import ResultsStore
+    from screenshots import ScreenshotService
+    from telemetry import Tracer
+    from asset_cache import AssetCache
+
+    results = ResultsStore(jsonl_path=os.path.join(work_dir, f"results_{worker_id}.jsonl"),
+                           db_path=os.path.join(work_dir, f"results_{worker_id}.db"), csv_path=None)
+    screenshots = ScreenshotService(os.path.join(work_dir, "screenshots"))
+    # One cache folder for every worker and level, like a long-running deployment
+    asset_cache = AssetCache(os.path.join(work_dir, "asset_cache")) if options['asset_cache'] else False
+    bot = None
+    try:
+        bot = WorldPostaAutomationBot(
+            headless=True, timing_profile=options['timing'], fill_strategy=options['fill'],
+            mailbox=options['mailbox'], results=results, screenshots=screenshots,
+            tracer=Tracer([SpanQueueExporter(events, worker_id)], log=False),
+            registration_engine=options['engine'], load_profile=options['profile'], asset_cache=asset_cache
+        )
+        events.put(('ready', worker_id, None, None, None))
+        while True:
+            account = jobs.get()
+            if account is None:
+                break
+            try:
+                success = bot.run_full_workflow(account)
+            except Exception as e:
+                print(f"❌ [bench worker {worker_id}] {account['email']}: {e}")
+                success = False
+            events.put(('account', worker_id, account['email'], None, 'ok' if success else 'error'))
+    except Exception as e:
+        print(f"❌ [bench worker {worker_id}] crashed: {e}")
+    finally:
+        if bot:
+            bot.close()
+        screenshots.close()
+        results.close()
+        events.put(('exit', worker_id, None, None, None))
+
+
+def bench_context_worker(slots, jobs, events, options, work_dir):
+    """One Chrome for all slots: each account runs in a fresh browser context"""
+    from concurrent.futures import ThreadPoolExecutor
+    from worldposta_automation import WorldPostaAutomationBot, create_driver
+    from browser_contexts import ContextPool
+    from results_store import ResultsStore
+    from screenshots import ScreenshotService
+    from telemetry import Tracer
+    from asset_cache import AssetCache
+
+    results = ResultsStore(jsonl_path=os.path.join(work_dir, "results_contexts.jsonl"),
+                           db_path=os.path.join(work_dir, "results_contexts.db"), csv_path=None)
+    screenshots = ScreenshotService(os.path.join(work_dir, "screenshots"))
+    asset_cache = AssetCache(os.path.join(work_dir, "asset_cache")) if options['asset_cache'] else False
+    pool = ContextPool(lambda: create_driver(True, options['profile']), size=slots)
+
+    def slot_loop(slot):
+        tracer = Tracer([SpanQueueExporter(events, slot)], log=False)
+        events.put(('ready', slot, None, None, None))
+        try:
+            while True:
+                account = jobs.get()
+                if account is None:
+                    break
+                try:
+                    with pool.lease() as driver:
+                        bot = WorldPostaAutomationBot(
+                            driver=driver, timing_profile=options['timing'], fill_strategy=options['fill'],
+                            mailbox=options['mailbox'], results=results, screenshots=screenshots, tracer=tracer,
+                            registration_engine=options['engine'], load_profile=options['profile'],
+                            asset_cache=asset_cache
+                        )
+                        try:
+                            success = bot.run_full_workflow(account)
+                        finally:
+                            bot.close()
+                except Exception as e:
+                    print(f"❌ [bench context {slot}] {account['email']}: {e}")
+                    success = False
+                events.put(('account', slot, account['email'], None, 'ok' if success else 'error'))
+        finally:
+            events.put(('exit', slot, None, None, None))
+
+    try:
+        pool.start()
+        with ThreadPoolExecutor(max_workers=slots) as executor:
+            list(executor.map(slot_loop, range(1, slots + 1)))
+    except Exception as e:
+        print(f"❌ [bench contexts] crashed: {e}")
+        for slot in range(1, slots + 1):
+            events.put(('exit', slot, None, None, None))
+    finally:
+        pool.close()
+        screenshots.close()
+        results.close()
+
+
+def bench_accounts(count, run_id):
+    """Unique accounts for one level (the stand-in rejects duplicate emails)"""
+    return [{
+        'full_name': f"Bench User {i}",
+        'email': f"bench.{run_id}.{i}@worldposta.com",
+        'company': f"BenchCorp {i}",
+        'phone': f"+1555{1000000 + i}",
+        'password': f"BenchPass@{i}123",
+    } for i in range(count)]
+
+
+def step_stats(durations):
+    values = sorted(durations)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 3),
+        'p50': round(percentile(values, 0.5), 3),
+        'p95': round(percentile(values, 0.95), 3),
+        'p99': round(percentile(values, 0.99), 3),
+        'max': round(values[-1], 3),
+    }
+
+
+def run_level(concurrency, accounts, options, work_dir, standin):
+    """Run all accounts with `concurrency` workers and summarise the level"""
+    served_before = standin.state.snapshot()
+    jobs = multiprocessing.Queue()
+    events = multiprocessing.Queue()
+    for account in accounts:
+        jobs.put(account)
+    for _ in range(concurrency):
+        jobs.put(None)
+
+    sampler = ResourceSampler()
+    processes = []
+    if options['contexts']:
+        # One process (one Chrome) hosting every slot
+        process = multiprocessing.Process(target=bench_context_worker,
+                                          args=(concurrency, jobs, events, options, work_dir),
+                                          name="bench-contexts")
+        process.start()
+        sampler.watch(1, process.pid)
+        processes.append(process)
+    else:
+        for worker_id in range(1, concurrency + 1):
+            process = multiprocessing.Process(target=bench_worker, args=(worker_id, jobs, events, options, work_dir),
+                                              name=f"bench-worker-{worker_id}")
+            process.start()
+            sampler.watch(worker_id, process.pid)
+            processes.append(process)
+    sampler.start()
+
+    durations = {}
+    successful = failed = ready = exited = 0
+    start = None
+    launch_start = time.time()
+    try:
+        while successful + failed < len(accounts) and exited < concurrency:
+            try:
+                kind, worker_id, name, duration, status = events.get(timeout=WORKER_TIMEOUT)
+            except queue.Empty:
+                print(f"⚠️  No progress for {WORKER_TIMEOUT}s, abandoning level {concurrency}")
+                break
+            if kind == 'ready':
+                ready += 1
+                # Throughput is measured from the first warm browser, launch time separately
+                start = start or time.time()
+            elif kind == 'span':
+                durations.setdefault(name, []).append(duration)
+            elif kind == 'account':
+                successful += status == 'ok'
+                failed += status != 'ok'
+                print(f"   {'✅' if status == 'ok' else '❌'} [{concurrency}x] {successful + failed}/{len(accounts)} {name}")
+            elif kind == 'exit':
+                exited += 1
+        wall = time.time() - (start or launch_start)
+    finally:
+        for process in processes:
+            process.join(timeout=60)
+            if process.is_alive():
+                process.terminate()
+        sampler.stop()
+
+    # Spans flushed after the last account event
+    while True:
+        try:
+            kind, _, name, duration, _ = events.get_nowait()
+        except queue.Empty:
+            break
+        if kind == 'span':
+            durations.setdefault(name, []).append(duration)
+
+    level = {
+        'concurrency': concurrency,
+        'accounts': len(accounts),
+        'successful': successful,
+        'failed': failed,
+        'wall_seconds': round(wall, 2),
+        'launch_seconds': round((start or time.time()) - launch_start, 2),
+        'accounts_per_minute': round(successful / wall * 60, 2) if wall > 0 else 0.0,
+        'steps': {name: step_stats(values) for name, values in sorted(durations.items())},
+    }
+    # Page assets the stand-in actually served (drops with --profile lean)
+    served = standin.state.snapshot()
+    level['asset_requests'] = served['asset_requests'] - served_before['asset_requests']
+    level['asset_mb'] = round((served['asset_bytes'] - served_before['asset_bytes']) / 1024 / 1024, 1)
+    # OWA inbox page loads: one per poll of the browser mailbox
+    level['inbox_loads'] = served['inbox_loads'] - served_before['inbox_loads']
+    level.update(sampler.summary())
+    # Memory per concurrent account, comparable between browsers and --contexts
+    level['rss_mb_per_slot'] = round(sum(level['peak_rss_mb_per_worker'].values()) / concurrency, 1)
+    return level
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ''
+
+
+def print_level(level):
+    print(f"\n📊 Concurrency {level['concurrency']}: {level['successful']}/{level['accounts']} ok in "
+          f"{level['wall_seconds']:.1f}s -> {level['accounts_per_minute']:.2f} accounts/min "
+          f"(launch {level['launch_seconds']:.1f}s)")
+    print(f"   Assets served: {level.get('asset_requests', 0)} requests, {level.get('asset_mb', 0):.1f} MB; "
+          f"inbox loads {level.get('inbox_loads', 0)}")
+    print(f"   RSS peak/worker {level['peak_rss_mb_max']:.0f} MB, per account slot "
+          f"{level.get('rss_mb_per_slot', 0):.0f} MB, CPU avg {level['cpu_percent_avg']:.0f}% "
+          f"peak {level['cpu_percent_peak']:.0f}%, min available {level['min_available_mb']:.0f} MB")
+    print(f"   {'step':<15} {'n':>4} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name in REPORT_STEPS:
+        stats = level['steps'].get(name)
+        if stats and stats['count']:
+            print(f"   {name:<15} {stats['count']:>4} {stats['p50']:>7.2f}s {stats['p95']:>7.2f}s {stats['p99']:>7.2f}s")
+
+
+def compare(base_path, new_path):
+    """Print per-level deltas between two result files"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"base: {base['meta'].get('commit') or base_path}   new: {new['meta'].get('commit') or new_path}")
+    base_levels = {level['concurrency']: level for level in base['levels']}
+
+    def delta(old, value):
+        return f"{(value - old) / old * 100:+.0f}%" if old else "n/a"
+
+    print(f"{'conc':>4} {'metric':<22} {'base':>10} {'new':>10} {'change':>8}")
+    for level in new['levels']:
+        old = base_levels.get(level['concurrency'])
+        if old is None:
+            continue
+        rows = [('accounts/min', old['accounts_per_minute'], level['accounts_per_minute']),
+                ('peak RSS MB/worker', old['peak_rss_mb_max'], level['peak_rss_mb_max']),
+                ('RSS MB/account slot', old.get('rss_mb_per_slot', 0), level.get('rss_mb_per_slot', 0)),
+                ('CPU avg %', old['cpu_percent_avg'], level['cpu_percent_avg']),
+                ('assets served MB', old.get('asset_mb', 0), level.get('asset_mb', 0)),
+                ('inbox loads', old.get('inbox_loads', 0), level.get('inbox_loads', 0))]
+        for name in REPORT_STEPS:
+            if level['steps'].get(name, {}).get('count') and old['steps'].get(name, {}).get('count'):
+                rows.append((f"{name} p95 s", old['steps'][name]['p95'], level['steps'][name]['p95']))
+        for metric, old_value, new_value in rows:
+            print(f"{level['concurrency']:>4} {metric:<22} {old_value:>10.2f} {new_value:>10.2f} "
+                  f"{delta(old_value, new_value):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput benchmark against the local stand-in")
+    parser.add_argument("--accounts", type=int, default=DEFAULT_ACCOUNTS, help="Accounts per concurrency level")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY, help="Comma-separated worker counts")
+    parser.add_argument("--mail-delay", type=float, default=DEFAULT_MAIL_DELAY,
+                        help="Seconds until the stand-in delivers the welcome mail")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in latency per request (seconds)")
+    parser.add_argument("--timing", default="staging", help="Timing profile for the bots")
+    parser.add_argument("--fill", default=None, help="Field-fill strategy")
+    parser.add_argument("--mailbox", default="browser", help="Mailbox backend (browser or imap)")
+    parser.add_argument("--engine", default="browser", help="Registration engine (browser, http, auto)")
+    parser.add_argument("--profile", default="full", help="Resource loading profile (full or lean)")
+    parser.add_argument("--asset-cache", action="store_true", help="Serve app bundles from a shared disk cache")
+    parser.add_argument("--contexts", action="store_true",
+                        help="Run each level's slots as browser contexts of one Chrome")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    parser.add_argument("--output", help="Result file (default bench/results/throughput_<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    levels = [int(c) for c in args.concurrency.split(',') if c.strip()]
+    options = {'timing': args.timing, 'fill': args.fill, 'mailbox': args.mailbox, 'engine': args.engine,
+               'profile': args.profile, 'asset_cache': args.asset_cache, 'contexts': args.contexts}
+
+    standin = LocalStandin(admin_port=0, mail_port=0, imap_port=0, mail_delay=args.mail_delay,
+                           latency=args.latency).start()
+    os.environ.update(standin.env())
+    work_dir = tempfile.mkdtemp(prefix="worldposta_bench_")
+    # Arrival history starts empty and is learned over the levels of this run
+    os.environ['WORLDPOSTA_MAIL_LATENCY_DB'] = os.path.join(work_dir, "mail_latency.db")
+    print(f"🧪 Stand-in at {standin.admin_url} / {standin.mail_url}, work dir {work_dir}")
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'label': args.label,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'accounts': args.accounts,
+            'mail_delay': args.mail_delay,
+            'latency': args.latency,
+            **options,
+        },
+        'levels': [],
+    }
+
+    run_id = datetime.now().strftime("%H%M%S")
+    try:
+        for concurrency in levels:
+            print(f"\n🚀 {args.accounts} accounts with {concurrency} "
+                  f"{'browser contexts' if args.contexts else 'workers'}...")
+            accounts = bench_accounts(args.accounts, f"{run_id}c{concurrency}")
+            level = run_level(concurrency, accounts, options, work_dir, standin)
+            results['levels'].append(level)
+            print_level(level)
+    finally:
+        standin.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"throughput_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
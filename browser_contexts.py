@@ -0,0 +1,232 @@
+"""
+Browser contexts in one Chrome
+Instead of one Chrome process tree per account, one Chrome hosts many
+isolated browser contexts (CDP Target.createBrowserContext), each with its
+own cookies, storage and cache, like separate incognito profiles. Every
+account gets a fresh context with one tab.
+
+Selenium drives one window at a time per session, so each concurrent slot
+keeps its own chromedriver session attached to the shared Chrome
+(debuggerAddress) and switches it to the tab of its current context.
+Sessions are started up front; a context plus tab is created per lease and
+disposed on release, so there is nothing to reset between accounts.
+
+Usage:
+    pool = ContextPool(lambda: create_driver(headless=True), size=8).start()
+    with pool.lease() as driver:
+        WorldPostaAutomationBot(driver=driver).run_full_workflow(account)
+    pool.close()
+"""
+
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from browser_pool import WINDOW_SIZE, SlotCount, relaunch
+from cdp_session import CdpConnection, CdpError, debugger_address
+from waits import install_request_tracker
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+DEFAULT_CONTEXTS = int(os.environ.get("WORLDPOSTA_CONTEXTS", "4"))  # concurrent contexts per Chrome
+PAGE_LOAD_TIMEOUT = 60
+
+
+class BrowserContext:
+    """One isolated context and its tab, driven by an attached session"""
+
+    def __init__(self, context_id, target_id, driver):
+        self.context_id = context_id
+        self.target_id = target_id
+        self.driver = driver
+
+
+def chromedriver_path(driver):
+    """The (patched) chromedriver binary undetected_chromedriver launched, if any"""
+    patcher = getattr(driver, 'patcher', None)
+    return getattr(patcher, 'executable_path', None)
+
+
+class ContextHost:
+    """
+    One Chrome whose tabs live in separate browser contexts
+
+    Usage:
+        host = ContextHost(create_driver(headless=True))
+        session = host.attach_session()
+        context = host.open_context(session)
+        ...
+        host.close_context(context)
+        host.close()
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.address = debugger_address(driver)
+        self.executable_path = chromedriver_path(driver)
+        self.connection = CdpConnection.for_driver(driver)
+
+    def attach_session(self):
+        """New chromedriver session attached to the shared Chrome (no browser launched)"""
+        options = webdriver.ChromeOptions()
+        options.debugger_address = self.address
+        service = Service(executable_path=self.executable_path) if self.executable_path else Service()
+        driver = webdriver.Chrome(service=service, options=options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        return driver
+
+    def open_context(self, session, window_size=WINDOW_SIZE):
+        """
+        Fresh browser context with one blank tab, selected in `session`
+
+        Returns:
+            BrowserContext
+        """
+        # Disposed with its tabs if this process dies and the connection drops
+        context_id = self.connection.send('Target.createBrowserContext', {'disposeOnDetach': True})['browserContextId']
+        try:
+            target_id = self.connection.send('Target.createTarget', {
+                'url': 'about:blank', 'browserContextId': context_id,
+            })['targetId']
+            session.switch_to.window(target_id)
+            if window_size:
+                session.set_window_size(*window_size)
+            install_request_tracker(session)
+        except Exception:
+            self._dispose(context_id)
+            raise
+        return BrowserContext(context_id, target_id, session)
+
+    def _dispose(self, context_id):
+        try:
+            self.connection.send('Target.disposeBrowserContext', {'browserContextId': context_id})
+        except CdpError as e:
+            print(f"⚠ Could not dispose browser context: {e}")
+
+    def close_context(self, context):
+        """Drop the context with its tabs, cookies and storage"""
+        self._dispose(context.context_id)
+
+    def close(self):
+        self.connection.close()
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"⚠ Error closing context host browser: {e}")
+
+
+class ContextPool:
+    """
+    Browser contexts in one shared Chrome, leased like BrowserPool browsers
+
+    Usage:
+        pool = ContextPool(lambda: create_driver(headless=True), size=8)
+        pool.start()
+        with pool.lease() as driver:
+            WorldPostaAutomationBot(driver=driver).run_full_workflow(account)
+        pool.close()
+    """
+
+    def __init__(self, launcher, size=DEFAULT_CONTEXTS, window_size=WINDOW_SIZE):
+        """
+        Args:
+            launcher: Callable returning the Selenium driver of the host Chrome
+            size: Accounts running at once (one attached session each)
+            window_size: Window size of every context's tab
+        """
+        self.launcher = launcher
+        self.size = size
+        self.window_size = window_size
+
+        self.host = None
+        self.idle = queue.Queue()
+        self.slots = SlotCount(size, self.idle)
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _attach(self):
+        session = self.host.attach_session()
+        with self.lock:
+            self.sessions.add(session)
+        return session
+
+    def _retire(self, session):
+        with self.lock:
+            self.sessions.discard(session)
+        try:
+            # An attached session detaches on quit; the shared Chrome keeps running
+            session.quit()
+        except Exception as e:
+            print(f"⚠ Error closing context session: {e}")
+
+    def start(self):
+        """Launch the host Chrome and attach every session up front"""
+        print(f"🌐 Launching one Chrome for {self.size} browser contexts...")
+        start = time.time()
+        self.host = ContextHost(self.launcher())
+        for _ in range(self.size):
+            self.idle.put(self._attach())
+        print(f"✅ Context pool ready ({self.size} sessions in {time.time() - start:.1f}s)")
+        return self
+
+    def acquire(self, timeout=None):
+        """A fresh isolated context, waiting up to timeout seconds for a free session"""
+        try:
+            session = self.slots.check(self.idle.get(timeout=timeout))
+        except queue.Empty:
+            raise TimeoutError(f"No browser context available within {timeout}s")
+        try:
+            return self.host.open_context(session, self.window_size)
+        except Exception:
+            self.release_session(session, healthy=False)
+            raise
+
+    def release_session(self, session, healthy=True):
+        if self.closed:
+            self._retire(session)
+            return
+        if not healthy:
+            self._retire(session)
+            session = relaunch(self._attach, "reattach context session", lambda: self.closed)
+            if session is None:
+                if not self.closed:
+                    self.slots.lose("browser context")
+                return
+        self.idle.put(session)
+
+    def release(self, context, healthy=True):
+        """Dispose the account's context and free its session for the next account"""
+        self.host.close_context(context)
+        self.release_session(context.driver, healthy)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager yielding a driver on a fresh context for one account"""
+        context = self.acquire(timeout)
+        healthy = True
+        try:
+            yield context.driver
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.release(context, healthy)
+
+    def close(self):
+        """Detach every session and quit the host Chrome"""
+        self.closed = True
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            self._retire(session)
+        if self.host is not None:
+            self.host.close()
@@ -0,0 +1,257 @@
+"""
+Warm browser pool
+Pre-launches Chrome instances and hands them out per account. Between
+accounts a browser is reset (cookies, storage, extra tabs, window size)
+instead of relaunched; it is only recycled after MAX_USES accounts.
+"""
+
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+DEFAULT_POOL_SIZE = 2
+MAX_USES = 20  # accounts per browser before it is replaced by a fresh one
+WINDOW_SIZE = (1920, 1080)
+RELAUNCH_ATTEMPTS = 4  # tries to replace a recycled browser before its slot is given up
+RELAUNCH_BACKOFF = 5  # seconds before the second try; doubles after each failure
+
+# Origins whose cookies/storage are wiped between accounts
+RESET_ORIGINS = [
+    os.environ.get("WORLDPOSTA_ADMIN_URL", "https://admin.worldposta.com"),
+    os.environ.get("WORLDPOSTA_MAIL_URL", "https://mail.worldposta.com"),
+]
+
+
+class PoolExhausted(Exception):
+    """Every slot of a pool failed to relaunch; nothing will ever be free again"""
+
+
+def relaunch(launch, description, closed):
+    """
+    Call launch() until it succeeds, backing off between failed attempts
+
+    Args:
+        launch: Callable returning the new browser/session
+        description: What is launched, for log lines
+        closed: Callable; True once the pool shuts down (stop retrying)
+
+    Returns:
+        launch()'s result, or None after RELAUNCH_ATTEMPTS failures or on shutdown
+    """
+    delay = RELAUNCH_BACKOFF
+    for attempt in range(1, RELAUNCH_ATTEMPTS + 1):
+        if closed():
+            return None
+        try:
+            return launch()
+        except Exception as e:
+            print(f"❌ Could not {description} (attempt {attempt}/{RELAUNCH_ATTEMPTS}): {e}")
+        if attempt < RELAUNCH_ATTEMPTS:
+            time.sleep(delay)
+            delay *= 2
+    return None
+
+
+class SlotCount:
+    """
+    Live slots of a pool; once none are left, waiters in acquire() are woken
+    with PoolExhausted instead of blocking forever on an idle queue nobody fills
+    """
+
+    def __init__(self, size, idle):
+        self.live = size
+        self.idle = idle
+        self.lock = threading.Lock()
+
+    def lose(self, description):
+        with self.lock:
+            self.live -= 1
+            live = self.live
+        print(f"⚠ Giving up a {description} slot; {live} left")
+        if live <= 0:
+            self.idle.put(None)
+
+    def check(self, item):
+        """Pass an item taken from the idle queue through, or raise if it is the exhaustion marker"""
+        if item is None:
+            self.idle.put(None)  # wake the next waiter too
+            raise PoolExhausted("every slot failed to relaunch")
+        return item
+
+
+class PooledBrowser:
+    """A launched driver plus its usage counter"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.launched_at = time.time()
+
+
+def reset_browser(driver, origins=RESET_ORIGINS, window_size=WINDOW_SIZE):
+    """
+    Return a browser to a clean per-account state without relaunching it
+
+    Closes every tab but the first, clears cookies and site storage for
+    the known origins, navigates to about:blank and restores the window.
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    driver.get("about:blank")
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    for origin in origins:
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+            "origin": origin,
+            "storageTypes": "local_storage,session_storage,indexeddb,websql,service_workers,cache_storage",
+        })
+
+    if window_size:
+        driver.set_window_size(*window_size)
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched browsers
+
+    Usage:
+        pool = BrowserPool(lambda: create_driver(headless=True), size=2)
+        pool.start()
+        with pool.lease() as driver:
+            WorldPostaAutomationBot(driver=driver).run_full_workflow(account)
+        pool.close()
+    """
+
+    def __init__(self, launcher, size=DEFAULT_POOL_SIZE, max_uses=MAX_USES,
+                 origins=RESET_ORIGINS, window_size=WINDOW_SIZE):
+        """
+        Args:
+            launcher: Callable returning a new Selenium driver
+            size: Number of browsers kept warm
+            max_uses: Accounts served by one browser before it is recycled
+            origins: Origins cleared between accounts
+            window_size: Window size restored between accounts
+        """
+        self.launcher = launcher
+        self.size = size
+        self.max_uses = max_uses
+        self.origins = origins
+        self.window_size = window_size
+
+        self.idle = queue.Queue()
+        self.slots = SlotCount(size, self.idle)
+        self.launch_lock = threading.Lock()  # driver patching is not thread-safe
+        self.all_browsers = set()
+        self.lock = threading.Lock()  # guards all_browsers and closed
+        self.closed = False
+
+    def _launch(self):
+        """New pooled browser, or None if the pool was closed while it started"""
+        with self.launch_lock:
+            browser = PooledBrowser(self.launcher())
+        with self.lock:
+            if not self.closed:
+                self.all_browsers.add(browser)
+                return browser
+        self._quit(browser)
+        return None
+
+    def _retire(self, browser):
+        with self.lock:
+            self.all_browsers.discard(browser)
+        self._quit(browser)
+
+    @staticmethod
+    def _quit(browser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            print(f"⚠ Error closing pooled browser: {e}")
+
+    def _replace(self, browser):
+        """Quit a browser and put a freshly launched one in its place"""
+        self._retire(browser)
+        browser = relaunch(self._launch, "relaunch pooled browser", lambda: self.closed)
+        if browser is not None:
+            self.idle.put(browser)
+        elif not self.closed:
+            self.slots.lose("browser")
+
+    def start(self):
+        """Launch all browsers up front"""
+        print(f"🌐 Pre-launching {self.size} browsers...")
+        start = time.time()
+        for _ in range(self.size):
+            browser = self._launch()
+            if browser is None:
+                return self
+            self.idle.put(browser)
+        print(f"✅ Browser pool ready ({self.size} browsers in {time.time() - start:.1f}s)")
+        return self
+
+    def acquire(self, timeout=None):
+        """
+        Take a warm browser, waiting up to timeout seconds for one to free up
+
+        Raises:
+            TimeoutError: none freed up in time
+            PoolExhausted: every browser failed to relaunch
+        """
+        try:
+            browser = self.slots.check(self.idle.get(timeout=timeout))
+        except queue.Empty:
+            raise TimeoutError(f"No pooled browser available within {timeout}s")
+        browser.uses += 1
+        return browser
+
+    def release(self, browser, healthy=True):
+        """
+        Give a browser back after an account
+
+        Browsers that reached max_uses or are unhealthy are replaced in the
+        background; the rest are reset and reused.
+        """
+        if self.closed:
+            self._retire(browser)
+            return
+
+        if healthy and browser.uses < self.max_uses:
+            try:
+                reset_browser(browser.driver, self.origins, self.window_size)
+                self.idle.put(browser)
+                return
+            except Exception as e:
+                print(f"⚠ Browser reset failed, recycling it: {e}")
+
+        threading.Thread(target=self._replace, args=(browser,), daemon=True).start()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager yielding a driver for one account"""
+        browser = self.acquire(timeout)
+        healthy = True
+        try:
+            yield browser.driver
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.release(browser, healthy)
+
+    def close(self):
+        """Quit every browser in the pool"""
+        with self.lock:
+            self.closed = True
+            browsers = list(self.all_browsers)
+        for browser in browsers:
+            self._retire(browser)
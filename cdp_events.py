@@ -0,0 +1,261 @@
+"""
+Event-driven waits over CDP
+Instead of polling current_url / find_elements, a step arms an
+Expectation before the action that triggers it (click, submit, refresh)
+and then waits for whichever of its events arrives first:
+
+    navigation_from   main frame committed a URL other than this one
+                      (Page.frameNavigated / navigatedWithinDocument)
+    url_contains      main frame committed a URL containing a fragment
+    response          network response whose URL contains a fragment
+                      (optionally with a given status)
+    selector          an element matching a CSS selector exists
+                      (in-page MutationObserver reporting via a binding)
+    new_window        a new tab/window was opened (Target.targetCreated)
+
+Usage:
+    events = attach_page_events(driver)
+    expected = events.expect(navigation_from=driver.current_url, response='/api/auth/login')
+    button.click()
+    wait_for_event(driver, expected, url_changes(previous_url), description="sign-in")
+"""
+
+import os
+import threading
+
+from cdp_session import CdpConnection, CdpError
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+CDP_EVENTS = os.environ.get("WORLDPOSTA_CDP_EVENTS", "1") == "1"
+
+BINDING = "__wpSelectorSeen"
+
+# Installed in every document: watches selectors until they match, then reports once
+WATCH_JS = """
+(function () {
+    if (window.__wpWatch) return;
+    var watched = {}, observer = null;
+    function check() {
+        for (var selector in watched) {
+            if (document.querySelector(selector)) {
+                delete watched[selector];
+                if (window.%(binding)s) window.%(binding)s(selector);
+            }
+        }
+        if (observer && !Object.keys(watched).length) { observer.disconnect(); observer = null; }
+    }
+    window.__wpWatch = function (selector) {
+        watched[selector] = true;
+        check();
+        if (!observer && Object.keys(watched).length) {
+            observer = new MutationObserver(check);
+            observer.observe(document.documentElement || document, {childList: true, subtree: true, attributes: true});
+        }
+    };
+})();
+""" % {'binding': BINDING}
+
+
+class Expectation:
+    """An any-of set of awaited events, armed before the action that triggers them"""
+
+    def __init__(self, events, navigation_from=None, url_contains=(), response=None, status=None,
+                 selector=None, new_window=False):
+        self.events = events
+        self.navigation_from = navigation_from
+        self.url_contains = [url_contains.lower()] if isinstance(url_contains, str) \
+            else [fragment.lower() for fragment in url_contains]
+        self.response = response
+        self.status = status
+        self.selector = selector
+        self.new_window = new_window
+        self.fired = threading.Event()
+        self.label = None
+
+    def fire(self, label):
+        if not self.fired.is_set():
+            self.label = label
+            self.fired.set()
+
+    def on_navigation(self, url):
+        lowered = url.lower()
+        for fragment in self.url_contains:
+            if fragment in lowered:
+                self.fire(f"url contains {fragment}")
+                return
+        if self.navigation_from is not None and url != self.navigation_from:
+            self.fire("navigation")
+
+    def wait(self, timeout):
+        """Label of the event that fired within timeout, else None (stays armed)"""
+        return self.label if self.fired.wait(timeout) else None
+
+    def cancel(self):
+        self.events.forget(self)
+
+
+class PageEvents:
+    """
+    Event subscriptions for one browser tab
+
+    Usage:
+        events = PageEvents.attach(driver)
+        expected = events.expect(selector='button.launch-button')
+        ...
+        expected.wait(15)
+        events.close()
+    """
+
+    def __init__(self, connection, target):
+        self.connection = connection
+        self.target = target
+        self.expectations = []
+        self.lock = threading.Lock()
+        # Target discovery reports every page in the browser, including the
+        # other browser contexts' tabs (--contexts); only ours count
+        try:
+            info = connection.send('Target.getTargetInfo', {'targetId': target.target_id})['targetInfo']
+            self.context_id = info.get('browserContextId')
+        except (CdpError, KeyError):
+            self.context_id = None
+
+        target.on('Page.frameNavigated', self._frame_navigated)
+        target.on('Page.navigatedWithinDocument', self._within_document)
+        target.on('Page.domContentEventFired', self._document_ready)
+        target.on('Network.responseReceived', self._response)
+        target.on('Runtime.bindingCalled', self._binding_called)
+        connection.on('Target.targetCreated', self._target_created)
+
+        target.send('Page.enable')
+        target.send('Network.enable')
+        target.send('Page.addScriptToEvaluateOnNewDocument', {'source': WATCH_JS})
+        try:
+            target.send('Runtime.addBinding', {'name': BINDING})
+        except CdpError:
+            # Older Chrome: bindings need the Runtime domain enabled
+            target.send('Runtime.enable')
+            target.send('Runtime.addBinding', {'name': BINDING})
+        target.send('Runtime.evaluate', {'expression': WATCH_JS})
+        connection.send('Target.setDiscoverTargets', {'discover': True})
+
+    @classmethod
+    def attach(cls, driver):
+        connection = CdpConnection.for_driver(driver)
+        try:
+            return cls(connection, connection.attach(driver.current_window_handle))
+        except Exception:
+            connection.close()
+            raise
+
+    def expect(self, navigation_from=None, url_contains=(), response=None, status=None, selector=None,
+               new_window=False):
+        """
+        Arm an expectation; call before the action that triggers it
+
+        Returns:
+            Expectation
+        """
+        expectation = Expectation(self, navigation_from, url_contains, response, status, selector, new_window)
+        with self.lock:
+            self.expectations.append(expectation)
+        if selector:
+            self._watch(selector)
+        return expectation
+
+    def forget(self, expectation):
+        with self.lock:
+            if expectation in self.expectations:
+                self.expectations.remove(expectation)
+
+    def _active(self):
+        with self.lock:
+            return [e for e in self.expectations if not e.fired.is_set()]
+
+    def _watch(self, selector):
+        expression = f"window.__wpWatch && window.__wpWatch({json_string(selector)})"
+        try:
+            self.target.send_nowait('Runtime.evaluate', {'expression': expression})
+        except CdpError:
+            pass
+
+    # =====================================================
+    # EVENT HANDLERS (CDP event thread)
+    # =====================================================
+
+    def _frame_navigated(self, params):
+        frame = params.get('frame', {})
+        if frame.get('parentId'):
+            return
+        url = frame.get('url', '') + frame.get('urlFragment', '')
+        for expectation in self._active():
+            expectation.on_navigation(url)
+        self._document_ready(params)
+
+    def _within_document(self, params):
+        if params.get('frameId') not in (None, self.target.target_id):
+            return
+        for expectation in self._active():
+            expectation.on_navigation(params.get('url', ''))
+
+    def _document_ready(self, params):
+        # A new document forgets the selectors it should watch
+        for selector in {e.selector for e in self._active() if e.selector}:
+            self._watch(selector)
+
+    def _response(self, params):
+        response = params.get('response', {})
+        url, status = response.get('url', ''), response.get('status')
+        for expectation in self._active():
+            if expectation.response and expectation.response in url \
+                    and (expectation.status is None or expectation.status == status):
+                expectation.fire(f"response {status} {expectation.response}")
+
+    def _binding_called(self, params):
+        if params.get('name') != BINDING:
+            return
+        for expectation in self._active():
+            if expectation.selector == params.get('payload'):
+                expectation.fire(f"element {expectation.selector}")
+
+    def _target_created(self, params):
+        info = params.get('targetInfo', {})
+        if info.get('type') != 'page' or info.get('targetId') == self.target.target_id:
+            return
+        # Opened by this tab; without an opener (noopener links) at least in its browser context
+        opener = info.get('openerId')
+        if opener is not None and opener != self.target.target_id:
+            return
+        if opener is None and self.context_id and info.get('browserContextId') != self.context_id:
+            return
+        for expectation in self._active():
+            if expectation.new_window:
+                expectation.fire("new window")
+
+    def close(self):
+        self.connection.close()
+
+
+def json_string(text):
+    """JS string literal for a selector"""
+    return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def attach_page_events(driver, enabled=None):
+    """
+    Event subscriptions for the driver's current tab
+
+    Returns:
+        PageEvents, or None when disabled (WORLDPOSTA_CDP_EVENTS=0) or CDP
+        events are unavailable; callers then poll as before
+    """
+    if not (CDP_EVENTS if enabled is None else enabled):
+        return None
+    try:
+        return PageEvents.attach(driver)
+    except (CdpError, OSError, ValueError, KeyError) as e:
+        print(f"⚠ CDP events unavailable, polling instead: {e}")
+        return None
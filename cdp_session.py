@@ -0,0 +1,315 @@
+"""
+CDP event connection
+Selenium's execute_cdp_cmd is request/response only, so anything that
+needs DevTools events (Fetch interception, lifecycle events) talks to
+Chrome's remote-debugging websocket directly. This module is a small
+stdlib websocket client plus a flattened-session CDP connection:
+
+    connection = CdpConnection.for_driver(driver)   # browser-level socket
+    page = connection.attach(driver.current_window_handle)
+    page.on('Fetch.requestPaused', handler)          # runs on the event thread
+    page.send('Fetch.enable', {...})
+    connection.close()
+
+Events are dispatched on one thread per connection, so a handler may call
+send() and wait for its answer.
+"""
+
+import os
+import json
+import queue
+import base64
+import socket
+import struct
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+COMMAND_TIMEOUT = 30  # seconds to wait for a CDP command's response
+CONNECT_TIMEOUT = 10
+
+
+class CdpError(Exception):
+    """A CDP command failed or the connection is gone"""
+
+
+# =====================================================
+# WEBSOCKET
+# =====================================================
+
+def _mask(data, key):
+    """XOR the payload with the 4-byte key (whole-buffer integer XOR, fast for large bodies)"""
+    if not data:
+        return data
+    repeated = (key * (len(data) // 4 + 1))[:len(data)]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(data), 'big')
+
+
+class WebSocket:
+    """Minimal RFC 6455 client: text frames out, text/continuation/ping/close in"""
+
+    def __init__(self, url, timeout=CONNECT_TIMEOUT):
+        parts = urlsplit(url)
+        self.sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.send_lock = threading.Lock()
+
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        path = parts.path + ('?' + parts.query if parts.query else '')
+        request = (f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nUpgrade: websocket\r\n"
+                   f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        self.sock.sendall(request.encode('ascii'))
+
+        self.reader = self.sock.makefile('rb')
+        status = self.reader.readline().decode('latin-1')
+        if ' 101 ' not in status:
+            raise CdpError(f"websocket handshake failed: {status.strip()}")
+        while self.reader.readline() not in (b'\r\n', b'\n', b''):
+            pass
+        # Reads block until the connection closes; commands time out on their own
+        self.sock.settimeout(None)
+
+    def send(self, text, opcode=0x1):
+        payload = text.encode('utf-8') if isinstance(text, str) else text
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+        key = os.urandom(4)
+        with self.send_lock:
+            self.sock.sendall(header + key + _mask(payload, key))
+
+    def _read_exact(self, count):
+        data = self.reader.read(count)
+        if data is None or len(data) < count:
+            raise CdpError("websocket closed")
+        return data
+
+    def recv(self):
+        """Next complete text message (None once the peer closed)"""
+        message = b''
+        while True:
+            first, second = self._read_exact(2)
+            opcode, length = first & 0x0F, second & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self._read_exact(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self._read_exact(8))[0]
+            key = self._read_exact(4) if second & 0x80 else None
+            payload = self._read_exact(length)
+            if key:
+                payload = _mask(payload, key)
+
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.send(payload, opcode=0xA)
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode('utf-8')
+
+    def close(self):
+        try:
+            self.send(b'', opcode=0x8)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# =====================================================
+# CDP
+# =====================================================
+
+def debugger_address(driver):
+    """host:port of the driver's Chrome remote-debugging endpoint"""
+    options = driver.capabilities.get('goog:chromeOptions', {})
+    address = options.get('debuggerAddress')
+    if not address:
+        raise CdpError("driver exposes no debuggerAddress")
+    return address
+
+
+def browser_websocket_url(address, timeout=CONNECT_TIMEOUT):
+    """Browser-level DevTools websocket URL from /json/version"""
+    host, port = address.rsplit(':', 1)
+    connection = http.client.HTTPConnection(host, int(port), timeout=timeout)
+    try:
+        connection.request('GET', '/json/version')
+        return json.loads(connection.getresponse().read())['webSocketDebuggerUrl']
+    finally:
+        connection.close()
+
+
+class CdpTarget:
+    """One attached target (page) on a CdpConnection"""
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    def send(self, method, params=None, timeout=COMMAND_TIMEOUT):
+        return self.connection.send(method, params, session_id=self.session_id, timeout=timeout)
+
+    def send_nowait(self, method, params=None):
+        self.connection.send_nowait(method, params, session_id=self.session_id)
+
+    def on(self, method, handler):
+        self.connection.on(method, handler, session_id=self.session_id)
+
+    def off(self, method, handler):
+        self.connection.off(method, handler, session_id=self.session_id)
+
+    def detach(self):
+        try:
+            self.connection.send('Target.detachFromTarget', {'sessionId': self.session_id}, timeout=5)
+        except CdpError:
+            pass
+
+
+class CdpConnection:
+    """
+    Browser-level DevTools connection with flattened target sessions
+
+    Usage:
+        connection = CdpConnection.for_driver(driver)
+        page = connection.attach(driver.current_window_handle)
+        page.send('Page.enable')
+        connection.close()
+    """
+
+    def __init__(self, websocket_url):
+        self.websocket = WebSocket(websocket_url)
+        self.next_id = 0
+        self.pending = {}  # command id -> [threading.Event, response]
+        self.handlers = {}  # (session id, method) -> [callables]
+        self.lock = threading.Lock()
+        self.events = queue.Queue()
+        self.closed = False
+
+        self.reader = threading.Thread(target=self._read_loop, name="cdp-reader", daemon=True)
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="cdp-events", daemon=True)
+        self.reader.start()
+        self.dispatcher.start()
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Connect to the Chrome behind a Selenium/undetected-chromedriver driver"""
+        return cls(browser_websocket_url(debugger_address(driver)))
+
+    def _read_loop(self):
+        try:
+            while True:
+                text = self.websocket.recv()
+                if text is None:
+                    break
+                message = json.loads(text)
+                if 'id' in message:
+                    with self.lock:
+                        waiter = self.pending.pop(message['id'], None)
+                    if waiter:
+                        waiter[1] = message
+                        waiter[0].set()
+                else:
+                    self.events.put(message)
+        except (CdpError, OSError, ValueError):
+            pass
+        finally:
+            self.closed = True
+            with self.lock:
+                waiters, self.pending = list(self.pending.values()), {}
+            for waiter in waiters:
+                waiter[0].set()
+            self.events.put(None)
+
+    def _dispatch_loop(self):
+        while True:
+            message = self.events.get()
+            if message is None:
+                break
+            key = (message.get('sessionId'), message.get('method'))
+            with self.lock:
+                handlers = list(self.handlers.get(key, ()))
+            for handler in handlers:
+                try:
+                    handler(message.get('params', {}))
+                except Exception as e:
+                    print(f"⚠ CDP handler for {key[1]} failed: {e}")
+
+    def _message(self, method, params, session_id):
+        with self.lock:
+            self.next_id += 1
+            command_id = self.next_id
+        message = {'id': command_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        return command_id, message
+
+    def send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        """Run a command and return its result dict (raises CdpError on an error response)"""
+        if self.closed:
+            raise CdpError("connection closed")
+        command_id, message = self._message(method, params, session_id)
+        waiter = [threading.Event(), None]
+        with self.lock:
+            self.pending[command_id] = waiter
+        try:
+            self.websocket.send(json.dumps(message))
+        except OSError as e:
+            with self.lock:
+                self.pending.pop(command_id, None)
+            raise CdpError(f"{method}: {e}")
+
+        if not waiter[0].wait(timeout):
+            with self.lock:
+                self.pending.pop(command_id, None)
+            raise CdpError(f"{method}: no response within {timeout}s")
+        response = waiter[1]
+        if response is None:
+            raise CdpError(f"{method}: connection closed")
+        if 'error' in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get('result', {})
+
+    def send_nowait(self, method, params=None, session_id=None):
+        """Fire a command without waiting for the response"""
+        _, message = self._message(method, params, session_id)
+        try:
+            self.websocket.send(json.dumps(message))
+        except OSError as e:
+            raise CdpError(f"{method}: {e}")
+
+    def on(self, method, handler, session_id=None):
+        with self.lock:
+            self.handlers.setdefault((session_id, method), []).append(handler)
+
+    def off(self, method, handler, session_id=None):
+        with self.lock:
+            handlers = self.handlers.get((session_id, method), [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def attach(self, target_id):
+        """Attach to a target (a Selenium window handle is its target id)"""
+        # Older chromedrivers prefix window handles
+        target_id = target_id.replace('CDwindow-', '')
+        result = self.send('Target.attachToTarget', {'targetId': target_id, 'flatten': True})
+        return CdpTarget(self, target_id, result['sessionId'])
+
+    def close(self):
+        self.closed = True
+        self.websocket.close()
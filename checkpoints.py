@@ -0,0 +1,150 @@
+"""
+Per-account workflow checkpoints
+Every step outcome is persisted in SQLite (with the extracted verification
+URL), so a rerun resumes each account at its first incomplete step instead
+of registering it again.
+"""
+
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+CHECKPOINT_DB = "workflow_checkpoints.db"
+
+STEP_DONE = 'done'
+STEP_FAILED = 'failed'
+
+# Steps that only work inside a browser session opened by an earlier step.
+# When resuming at the key, these are re-run first (if they are in the table).
+SESSION_PREREQUISITES = {
+    'find_email': ['email_login'],
+    'extract_link': ['email_login', 'find_email'],
+    'post_login': ['website_login'],
+}
+
+
+def resume_index(step_names, completed):
+    """
+    Index in step_names where an account should resume
+
+    Args:
+        step_names: Ordered step names of the workflow table
+        completed: Set/dict of step names already done
+
+    Returns:
+        int: len(step_names) when every step is done
+    """
+    for i, step in enumerate(step_names):
+        if step not in completed:
+            prerequisites = [step_names.index(p) for p in SESSION_PREREQUISITES.get(step, []) if p in step_names]
+            return min(prerequisites + [i])
+    return len(step_names)
+
+
+class CheckpointStore:
+    """SQLite table of (email, step) -> outcome and step data"""
+
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                email TEXT,
+                step TEXT,
+                status TEXT,
+                data TEXT,
+                error TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (email, step)
+            )
+        """)
+        # Older runs stored emails as typed; lookups compare lower-cased
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_email_lower ON checkpoints(lower(email), step)")
+        self.db.commit()
+
+    def record(self, email, step, ok, data=None, error=''):
+        """Persist one step outcome (committed immediately so Ctrl+C loses nothing)"""
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoints (email, step, status, data, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (email, step, STEP_DONE if ok else STEP_FAILED, json.dumps(data or {}), error,
+                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self.db.commit()
+
+    def completed_steps(self, email):
+        """
+        Steps already done for an account
+
+        Returns:
+            dict: step name -> data saved with it
+        """
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT step, data FROM checkpoints WHERE lower(email) = ? AND status = ? ORDER BY updated_at",
+                (email.lower(), STEP_DONE)
+            ).fetchall()
+        return {step: json.loads(data) for step, data in rows}
+
+    def emails_with_step(self, step, among):
+        """Emails (lower-cased) of the given batch that have `step` done"""
+        among = [email.lower() for email in among]
+        if not among:
+            return set()
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT lower(email) FROM checkpoints WHERE lower(email) IN ({', '.join('?' * len(among))}) "
+                "AND step = ? AND status = ?", (*among, step, STEP_DONE)
+            ).fetchall()
+        return {email for (email,) in rows}
+
+    def clear(self, email=None):
+        """Forget one account's checkpoints, or all of them"""
+        with self.lock:
+            if email is None:
+                self.db.execute("DELETE FROM checkpoints")
+            else:
+                self.db.execute("DELETE FROM checkpoints WHERE lower(email) = ?", (email.lower(),))
+            self.db.commit()
+
+    def summary(self):
+        """Rows of (step, status, count) across all accounts"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT step, status, COUNT(*) FROM checkpoints GROUP BY step, status ORDER BY step, status"
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta workflow checkpoints")
+    parser.add_argument("--db", default=CHECKPOINT_DB, help="Checkpoint database")
+    parser.add_argument("--clear", metavar="EMAIL", nargs='?', const='*',
+                        help="Forget checkpoints for EMAIL (or every account when no email is given)")
+    args = parser.parse_args()
+
+    store = CheckpointStore(args.db)
+    if args.clear:
+        store.clear(None if args.clear == '*' else args.clear)
+        print(f"🧹 Cleared checkpoints for {'all accounts' if args.clear == '*' else args.clear}")
+    else:
+        for step, status, count in store.summary():
+            print(f"   {step:<15} {status:<7} {count}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
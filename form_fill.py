@@ -0,0 +1,149 @@
+"""
+Field-fill strategies for the WorldPosta forms
+keystroke: human-like typing, one send_keys per character
+bulk:      one send_keys per field
+script:    every field set in a single execute_script call, firing the
+           input/change/blur events Angular's formcontrolname bindings need
+"""
+
+import os
+import time
+import random
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.common.exceptions import NoSuchElementException
+from waits import delay_scale
+
+
+DEFAULT_FILL_STRATEGY = os.environ.get("WORLDPOSTA_FILL", "keystroke")
+
+
+def _pause(min_sec, max_sec):
+    """Cosmetic pause scaled by the timing profile"""
+    scale = delay_scale()
+    if scale > 0:
+        time.sleep(random.uniform(min_sec, max_sec) * scale)
+
+
+class FillStrategy:
+    """Base strategy: fill fields one at a time"""
+
+    name = None
+
+    def fill(self, driver, element, text):
+        raise NotImplementedError
+
+    def fill_form(self, driver, fields):
+        """
+        Fill several inputs
+
+        Args:
+            driver: Selenium driver
+            fields: List of (css_selector, value, log_line) tuples
+        """
+        for selector, value, log_line in fields:
+            print(log_line)
+            element = driver.find_element(By.CSS_SELECTOR, selector)
+            self.fill(driver, element, value)
+
+
+class KeystrokeFill(FillStrategy):
+    """Scroll, hover, click and type character by character (original behavior)"""
+
+    name = 'keystroke'
+
+    def fill(self, driver, element, text):
+        driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", element)
+        _pause(0.5, 1)
+        try:
+            ActionChains(driver).move_to_element(element).perform()
+            _pause(0.2, 0.5)
+        except Exception as e:
+            print(f"⚠ Mouse move error: {e}")
+        element.click()
+        _pause(0.3, 0.6)
+
+        scale = delay_scale()
+        for char in text:
+            element.send_keys(char)
+            if scale > 0:
+                time.sleep(random.uniform(0.05, 0.15) * scale)
+        _pause(0.5, 1)
+
+
+class BulkFill(FillStrategy):
+    """Clear the field and send the whole value in one send_keys call"""
+
+    name = 'bulk'
+
+    def fill(self, driver, element, text):
+        element.click()
+        element.clear()
+        element.send_keys(text)
+
+
+# Sets values through the native setter so Angular's DefaultValueAccessor
+# sees them, then fires the events that update the FormControl
+SCRIPT_FILL_JS = """
+var fields = arguments[0];
+var missing = [];
+for (var i = 0; i < fields.length; i++) {
+    var el = document.querySelector(fields[i][0]);
+    if (!el) { missing.push(fields[i][0]); continue; }
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, fields[i][1]);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.blur();
+}
+return missing;
+"""
+
+
+class ScriptFill(FillStrategy):
+    """Set every field with a single execute_script round trip"""
+
+    name = 'script'
+
+    def fill(self, driver, element, text):
+        driver.execute_script(
+            "var el = arguments[0];"
+            "var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;"
+            "Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, arguments[1]);"
+            "el.dispatchEvent(new Event('input', {bubbles: true}));"
+            "el.dispatchEvent(new Event('change', {bubbles: true}));"
+            "el.blur();",
+            element, text
+        )
+
+    def fill_form(self, driver, fields):
+        for _, _, log_line in fields:
+            print(log_line)
+        missing = driver.execute_script(SCRIPT_FILL_JS, [[selector, value] for selector, value, _ in fields])
+        if missing:
+            raise NoSuchElementException(f"Form fields not found: {', '.join(missing)}")
+
+
+FILL_STRATEGIES = {
+    KeystrokeFill.name: KeystrokeFill,
+    BulkFill.name: BulkFill,
+    ScriptFill.name: ScriptFill,
+}
+
+
+def get_fill_strategy(name=None):
+    """
+    Build a fill strategy by name
+
+    Args:
+        name: keystroke, bulk or script (defaults to WORLDPOSTA_FILL / keystroke)
+
+    Returns:
+        FillStrategy instance
+    """
+    name = name or DEFAULT_FILL_STRATEGY
+    if name not in FILL_STRATEGIES:
+        raise ValueError(f"Unknown fill strategy '{name}', choose from {sorted(FILL_STRATEGIES)}")
+    return FILL_STRATEGIES[name]()
@@ -0,0 +1,277 @@
+"""
+HTTP registration engine
+Posts the six register-form fields straight to the admin portal's backend
+endpoint over a pooled keep-alive connection (one per worker thread), and
+reads the JSON response for success or validation errors. The browser
+form stays as the fallback whenever the endpoint gives no clear answer
+(network error, blocked, 5xx, non-JSON), so an HTTP problem never costs
+an account.
+
+    browser   browser form only (original behavior)
+    http      endpoint only, no browser fallback (stand-in / provisioning runs)
+    auto      endpoint first, browser form when the endpoint cannot decide
+"""
+
+import os
+import ssl
+import json
+import time
+import threading
+import http.client
+from collections import namedtuple
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+REGISTRATION_ENGINE = os.environ.get("WORLDPOSTA_REGISTRATION_ENGINE", "browser")  # browser | http | auto
+
+# POST target of the Angular register form (check the Network tab if the portal changes)
+ADMIN_URL = os.environ.get("WORLDPOSTA_ADMIN_URL", "https://admin.worldposta.com")
+REGISTER_API_URL = os.environ.get("WORLDPOSTA_REGISTER_API_URL", ADMIN_URL + "/api/auth/register")
+
+REQUEST_TIMEOUT = 30
+
+# Statuses whose JSON body is a definitive answer (validation / duplicate account)
+VALIDATION_STATUSES = (400, 409, 422)
+
+REGISTRATION_ENGINES = ('browser', 'http', 'auto')
+
+RegistrationResult = namedtuple('RegistrationResult', ['ok', 'status', 'errors', 'fallback', 'elapsed'])
+
+
+def registration_payload(account_data):
+    """Request body with the register form's formcontrolname keys"""
+    return {
+        'FullName': account_data['full_name'],
+        'Email': account_data['email'],
+        'Customer': account_data['company'],
+        'PhoneNumber': account_data['phone'],
+        'Password': account_data['password'],
+        'ConfirmPassword': account_data['password'],
+    }
+
+
+def parse_errors(body):
+    """
+    Error messages from an ASP.NET-style JSON body
+
+    Handles ModelState dicts ({"errors": {"Email": ["..."]}}), Identity
+    error lists ([{"code", "description"}]) and plain message fields.
+    """
+    if isinstance(body, list):
+        errors = body
+    elif isinstance(body, dict):
+        errors = body.get('errors') or body.get('Errors')
+        if errors is None:
+            message = body.get('message') or body.get('Message') or body.get('error') or body.get('title')
+            return [str(message)] if message else []
+    else:
+        return []
+
+    if isinstance(errors, dict):
+        return [f"{field}: {message}" for field, messages in errors.items()
+                for message in (messages if isinstance(messages, list) else [messages])]
+    if isinstance(errors, list):
+        return [e.get('description') or e.get('code') or json.dumps(e) if isinstance(e, dict) else str(e)
+                for e in errors]
+    return [str(errors)]
+
+
+def classify_response(status, raw_body):
+    """
+    Turn a status code and body into (ok, errors, fallback)
+
+    fallback=True means the endpoint did not give a usable answer and the
+    browser form should decide.
+    """
+    try:
+        body = json.loads(raw_body) if raw_body.strip() else {}
+    except ValueError:
+        return False, [f"HTTP {status}: response is not JSON"], True
+
+    if 200 <= status < 300:
+        # Some endpoints answer 200 with {"succeeded": false, "errors": [...]}
+        if isinstance(body, dict) and any(body.get(key) is False for key in ('succeeded', 'success', 'isSuccess')):
+            return False, parse_errors(body) or ["registration rejected"], False
+        return True, [], False
+
+    if status in VALIDATION_STATUSES:
+        errors = parse_errors(body)
+        if errors:
+            return False, errors, False
+
+    # Auth walls, rate limits, captcha challenges, server errors
+    return False, parse_errors(body) or [f"HTTP {status}"], True
+
+
+class HttpRegistrationClient:
+    """
+    Registration over HTTP with a keep-alive connection per worker thread
+
+    Usage:
+        client = HttpRegistrationClient()
+        result = client.register(account_data)
+        if result.fallback: ... use the browser form ...
+    """
+
+    def __init__(self, url=REGISTER_API_URL, timeout=REQUEST_TIMEOUT, browser_fallback=True, origin=None):
+        """
+        Args:
+            url: Registration endpoint
+            timeout: Seconds per request
+            browser_fallback: Whether callers should retry inconclusive
+                              results in the browser (auto engine)
+            origin: Origin/Referer header value (defaults to the endpoint's own)
+        """
+        parts = urlsplit(url)
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        if parts.query:
+            self.path += '?' + parts.query
+        self.timeout = timeout
+        self.browser_fallback = browser_fallback
+        self.origin = origin or f"{parts.scheme}://{parts.netloc}"
+        self.local = threading.local()
+
+    # =====================================================
+    # SESSION
+    # =====================================================
+
+    def _session(self):
+        """This thread's [connection, cookies, requests sent on the connection]"""
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = [None, SimpleCookie(), 0]
+        if session[0] is None:
+            if self.scheme == 'https':
+                session[0] = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                                         context=ssl.create_default_context())
+            else:
+                session[0] = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            session[2] = 0
+        return session
+
+    def _reset(self):
+        """Drop this thread's connection (cookies are kept)"""
+        session = getattr(self.local, 'session', None)
+        if session is not None and session[0] is not None:
+            session[0].close()
+            session[0] = None
+
+    def _headers(self, cookies):
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Origin': self.origin,
+            'Referer': self.origin + '/auth/register',
+            'Connection': 'keep-alive',
+        }
+        if cookies:
+            headers['Cookie'] = '; '.join(f"{name}={morsel.value}" for name, morsel in cookies.items())
+            # Angular's antiforgery convention: echo the XSRF cookie as a header
+            if 'XSRF-TOKEN' in cookies:
+                headers['X-XSRF-TOKEN'] = cookies['XSRF-TOKEN'].value
+        return headers
+
+    def post(self, payload):
+        """
+        POST JSON on the pooled connection
+
+        A request that dies on a reused keep-alive connection before any
+        response (server closed it while idle) is retried once on a new one.
+
+        Returns:
+            tuple: (status, body text)
+        """
+        data = json.dumps(payload).encode('utf-8')
+        for attempt in range(2):
+            connection, cookies, sent = session = self._session()
+            try:
+                connection.request('POST', self.path, body=data, headers=self._headers(cookies))
+                response = connection.getresponse()
+                body = response.read().decode('utf-8', errors='replace')
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._reset()
+                if sent and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                self._reset()
+                raise
+
+            session[2] = sent + 1
+            for header in response.msg.get_all('Set-Cookie') or []:
+                cookies.load(header)
+            if response.getheader('Connection', '').lower() == 'close':
+                self._reset()
+            return response.status, body
+
+    def register(self, account_data):
+        """
+        Submit one registration
+
+        Returns:
+            RegistrationResult(ok, status, errors, fallback, elapsed)
+        """
+        start = time.time()
+        try:
+            status, body = self.post(registration_payload(account_data))
+        except (OSError, http.client.HTTPException) as e:
+            return RegistrationResult(False, None, [f"request failed: {e}"], True, time.time() - start)
+
+        ok, errors, fallback = classify_response(status, body)
+        return RegistrationResult(ok, status, errors, fallback, time.time() - start)
+
+    def close(self):
+        self._reset()
+
+
+def create_registration_client(engine=None):
+    """
+    Build the HTTP client for a registration engine
+
+    Args:
+        engine: browser, http or auto (defaults to WORLDPOSTA_REGISTRATION_ENGINE)
+
+    Returns:
+        HttpRegistrationClient, or None for the browser form
+    """
+    engine = engine or REGISTRATION_ENGINE
+    if engine not in REGISTRATION_ENGINES:
+        raise ValueError(f"Unknown registration engine '{engine}', choose from {list(REGISTRATION_ENGINES)}")
+    if engine == 'browser':
+        return None
+    return HttpRegistrationClient(browser_fallback=(engine == 'auto'))
+
+
+def register_over_http(client, account_data, status_log=None):
+    """
+    Try the HTTP engine for one account
+
+    Returns:
+        True/False when the endpoint decided, None when the browser form
+        should be used instead (auto engine, inconclusive response)
+    """
+    print(f"⚡ Registering via {client.url}...")
+    result = client.register(account_data)
+
+    if result.ok:
+        print(f"✅ Registration accepted over HTTP in {result.elapsed * 1000:.0f}ms")
+        return True
+
+    error_msg = "; ".join(result.errors)
+    if result.fallback and client.browser_fallback:
+        print(f"↩️  HTTP registration inconclusive ({error_msg}), using the browser form")
+        return None
+
+    print(f"❌ Registration failed over HTTP (status {result.status}): {error_msg}")
+    if status_log is not None:
+        status_log['error_message'] = f"Registration failed: {error_msg}"
+    return False
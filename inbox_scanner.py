@@ -0,0 +1,140 @@
+"""
+In-page inbox scanner
+Finds the verification email's row in OWA with one execute_script call per
+poll instead of a find_elements per selector plus a .text per row. The
+script tries every candidate row selector inside the page, reads each
+row's subject, sender and received time, and returns only the rows whose
+text contains the keyword, with their element handles ready to click.
+
+The selector that matched last is tried first on the next scan.
+"""
+
+import threading
+from collections import namedtuple
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+# Candidate inbox row selectors, most specific (OWA classic list view) first
+INBOX_ROW_SELECTORS = [
+    'div[autoid="_lvv_3"][role="option"]',
+    'div[role="listitem"]',
+    'div[role="option"]',
+    'div.ms-List-cell',
+    'div._lvv_E',
+    'tr[role="row"]',
+    'div[data-convid]',
+    'div.customScrollBar div[tabindex]',
+]
+
+ScanResult = namedtuple('ScanResult', ['selector', 'rows', 'counts'])
+
+# arguments: [selectors in try order, lower-case keyword]
+# returns:   {selector, rows: [{element, subject, sender, received, text}], counts: {selector: n}}
+SCAN_JS = """
+var selectors = arguments[0], keyword = arguments[1];
+var counts = {};
+
+function field(row, query) {
+    var node = row.querySelector(query);
+    return node ? (node.getAttribute('title') || node.textContent || '').trim() : '';
+}
+
+function received(row, text) {
+    var time = row.querySelector('time');
+    if (time) return (time.getAttribute('datetime') || time.textContent).trim();
+    var stamp = field(row, '[autoid="_lvv_K"], [autoid="_lvv_4"], span[title*=":"]');
+    if (stamp) return stamp;
+    var match = text.match(/\\b\\d{1,2}:\\d{2}(?:\\s?[AP]M)?\\b|\\b\\d{1,2}\\/\\d{1,2}\\/\\d{2,4}\\b/i);
+    return match ? match[0] : '';
+}
+
+for (var i = 0; i < selectors.length; i++) {
+    var elements = document.querySelectorAll(selectors[i]);
+    counts[selectors[i]] = elements.length;
+    var rows = [];
+    for (var j = 0; j < elements.length; j++) {
+        var row = elements[j];
+        var subject = field(row, '[autoid="_lvv_6"]');
+        var sender = field(row, '[autoid="_lvv_5"]');
+        var preview = field(row, '[autoid="_lvv_7"]');
+        var text = (subject || sender || preview)
+            ? [sender, subject, preview].join(' ')
+            : (row.innerText || row.textContent || '');
+        if (text.toLowerCase().indexOf(keyword) === -1) continue;
+        rows.push({element: row, subject: subject || text.trim().slice(0, 200), sender: sender,
+                   received: received(row, text), text: text.trim().slice(0, 500)});
+    }
+    if (rows.length) return {selector: selectors[i], rows: rows, counts: counts};
+}
+return {selector: null, rows: [], counts: counts};
+"""
+
+# arguments: [selectors]; true once any candidate row exists
+ROWS_PRESENT_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    if (document.querySelector(selectors[i])) return true;
+}
+return false;
+"""
+
+
+class InboxScanner:
+    """
+    One-call inbox row search that remembers the selector that worked
+
+    Usage:
+        scanner = InboxScanner()
+        wait_until(driver, scanner.rows_rendered, timeout=15)
+        result = scanner.scan(driver, "Welcome To WorldPosta")
+        if result.rows:
+            result.rows[0]['element'].click()
+    """
+
+    def __init__(self, selectors=None):
+        self.selectors = list(selectors or INBOX_ROW_SELECTORS)
+        self.last_selector = None
+
+    def ordered(self):
+        """Selectors in try order: the last one that matched first"""
+        if self.last_selector in self.selectors:
+            return [self.last_selector] + [s for s in self.selectors if s != self.last_selector]
+        return list(self.selectors)
+
+    def rows_rendered(self, driver):
+        """Condition: any candidate row is in the DOM (one round trip per poll)"""
+        return driver.execute_script(ROWS_PRESENT_JS, self.ordered())
+
+    def scan(self, driver, keyword):
+        """
+        Matching inbox rows, in one execute_script call
+
+        Args:
+            driver: Selenium driver on the OWA inbox
+            keyword: Subject text to look for (case-insensitive)
+
+        Returns:
+            ScanResult(selector, rows, counts); rows are dicts with element,
+            subject, sender, received and text
+        """
+        result = driver.execute_script(SCAN_JS, self.ordered(), keyword.lower()) or {}
+        selector = result.get('selector')
+        if selector:
+            self.last_selector = selector
+        return ScanResult(selector, result.get('rows') or [], result.get('counts') or {})
+
+
+_shared_scanner = None
+_shared_lock = threading.Lock()
+
+
+def shared_inbox_scanner():
+    """Process-wide scanner, so every bot starts with the selector that worked last"""
+    global _shared_scanner
+    with _shared_lock:
+        if _shared_scanner is None:
+            _shared_scanner = InboxScanner()
+        return _shared_scanner
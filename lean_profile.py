@@ -0,0 +1,158 @@
+"""
+Lean browser profile
+Blocks the downloads the workflow never looks at (images, web fonts,
+media, analytics/tag scripts) with CDP Network.setBlockedURLs, per page of
+the workflow, and launches Chrome with background services switched off.
+Stylesheets and the sites' own scripts always load: visibility and
+clickability checks depend on layout, and the Angular/OWA apps on their JS.
+
+    full   default resource loading (original behavior)
+    lean   block the categories PAGE_RULES lists for each page
+
+Screenshots can opt back in: with keep_for_screenshots, pages of accounts
+whose step screenshots are kept by the screenshot policy load images and
+fonts, so those images look like the real page.
+"""
+
+import os
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+LOAD_PROFILE = os.environ.get("WORLDPOSTA_LOAD_PROFILE", "full")  # full | lean
+LOAD_PROFILES = ('full', 'lean')
+
+# Load images/fonts on pages whose screenshots are kept
+KEEP_FOR_SCREENSHOTS = os.environ.get("WORLDPOSTA_LEAN_SCREENSHOT_ASSETS", "0") == "1"
+
+# URL patterns per resource category (Network.setBlockedURLs wildcards)
+BLOCK_CATEGORIES = {
+    'images': ['*.png', '*.png?*', '*.jpg', '*.jpg?*', '*.jpeg', '*.jpeg?*', '*.gif', '*.gif?*',
+               '*.webp', '*.webp?*', '*.svg', '*.svg?*', '*.ico', '*.ico?*'],
+    'fonts': ['*.woff', '*.woff?*', '*.woff2', '*.woff2?*', '*.ttf', '*.ttf?*', '*.otf', '*.otf?*',
+              '*.eot', '*.eot?*', '*fonts.googleapis.com*', '*fonts.gstatic.com*'],
+    'media': ['*.mp4', '*.mp4?*', '*.webm', '*.webm?*', '*.mp3', '*.mp3?*'],
+    'analytics': ['*google-analytics.com*', '*googletagmanager.com*', '*/gtag/js*', '*doubleclick.net*',
+                  '*hotjar.com*', '*clarity.ms*', '*connect.facebook.net*', '*browser-intake-datadoghq*'],
+}
+
+# Categories dropped when an account's screenshots are kept
+SCREENSHOT_CATEGORIES = ('images', 'fonts')
+
+ALL_CATEGORIES = ('images', 'fonts', 'media', 'analytics')
+
+# Categories blocked on each workflow page under the lean profile
+PAGE_RULES = {
+    'register': ALL_CATEGORIES,
+    'owa': ALL_CATEGORIES,       # sign-in page and inbox
+    'confirm': ALL_CATEGORIES,
+    'login': ALL_CATEGORIES,     # sign-in page and the dashboard behind it
+    'default': ALL_CATEGORIES,
+}
+
+# Chrome switches for the lean profile: no background downloads or services
+LEAN_CHROME_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-domain-reliability",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+
+def blocked_patterns(categories):
+    """URL patterns for a list of category names"""
+    unknown = set(categories) - set(BLOCK_CATEGORIES)
+    if unknown:
+        raise ValueError(f"Unknown resource categories {sorted(unknown)}, choose from {sorted(BLOCK_CATEGORIES)}")
+    return [pattern for category in categories for pattern in BLOCK_CATEGORIES[category]]
+
+
+class LeanProfile:
+    """
+    Per-page resource blocking on one browser tab
+
+    Usage:
+        lean = LeanProfile()
+        lean.apply(driver, 'register')
+        driver.get(REGISTRATION_URL)
+    """
+
+    def __init__(self, page_rules=None, keep_for_screenshots=KEEP_FOR_SCREENSHOTS):
+        """
+        Args:
+            page_rules: {page: categories} overriding PAGE_RULES entries
+            keep_for_screenshots: Load images/fonts on pages whose
+                                  screenshots the policy keeps
+        """
+        self.page_rules = dict(PAGE_RULES)
+        self.page_rules.update(page_rules or {})
+        for categories in self.page_rules.values():
+            blocked_patterns(categories)
+        self.keep_for_screenshots = keep_for_screenshots
+        # Last pattern list sent per driver, so unchanged pages cost no CDP call
+        self.applied = {}
+
+    def categories(self, page, screenshots=False):
+        """Categories blocked on a page"""
+        categories = self.page_rules.get(page, self.page_rules['default'])
+        if screenshots and self.keep_for_screenshots:
+            categories = [c for c in categories if c not in SCREENSHOT_CATEGORIES]
+        return list(categories)
+
+    def apply(self, driver, page, screenshots=False):
+        """
+        Set the blocked URLs before navigating to a page
+
+        Args:
+            driver: Selenium driver (CDP-capable)
+            page: Key in the page rules (register, owa, confirm, login)
+            screenshots: Whether step screenshots are kept on this page
+
+        Returns:
+            bool: True if blocking is active for the page
+        """
+        patterns = blocked_patterns(self.categories(page, screenshots))
+        key = id(driver)
+        if self.applied.get(key) == patterns:
+            return bool(patterns)
+        try:
+            if key not in self.applied:
+                driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            # Never fail a step over an optimisation: load the page in full
+            print(f"⚠ Resource blocking not applied on '{page}': {e}")
+            self.applied.pop(key, None)
+            return False
+        self.applied[key] = patterns
+        return bool(patterns)
+
+    def forget(self, driver):
+        """Drop state for a driver that was quit or handed back to a pool"""
+        self.applied.pop(id(driver), None)
+
+
+def create_load_profile(name=None, keep_for_screenshots=KEEP_FOR_SCREENSHOTS):
+    """
+    Build the resource-loading profile
+
+    Args:
+        name: full or lean (defaults to WORLDPOSTA_LOAD_PROFILE)
+
+    Returns:
+        LeanProfile, or None for full loading
+    """
+    name = name or LOAD_PROFILE
+    if name not in LOAD_PROFILES:
+        raise ValueError(f"Unknown load profile '{name}', choose from {list(LOAD_PROFILES)}")
+    if name == 'full':
+        return None
+    return LeanProfile(keep_for_screenshots=keep_for_screenshots)
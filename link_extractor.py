@@ -0,0 +1,146 @@
+"""
+Verification-link extraction
+Finds the "Confirm Email" link in the message body only: the OWA reading
+pane's outerHTML (one execute_script call) or the MIME body delivered by a
+mailbox client, scanned with precompiled patterns instead of parsing the
+whole OWA page_source with BeautifulSoup.
+"""
+
+import re
+import html as html_lib
+from collections import namedtuple
+from urllib.parse import urlparse, parse_qs
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+LINK_TEXT = "Confirm Email"
+LINK_HREF_MARKER = "ConfirmEmail"
+
+# Query parameters that carry the confirmation token (ASP.NET Identity uses code)
+TOKEN_PARAMS = ('token', 'code', 'confirmationToken')
+
+# OWA containers holding the open message, most specific first
+READING_PANE_SELECTORS = [
+    'div[aria-label="Message body"]',
+    'div[role="document"]',
+    'div.ReadingPaneContents',
+    'div[id^="UniqueMessageBody"]',
+    'div.rps_',
+    'div[role="main"]',
+]
+
+VerificationLink = namedtuple('VerificationLink', ['url', 'token', 'text'])
+
+ANCHOR_RE = re.compile(r'<a\b([^>]*)>(.*?)</a\s*>', re.IGNORECASE | re.DOTALL)
+HREF_RE = re.compile(r'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+PLAIN_URL_RE = re.compile(r'https?://[^\s<>"\']*' + LINK_HREF_MARKER + r'[^\s<>"\']*', re.IGNORECASE)
+
+# Returns the reading pane's outerHTML, or null when no message is open
+READING_PANE_JS = """
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var pane = document.querySelector(selectors[i]);
+    if (pane && pane.querySelector('a[href*="ConfirmEmail"]')) return pane.outerHTML;
+}
+return null;
+"""
+
+# Last resort in the browser: ask the DOM for the anchor itself
+ANCHOR_JS = """
+var text = arguments[0];
+var anchors = document.querySelectorAll('a[href*="ConfirmEmail"]');
+if (!anchors.length) {
+    anchors = Array.prototype.filter.call(document.querySelectorAll('a'), function (a) {
+        return (a.textContent || '').indexOf(text) !== -1;
+    });
+}
+if (!anchors.length) return null;
+return [anchors[0].getAttribute('href'), anchors[0].textContent];
+"""
+
+
+def extract_token(url):
+    """Confirmation token from the link's query string (or last path segment)"""
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    for name in TOKEN_PARAMS:
+        for key, values in query.items():
+            if key.lower() == name.lower() and values:
+                return values[0]
+    segment = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+    return segment if segment and segment.lower() != LINK_HREF_MARKER.lower() else ''
+
+
+def _link(url, text):
+    url = html_lib.unescape(url.strip())
+    text = SPACE_RE.sub(' ', html_lib.unescape(TAG_RE.sub('', text or ''))).strip()
+    return VerificationLink(url, extract_token(url), text)
+
+
+def extract_from_html(body):
+    """
+    Find the verification link in an HTML fragment
+
+    Anchors whose text says "Confirm Email" win over anchors that only
+    match by href, same precedence as the old BeautifulSoup lookups.
+
+    Returns:
+        VerificationLink or None
+    """
+    if not body or (LINK_HREF_MARKER not in body and LINK_TEXT not in body):
+        return None
+
+    by_href = None
+    for match in ANCHOR_RE.finditer(body):
+        attributes, inner = match.groups()
+        href = HREF_RE.search(attributes)
+        if not href:
+            continue
+        url = next(group for group in href.groups() if group is not None)
+        if LINK_TEXT in inner or ('<' in inner and LINK_TEXT in TAG_RE.sub('', inner)):
+            return _link(url, inner)
+        if by_href is None and LINK_HREF_MARKER in url:
+            by_href = _link(url, inner)
+    return by_href
+
+
+def extract_from_text(body):
+    """Find a bare ConfirmEmail URL in a plain-text body"""
+    match = PLAIN_URL_RE.search(body or '')
+    return _link(match.group(0), '') if match else None
+
+
+def extract_from_message(message):
+    """
+    Find the verification link in a MailMessage from a mailbox client
+
+    Returns:
+        VerificationLink or None
+    """
+    return extract_from_html(message.html_body) or extract_from_text(message.text_body)
+
+
+def extract_from_driver(driver, selectors=READING_PANE_SELECTORS):
+    """
+    Find the verification link in the message open in OWA
+
+    Reads only the reading pane's outerHTML; when no pane matches, asks the
+    DOM for the anchor directly instead of serializing the whole page.
+
+    Returns:
+        VerificationLink or None
+    """
+    pane_html = driver.execute_script(READING_PANE_JS, selectors)
+    link = extract_from_html(pane_html)
+    if link:
+        return link
+
+    anchor = driver.execute_script(ANCHOR_JS, LINK_TEXT)
+    if anchor and anchor[0]:
+        return _link(anchor[0], anchor[1])
+    return None
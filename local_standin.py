@@ -0,0 +1,1075 @@
+"""
+Local stand-in for the admin portal and the OWA mailbox
+Serves the pages and endpoints the bots actually touch, with the same
+selectors, so full workflows (browser, HTTP registration and IMAP) can be
+run and timed repeatably without admin.worldposta.com / mail.worldposta.com:
+
+    admin   /auth/register, /api/auth/register, /auth/login, /api/auth/login,
+            /auth/ConfirmEmail, /dashboard (button.launch-button), /launch/<app>
+    mail    / (OWA sign-in, div.signinbutton), /owa/ (inbox with _lvv_3 rows),
+            /owa/languageselection.aspx
+    both    /assets/* (logo, hero image, web font, hashed app bundle, ETag'd
+            stylesheet) and /gtag/js (tag script), referenced by every page
+    imap    LOGIN / SELECT / UID SEARCH / UID FETCH / IDLE / NOOP
+    redis   the RESP commands work_queue.RedisWorkQueue uses (strings,
+            hashes, sets, sorted sets, WATCH/MULTI/EXEC), for the
+            distributed work queue
+
+The welcome mail is delivered `mail_delay` seconds after registration.
+Latency (plus jitter) is added to every request, and each route can fail
+with a configured probability (HTTP 503, IMAP NO/BYE).
+
+Usage:
+    python local_standin.py --mail-delay 5 --latency 0.2 --fail register_api=0.1
+    # then export the printed WORLDPOSTA_* variables and run the bots
+"""
+
+import re
+import json
+import time
+import random
+import uuid
+import argparse
+import socket
+import threading
+import socketserver
+from email.message import EmailMessage
+from email.utils import formatdate
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit, parse_qs
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+STANDIN_HOST = "127.0.0.1"
+ADMIN_PORT = 8081
+MAIL_PORT = 8082
+IMAP_PORT = 1143
+REDIS_PORT = 16379
+
+MAIL_DELAY = 5.0  # seconds between registration and the welcome mail
+FILLER_MESSAGES = 3  # unrelated inbox rows shown before the welcome mail
+
+WELCOME_SUBJECT = "Welcome To WorldPosta Business Email"
+WELCOME_SENDER = "noreply@worldposta.com"
+
+# Static assets every page references: name -> (content type, size in bytes, Cache-Control)
+APP_BUNDLE = 'main.5f1c2ab4d9e07c31.js'
+ASSETS = {
+    'logo.png': ('image/png', 40 * 1024, 'no-store'),
+    'hero.jpg': ('image/jpeg', 350 * 1024, 'no-store'),
+    'segoe-ui.woff2': ('font/woff2', 90 * 1024, 'no-store'),
+    'gtag.js': ('application/javascript', 120 * 1024, 'no-store'),
+    # Angular-style output: hashed bundle (immutable) and a revalidated stylesheet
+    APP_BUNDLE: ('application/javascript', 900 * 1024, 'public, max-age=31536000, immutable'),
+    'styles.css': ('text/css', 160 * 1024, 'no-cache'),
+}
+
+# Route names accepted by --fail
+ROUTES = (
+    'register_page', 'register_api', 'login_page', 'login_api', 'confirm', 'dashboard', 'launch',
+    'owa_login', 'owa_auth', 'owa_inbox', 'assets', 'imap',
+)
+
+
+class FaultInjector:
+    """Per-request latency and per-route failure probabilities"""
+
+    def __init__(self, latency=0.0, jitter=0.0, failures=None, seed=None):
+        """
+        Args:
+            latency: Seconds added to every request
+            jitter: Extra random 0..jitter seconds per request
+            failures: {route: probability 0..1}
+            seed: Random seed for repeatable runs
+        """
+        unknown = set(failures or {}) - set(ROUTES)
+        if unknown:
+            raise ValueError(f"Unknown stand-in routes {sorted(unknown)}, choose from {list(ROUTES)}")
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = dict(failures or {})
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self):
+        with self.lock:
+            extra = self.random.uniform(0, self.jitter) if self.jitter else 0.0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def should_fail(self, route):
+        rate = self.failures.get(route, 0)
+        if not rate:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+
+def parse_failures(spec):
+    """'register_api=0.1,confirm=0.05' -> {'register_api': 0.1, 'confirm': 0.05}"""
+    failures = {}
+    for part in filter(None, (p.strip() for p in (spec or '').split(','))):
+        route, _, rate = part.partition('=')
+        failures[route.strip()] = float(rate)
+    return failures
+
+
+# =====================================================
+# STATE
+# =====================================================
+
+class StandinState:
+    """Accounts and mailboxes shared by the admin, mail and IMAP servers"""
+
+    def __init__(self, admin_url, mail_delay=MAIL_DELAY, filler_messages=FILLER_MESSAGES, language_page=False):
+        self.admin_url = admin_url
+        self.mail_delay = mail_delay
+        self.filler_messages = filler_messages
+        self.language_page = language_page
+
+        self.accounts = {}  # email -> account dict
+        self.mailboxes = {}  # email -> [message dicts]
+        self.stats = {'registered': 0, 'rejected': 0, 'confirmed': 0, 'logins': 0, 'owa_logins': 0,
+                      'imap_fetches': 0, 'injected_failures': 0, 'asset_requests': 0, 'asset_not_modified': 0,
+                      'asset_bytes': 0, 'inbox_loads': 0, 'redis_commands': 0}
+        self.lock = threading.Lock()
+        self.mail_arrived = threading.Condition(self.lock)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def register(self, payload):
+        """
+        Validate and create an account, scheduling its welcome mail
+
+        Returns:
+            tuple: (HTTP status, JSON body)
+        """
+        required = ('FullName', 'Email', 'Customer', 'PhoneNumber', 'Password', 'ConfirmPassword')
+        errors = {field: [f"The {field} field is required."] for field in required if not payload.get(field)}
+        if not errors and payload['Password'] != payload['ConfirmPassword']:
+            errors['ConfirmPassword'] = ["The password and confirmation password do not match."]
+
+        email = (payload.get('Email') or '').strip().lower()
+        with self.lock:
+            if not errors and email in self.accounts:
+                errors['Email'] = [f"Email '{email}' is already taken."]
+            if errors:
+                self.stats['rejected'] += 1
+                return 400, {'succeeded': False, 'errors': errors}
+
+            account = {
+                'email': email,
+                'password': payload['Password'],
+                'full_name': payload['FullName'],
+                'user_id': uuid.uuid4().hex[:12],
+                'code': uuid.uuid4().hex,
+                'confirmed': False,
+                'owa_logins': 0,
+            }
+            self.accounts[email] = account
+            self.mailboxes[email] = self._filler(email)
+            self.mailboxes[email].append(self._welcome(account))
+            self.stats['registered'] += 1
+
+        # Wake IMAP IDLE sessions once the welcome mail is due
+        timer = threading.Timer(self.mail_delay, self._notify)
+        timer.daemon = True
+        timer.start()
+        return 200, {'succeeded': True, 'userId': account['user_id']}
+
+    def _notify(self):
+        with self.mail_arrived:
+            self.mail_arrived.notify_all()
+
+    def _filler(self, email):
+        return [{
+            'subject': f"WorldPosta newsletter #{i + 1}",
+            'sender': "news@worldposta.com",
+            'html': f"<p>Product news #{i + 1} for {escape(email)}.</p>",
+            'deliver_at': 0,
+        } for i in range(self.filler_messages)]
+
+    def _welcome(self, account):
+        link = f"{self.admin_url}/auth/ConfirmEmail?userId={account['user_id']}&code={account['code']}"
+        return {
+            'subject': WELCOME_SUBJECT,
+            'sender': WELCOME_SENDER,
+            'html': (f'<h1>{WELCOME_SUBJECT}</h1>'
+                     f'<p>Hello {escape(account["full_name"])}, please confirm your email address.</p>'
+                     f'<p><a href="https://worldposta.com/">WorldPosta</a></p>'
+                     f'<p><a href="{escape(link)}">Confirm Email Address</a></p>'),
+            'text': f"Please confirm your email address: {link}",
+            'deliver_at': time.time() + self.mail_delay,
+        }
+
+    def account(self, email, password=None):
+        """Account for email, or None (also None when password is given and wrong)"""
+        with self.lock:
+            account = self.accounts.get((email or '').strip().lower())
+        if account is None or (password is not None and account['password'] != password):
+            return None
+        return account
+
+    def delivered(self, email):
+        """Messages already in the inbox, oldest first"""
+        now = time.time()
+        with self.lock:
+            return [m for m in self.mailboxes.get((email or '').lower(), []) if m['deliver_at'] <= now]
+
+    def wait_for_mail(self, email, known, timeout):
+        """Block until more than `known` messages are delivered or timeout passes"""
+        deadline = time.time() + timeout
+        while len(self.delivered(email)) <= known:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            with self.mail_arrived:
+                self.mail_arrived.wait(min(remaining, 1.0))
+        return True
+
+    def confirm(self, user_id, code):
+        with self.lock:
+            for account in self.accounts.values():
+                if account['user_id'] == user_id and account['code'] == code:
+                    if not account['confirmed']:
+                        account['confirmed'] = True
+                        self.stats['confirmed'] += 1
+                    return True
+        return False
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats, accounts=len(self.accounts))
+
+
+def build_message(message, recipient):
+    """RFC 822 bytes for a mailbox message (for IMAP FETCH)"""
+    msg = EmailMessage()
+    msg['Subject'] = message['subject']
+    msg['From'] = message['sender']
+    msg['To'] = recipient
+    msg['Date'] = formatdate(message['deliver_at'] or time.time())
+    msg.set_content(message.get('text') or 'This message requires an HTML viewer.')
+    msg.add_alternative(message['html'], subtype='html')
+    return bytes(msg).replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+
+
+# =====================================================
+# PAGES
+# =====================================================
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>@font-face {{ font-family: "Segoe UI Web"; src: url(/assets/segoe-ui.woff2) format("woff2"); }}</style>
+<link rel="stylesheet" href="/assets/styles.css">
+<script src="/assets/""" + APP_BUNDLE + """"></script>
+<script async src="/gtag/js?id=G-STANDIN"></script></head>
+<body style="font-family: 'Segoe UI Web', sans-serif">
+<img src="/assets/logo.png" alt="WorldPosta" width="160" height="40">
+<img src="/assets/hero.jpg" alt="" width="320" height="60">
+{body}</body></html>"""
+
+REGISTER_PAGE = """
+<div style="height: 500px">WorldPosta - Create your account</div>
+<form id="register-form" onsubmit="return submitRegister()">
+  <input formcontrolname="FullName" placeholder="Full name">
+  <input formcontrolname="Email" placeholder="Email">
+  <input formcontrolname="Customer" placeholder="Company">
+  <input formcontrolname="PhoneNumber" placeholder="Phone">
+  <input formcontrolname="Password" type="password" placeholder="Password">
+  <input formcontrolname="ConfirmPassword" type="password" placeholder="Confirm password">
+  <button id="create-account" type="submit">Create Account</button>
+</form>
+<div id="errors" style="color: red; height: 800px"></div>
+<script>
+function submitRegister() {
+  var data = {};
+  document.querySelectorAll('input[formcontrolname]').forEach(function (input) {
+    data[input.getAttribute('formcontrolname')] = input.value;
+  });
+  fetch('/api/auth/register', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                               body: JSON.stringify(data)})
+    .then(function (response) {
+      return response.json().then(function (body) {
+        if (response.ok) { location.href = '/auth/login?registered=1'; }
+        else { document.getElementById('errors').textContent = JSON.stringify(body.errors || body); }
+      });
+    })
+    .catch(function (e) { document.getElementById('errors').textContent = String(e); });
+  return false;
+}
+</script>"""
+
+LOGIN_PAGE = """
+<div>WorldPosta - Sign in</div>
+<form onsubmit="return signIn()">
+  <input formcontrolname="Email" placeholder="Email">
+  <input formcontrolname="Password" type="password" placeholder="Password">
+  <button id="sign-in" type="submit">Sign in</button>
+</form>
+<div id="errors" style="color: red"></div>
+<script>
+function signIn() {
+  var data = {
+    Email: document.querySelector('input[formcontrolname="Email"]').value,
+    Password: document.querySelector('input[formcontrolname="Password"]').value
+  };
+  fetch('/api/auth/login', {method: 'POST', headers: {'Content-Type': 'application/json'},
+                            body: JSON.stringify(data), credentials: 'same-origin'})
+    .then(function (response) {
+      return response.json().then(function (body) {
+        if (response.ok) { location.href = '/dashboard'; }
+        else { document.getElementById('errors').textContent = body.message || 'Sign in failed'; }
+      });
+    });
+  return false;
+}
+</script>"""
+
+DASHBOARD_PAGE = """
+<div style="height: 600px">Welcome {name}</div>
+<div class="card"><h3>Posta</h3>
+  <button class="launch-button" onclick="location.href='/launch/posta'">View Posta</button></div>
+<div class="card"><h3>CloudEdge</h3>
+  <button class="launch-button" onclick="location.href='/launch/cloudedge'">View CloudEdge</button></div>
+<div style="height: 800px"></div>"""
+
+OWA_LOGIN_PAGE = """
+<div>Outlook Web App</div>
+<form action="/owa/auth.owa" method="post">
+  <input id="username" name="username" placeholder="Domain\\user name">
+  <input id="password" name="password" type="password" placeholder="Password"
+         onkeydown="if (event.key === 'Enter') {{ clkLgn(); return false; }}">
+  <div class="signinbutton" role="button" tabindex="0" onclick="clkLgn()"><span>sign in</span></div>
+</form>
+<div id="signInErrorDiv">{error}</div>
+<script>function clkLgn() {{ document.forms[0].submit(); }}</script>"""
+
+LANGUAGE_PAGE = """
+<div>Choose your preferred display language and home time zone</div>
+<select id="selTz"><option value="UTC">(UTC) Coordinated Universal Time</option>
+  <option value="Egypt Standard Time">(UTC+02:00) Cairo</option></select>
+<div role="button" onclick="location.href='/owa/'"><span>Save</span></div>"""
+
+INBOX_PAGE = """
+<div role="navigation"><a href="#">Inbox</a> <a href="#">Sent Items</a></div>
+<div autoid="_lvv_8" role="listbox" class="customScrollBar">{rows}</div>
+<div class="ReadingPaneContents" id="readingPane"></div>
+{templates}
+<script>
+function openMessage(id) {{
+  document.getElementById('readingPane').innerHTML = document.getElementById('msg-' + id).innerHTML;
+}}
+</script>"""
+
+INBOX_ROW = """
+<div autoid="_lvv_3" role="option" class="_lvv_3 ms-List-cell" data-convid="{id}" tabindex="0" onclick="openMessage({id})">
+  <div class="_lvv_E"><span autoid="_lvv_5">{sender}</span> <span autoid="_lvv_6">{subject}</span>
+  <span autoid="_lvv_7">{preview}</span></div>
+</div>"""
+
+MESSAGE_TEMPLATE = """<template id="msg-{id}"><div aria-label="Message body" role="document">{html}</div></template>"""
+
+
+# =====================================================
+# HTTP SERVERS
+# =====================================================
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Shared plumbing: keep-alive, single-write responses, latency and faults"""
+
+    protocol_version = 'HTTP/1.1'
+    state = None
+    faults = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        lines = [f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}",
+                 f"Content-Type: {content_type}", f"Content-Length: {len(data)}"]
+        lines += [f"{name}: {value}" for name, value in (headers or [])]
+        # One write per response: headers and body split over two segments
+        # stall keep-alive clients on Nagle/delayed-ACK
+        self.wfile.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + data)
+        self.log_request(status)
+
+    def page(self, title, body, status=200, headers=None):
+        self.respond(status, PAGE.format(title=title, body=body), headers=headers)
+
+    def json(self, status, body, headers=None):
+        self.respond(status, json.dumps(body), 'application/json; charset=utf-8', headers)
+
+    def redirect(self, location, headers=None):
+        self.respond(302, '', headers=[('Location', location)] + list(headers or []))
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def cookie(self, name):
+        cookies = SimpleCookie(self.headers.get('Cookie', ''))
+        return cookies[name].value if name in cookies else None
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        if method == 'GET' and (url.path.startswith('/assets/') or url.path == '/gtag/js'):
+            route, handler = 'assets', self.asset
+        else:
+            route, handler = self.route(method, url.path)
+        if handler is None:
+            self.page("Not found", "<h1>404</h1>", status=404)
+            return
+
+        self.faults.delay()
+        if self.faults.should_fail(route):
+            self.state.count('injected_failures')
+            if route.endswith('_api'):
+                self.json(503, {'message': 'Service temporarily unavailable (injected)'})
+            else:
+                self.page("Service unavailable", "<h1>503 Service Unavailable</h1>", status=503)
+            return
+        handler(parse_qs(url.query))
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def route(self, method, path):
+        raise NotImplementedError
+
+    def asset(self, query):
+        path = urlsplit(self.path).path
+        name = 'gtag.js' if path == '/gtag/js' else path.rsplit('/', 1)[-1]
+        if name not in ASSETS:
+            self.page("Not found", "<h1>404</h1>", status=404)
+            return
+        content_type, size, cache_control = ASSETS[name]
+        etag = f'"{name}-{size}"'
+        self.state.count('asset_requests')
+        if self.headers.get('If-None-Match') == etag:
+            self.state.count('asset_not_modified')
+            self.respond(304, b'', content_type, headers=[('Cache-Control', cache_control), ('ETag', etag)])
+            return
+        self.state.count('asset_bytes', size)
+        # Scripts and stylesheets must still parse: pad them with one long comment
+        if content_type.endswith(('javascript', 'css')):
+            body = b'/*' + b' ' * (size - 4) + b'*/'
+        else:
+            body = b'\0' * size
+        self.respond(200, body, content_type, headers=[('Cache-Control', cache_control), ('ETag', etag)])
+
+
+class AdminHandler(StandinHandler):
+    """admin.worldposta.com stand-in"""
+
+    def route(self, method, path):
+        routes = {
+            ('GET', '/auth/register'): ('register_page', self.register_page),
+            ('POST', '/api/auth/register'): ('register_api', self.register_api),
+            ('GET', '/auth/login'): ('login_page', self.login_page),
+            ('POST', '/api/auth/login'): ('login_api', self.login_api),
+            ('GET', '/auth/ConfirmEmail'): ('confirm', self.confirm),
+            ('GET', '/dashboard'): ('dashboard', self.dashboard),
+            ('GET', '/__standin/stats'): ('stats', self.stats),
+        }
+        if method == 'GET' and path.startswith('/launch/'):
+            return 'launch', self.launch
+        return routes.get((method, path), (None, None))
+
+    def register_page(self, query):
+        self.page("Register - WorldPosta", REGISTER_PAGE)
+
+    def register_api(self, query):
+        try:
+            payload = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            self.json(400, {'title': 'Invalid JSON body'})
+            return
+        status, body = self.state.register(payload)
+        self.json(status, body, headers=[('Set-Cookie', 'XSRF-TOKEN=' + uuid.uuid4().hex + '; Path=/')])
+
+    def login_page(self, query):
+        self.page("Sign in - WorldPosta", LOGIN_PAGE)
+
+    def login_api(self, query):
+        try:
+            payload = json.loads(self.read_body() or b'{}')
+        except ValueError:
+            payload = {}
+        account = self.state.account(payload.get('Email'), payload.get('Password'))
+        if account is None:
+            self.json(401, {'message': 'Invalid email or password.'})
+        elif not account['confirmed']:
+            self.json(403, {'message': 'Please confirm your email address first.'})
+        else:
+            self.state.count('logins')
+            self.json(200, {'succeeded': True},
+                      headers=[('Set-Cookie', f"session={account['email']}; Path=/; HttpOnly")])
+
+    def confirm(self, query):
+        user_id, code = query.get('userId', [''])[0], query.get('code', [''])[0]
+        if self.state.confirm(user_id, code):
+            self.page("Email confirmed", "<h1>Thank you for confirming your email.</h1>"
+                                         "<a href='/auth/login'>Sign in</a>")
+        else:
+            self.page("Invalid link", "<h1>Invalid or expired confirmation link.</h1>", status=400)
+
+    def dashboard(self, query):
+        account = self.state.account(self.cookie('session'))
+        if account is None:
+            self.redirect('/auth/login')
+            return
+        self.page("Dashboard - WorldPosta", DASHBOARD_PAGE.format(name=escape(account['full_name'])))
+
+    def launch(self, query):
+        app = self.path.split('/launch/', 1)[1].split('?', 1)[0]
+        self.page(f"{app} - WorldPosta", f"<h1>{escape(app)}</h1><a href='/dashboard'>Back</a>")
+
+    def stats(self, query):
+        self.json(200, self.state.snapshot())
+
+
+class MailHandler(StandinHandler):
+    """mail.worldposta.com (OWA) stand-in"""
+
+    def route(self, method, path):
+        routes = {
+            ('GET', '/'): ('owa_login', self.login_page),
+            ('POST', '/owa/auth.owa'): ('owa_auth', self.auth),
+            ('GET', '/owa/'): ('owa_inbox', self.inbox),
+            ('GET', '/owa/languageselection.aspx'): ('owa_inbox', self.language_selection),
+        }
+        return routes.get((method, path), (None, None))
+
+    def login_page(self, query):
+        error = "The user name or password you entered isn't correct." if 'reason' in query else ''
+        self.page("Outlook", OWA_LOGIN_PAGE.format(error=error))
+
+    def auth(self, query):
+        form = parse_qs(self.read_body().decode('utf-8'))
+        account = self.state.account(form.get('username', [''])[0], form.get('password', [''])[0])
+        if account is None:
+            self.redirect('/?reason=2')
+            return
+
+        self.state.count('owa_logins')
+        account['owa_logins'] += 1
+        first_login = account['owa_logins'] == 1
+        target = '/owa/languageselection.aspx' if self.state.language_page and first_login else '/owa/'
+        self.redirect(target, headers=[('Set-Cookie', f"owa={account['email']}; Path=/; HttpOnly")])
+
+    def language_selection(self, query):
+        if self.state.account(self.cookie('owa')) is None:
+            self.redirect('/')
+            return
+        self.page("Outlook", LANGUAGE_PAGE)
+
+    def inbox(self, query):
+        email = self.cookie('owa')
+        if self.state.account(email) is None:
+            self.redirect('/')
+            return
+
+        self.state.count('inbox_loads')
+        messages = list(enumerate(self.state.delivered(email), 1))[::-1]  # newest first
+        rows = "".join(INBOX_ROW.format(id=i, sender=escape(m['sender']), subject=escape(m['subject']),
+                                        preview=escape(re.sub(r'<[^>]+>', ' ', m['html'])[:80]))
+                       for i, m in messages)
+        templates = "".join(MESSAGE_TEMPLATE.format(id=i, html=m['html']) for i, m in messages)
+        self.page("Mail - Outlook Web App", INBOX_PAGE.format(rows=rows, templates=templates))
+
+
+# =====================================================
+# IMAP SERVER
+# =====================================================
+
+IMAP_TOKEN_RE = re.compile(r'"((?:\\.|[^"\\])*)"|(\S+)')
+
+
+def imap_tokens(line):
+    return [match.group(1).replace('\\"', '"').replace('\\\\', '\\') if match.group(1) is not None
+            else match.group(2) for match in IMAP_TOKEN_RE.finditer(line)]
+
+
+class ImapHandler(socketserver.StreamRequestHandler):
+    """Just enough IMAP4rev1 for ImapMailboxClient (plain TCP, read-only INBOX)"""
+
+    state = None
+    faults = None
+
+    def send(self, line):
+        self.wfile.write(line.encode('utf-8') + b"\r\n")
+
+    def handle(self):
+        self.user = None
+        self.send("* OK [CAPABILITY IMAP4rev1 IDLE] WorldPosta stand-in ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            tokens = imap_tokens(line.decode('utf-8', errors='replace').strip())
+            if len(tokens) < 2:
+                self.send("* BAD missing command")
+                continue
+            tag, command, args = tokens[0], tokens[1].upper(), tokens[2:]
+
+            self.faults.delay()
+            if command != 'LOGOUT' and self.faults.should_fail('imap'):
+                self.state.count('injected_failures')
+                self.send("* BYE stand-in injected failure")
+                return
+            if not self.command(tag, command, args):
+                return
+
+    def command(self, tag, command, args):
+        """Handle one command; False closes the connection"""
+        if command == 'CAPABILITY':
+            self.send("* CAPABILITY IMAP4rev1 IDLE")
+            self.send(f"{tag} OK CAPABILITY completed")
+        elif command == 'LOGIN':
+            if len(args) == 2 and self.state.account(args[0], args[1]) is not None:
+                self.user = args[0].lower()
+                self.send(f"{tag} OK LOGIN completed")
+            else:
+                self.send(f"{tag} NO [AUTHENTICATIONFAILED] Invalid credentials")
+        elif command == 'LOGOUT':
+            self.send("* BYE logging out")
+            self.send(f"{tag} OK LOGOUT completed")
+            return False
+        elif self.user is None:
+            self.send(f"{tag} NO not authenticated")
+        elif command in ('SELECT', 'EXAMINE'):
+            self.send(f"* {len(self.state.delivered(self.user))} EXISTS")
+            self.send(f"{tag} OK [READ-ONLY] {command} completed")
+        elif command == 'NOOP':
+            # Report the mailbox size like a real server does on NOOP
+            self.send(f"* {len(self.state.delivered(self.user))} EXISTS")
+            self.send(f"{tag} OK NOOP completed")
+        elif command == 'UID' and args and args[0].upper() == 'SEARCH':
+            keyword = args[-1].lower() if len(args) >= 3 and args[-2].upper() == 'SUBJECT' else ''
+            uids = [str(uid) for uid, m in enumerate(self.state.delivered(self.user), 1)
+                    if keyword in m['subject'].lower()]
+            self.send("* SEARCH" + "".join(" " + uid for uid in uids))
+            self.send(f"{tag} OK SEARCH completed")
+        elif command == 'UID' and len(args) >= 2 and args[0].upper() == 'FETCH':
+            messages = self.state.delivered(self.user)
+            for uid in (int(u) for u in args[1].split(',') if u.isdigit()):
+                if 1 <= uid <= len(messages):
+                    raw = build_message(messages[uid - 1], self.user)
+                    self.wfile.write(f"* {uid} FETCH (UID {uid} BODY[] {{{len(raw)}}}\r\n".encode() + raw + b")\r\n")
+                    self.state.count('imap_fetches')
+            self.send(f"{tag} OK FETCH completed")
+        elif command == 'IDLE':
+            self.idle(tag)
+        else:
+            self.send(f"{tag} BAD unsupported command {command}")
+        return True
+
+    def idle(self, tag):
+        """Push EXISTS when the welcome mail is delivered, until the client sends DONE"""
+        self.send("+ idling")
+        known = len(self.state.delivered(self.user))
+        done = threading.Event()
+
+        def push():
+            while not done.is_set():
+                if self.state.wait_for_mail(self.user, known, 1.0):
+                    try:
+                        self.send(f"* {len(self.state.delivered(self.user))} EXISTS")
+                    except OSError:
+                        pass
+                    return
+
+        pusher = threading.Thread(target=push, daemon=True)
+        pusher.start()
+        self.rfile.readline()  # DONE
+        done.set()
+        pusher.join()
+        self.send(f"{tag} OK IDLE terminated")
+
+
+class ThreadingImapServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+# =====================================================
+# REDIS PROTOCOL
+# =====================================================
+
+class RespError(Exception):
+    pass
+
+
+class RespStore:
+    """
+    In-memory keyspace for the Redis stand-in
+
+    Every command runs under one lock, so MULTI/EXEC blocks are atomic;
+    each write bumps the key's version, which is what WATCH checks.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def _get(self, key, kind):
+        value = self.data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _touch(self, key):
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _container(self, key, kind):
+        value = self._get(key, kind)
+        if value is None:
+            value = self.data[key] = kind()
+        self._touch(key)
+        return value
+
+    @staticmethod
+    def _bound(text):
+        """Score range bound: (value, exclusive); float() already reads -inf/+inf"""
+        if text.startswith('('):
+            return float(text[1:]), True
+        return float(text), False
+
+    def _in_range(self, score, low, high):
+        (low, low_open), (high, high_open) = low, high
+        return (score > low if low_open else score >= low) and (score < high if high_open else score <= high)
+
+    @staticmethod
+    def _format_score(score):
+        return str(int(score)) if score == int(score) else repr(score)
+
+    def execute(self, command, args):
+        """Run one command (caller holds the lock)"""
+        if command == 'PING':
+            return 'PONG'
+        if command in ('SELECT', 'AUTH'):
+            return 'OK'
+        if command == 'GET':
+            return self._get(args[0], str)
+        if command == 'SET':
+            self.data[args[0]] = args[1]
+            self._touch(args[0])
+            return 'OK'
+        if command in ('INCR', 'INCRBY'):
+            value = int(self._get(args[0], str) or 0) + (int(args[1]) if command == 'INCRBY' else 1)
+            self.data[args[0]] = str(value)
+            self._touch(args[0])
+            return value
+        if command == 'DEL':
+            removed = 0
+            for key in args:
+                if self.data.pop(key, None) is not None:
+                    self._touch(key)
+                    removed += 1
+            return removed
+        if command == 'HSET':
+            values = self._container(args[0], dict)
+            added = sum(1 for field in args[1::2] if field not in values)
+            values.update(zip(args[1::2], args[2::2]))
+            return added
+        if command == 'HSETNX':
+            values = self._get(args[0], dict) or {}
+            if args[1] in values:
+                return 0
+            self._container(args[0], dict)[args[1]] = args[2]
+            return 1
+        if command == 'HGET':
+            return (self._get(args[0], dict) or {}).get(args[1])
+        if command == 'HMGET':
+            values = self._get(args[0], dict) or {}
+            return [values.get(field) for field in args[1:]]
+        if command == 'HGETALL':
+            return [item for pair in (self._get(args[0], dict) or {}).items() for item in pair]
+        if command == 'HINCRBY':
+            values = self._container(args[0], dict)
+            values[args[1]] = str(int(values.get(args[1], 0)) + int(args[2]))
+            return int(values[args[1]])
+        if command == 'SADD':
+            members = self._container(args[0], set)
+            added = len(set(args[1:]) - members)
+            members.update(args[1:])
+            return added
+        if command == 'SMEMBERS':
+            return sorted(self._get(args[0], set) or ())
+        if command == 'ZADD':
+            scores = self._container(args[0], dict)
+            added = 0
+            for score, member in zip(args[1::2], args[2::2]):
+                added += member not in scores
+                scores[member] = float(score)
+            return added
+        if command == 'ZREM':
+            scores = self._get(args[0], dict) or {}
+            removed = sum(1 for member in args[1:] if scores.pop(member, None) is not None)
+            if removed:
+                self._touch(args[0])
+            return removed
+        if command in ('ZRANGEBYSCORE', 'ZCOUNT'):
+            low, high = self._bound(args[1]), self._bound(args[2])
+            matches = sorted((score, member) for member, score in (self._get(args[0], dict) or {}).items()
+                             if self._in_range(score, low, high))
+            if command == 'ZCOUNT':
+                return len(matches)
+            options = [arg.upper() for arg in args[3:]]
+            if 'LIMIT' in options:
+                at = options.index('LIMIT')
+                offset, count = int(args[3 + at + 1]), int(args[3 + at + 2])
+                matches = matches[offset:offset + count if count >= 0 else None]
+            if 'WITHSCORES' in options:
+                return [item for score, member in matches for item in (member, self._format_score(score))]
+            return [member for score, member in matches]
+        if command == 'ZCARD':
+            return len(self._get(args[0], dict) or {})
+        if command == 'FLUSHDB':
+            for key in list(self.data):
+                self._touch(key)
+            self.data.clear()
+            return 'OK'
+        raise RespError(f"ERR unknown command '{command}'")
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """RESP2 front end of RespStore (inline commands are not supported)"""
+
+    store = None
+    state = None
+    faults = None
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def reply(self, value):
+        self.wfile.write(self.encode(value))
+
+    def encode(self, value):
+        if isinstance(value, RespError):
+            return f"-{value}\r\n".encode('utf-8')
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, bool) or isinstance(value, int):
+            return f":{int(value)}\r\n".encode()
+        if isinstance(value, list):
+            return f"*{len(value)}\r\n".encode() + b"".join(self.encode(item) for item in value)
+        if value in ('OK', 'PONG', 'QUEUED'):
+            return f"+{value}\r\n".encode()
+        data = str(value).encode('utf-8')
+        return f"${len(data)}\r\n".encode() + data + b"\r\n"
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            raise RespError("ERR inline commands are not supported")
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2].decode('utf-8'))
+        return args
+
+    def handle(self):
+        watched = {}
+        queued = None
+        while True:
+            try:
+                args = self.read_command()
+            except RespError as e:
+                self.reply(e)
+                return
+            if not args:
+                return
+            command, args = args[0].upper(), args[1:]
+            self.state.count('redis_commands')
+
+            if command == 'QUIT':
+                self.reply('OK')
+                return
+            if command == 'MULTI':
+                queued = []
+                self.reply('OK')
+            elif command == 'DISCARD':
+                queued, watched = None, {}
+                self.reply('OK')
+            elif command == 'WATCH':
+                with self.store.lock:
+                    watched.update({key: self.store.versions.get(key, 0) for key in args})
+                self.reply('OK')
+            elif command == 'UNWATCH':
+                watched = {}
+                self.reply('OK')
+            elif command == 'EXEC':
+                with self.store.lock:
+                    if any(self.store.versions.get(key, 0) != version for key, version in watched.items()):
+                        self.wfile.write(b"*-1\r\n")
+                    else:
+                        results = []
+                        for queued_command, queued_args in queued or []:
+                            try:
+                                results.append(self.store.execute(queued_command, queued_args))
+                            except RespError as e:
+                                results.append(e)
+                        self.reply(results)
+                queued, watched = None, {}
+            elif queued is not None:
+                queued.append((command, args))
+                self.reply('QUEUED')
+            else:
+                try:
+                    with self.store.lock:
+                        result = self.store.execute(command, args)
+                except (RespError, ValueError, IndexError) as e:
+                    result = e if isinstance(e, RespError) else RespError(f"ERR {e}")
+                self.reply(result)
+
+
+class ThreadingRespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+# =====================================================
+# STAND-IN
+# =====================================================
+
+class LocalStandin:
+    """
+    Admin portal, OWA and IMAP stand-ins on local ports
+
+    Usage:
+        standin = LocalStandin(mail_delay=2).start()
+        os.environ.update(standin.env())
+        ...
+        standin.stop()
+    """
+
+    def __init__(self, host=STANDIN_HOST, admin_port=ADMIN_PORT, mail_port=MAIL_PORT, imap_port=IMAP_PORT,
+                 redis_port=REDIS_PORT, mail_delay=MAIL_DELAY, latency=0.0, jitter=0.0, failures=None, seed=None,
+                 filler_messages=FILLER_MESSAGES, language_page=False):
+        """
+        Args:
+            host: Interface to bind
+            admin_port, mail_port, imap_port, redis_port: Ports (0 = pick a free one)
+            mail_delay: Seconds until the welcome mail shows up
+            latency, jitter: Added to every request
+            failures: {route: probability} for injected 503 / IMAP BYE
+            seed: Random seed for jitter and failures
+            filler_messages: Unrelated rows in every inbox
+            language_page: Send first OWA logins through languageselection.aspx
+        """
+        self.host = host
+        self.faults = FaultInjector(latency, jitter, failures, seed)
+        self.state = None
+        self.servers = []
+        self.ports = (admin_port, mail_port, imap_port, redis_port)
+        self.mail_delay = mail_delay
+        self.filler_messages = filler_messages
+        self.language_page = language_page
+        self.admin_url = self.mail_url = None
+        self.imap_port = self.redis_port = None
+
+    def _serve(self, server_class, handler, port, **attributes):
+        handler = type(handler.__name__, (handler,), dict(attributes, state=self.state, faults=self.faults))
+        server = server_class((self.host, port), handler)
+        self.servers.append(server)
+        threading.Thread(target=server.serve_forever, name=f"standin-{handler.__name__}", daemon=True).start()
+        return server
+
+    def start(self):
+        # The confirm link's base URL is only known once the admin port is bound
+        self.state = StandinState(None, self.mail_delay, self.filler_messages, self.language_page)
+        admin = self._serve(ThreadingHTTPServer, AdminHandler, self.ports[0])
+        mail = self._serve(ThreadingHTTPServer, MailHandler, self.ports[1])
+        imap = self._serve(ThreadingImapServer, ImapHandler, self.ports[2])
+        redis = self._serve(ThreadingRespServer, RespHandler, self.ports[3], store=RespStore())
+
+        self.admin_url = f"http://{self.host}:{admin.server_address[1]}"
+        self.mail_url = f"http://{self.host}:{mail.server_address[1]}"
+        self.imap_port = imap.server_address[1]
+        self.redis_port = redis.server_address[1]
+        self.state.admin_url = self.admin_url
+        return self
+
+    def env(self):
+        """WORLDPOSTA_* variables pointing the bots at this stand-in"""
+        return {
+            'WORLDPOSTA_ADMIN_URL': self.admin_url,
+            'WORLDPOSTA_MAIL_URL': self.mail_url,
+            'WORLDPOSTA_REGISTER_API_URL': self.admin_url + '/api/auth/register',
+            'WORLDPOSTA_IMAP_HOST': self.host,
+            'WORLDPOSTA_IMAP_PORT': str(self.imap_port),
+            'WORLDPOSTA_IMAP_SSL': '0',
+            'WORLDPOSTA_QUEUE': f"redis://{self.host}:{self.redis_port}/0",
+        }
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for admin.worldposta.com and mail.worldposta.com")
+    parser.add_argument("--host", default=STANDIN_HOST)
+    parser.add_argument("--admin-port", type=int, default=ADMIN_PORT)
+    parser.add_argument("--mail-port", type=int, default=MAIL_PORT)
+    parser.add_argument("--imap-port", type=int, default=IMAP_PORT)
+    parser.add_argument("--redis-port", type=int, default=REDIS_PORT)
+    parser.add_argument("--mail-delay", type=float, default=MAIL_DELAY,
+                        help="Seconds between registration and the welcome mail")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random 0..N seconds per request")
+    parser.add_argument("--fail", default="",
+                        help=f"Injected failure rates, e.g. register_api=0.1,confirm=0.05 (routes: {', '.join(ROUTES)})")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter and failures")
+    parser.add_argument("--language-page", action="store_true",
+                        help="Send the first OWA login through the language/time zone page")
+    args = parser.parse_args()
+
+    standin = LocalStandin(
+        host=args.host, admin_port=args.admin_port, mail_port=args.mail_port, imap_port=args.imap_port,
+        redis_port=args.redis_port, mail_delay=args.mail_delay, latency=args.latency, jitter=args.jitter,
+        failures=parse_failures(args.fail), seed=args.seed, language_page=args.language_page
+    ).start()
+
+    print("="*60)
+    print("🧪 WORLDPOSTA LOCAL STAND-IN")
+    print("="*60)
+    print(f"🏢 Admin portal: {standin.admin_url}")
+    print(f"📬 OWA:          {standin.mail_url}")
+    print(f"📡 IMAP:         {standin.host}:{standin.imap_port}")
+    print(f"🧮 Queue (RESP): {standin.host}:{standin.redis_port}")
+    print("\nPoint the bots at it with:\n")
+    for name, value in standin.env().items():
+        print(f"export {name}={value}")
+    print("\nPress Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {json.dumps(standin.state.snapshot())}")
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
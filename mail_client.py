@@ -0,0 +1,388 @@
+"""
+Protocol-level mailbox clients for the verification email
+IMAP (IDLE push when the server supports it, SUBJECT SEARCH otherwise) and
+EWS, so the welcome mail can be picked up without reloading OWA in the
+browser. The browser poller in the bots stays as the fallback.
+"""
+
+import os
+import ssl
+import time
+import email
+import select
+import base64
+import imaplib
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from email import policy
+from xml.sax.saxutils import escape
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+MAILBOX_BACKEND = os.environ.get("WORLDPOSTA_MAILBOX", "browser")  # browser | imap | ews
+
+IMAP_HOST = os.environ.get("WORLDPOSTA_IMAP_HOST", "mail.worldposta.com")
+IMAP_PORT = int(os.environ.get("WORLDPOSTA_IMAP_PORT", "993"))
+IMAP_SSL = os.environ.get("WORLDPOSTA_IMAP_SSL", "1") != "0"
+IMAP_FOLDER = "INBOX"
+IMAP_IDLE_WINDOW = 60  # seconds per IDLE round before re-checking with SEARCH
+
+EWS_URL = os.environ.get("WORLDPOSTA_EWS_URL", "https://mail.worldposta.com/EWS/Exchange.asmx")
+
+POLL_INTERVAL = 5  # seconds between checks when push is not available
+
+
+MailMessage = namedtuple('MailMessage', ['subject', 'sender', 'received', 'html_body', 'text_body'])
+
+
+class MailboxError(Exception):
+    """Raised when the mailbox cannot be reached or queried"""
+
+
+# =====================================================
+# INTERFACE
+# =====================================================
+
+class MailboxClient:
+    """Finds a message by subject in one account's inbox"""
+
+    name = None
+
+    def wait_for_message(self, address, password, subject_keyword, timeout):
+        """
+        Wait for a message whose subject contains subject_keyword
+
+        Args:
+            address: Mailbox login (full email address)
+            password: Mailbox password
+            subject_keyword: Case-insensitive subject substring
+            timeout: Maximum seconds to wait
+
+        Returns:
+            MailMessage or None on timeout
+
+        Raises:
+            MailboxError: Connection, login or protocol failure
+        """
+        raise NotImplementedError
+
+
+def parse_message(raw_bytes):
+    """Build a MailMessage from raw RFC 822 bytes"""
+    msg = email.message_from_bytes(raw_bytes, policy=policy.default)
+
+    html_part = msg.get_body(preferencelist=('html',))
+    text_part = msg.get_body(preferencelist=('plain',))
+
+    return MailMessage(
+        subject=str(msg.get('Subject', '')),
+        sender=str(msg.get('From', '')),
+        received=str(msg.get('Date', '')),
+        html_body=html_part.get_content() if html_part else '',
+        text_body=text_part.get_content() if text_part else ''
+    )
+
+
+# =====================================================
+# IMAP
+# =====================================================
+
+class ImapMailboxClient(MailboxClient):
+    """IMAP4 client: IDLE push where supported, SUBJECT SEARCH polling otherwise"""
+
+    name = 'imap'
+
+    def __init__(self, host=IMAP_HOST, port=IMAP_PORT, use_ssl=IMAP_SSL, folder=IMAP_FOLDER,
+                 poll_interval=POLL_INTERVAL, idle_window=IMAP_IDLE_WINDOW, use_idle=True):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.folder = folder
+        self.poll_interval = poll_interval
+        self.idle_window = idle_window
+        self.use_idle = use_idle
+
+    def connect(self, address, password):
+        """Open, authenticate and select the folder"""
+        try:
+            if self.use_ssl:
+                conn = imaplib.IMAP4_SSL(self.host, self.port, ssl_context=ssl.create_default_context())
+            else:
+                conn = imaplib.IMAP4(self.host, self.port)
+            conn.login(address, password)
+            status, _ = conn.select(self.folder, readonly=True)
+            if status != 'OK':
+                raise MailboxError(f"Cannot select folder {self.folder}")
+            return conn
+        except (imaplib.IMAP4.error, OSError) as e:
+            raise MailboxError(f"IMAP connection failed: {e}") from e
+
+    def search(self, conn, subject_keyword):
+        """UIDs of messages whose subject contains subject_keyword (oldest first)"""
+        quoted = '"' + subject_keyword.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        status, data = conn.uid('SEARCH', None, 'SUBJECT', quoted)
+        if status != 'OK':
+            raise MailboxError(f"IMAP SEARCH failed: {data}")
+        return data[0].split() if data and data[0] else []
+
+    def fetch(self, conn, uid):
+        """Fetch and parse one message by UID"""
+        status, data = conn.uid('FETCH', uid, '(BODY.PEEK[])')
+        if status != 'OK':
+            raise MailboxError(f"IMAP FETCH failed: {data}")
+        for part in data:
+            if isinstance(part, tuple):
+                return parse_message(part[1])
+        raise MailboxError(f"IMAP FETCH returned no body for UID {uid}")
+
+    def supports_idle(self, conn):
+        return self.use_idle and 'IDLE' in conn.capabilities
+
+    @staticmethod
+    def buffered(conn):
+        """Input already read off the socket (TLS record or imaplib's file buffer)"""
+        if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.pending():
+            return True
+        # Non-blocking peek: returns what is buffered without waiting for more
+        timeout = conn.sock.gettimeout()
+        conn.sock.setblocking(False)
+        try:
+            return bool(conn.file.peek(1))
+        except (BlockingIOError, ssl.SSLWantReadError):
+            return False
+        finally:
+            conn.sock.settimeout(timeout)
+
+    def idle(self, conn, seconds):
+        """
+        Block in IDLE until the server reports new mail or `seconds` pass
+
+        Returns:
+            bool: True if the server pushed an EXISTS/RECENT update
+        """
+        tag = conn._new_tag()
+        conn.send(tag + b' IDLE\r\n')
+        response = conn.readline()
+        if not response.startswith(b'+'):
+            raise MailboxError(f"IMAP IDLE rejected: {response!r}")
+
+        pushed = False
+        deadline = time.time() + seconds
+        while not pushed:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            # select() only sees the socket: a line already read into imaplib's
+            # buffer (e.g. sent with the continuation) would wait out the window
+            if not self.buffered(conn):
+                readable, _, _ = select.select([conn.sock], [], [], min(remaining, 1.0))
+                if not readable:
+                    continue
+            line = conn.readline()
+            if not line:
+                raise MailboxError("IMAP connection closed during IDLE")
+            if b'EXISTS' in line or b'RECENT' in line:
+                pushed = True
+
+        conn.send(b'DONE\r\n')
+        while True:
+            line = conn.readline()
+            if not line:
+                raise MailboxError("IMAP connection closed while ending IDLE")
+            if line.startswith(tag):
+                break
+        return pushed
+
+    def wait_for_message(self, address, password, subject_keyword, timeout):
+        conn = self.connect(address, password)
+        deadline = time.time() + timeout
+        try:
+            use_idle = self.supports_idle(conn)
+            print(f"📡 IMAP {self.host}:{self.port} connected ({'IDLE push' if use_idle else 'SEARCH polling'})")
+
+            while True:
+                uids = self.search(conn, subject_keyword)
+                if uids:
+                    return self.fetch(conn, uids[-1])
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+
+                if use_idle:
+                    self.idle(conn, min(remaining, self.idle_window))
+                else:
+                    time.sleep(min(remaining, self.poll_interval))
+                    conn.noop()
+
+        except (imaplib.IMAP4.error, OSError) as e:
+            raise MailboxError(f"IMAP error: {e}") from e
+        finally:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+
+# =====================================================
+# EWS
+# =====================================================
+
+EWS_NS = {
+    'm': 'http://schemas.microsoft.com/exchange/services/2006/messages',
+    't': 'http://schemas.microsoft.com/exchange/services/2006/types',
+}
+
+EWS_ENVELOPE = """<?xml version="1.0" encoding="utf-8"?>
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"
+               xmlns:t="http://schemas.microsoft.com/exchange/services/2006/types"
+               xmlns:m="http://schemas.microsoft.com/exchange/services/2006/messages">
+  <soap:Header><t:RequestServerVersion Version="Exchange2013"/></soap:Header>
+  <soap:Body>{body}</soap:Body>
+</soap:Envelope>"""
+
+EWS_FIND_ITEM = """<m:FindItem Traversal="Shallow">
+  <m:ItemShape><t:BaseShape>IdOnly</t:BaseShape></m:ItemShape>
+  <m:IndexedPageItemView MaxEntriesReturned="1" Offset="0" BasePoint="Beginning"/>
+  <m:Restriction>
+    <t:Contains ContainmentMode="Substring" ContainmentComparison="IgnoreCase">
+      <t:FieldURI FieldURI="item:Subject"/>
+      <t:Constant Value="{subject}"/>
+    </t:Contains>
+  </m:Restriction>
+  <m:SortOrder>
+    <t:FieldOrder Order="Descending"><t:FieldURI FieldURI="item:DateTimeReceived"/></t:FieldOrder>
+  </m:SortOrder>
+  <m:ParentFolderIds><t:DistinguishedFolderId Id="inbox"/></m:ParentFolderIds>
+</m:FindItem>"""
+
+EWS_GET_ITEM = """<m:GetItem>
+  <m:ItemShape>
+    <t:BaseShape>Default</t:BaseShape>
+    <t:BodyType>HTML</t:BodyType>
+  </m:ItemShape>
+  <m:ItemIds><t:ItemId Id="{item_id}"/></m:ItemIds>
+</m:GetItem>"""
+
+
+class EwsMailboxClient(MailboxClient):
+    """Exchange Web Services client (FindItem on subject, GetItem for the body)"""
+
+    name = 'ews'
+
+    def __init__(self, url=EWS_URL, poll_interval=POLL_INTERVAL, request_timeout=30):
+        self.url = url
+        self.poll_interval = poll_interval
+        self.request_timeout = request_timeout
+
+    def call(self, address, password, body):
+        """POST one SOAP request and return the parsed XML root"""
+        payload = EWS_ENVELOPE.format(body=body).encode('utf-8')
+        token = base64.b64encode(f"{address}:{password}".encode('utf-8')).decode('ascii')
+        request = urllib.request.Request(self.url, data=payload, method='POST', headers={
+            'Content-Type': 'text/xml; charset=utf-8',
+            'Authorization': f'Basic {token}',
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=self.request_timeout) as response:
+                root = ET.fromstring(response.read())
+        except (OSError, ET.ParseError) as e:
+            raise MailboxError(f"EWS request failed: {e}") from e
+
+        for message in root.iter(f"{{{EWS_NS['m']}}}ResponseCode"):
+            if message.text != 'NoError':
+                raise MailboxError(f"EWS error: {message.text}")
+        return root
+
+    def find_item_id(self, address, password, subject_keyword):
+        root = self.call(address, password, EWS_FIND_ITEM.format(subject=escape(subject_keyword, {'"': '&quot;'})))
+        item_id = root.find('.//t:ItemId', EWS_NS)
+        return item_id.get('Id') if item_id is not None else None
+
+    def get_item(self, address, password, item_id):
+        root = self.call(address, password, EWS_GET_ITEM.format(item_id=escape(item_id, {'"': '&quot;'})))
+        item = root.find('.//t:Message', EWS_NS)
+        if item is None:
+            raise MailboxError(f"EWS GetItem returned no message for {item_id}")
+
+        def text(path):
+            node = item.find(path, EWS_NS)
+            return node.text or '' if node is not None else ''
+
+        return MailMessage(
+            subject=text('t:Subject'),
+            sender=text('t:From/t:Mailbox/t:EmailAddress'),
+            received=text('t:DateTimeReceived'),
+            html_body=text('t:Body'),
+            text_body=''
+        )
+
+    def wait_for_message(self, address, password, subject_keyword, timeout):
+        deadline = time.time() + timeout
+        print(f"📡 EWS {self.url} (polling every {self.poll_interval}s)")
+        while True:
+            item_id = self.find_item_id(address, password, subject_keyword)
+            if item_id:
+                return self.get_item(address, password, item_id)
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(remaining, self.poll_interval))
+
+
+# =====================================================
+# FACTORY
+# =====================================================
+
+MAILBOX_BACKENDS = {
+    'browser': None,  # OWA poller inside the bot
+    ImapMailboxClient.name: ImapMailboxClient,
+    EwsMailboxClient.name: EwsMailboxClient,
+}
+
+
+def create_mailbox_client(backend=None):
+    """
+    Build a mailbox client by backend name
+
+    Args:
+        backend: browser, imap or ews (defaults to WORLDPOSTA_MAILBOX / browser)
+
+    Returns:
+        MailboxClient, or None for the browser poller
+    """
+    backend = backend or MAILBOX_BACKEND
+    if backend not in MAILBOX_BACKENDS:
+        raise ValueError(f"Unknown mailbox backend '{backend}', choose from {sorted(MAILBOX_BACKENDS)}")
+    client_class = MAILBOX_BACKENDS[backend]
+    return client_class() if client_class else None
+
+
+def wait_for_verification_mail(client, address, password, subject_keyword, timeout):
+    """
+    Wait for the verification email through a protocol client
+
+    Returns:
+        MailMessage, or None if it did not arrive or the mailbox failed
+        (the caller then falls back to the browser poller)
+    """
+    print(f"📡 Waiting for '{subject_keyword}' via {client.name.upper()} (timeout {timeout}s)...")
+    start = time.time()
+    try:
+        message = client.wait_for_message(address, password, subject_keyword, timeout)
+    except MailboxError as e:
+        print(f"⚠ Mailbox client failed: {e}")
+        return None
+
+    if message is None:
+        print(f"⌛ No matching email via {client.name.upper()} after {int(time.time() - start)}s")
+        return None
+
+    print(f"✅ Verification email received via {client.name.upper()} after {time.time() - start:.1f}s")
+    print(f"📧 Subject: {message.subject}")
+    return message
@@ -0,0 +1,271 @@
+"""
+Mail-arrival latency and adaptive inbox polling
+Records, per account, how long the welcome mail took from registration
+submit to detection, and keeps the last WINDOW samples in SQLite (shared
+by every worker process). PollSchedule turns that distribution into the
+inbox poll plan:
+
+    exploratory check   one early check at EXPLORE_AT, so arrivals faster
+                        than the current window are still seen (and learned)
+    before the window   no polls until the first planned check
+    in the window       checks at POLL_QUANTILES of the arrival times, so
+                        they are densest where most mail arrives and each
+                        one catches a similar share of accounts
+                        (gaps wider than MAX_GAP are split)
+    in the tail         back off geometrically, up to MAX_INTERVAL
+
+Until MIN_SAMPLES arrivals are known, PRIOR_POLL_TIMES (the old fixed
+15 s cadence) stand in for the distribution. A check only tells that the
+mail arrived since the previous miss (or the submit), so arrivals are
+recorded as the middle of that interval, not as the check time; otherwise
+the distribution could never move earlier than the first check.
+
+Usage:
+    store = shared_mail_latency()
+    schedule = store.schedule()
+    time.sleep(schedule.next_delay(time.time() - registered_at))
+    store.record(email, arrival_estimate(registered_at, last_miss, checked_at) - registered_at, 'owa')
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+MAIL_LATENCY_DB = os.environ.get("WORLDPOSTA_MAIL_LATENCY_DB", "mail_latency.db")
+
+WINDOW = 200  # most recent arrivals the schedule is built from
+MIN_SAMPLES = 5  # arrivals needed before the measured distribution is trusted
+POLL_QUANTILES = (0.3, 0.6, 0.85, 0.95)  # planned checks, as arrival quantiles
+PRIOR_POLL_TIMES = (15.0, 30.0, 45.0, 60.0)  # seconds after submit, with too few samples
+EXPLORE_AT = 3.0  # seconds after submit; early check ahead of the planned ones
+MIN_INTERVAL = 2.0  # seconds; an OWA refresh takes about this long anyway
+MAX_GAP = 20.0  # planned checks further apart are split
+MAX_INTERVAL = 30.0  # longest tail delay
+TAIL_BACKOFF = 1.5  # each tail delay is this much longer than the one before
+
+
+def quantile(values, q):
+    """Linear-interpolated quantile of a sorted list"""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class PollSchedule:
+    """
+    Delay before the next inbox check, from the arrival distribution
+
+    Usage:
+        schedule = PollSchedule(samples)
+        delay = schedule.next_delay(seconds_since_registration)
+    """
+
+    def __init__(self, samples, min_samples=MIN_SAMPLES):
+        values = sorted(samples)
+        self.learned = len(values) >= min_samples
+        if self.learned:
+            planned = [quantile(values, q) for q in POLL_QUANTILES]
+        else:
+            planned = list(PRIOR_POLL_TIMES)
+        if planned[0] - EXPLORE_AT >= MIN_INTERVAL:
+            planned.insert(0, EXPLORE_AT)
+        # Checks closer together than a refresh takes are merged; wide gaps are split
+        self.poll_times = []
+        for at in planned:
+            if self.poll_times:
+                previous = self.poll_times[-1]
+                if at - previous < MIN_INTERVAL:
+                    continue
+                splits = int((at - previous) // MAX_GAP)
+                self.poll_times += [previous + (at - previous) * i / (splits + 1) for i in range(1, splits + 1)]
+            self.poll_times.append(at)
+        self.median = quantile(values, 0.5) if values else None
+        last_gap = self.poll_times[-1] - self.poll_times[-2] if len(self.poll_times) > 1 else MIN_INTERVAL
+        self.tail_start = max(MIN_INTERVAL, last_gap)
+
+    def next_delay(self, elapsed):
+        """
+        Seconds to wait before the next check
+
+        Args:
+            elapsed: Seconds since the registration was submitted
+
+        Returns:
+            float, at least MIN_INTERVAL
+        """
+        for at in self.poll_times:
+            if at - elapsed >= MIN_INTERVAL:
+                return at - elapsed
+
+        # Past the last planned check: every delay TAIL_BACKOFF times the previous one
+        delay, checked = self.tail_start, self.poll_times[-1]
+        while checked + delay <= elapsed + MIN_INTERVAL and delay < MAX_INTERVAL:
+            checked += delay
+            delay *= TAIL_BACKOFF
+        return min(MAX_INTERVAL, max(MIN_INTERVAL, checked + delay - elapsed))
+
+    def initial_delay(self, elapsed):
+        """Wait before the first check; 0 once the first planned check is due"""
+        first = self.poll_times[0]
+        return first - elapsed if first - elapsed >= MIN_INTERVAL else 0.0
+
+    def describe(self):
+        source = f"measured (median {self.median:.0f}s)" if self.learned else "prior"
+        return f"{source} arrival, checks at {', '.join(f'{at:.0f}' for at in self.poll_times)}s then back-off"
+
+
+def arrival_estimate(registered_at, last_miss, checked_at):
+    """
+    When the mail most likely arrived: the middle of (last miss, hit check]
+
+    Args:
+        registered_at: Time the registration was submitted
+        last_miss: Time of the last check that did not find the mail, or None
+        checked_at: Time of the check that found it
+
+    Returns:
+        float: Absolute time
+    """
+    since = max(registered_at, last_miss) if last_miss else registered_at
+    return (since + checked_at) / 2
+
+
+def arrival_latency(registered_at, last_miss, checked_at, restored=False):
+    """
+    Seconds from submit to arrival for the latency window, or None to skip the sample
+
+    Args:
+        registered_at: Time the registration was submitted, or None
+        last_miss: Time of the last check in this run that did not find the mail, or None
+        checked_at: Time of the check that found it
+        restored: registered_at comes from an earlier run's checkpoint; without a
+                  miss in this run the mail may have sat there through the outage
+
+    Returns:
+        float or None
+    """
+    if not registered_at or (restored and last_miss is None):
+        return None
+    return arrival_estimate(registered_at, last_miss, checked_at) - registered_at
+
+
+def sleep_until_next_poll(schedule, since, deadline):
+    """
+    Sleep per the schedule, never past the deadline
+
+    Args:
+        schedule: PollSchedule
+        since: Time the registration was submitted (or the wait started)
+        deadline: Absolute time the caller gives up
+
+    Returns:
+        float: Seconds slept
+    """
+    delay = max(0.0, min(schedule.next_delay(time.time() - since), deadline - time.time()))
+    time.sleep(delay)
+    return delay
+
+
+class MailLatencyStore:
+    """SQLite table of recent registration-to-mail latencies"""
+
+    def __init__(self, path=MAIL_LATENCY_DB, window=WINDOW):
+        self.path = path
+        self.window = window
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS arrivals (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT,
+                seconds REAL,
+                source TEXT,
+                recorded_at TEXT
+            )
+        """)
+        self.db.commit()
+
+    def record(self, email, seconds, source='owa'):
+        """Add one arrival and drop everything older than the window"""
+        if seconds is None or seconds < 0:
+            return
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT INTO arrivals (email, seconds, source, recorded_at) VALUES (?, ?, ?, ?)",
+                (email, round(seconds, 2), source, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self.db.execute("DELETE FROM arrivals WHERE id <= ?", (cursor.lastrowid - self.window,))
+            self.db.commit()
+        print(f"   📈 Mail arrived {seconds:.1f}s after registration ({source})")
+
+    def samples(self):
+        """Latencies of the most recent arrivals"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT seconds FROM arrivals ORDER BY id DESC LIMIT ?", (self.window,)
+            ).fetchall()
+        return [seconds for (seconds,) in rows]
+
+    def schedule(self):
+        """PollSchedule from the current distribution"""
+        return PollSchedule(self.samples())
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM arrivals")
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def shared_mail_latency():
+    """Process-wide store at MAIL_LATENCY_DB (opened on first use)"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = MailLatencyStore()
+        return _shared_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta mail-arrival latency")
+    parser.add_argument("--db", default=MAIL_LATENCY_DB, help="Latency database")
+    parser.add_argument("--clear", action="store_true", help="Forget every recorded arrival")
+    args = parser.parse_args()
+
+    store = MailLatencyStore(args.db)
+    try:
+        if args.clear:
+            store.clear()
+            print("🧹 Arrival history cleared")
+            return
+        samples = sorted(store.samples())
+        print(f"📊 {len(samples)} arrivals (window {store.window})")
+        if samples:
+            print(f"   p10 {quantile(samples, 0.1):.1f}s  p50 {quantile(samples, 0.5):.1f}s  "
+                  f"p90 {quantile(samples, 0.9):.1f}s  max {samples[-1]:.1f}s")
+        print(f"   {PollSchedule(samples).describe()}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Cross-account stage pipeline
+Splits the workflow into stages with their own concurrency limits so that
+registration of the next accounts continues while earlier accounts wait
+for their verification email:
+
+    register  ->  mail (login/find/extract)  ->  verify (confirm/login/post-login)
+
+Browser stages lease warm browsers from a shared BrowserPool. With an IMAP
+or EWS mailbox client the mail stage needs no browser at all, so up to
+`mail_concurrency` accounts can wait for mail while every browser keeps
+registering and verifying. Likewise the http/auto registration engines
+register without leasing a browser (auto leases one only as a fallback).
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from account_source import account_label
+from browser_pool import BrowserPool, MAX_USES
+from browser_contexts import ContextPool
+from checkpoints import resume_index
+from http_registration import create_registration_client, register_over_http
+from link_extractor import extract_from_message
+from mail_client import create_mailbox_client, wait_for_verification_mail
+from mail_latency import shared_mail_latency
+from results_store import ResultsStore
+from screenshots import ScreenshotService
+from telemetry import create_tracer, new_correlation_id
+from waits import set_timing_profile
+from worldposta_automation import (
+    WorldPostaAutomationBot, create_driver, new_status_log, get_timestamp,
+    EMAIL_SUBJECT_KEYWORD, EMAIL_WAIT_TIMEOUT, CSV_FILE, RESULTS_JSONL, RESULTS_DB, SCREENSHOT_DIR
+)
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+DEFAULT_BROWSERS = 2
+REGISTER_CONCURRENCY = 1
+MAIL_CONCURRENCY = 20  # accounts waiting for mail at once (protocol mailbox)
+VERIFY_CONCURRENCY = 1
+MAX_IN_FLIGHT = 25  # registered-but-unfinished accounts
+
+STAGE_STEPS = {
+    'register': ['register'],
+    'mail': ['email_login', 'find_email', 'extract_link'],
+    'verify': ['confirm_email', 'website_login', 'post_login'],
+}
+STAGE_ORDER = ['register', 'mail', 'verify']
+
+
+class AccountJob:
+    """Per-account state carried from stage to stage"""
+
+    def __init__(self, idx, account_data):
+        self.idx = idx
+        self.account_data = account_data
+        self.email = account_data['email']
+        self.correlation_id = new_correlation_id()
+        self.status_log = new_status_log(self.email)
+        self.status_log['correlation_id'] = self.correlation_id
+        self.verification_url = None
+        self.verification_message = None
+        self.registered_at = None  # registration submit time (mail-arrival latency)
+        self.registered_at_restored = False  # ... read back from an earlier run's checkpoint
+        self.started = time.time()
+
+
+class StagePipeline:
+    """
+    Runs accounts through register -> mail -> verify with per-stage limits
+
+    Usage:
+        pipeline = StagePipeline(browsers=3, mailbox='imap')
+        successful, failed = pipeline.run(accounts)
+    """
+
+    def __init__(self, browsers=DEFAULT_BROWSERS, headless=False, timing_profile=None, fill_strategy=None,
+                 mailbox=None, checkpoints=None, register_concurrency=REGISTER_CONCURRENCY,
+                 mail_concurrency=MAIL_CONCURRENCY, verify_concurrency=VERIFY_CONCURRENCY,
+                 max_in_flight=MAX_IN_FLIGHT, max_uses=MAX_USES, registration_engine=None, load_profile=None,
+                 asset_cache=None, contexts=False):
+        """
+        Args:
+            browsers: Size of the shared warm browser pool
+            headless: Run Chrome headless
+            timing_profile: Optional timing profile name
+            fill_strategy: Optional field-fill strategy name
+            mailbox: Mailbox backend name (browser, imap, ews)
+            checkpoints: Optional CheckpointStore for resumable accounts
+            register_concurrency: Accounts registering at once
+            mail_concurrency: Accounts waiting for their email at once
+            verify_concurrency: Accounts confirming/logging in at once
+            max_in_flight: Registered accounts allowed to be unfinished;
+                           keeps registration from racing too far ahead
+            max_uses: Accounts per pooled browser before it is relaunched
+            registration_engine: browser, http or auto; http/auto register
+                                 over the backend endpoint without a browser
+            load_profile: full or lean resource loading for the pooled browsers
+            asset_cache: Serve app bundles from the shared on-disk cache
+            contexts: Lease isolated browser contexts of one shared Chrome
+                      (ContextPool) instead of separate browsers
+        """
+        if timing_profile:
+            set_timing_profile(timing_profile)
+
+        self.headless = headless
+        self.fill_strategy = fill_strategy
+        self.mailbox_name = mailbox
+        self.mailbox = create_mailbox_client(mailbox)
+        self.registration_client = create_registration_client(registration_engine)
+        self.load_profile = load_profile
+        self.asset_cache = asset_cache
+        self.contexts = contexts
+        self.checkpoints = checkpoints
+        self.browsers = browsers
+        self.max_uses = max_uses
+
+        # The OWA mail stage holds a browser for the whole email wait, so it
+        # may never take every browser away from register/verify
+        if self.mailbox is None:
+            mail_concurrency = max(1, min(mail_concurrency, browsers - 1))
+
+        self.concurrency = {
+            'register': register_concurrency,
+            'mail': mail_concurrency,
+            'verify': verify_concurrency,
+        }
+        self.max_in_flight = max_in_flight
+
+        self.pool = None
+        self.results = None
+        self.screenshots = None
+        self.tracer = create_tracer()
+        self.executors = {}
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.lock = threading.Lock()
+        self.done = threading.Condition(self.lock)
+        self.finished = 0
+        self.successful = 0
+        self.failed = 0
+        self.total = 0
+
+    # =====================================================
+    # STAGE PLUMBING
+    # =====================================================
+
+    def submit(self, stage, job):
+        self.executors[stage].submit(self.run_stage, stage, job)
+
+    def run_stage(self, stage, job):
+        """Run one stage for one account and hand it to the next stage"""
+        try:
+            if stage == 'mail' and self.mailbox is not None:
+                failed_status = self.receive_mail(job)
+            elif stage == 'register' and self.registration_client is not None:
+                failed_status = self.register_http(job)
+            else:
+                failed_status = self.run_browser_stage(stage, job)
+        except Exception as e:
+            print(f"❌ [{stage}] {job.email}: {e}")
+            job.status_log['error_message'] = str(e)
+            failed_status = 'failed_unexpected_error'
+
+        if failed_status:
+            job.status_log['status'] = failed_status
+            self.finish(job, False)
+            return
+
+        next_index = STAGE_ORDER.index(stage) + 1
+        if next_index < len(STAGE_ORDER):
+            self.submit(STAGE_ORDER[next_index], job)
+        else:
+            job.status_log['status'] = 'success'
+            self.finish(job, True)
+
+    def finish(self, job, success):
+        """Record the account result and free its in-flight slot"""
+        job.status_log['timestamp'] = get_timestamp()
+        try:
+            self.results.add(dict(job.status_log))
+        except Exception as e:
+            print(f"⚠ Error saving status for {job.email}: {e}")
+        self.tracer.flush()
+        self.in_flight.release()
+
+        with self.done:
+            self.finished += 1
+            if success:
+                self.successful += 1
+                print(f"✅ Account {account_label(job.idx, self.total)} ({job.email}) completed in {time.time() - job.started:.0f}s")
+            else:
+                self.failed += 1
+                print(f"❌ Account {account_label(job.idx, self.total)} ({job.email}) {job.status_log['status']}")
+            self.done.notify_all()
+
+    def pending_steps(self, stage, job, steps):
+        """Stage steps still to run for this account (all of them without checkpoints)"""
+        names = [name for name in STAGE_STEPS[stage] if name in {s[0] for s in steps}]
+        stage_steps = [s for s in steps if s[0] in names]
+        if self.checkpoints is None:
+            return stage_steps
+
+        completed = self.checkpoints.completed_steps(job.email)
+        if 'extract_link' in completed:
+            job.verification_url = completed['extract_link'].get('verification_url')
+        if job.registered_at is None:
+            job.registered_at = completed.get('register', {}).get('submitted_at')
+            job.registered_at_restored = job.registered_at is not None
+        return stage_steps[resume_index(names, completed):]
+
+    # =====================================================
+    # STAGES
+    # =====================================================
+
+    def run_browser_stage(self, stage, job):
+        """Run a stage's steps on a leased browser"""
+        with self.pool.lease() as driver:
+            bot = WorldPostaAutomationBot(
+                fill_strategy=self.fill_strategy, mailbox=self.mailbox or 'browser', results=self.results,
+                driver=driver, tracer=self.tracer, checkpoints=self.checkpoints, screenshots=self.screenshots,
+                registration_engine='browser', load_profile=self.load_profile, asset_cache=self.asset_cache
+            )
+            try:
+                # Continue the same account record across stages
+                bot.begin_account(job.account_data, job.correlation_id)
+                bot.status_log = job.status_log
+                bot.verification_url = job.verification_url
+                bot.verification_message = job.verification_message
+
+                steps = self.pending_steps(stage, job, bot.workflow_steps(job.account_data))
+                bot.registered_at, bot.registered_at_restored = job.registered_at, job.registered_at_restored
+                failed_status = bot.run_steps(steps)
+                job.verification_url = bot.verification_url
+                job.registered_at, job.registered_at_restored = bot.registered_at, bot.registered_at_restored
+
+                if not failed_status and stage == STAGE_ORDER[-1]:
+                    bot.take_final_screenshot()
+                return failed_status
+            finally:
+                bot.close()
+
+    def register_http(self, job):
+        """Register stage without a browser; leases one only when the endpoint cannot decide"""
+        if self.checkpoints is not None and 'register' in self.checkpoints.completed_steps(job.email):
+            return None
+
+        job.registered_at, job.registered_at_restored = time.time(), False
+        with self.tracer.span('register', job.correlation_id, email=job.email, engine='http') as span:
+            registered = register_over_http(self.registration_client, job.account_data, job.status_log)
+            span.set_result(registered, 'http_fallback' if registered is None else 'failed_registration')
+        if registered is None:
+            return self.run_browser_stage('register', job)
+
+        self.record(job, 'register', registered, {'submitted_at': job.registered_at}, 'failed_registration')
+        return None if registered else 'failed_registration'
+
+    def receive_mail(self, job):
+        """Mail stage without a browser: wait on IMAP/EWS and parse the link"""
+        email, password = job.email, job.account_data['password']
+        if self.checkpoints is not None:
+            completed = self.checkpoints.completed_steps(email)
+            if 'extract_link' in completed:
+                job.verification_url = completed['extract_link'].get('verification_url')
+                return None
+
+        with self.tracer.span('find_email', job.correlation_id, email=email) as span:
+            job.verification_message = wait_for_verification_mail(
+                self.mailbox, email, password, EMAIL_SUBJECT_KEYWORD, EMAIL_WAIT_TIMEOUT
+            )
+            span.set_result(job.verification_message is not None, 'failed_email_not_found')
+        # A checkpointed submit can't be timed: the mail may predate this run
+        if job.verification_message is not None and job.registered_at and not job.registered_at_restored:
+            shared_mail_latency().record(email, time.time() - job.registered_at, self.mailbox.name)
+        self.record(job, 'find_email', job.verification_message is not None, failed_status='failed_email_not_found')
+        if job.verification_message is None:
+            return 'failed_email_not_found'
+
+        with self.tracer.span('extract_link', job.correlation_id, email=email) as span:
+            link = extract_from_message(job.verification_message)
+            job.verification_url = link.url if link else None
+            span.set_result(job.verification_url, 'failed_no_verification_link')
+        self.record(job, 'extract_link', bool(job.verification_url), {'verification_url': job.verification_url},
+                    'failed_no_verification_link')
+        return None if job.verification_url else 'failed_no_verification_link'
+
+    def record(self, job, step, ok, data=None, failed_status=''):
+        if self.checkpoints is not None:
+            self.checkpoints.record(job.email, step, ok, data if ok else None, '' if ok else failed_status)
+
+    # =====================================================
+    # RUN
+    # =====================================================
+
+    def run(self, accounts):
+        """
+        Push every account through the pipeline
+
+        Args:
+            accounts: Iterable of account dictionaries (a list or an
+                      AccountSource); read only as in-flight slots free up
+
+        Returns:
+            tuple: (successful, failed)
+        """
+        self.total = len(accounts) if isinstance(accounts, list) else None
+        if self.total == 0:
+            return 0, 0
+
+        print(f"🧵 Pipeline: {self.browsers} {'browser contexts' if self.contexts else 'browsers'}, concurrency "
+              + ", ".join(f"{stage}={self.concurrency[stage]}" for stage in STAGE_ORDER)
+              + f", mail via {'browser' if self.mailbox is None else self.mailbox_name}"
+              + f", register via {'browser' if self.registration_client is None else self.registration_client.url}")
+
+        self.results = ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+        self.screenshots = ScreenshotService(SCREENSHOT_DIR)
+        launcher = lambda: create_driver(self.headless, self.load_profile)
+        if self.contexts:
+            self.pool = ContextPool(launcher, size=self.browsers).start()
+        else:
+            self.pool = BrowserPool(launcher, size=self.browsers, max_uses=self.max_uses).start()
+        self.executors = {
+            stage: ThreadPoolExecutor(max_workers=self.concurrency[stage], thread_name_prefix=f"stage-{stage}")
+            for stage in STAGE_ORDER
+        }
+
+        try:
+            # Feed registrations only while fewer than max_in_flight accounts are unfinished
+            fed = 0
+            for fed, account_data in enumerate(accounts, 1):
+                self.in_flight.acquire()
+                self.submit('register', AccountJob(fed, account_data))
+
+            with self.done:
+                while self.finished < fed:
+                    self.done.wait(timeout=5)
+        finally:
+            for stage in STAGE_ORDER:
+                self.executors[stage].shutdown(wait=False, cancel_futures=True)
+            self.pool.close()
+            self.screenshots.close()
+            self.results.close()
+            if self.registration_client is not None:
+                self.registration_client.close()
+            self.tracer.close()
+
+        return self.successful, self.failed
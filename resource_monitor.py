@@ -0,0 +1,213 @@
+"""
+Resource sampling for browser workers
+Measures a worker's whole process tree (worker -> chromedriver -> Chrome
+renderers/GPU/utility processes) plus system memory, CPU and load. Uses
+psutil when it is installed and falls back to /proc on Linux.
+"""
+
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+SAMPLE_INTERVAL = 0.5  # seconds between samples
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+# =====================================================
+# PROCESS TREE
+# =====================================================
+
+def _proc_table():
+    """pid -> (ppid, rss bytes, cpu seconds) from /proc"""
+    table = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read().decode('utf-8', errors='replace')
+        except OSError:
+            continue
+        # Fields after the parenthesised command name (which may contain spaces)
+        fields = stat[stat.rfind(')') + 2:].split()
+        ppid, utime, stime, rss_pages = int(fields[1]), int(fields[11]), int(fields[12]), int(fields[21])
+        table[int(entry)] = (ppid, rss_pages * PAGE_SIZE, (utime + stime) / CLOCK_TICKS)
+    return table
+
+
+def tree_usage(pid):
+    """
+    RSS and CPU time of a process and all its descendants
+
+    Returns:
+        tuple: (rss bytes, cpu seconds, process count); zeros if pid is gone
+    """
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0, 0.0, 0
+        rss, cpu, count = 0, 0.0, 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+                times = process.cpu_times()
+                cpu += times.user + times.system
+                count += 1
+            except psutil.Error:
+                continue
+        return rss, cpu, count
+
+    table = _proc_table()
+    if pid not in table:
+        return 0, 0.0, 0
+    children = {}
+    for child, (ppid, _, _) in table.items():
+        children.setdefault(ppid, []).append(child)
+
+    rss, cpu, count = 0, 0.0, 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if current in table:
+            rss += table[current][1]
+            cpu += table[current][2]
+            count += 1
+        stack.extend(children.get(current, []))
+    return rss, cpu, count
+
+
+# =====================================================
+# SYSTEM
+# =====================================================
+
+def system_memory():
+    """(total, available) bytes"""
+    if psutil is not None:
+        memory = psutil.virtual_memory()
+        return memory.total, memory.available
+
+    info = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            name, value = line.split(':', 1)
+            info[name] = int(value.split()[0]) * 1024
+    return info['MemTotal'], info.get('MemAvailable', info['MemFree'])
+
+
+def _cpu_times():
+    """(busy, total) jiffies since boot from /proc/stat"""
+    with open('/proc/stat') as f:
+        values = [int(v) for v in f.readline().split()[1:]]
+    idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+    total = sum(values[:8])
+    return total - idle, total
+
+
+class CpuMeter:
+    """System-wide CPU utilisation (0-100) between consecutive reads"""
+
+    def __init__(self):
+        self.last = None if psutil is not None else _cpu_times()
+        if psutil is not None:
+            psutil.cpu_percent(interval=None)
+
+    def percent(self):
+        if psutil is not None:
+            return psutil.cpu_percent(interval=None)
+        busy, total = _cpu_times()
+        last_busy, last_total = self.last
+        self.last = (busy, total)
+        return 100.0 * (busy - last_busy) / (total - last_total) if total > last_total else 0.0
+
+
+def load_per_cpu():
+    """1-minute load average divided by the CPU count"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+# =====================================================
+# SAMPLER
+# =====================================================
+
+class ResourceSampler(threading.Thread):
+    """
+    Background sampler for a set of worker process trees
+
+    Usage:
+        sampler = ResourceSampler()
+        sampler.watch(worker_id, process.pid)
+        sampler.start()
+        ...
+        sampler.stop()
+        sampler.summary()
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name="resource-sampler", daemon=True)
+        self.interval = interval
+        self.pids = {}  # worker id -> pid
+        self.peak_rss = {}  # worker id -> bytes
+        self.peak_processes = {}
+        self.cpu_samples = []
+        self.min_available = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def watch(self, worker_id, pid):
+        with self.lock:
+            self.pids[worker_id] = pid
+
+    def sample(self):
+        """Take one sample; returns {worker id: rss bytes}"""
+        with self.lock:
+            pids = dict(self.pids)
+        current = {}
+        for worker_id, pid in pids.items():
+            rss, _, processes = tree_usage(pid)
+            current[worker_id] = rss
+            with self.lock:
+                self.peak_rss[worker_id] = max(self.peak_rss.get(worker_id, 0), rss)
+                self.peak_processes[worker_id] = max(self.peak_processes.get(worker_id, 0), processes)
+        _, available = system_memory()
+        with self.lock:
+            self.min_available = available if self.min_available is None else min(self.min_available, available)
+        return current
+
+    def run(self):
+        cpu = CpuMeter()
+        while not self.stopped.wait(self.interval):
+            self.sample()
+            with self.lock:
+                self.cpu_samples.append(cpu.percent())
+
+    def stop(self):
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def summary(self):
+        with self.lock:
+            cpu = self.cpu_samples or [0.0]
+            return {
+                'peak_rss_mb_per_worker': {str(w): round(rss / 1024 / 1024, 1) for w, rss in self.peak_rss.items()},
+                'peak_rss_mb_max': round(max(self.peak_rss.values(), default=0) / 1024 / 1024, 1),
+                'peak_processes_per_worker': max(self.peak_processes.values(), default=0),
+                'cpu_percent_avg': round(sum(cpu) / len(cpu), 1),
+                'cpu_percent_peak': round(max(cpu), 1),
+                'min_available_mb': round((self.min_available or 0) / 1024 / 1024, 1),
+            }
@@ -0,0 +1,257 @@
+"""
+Append-only results store
+Every account result is appended to a JSON Lines file and the CSV log and
+inserted into a SQLite database indexed by email and status, with batched
+commits. Writes cost the same no matter how long the history is.
+
+Worker processes report through a QueueResultsSink; one ResultsAggregator
+thread in the parent is the only writer.
+"""
+
+import io
+import os
+import csv
+import json
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+RESULTS_JSONL = "registration_results.jsonl"
+RESULTS_DB = "registration_results.db"
+CSV_FILE = "registration_results.csv"
+
+CSV_FIELDS = ['timestamp', 'email', 'status', 'error_message', 'screenshot_path']
+
+COMMIT_BATCH_SIZE = 50  # records per SQLite commit
+COMMIT_INTERVAL = 2.0  # seconds before a partial batch is committed
+
+
+def append_line(path, line):
+    """Append one line with a single O_APPEND write (safe across processes)"""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode('utf-8'))
+    finally:
+        os.close(fd)
+
+
+def format_csv_row(record):
+    """Render one CSV_FIELDS row as text"""
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore').writerow(record)
+    return buffer.getvalue()
+
+
+def ensure_csv_header(path):
+    """Create the CSV with its header row unless it already exists"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return
+    try:
+        os.write(fd, (','.join(CSV_FIELDS) + '\r\n').encode('utf-8'))
+    finally:
+        os.close(fd)
+
+
+# =====================================================
+# STORE
+# =====================================================
+
+class ResultsStore:
+    """JSONL + CSV append log and an indexed SQLite table"""
+
+    def __init__(self, jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE,
+                 batch_size=COMMIT_BATCH_SIZE, commit_interval=COMMIT_INTERVAL):
+        self.jsonl_path = jsonl_path
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_commit = time.time()
+
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT,
+                email TEXT,
+                status TEXT,
+                error_message TEXT,
+                screenshot_path TEXT,
+                record TEXT
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_results_email ON results(email)")
+        # Older runs stored emails as typed; lookups compare lower-cased
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_results_email_lower ON results(lower(email))")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_results_status ON results(status)")
+        self.db.commit()
+
+        if self.csv_path:
+            ensure_csv_header(self.csv_path)
+
+    def add(self, record):
+        """Append one result record"""
+        with self.lock:
+            append_line(self.jsonl_path, json.dumps(record, ensure_ascii=False) + '\n')
+            if self.csv_path:
+                append_line(self.csv_path, format_csv_row(record))
+
+            self.db.execute(
+                "INSERT INTO results (timestamp, email, status, error_message, screenshot_path, record) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (record.get('timestamp', ''), record.get('email', ''), record.get('status', ''),
+                 record.get('error_message', ''), record.get('screenshot_path', ''),
+                 json.dumps(record, ensure_ascii=False))
+            )
+            self.pending += 1
+            if self.pending >= self.batch_size or time.time() - self.last_commit >= self.commit_interval:
+                self._commit()
+
+    def _commit(self):
+        self.db.commit()
+        self.pending = 0
+        self.last_commit = time.time()
+
+    def flush(self):
+        """Commit any batched SQLite inserts"""
+        with self.lock:
+            if self.pending:
+                self._commit()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.db.close()
+
+    def emails_with_status(self, status='success', among=None):
+        """
+        Set of (lower-cased) emails that have at least one result with the given status
+
+        Args:
+            status: Result status to look for
+            among: Optional batch of emails to check (an indexed lookup)
+                   instead of returning every such email in the history
+        """
+        with self.lock:
+            if among is None:
+                rows = self.db.execute("SELECT DISTINCT lower(email) FROM results WHERE status = ?", (status,))
+            else:
+                among = [email.lower() for email in among]
+                if not among:
+                    return set()
+                rows = self.db.execute(
+                    f"SELECT DISTINCT lower(email) FROM results WHERE lower(email) IN ({', '.join('?' * len(among))}) "
+                    "AND status = ?", (*among, status)
+                )
+            return {row[0] for row in rows}
+
+    def latest(self, email):
+        """Most recent result record for an email, or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT record FROM results WHERE lower(email) = ? ORDER BY id DESC LIMIT 1", (email.lower(),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def export_json(self, path):
+        """Write the full history as one JSON array (the old registration_results.json format)"""
+        self.flush()
+        with self.lock:
+            rows = self.db.execute("SELECT record FROM results ORDER BY id")
+            records = [json.loads(row[0]) for row in rows]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+        return len(records)
+
+
+# =====================================================
+# MULTI-PROCESS REPORTING
+# =====================================================
+
+class QueueResultsSink:
+    """Results sink for worker processes: hands records to the aggregator"""
+
+    def __init__(self, records_queue):
+        self.records_queue = records_queue
+
+    def add(self, record):
+        self.records_queue.put(dict(record))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ResultsAggregator(threading.Thread):
+    """
+    Single writer draining a records queue into a ResultsStore
+
+    Usage:
+        aggregator = ResultsAggregator(multiprocessing.Queue())
+        aggregator.start()
+        ... workers use QueueResultsSink(aggregator.records_queue) ...
+        aggregator.stop()
+    """
+
+    def __init__(self, records_queue, store=None):
+        super().__init__(name="results-aggregator", daemon=True)
+        self.records_queue = records_queue
+        self.store = store
+        self.written = 0
+
+    def run(self):
+        store = self.store or ResultsStore()
+        try:
+            while True:
+                try:
+                    record = self.records_queue.get(timeout=COMMIT_INTERVAL)
+                except queue.Empty:
+                    store.flush()
+                    continue
+                if record is None:
+                    break
+                store.add(record)
+                self.written += 1
+        finally:
+            if self.store is None:
+                store.close()
+            else:
+                store.flush()
+
+    def stop(self, timeout=30):
+        """Write everything still queued, then stop"""
+        self.records_queue.put(None)
+        self.join(timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta results store")
+    parser.add_argument("--export-json", metavar="PATH", help="Write the full history as a JSON array")
+    parser.add_argument("--db", default=RESULTS_DB, help="SQLite results database")
+    args = parser.parse_args()
+
+    if args.export_json:
+        store = ResultsStore(db_path=args.db, csv_path=None)
+        count = store.export_json(args.export_json)
+        store.close()
+        print(f"✅ Exported {count} results to {args.export_json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Bounded screenshot store
+Keeps the screenshot folder under a byte budget and an age limit. Images
+are filed in per-day subfolders and recorded in a compact JSON Lines index
+(one short record per image, tombstones for deletions), so artifacts can
+be looked up by email and step without listing the folder.
+
+Eviction order: expired images first, then the oldest success-path images;
+failure evidence is only removed once it passes its own (longer) retention
+or when nothing else is left to free.
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from results_store import append_line
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+SCREENSHOT_DIR = os.environ.get("WORLDPOSTA_SCREENSHOT_DIR", "screenshots")
+MAX_BYTES = int(float(os.environ.get("WORLDPOSTA_SCREENSHOT_BUDGET_MB", "2048")) * 1024 * 1024)
+MAX_AGE_DAYS = float(os.environ.get("WORLDPOSTA_SCREENSHOT_MAX_AGE_DAYS", "14"))
+FAILURE_MAX_AGE_DAYS = float(os.environ.get("WORLDPOSTA_SCREENSHOT_FAILURE_MAX_AGE_DAYS", "90"))
+
+INDEX_FILE = "index.jsonl"
+DAY = 24 * 60 * 60
+
+
+class ScreenshotStore:
+    """
+    Screenshot folder with a byte budget, age retention and an index
+
+    Index records use short keys: p (path relative to the folder), e (email),
+    s (step), f (1 = failure evidence), b (bytes), t (unix time); {"p", "d": 1}
+    marks a deleted image. Several processes can share one folder: records
+    are single O_APPEND writes and every store replays lines it has not seen.
+    """
+
+    def __init__(self, directory=SCREENSHOT_DIR, max_bytes=MAX_BYTES, max_age_days=MAX_AGE_DAYS,
+                 failure_max_age_days=FAILURE_MAX_AGE_DAYS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * DAY
+        self.failure_max_age = failure_max_age_days * DAY
+        self.index_path = os.path.join(directory, INDEX_FILE)
+
+        self.lock = threading.Lock()
+        self.success = OrderedDict()  # path -> entry, oldest first
+        self.failures = OrderedDict()
+        self.by_email = {}
+        self.total_bytes = 0
+        self.index_offset = 0
+
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self._sync()
+            self._enforce()
+
+    # =====================================================
+    # INDEX
+    # =====================================================
+
+    def _sync(self):
+        """Apply index lines appended since the last sync (ours or other processes')"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                f.seek(self.index_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        end = data.rfind(b'\n') + 1  # ignore a line still being written
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('d'):
+                self._forget(record['p'])
+            else:
+                self._remember(record)
+        self.index_offset += end
+
+    def _remember(self, entry):
+        path = entry['p']
+        if path in self.success or path in self.failures:
+            return
+        (self.failures if entry.get('f') else self.success)[path] = entry
+        self.by_email.setdefault(entry.get('e', ''), []).append(path)
+        self.total_bytes += entry.get('b', 0)
+
+    def _forget(self, path):
+        entry = self.success.pop(path, None) or self.failures.pop(path, None)
+        if entry is None:
+            return None
+        paths = self.by_email.get(entry.get('e', ''), [])
+        if path in paths:
+            paths.remove(path)
+        self.total_bytes -= entry.get('b', 0)
+        return entry
+
+    # =====================================================
+    # WRITING / EVICTION
+    # =====================================================
+
+    def path_for(self, filename):
+        """Absolute path for a new image, inside today's subfolder"""
+        day_dir = os.path.join(self.directory, datetime.now().strftime("%Y%m%d"))
+        os.makedirs(day_dir, exist_ok=True)
+        return os.path.join(day_dir, filename)
+
+    def add(self, path, email, step, failure=False, size=None):
+        """Record a written image and evict whatever the budget no longer allows"""
+        if size is None:
+            size = os.path.getsize(path)
+        entry = {
+            'p': os.path.relpath(path, self.directory),
+            'e': email,
+            's': step,
+            'f': 1 if failure else 0,
+            'b': size,
+            't': int(time.time()),
+        }
+        with self.lock:
+            append_line(self.index_path, json.dumps(entry, separators=(',', ':')) + '\n')
+            self._sync()
+            self._enforce()
+
+    def _delete(self, path):
+        self._forget(path)
+        try:
+            os.remove(os.path.join(self.directory, path))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠ Could not delete screenshot {path}: {e}")
+        append_line(self.index_path, json.dumps({'p': path, 'd': 1}, separators=(',', ':')) + '\n')
+
+    def _enforce(self, now=None):
+        now = now or time.time()
+        evicted = 0
+
+        # Age retention (both maps are oldest-first)
+        for entries, max_age in ((self.success, self.max_age), (self.failures, self.failure_max_age)):
+            while entries and now - next(iter(entries.values()))['t'] > max_age:
+                self._delete(next(iter(entries)))
+                evicted += 1
+
+        # Byte budget: success-path images first, failure evidence last
+        while self.total_bytes > self.max_bytes and (self.success or self.failures):
+            entries = self.success or self.failures
+            if entries is self.failures:
+                print("⚠ Screenshot budget reached with only failure evidence left, evicting the oldest")
+            self._delete(next(iter(entries)))
+            evicted += 1
+
+        return evicted
+
+    def enforce(self):
+        """Apply retention and budget now; returns the number of images removed"""
+        with self.lock:
+            self._sync()
+            return self._enforce()
+
+    # =====================================================
+    # LOOKUP / MAINTENANCE
+    # =====================================================
+
+    def find(self, email, step=None):
+        """
+        Screenshots of one account, oldest first
+
+        Returns:
+            List of entry dicts with an absolute 'path' added
+        """
+        with self.lock:
+            self._sync()
+            results = []
+            for path in self.by_email.get(email, []):
+                entry = self.success.get(path) or self.failures.get(path)
+                if entry and (step is None or entry['s'] == step):
+                    results.append(dict(entry, path=os.path.join(self.directory, path)))
+            return sorted(results, key=lambda entry: entry['t'])
+
+    def stats(self):
+        with self.lock:
+            self._sync()
+            return {
+                'images': len(self.success) + len(self.failures),
+                'failures': len(self.failures),
+                'bytes': self.total_bytes,
+                'budget': self.max_bytes,
+            }
+
+    def compact(self):
+        """
+        Rewrite the index with live entries only (drops tombstones)
+
+        Run while no batch is writing screenshots into this folder.
+        """
+        with self.lock:
+            self._sync()
+            entries = sorted(list(self.success.values()) + list(self.failures.values()), key=lambda e: e['t'])
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            os.replace(tmp_path, self.index_path)
+            self.index_offset = os.path.getsize(self.index_path)
+            return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta screenshot store")
+    parser.add_argument("--dir", default=SCREENSHOT_DIR, help="Screenshot folder")
+    parser.add_argument("--find", metavar="EMAIL", help="List screenshots of an account")
+    parser.add_argument("--step", help="Only screenshots of this step (with --find)")
+    parser.add_argument("--enforce", action="store_true", help="Apply retention and byte budget now")
+    parser.add_argument("--compact", action="store_true", help="Rewrite the index without deleted entries")
+    args = parser.parse_args()
+
+    store = ScreenshotStore(args.dir)
+
+    if args.find:
+        for entry in store.find(args.find, args.step):
+            kind = "failure" if entry['f'] else "success"
+            print(f"{datetime.fromtimestamp(entry['t']):%Y-%m-%d %H:%M:%S}  {entry['s']:<22} {kind:<8} {entry['path']}")
+    if args.enforce:
+        print(f"🧹 Removed {store.enforce()} screenshots")
+    if args.compact:
+        print(f"🗜️  Index compacted to {store.compact()} entries")
+
+    stats = store.stats()
+    print(f"📦 {stats['images']} screenshots ({stats['failures']} failures), "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB of {stats['budget'] / 1024 / 1024:.0f} MB budget")
+
+
+if __name__ == "__main__":
+    main()
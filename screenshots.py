@@ -0,0 +1,174 @@
+"""
+Screenshot service
+Captures through CDP Page.captureScreenshot (PNG, JPEG or WebP, optional
+clip) and hands the base64 data to a background writer thread, so decoding
+and disk I/O never sit on a step's critical path. A policy decides which
+screenshots are taken at all:
+
+    all        every step screenshot (original behavior)
+    failures   only error screenshots
+    sample:N   every screenshot for 1 in N accounts, errors always
+
+Written images are registered with a ScreenshotStore, which files them per
+day, indexes them and keeps the folder inside its byte/age budget.
+"""
+
+import os
+import queue
+import base64
+import zlib
+import threading
+from datetime import datetime
+
+from screenshot_store import ScreenshotStore, SCREENSHOT_DIR
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+SCREENSHOT_FORMAT = os.environ.get("WORLDPOSTA_SCREENSHOT_FORMAT", "jpeg")  # png, jpeg, webp
+SCREENSHOT_QUALITY = int(os.environ.get("WORLDPOSTA_SCREENSHOT_QUALITY", "70"))  # jpeg/webp only
+SCREENSHOT_CLIP = os.environ.get("WORLDPOSTA_SCREENSHOT_CLIP", "")  # "x,y,width,height" in CSS pixels
+SCREENSHOT_POLICY = os.environ.get("WORLDPOSTA_SCREENSHOTS", "all")
+
+WRITE_QUEUE_SIZE = 64  # pending images before capture() blocks (backpressure)
+
+FORMAT_EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+
+
+def screenshot_filename(email, label, extension='png'):
+    """Generate screenshot filename"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_email = email.replace("@", "_at_").replace(".", "_")
+    return f"{safe_email}_{label}_{timestamp}.{extension}"
+
+
+def parse_clip(spec):
+    """'x,y,width,height' -> CDP clip viewport (None when empty)"""
+    if not spec:
+        return None
+    x, y, width, height = (float(part) for part in spec.split(','))
+    return {'x': x, 'y': y, 'width': width, 'height': height, 'scale': 1}
+
+
+class ScreenshotPolicy:
+    """Decides whether a screenshot is worth taking"""
+
+    def __init__(self, spec=SCREENSHOT_POLICY):
+        self.spec = spec
+        self.mode = spec
+        self.sample_every = 1
+
+        if spec.startswith('sample:'):
+            self.mode = 'sample'
+            self.sample_every = max(1, int(spec.split(':', 1)[1]))
+        elif spec not in ('all', 'failures'):
+            raise ValueError(f"Unknown screenshot policy '{spec}', use all, failures or sample:N")
+
+    def should_capture(self, email, failure=False):
+        if failure or self.mode == 'all':
+            return True
+        if self.mode == 'failures':
+            return False
+        # Sample whole accounts, so a sampled account keeps its full step trail
+        return zlib.crc32(email.encode('utf-8')) % self.sample_every == 0
+
+
+class ScreenshotService:
+    """
+    Policy-driven CDP screenshots written on a background thread
+
+    Usage:
+        screenshots = ScreenshotService()
+        path = screenshots.capture(driver, email, 'registration')
+        screenshots.close()  # waits for pending writes
+    """
+
+    def __init__(self, directory=SCREENSHOT_DIR, image_format=SCREENSHOT_FORMAT, quality=SCREENSHOT_QUALITY,
+                 clip=SCREENSHOT_CLIP, policy=SCREENSHOT_POLICY, queue_size=WRITE_QUEUE_SIZE, store=None):
+        """
+        Args:
+            directory: Folder the images are written to (ignored when store is given)
+            image_format: png, jpeg or webp
+            quality: 0-100 compression quality for jpeg/webp
+            clip: Optional "x,y,width,height" string or CDP clip dict
+            policy: all, failures, sample:N or a ScreenshotPolicy
+            queue_size: Images waiting to be written before capture() blocks
+            store: Optional ScreenshotStore (default: one for directory with env budget)
+        """
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unknown screenshot format '{image_format}', choose from {sorted(FORMAT_EXTENSIONS)}")
+
+        self.store = store or ScreenshotStore(directory)
+        self.directory = self.store.directory
+        self.image_format = image_format
+        self.quality = quality
+        self.clip = parse_clip(clip) if isinstance(clip, str) else clip
+        self.policy = policy if isinstance(policy, ScreenshotPolicy) else ScreenshotPolicy(policy)
+
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.writer = threading.Thread(target=self._write_loop, name="screenshot-writer", daemon=True)
+        self.writer.start()
+
+    def _cdp_params(self):
+        params = {'format': self.image_format, 'captureBeyondViewport': False}
+        if self.image_format != 'png':
+            params['quality'] = self.quality
+        if self.clip:
+            params['clip'] = self.clip
+        return params
+
+    def capture(self, driver, email, label, failure=False):
+        """
+        Capture the current page if the policy wants it
+
+        The image is grabbed now (so it shows this moment) and written later.
+
+        Returns:
+            str: Path the image will be written to, or None if skipped/failed
+        """
+        if not self.policy.should_capture(email, failure):
+            return None
+
+        try:
+            data = driver.execute_cdp_cmd('Page.captureScreenshot', self._cdp_params())['data']
+            extension = FORMAT_EXTENSIONS[self.image_format]
+        except Exception:
+            # Drivers without CDP access fall back to WebDriver's PNG screenshot
+            try:
+                data = driver.get_screenshot_as_base64()
+                extension = 'png'
+            except Exception as e:
+                print(f"⚠ Could not capture screenshot '{label}': {e}")
+                return None
+
+        path = self.store.path_for(screenshot_filename(email, label, extension))
+        self.pending.put((path, data, email, label, failure))
+        print(f"📸 Screenshot saved: {path}")
+        return path
+
+    def _write_loop(self):
+        while True:
+            item = self.pending.get()
+            try:
+                if item is None:
+                    return
+                path, data, email, label, failure = item
+                image = base64.b64decode(data)
+                with open(path, 'wb') as f:
+                    f.write(image)
+                self.store.add(path, email, label, failure, len(image))
+            except Exception as e:
+                print(f"⚠ Could not write screenshot {item[0]}: {e}")
+            finally:
+                self.pending.task_done()
+
+    def flush(self):
+        """Block until every captured image is on disk"""
+        self.pending.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
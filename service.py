@@ -0,0 +1,444 @@
+"""
+Resident service with an HTTP job API
+`python worldposta_automation_complete.py serve` keeps `slots` warm browsers
+running and takes registration jobs over HTTP, so a trigger (e.g. an n8n
+HTTP Request node) starts work within a second instead of waiting for a CI
+runner to install Chrome first.
+
+    POST /jobs               {"account": {...}} or {} for a random account,
+                             optional "callback_url"; 202 with the job id
+                             right away, 429 when the queue is full, 200
+                             with the existing job if that email is already
+                             queued or running (a retried trigger)
+    GET  /jobs               recent jobs
+    GET  /jobs/<id>          state, queue position and timings
+    GET  /jobs/<id>/result   200 with the status log once finished, else 202
+    GET  /health             slots, busy, queued, capacity
+
+At most `slots` accounts run at once (one leased browser each); up to
+`max_queued` more wait in FIFO order. With WORLDPOSTA_SERVICE_TOKEN set,
+every endpoint but /health needs "Authorization: Bearer <token>".
+
+Usage:
+    python worldposta_automation_complete.py serve --slots 2 --headless
+    curl -X POST localhost:8090/jobs -d '{}'
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import threading
+import urllib.request
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from account_source import validate_account
+from results_store import ResultsStore
+from screenshots import ScreenshotService
+from telemetry import create_tracer
+from worldposta_automation_complete import (
+    WorldPostaAutomationBot, create_browser_pool, generate_random_account, get_timestamp,
+    CSV_FILE, RESULTS_JSONL, RESULTS_DB, SCREENSHOT_DIR
+)
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+SERVICE_HOST = os.environ.get("WORLDPOSTA_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("WORLDPOSTA_SERVICE_PORT", "8090"))
+SERVICE_TOKEN = os.environ.get("WORLDPOSTA_SERVICE_TOKEN", "")
+
+DEFAULT_SLOTS = 2  # accounts running at once (one warm browser each)
+MAX_QUEUED = 50  # accepted jobs waiting for a slot; more are refused with 429
+JOB_HISTORY = 500  # finished jobs kept for status/result lookups
+CALLBACK_TIMEOUT = 10  # seconds for the result POST to callback_url
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ServiceBusy(Exception):
+    """Every slot is busy and the queue is full"""
+
+
+class ServiceJob:
+    """One registration request and its outcome"""
+
+    def __init__(self, account, callback_url=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.account = account
+        self.callback_url = callback_url
+        self.state = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.success = None
+        self.status_log = None
+        self.error = None
+
+    @property
+    def finished_state(self):
+        return self.state in ('done', 'failed', 'cancelled')
+
+    def summary(self, position=None):
+        """JSON-ready status (no password)"""
+        data = {
+            'id': self.id,
+            'state': self.state,
+            'email': self.account['email'],
+            'created_at': self.created,
+            'started_at': self.started,
+            'finished_at': self.finished,
+            'wait_seconds': round((self.started or time.time()) - self.created, 3),
+        }
+        if position is not None:
+            data['position'] = position
+        if self.started:
+            data['run_seconds'] = round((self.finished or time.time()) - self.started, 1)
+        if self.finished_state:
+            data['success'] = self.success
+            data['status'] = (self.status_log or {}).get('status', self.state)
+            if self.error:
+                data['error'] = self.error
+        return data
+
+
+class JobService:
+    """
+    Bounded FIFO of jobs served by `slots` threads on a warm BrowserPool
+
+    Usage:
+        service = JobService(create_browser_pool(2, headless=True), slots=2).start()
+        job, created = service.submit(account)
+        ...
+        service.stop()
+    """
+
+    def __init__(self, pool, slots=DEFAULT_SLOTS, max_queued=MAX_QUEUED, **bot_options):
+        """
+        Args:
+            pool: Started BrowserPool (one browser per slot)
+            slots: Accounts running at once
+            max_queued: Jobs allowed to wait for a slot
+            bot_options: WorldPostaAutomationBot options (timing_profile, fill_strategy, ...)
+        """
+        self.pool = pool
+        self.slots = slots
+        self.max_queued = max_queued
+        self.bot_options = bot_options
+
+        self.jobs = OrderedDict()
+        self.active = {}  # email -> queued or running job
+        self.pending = deque()
+        self.busy = 0
+        self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        self.stopping = False
+        self.threads = []
+
+        self.results = ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+        self.screenshots = ScreenshotService(SCREENSHOT_DIR)
+        self.tracer = create_tracer()
+
+    def start(self):
+        for slot in range(1, self.slots + 1):
+            thread = threading.Thread(target=self._slot, args=(slot,), name=f"service-slot-{slot}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    # =====================================================
+    # JOBS
+    # =====================================================
+
+    def submit(self, account, callback_url=None):
+        """
+        Queue one account
+
+        An email that is already queued or running is not queued again (two
+        bots would register the same account); its job is returned instead.
+
+        Returns:
+            tuple: (ServiceJob, created) - created is False for the existing job
+
+        Raises:
+            ServiceBusy: max_queued jobs are already waiting
+        """
+        email = account['email'].lower()
+        with self.available:
+            existing = self.active.get(email)
+            if existing is not None:
+                return existing, False
+            if len(self.pending) >= self.max_queued:
+                raise ServiceBusy(f"{len(self.pending)} jobs already waiting")
+            job = ServiceJob(account, callback_url)
+            self.jobs[job.id] = job
+            self.active[email] = job
+            self.pending.append(job)
+            self._trim_history()
+            self.available.notify()
+        print(f"📥 Job {job.id} queued for {account['email']}")
+        return job, True
+
+    def _trim_history(self):
+        # Oldest finished jobs go first; queued and running ones are always kept
+        excess = len(self.jobs) - JOB_HISTORY
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished_state][:max(0, excess)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        """(job, queue position or None), or (None, None) if unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None, None
+            position = self.pending.index(job) + 1 if job.state == 'queued' else None
+        return job, position
+
+    def recent(self, limit=50):
+        with self.lock:
+            return [job.summary() for job in list(self.jobs.values())[-limit:]]
+
+    def health(self):
+        with self.lock:
+            return {
+                'status': 'stopping' if self.stopping else 'ok',
+                'slots': self.slots,
+                'busy': self.busy,
+                'queued': len(self.pending),
+                'capacity': self.max_queued - len(self.pending),
+            }
+
+    # =====================================================
+    # SLOTS
+    # =====================================================
+
+    def _next(self):
+        with self.available:
+            while not self.pending and not self.stopping:
+                self.available.wait()
+            if self.stopping:
+                return None
+            job = self.pending.popleft()
+            job.state, job.started = 'running', time.time()
+            self.busy += 1
+            return job
+
+    def _slot(self, slot):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            print(f"🚀 [slot {slot}] Job {job.id} started after {job.started - job.created:.2f}s: {job.account['email']}")
+            try:
+                job.success, job.status_log = self._run(job)
+            except Exception as e:
+                print(f"❌ [slot {slot}] Job {job.id} failed with error: {e}")
+                job.success, job.error = False, str(e)
+            with self.lock:
+                job.state = 'done' if job.success else 'failed'
+                job.finished = time.time()
+                self.busy -= 1
+                self.active.pop(job.account['email'].lower(), None)
+            print(f"{'✅' if job.success else '❌'} [slot {slot}] Job {job.id} {job.state} "
+                  f"in {job.finished - job.started:.0f}s")
+            if job.callback_url:
+                self._callback(job)
+
+    def _run(self, job):
+        """One account on a leased warm browser; returns (success, status_log)"""
+        with self.pool.lease() as driver:
+            bot = WorldPostaAutomationBot(
+                driver=driver, results=self.results, screenshots=self.screenshots, tracer=self.tracer,
+                **self.bot_options
+            )
+            try:
+                success = bot.run_full_workflow(job.account)
+                return success, dict(bot.status_log)
+            finally:
+                bot.close()
+
+    def _callback(self, job):
+        """POST the finished job to its callback_url (e.g. an n8n Wait node resume URL)"""
+        body = json.dumps(result_body(job)).encode('utf-8')
+        request = urllib.request.Request(job.callback_url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=CALLBACK_TIMEOUT) as response:
+                response.read()
+        except Exception as e:
+            print(f"⚠ Callback for job {job.id} to {job.callback_url} failed: {e}")
+
+    def stop(self, timeout=None):
+        """Refuse new work, cancel queued jobs and wait for running ones"""
+        with self.available:
+            self.stopping = True
+            cancelled = list(self.pending)
+            self.pending.clear()
+            for job in cancelled:
+                job.state, job.finished = 'cancelled', time.time()
+                self.active.pop(job.account['email'].lower(), None)
+            self.available.notify_all()
+        if cancelled:
+            print(f"⚠️  Cancelled {len(cancelled)} queued jobs")
+        for thread in self.threads:
+            thread.join(timeout)
+        self.screenshots.close()
+        self.results.close()
+        self.tracer.close()
+
+
+def result_body(job):
+    """Finished job with its status log (what /result and callbacks return)"""
+    return dict(job.summary(), status_log=job.status_log, completed_at=get_timestamp())
+
+
+def parse_job_request(payload):
+    """
+    Account for a POST /jobs body
+
+    Returns:
+        tuple: (account, callback_url, error)
+    """
+    if not isinstance(payload, dict):
+        return None, None, "body must be a JSON object"
+    callback_url = payload.get('callback_url')
+    if callback_url is not None and not str(callback_url).startswith(('http://', 'https://')):
+        return None, None, "callback_url must be an http(s) URL"
+    if payload.get('account') is None:
+        return generate_random_account(), callback_url, None
+    if not isinstance(payload['account'], dict):
+        return None, None, "account must be an object"
+    # No coercion: null would become "None" and numbers would pass as text
+    for key, value in payload['account'].items():
+        if not isinstance(value, str) or not value.strip():
+            return None, None, f"account.{key} must be a non-empty string"
+    account, reason = validate_account(payload['account'])
+    return account, callback_url, reason
+
+
+# =====================================================
+# HTTP API
+# =====================================================
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over a JobService"""
+
+    service = None
+    token = None
+    server_version = "WorldPostaService/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def authorized(self):
+        if not self.token or urlsplit(self.path).path == '/health':
+            return True
+        # Constant-time, so response timing does not leak how much of the token matched
+        supplied = self.headers.get('Authorization', '').encode('utf-8')
+        if hmac.compare_digest(supplied, f"Bearer {self.token}".encode('utf-8')):
+            return True
+        self.json(401, {'error': 'missing or wrong bearer token'})
+        return False
+
+    def do_GET(self):
+        if not self.authorized():
+            return
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        if parts == ['health']:
+            self.json(200, self.service.health())
+        elif parts == ['jobs']:
+            self.json(200, {'jobs': self.service.recent()})
+        elif len(parts) in (2, 3) and parts[0] == 'jobs' and parts[2:] in ([], ['result']):
+            job, position = self.service.get(parts[1])
+            if job is None:
+                self.json(404, {'error': f"unknown job {parts[1]}"})
+            elif len(parts) == 2:
+                self.json(200, job.summary(position))
+            elif job.finished_state:
+                self.json(200, result_body(job))
+            else:
+                self.json(202, job.summary(position), {'Retry-After': '5'})
+        else:
+            self.json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if not self.authorized():
+            return
+        if self.path.split('?')[0].rstrip('/') != '/jobs':
+            self.json(404, {'error': 'not found'})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.json(413, {'error': 'body too large'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.json(400, {'error': 'body is not valid JSON'})
+            return
+
+        account, callback_url, error = parse_job_request(payload)
+        if error:
+            self.json(400, {'error': error})
+            return
+        try:
+            job, created = self.service.submit(account, callback_url)
+        except ServiceBusy as e:
+            self.json(429, {'error': f"queue full: {e}"}, {'Retry-After': '30'})
+            return
+        _, position = self.service.get(job.id)
+        self.json(202 if created else 200, dict(job.summary(position), status_url=f"/jobs/{job.id}",
+                                                result_url=f"/jobs/{job.id}/result"),
+                  {'Location': f"/jobs/{job.id}"})
+
+
+def run_service(host=SERVICE_HOST, port=SERVICE_PORT, slots=DEFAULT_SLOTS, max_queued=MAX_QUEUED, headless=False,
+                max_uses=None, token=SERVICE_TOKEN, **bot_options):
+    """
+    Launch the warm browsers, then serve the job API until Ctrl+C
+
+    Args:
+        host, port: Interface and port of the HTTP API
+        slots: Accounts running at once (browsers kept warm)
+        max_queued: Jobs allowed to wait for a slot
+        headless: Run Chrome headless
+        max_uses: Accounts per browser before it is relaunched (BrowserPool default if None)
+        token: Bearer token required by the API (empty = none)
+        bot_options: WorldPostaAutomationBot options
+    """
+    print("="*60)
+    print("🛎️  WORLDPOSTA SERVICE")
+    print("="*60)
+
+    pool_options = {'max_uses': max_uses} if max_uses else {}
+    pool = create_browser_pool(slots, headless, load_profile=bot_options.get('load_profile'), **pool_options)
+    service = JobService(pool, slots, max_queued, **bot_options).start()
+    handler = type('ServiceHandler', (ServiceHandler,), {'service': service, 'token': token})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    print(f"🌐 Job API on http://{host}:{server.server_address[1]} "
+          f"({slots} slots, queue {max_queued}{', bearer token required' if token else ''})")
+    print("   POST /jobs · GET /jobs/<id> · GET /jobs/<id>/result · GET /health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Shutting down: finishing running jobs...")
+    finally:
+        server.server_close()
+        service.stop()
+        pool.close()
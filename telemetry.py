@@ -0,0 +1,424 @@
+"""
+Step telemetry for the WorldPosta workflow
+Every workflow step runs inside a timed span tagged with the account's
+correlation ID. Finished spans can be exported to an OTLP/HTTP collector
+(JSON encoding) and to a Prometheus textfile with per-step histograms
+and p50/p95/p99 quantiles.
+
+Configuration (environment):
+    WORLDPOSTA_OTLP_ENDPOINT  e.g. http://localhost:4318 (spans go to /v1/traces)
+    WORLDPOSTA_METRICS_FILE   e.g. metrics/worldposta_steps.prom
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import argparse
+import threading
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+SERVICE_NAME = "worldposta-automation"
+OTLP_ENDPOINT = os.environ.get("WORLDPOSTA_OTLP_ENDPOINT", "")
+METRICS_FILE = os.environ.get("WORLDPOSTA_METRICS_FILE", "")
+OTLP_TIMEOUT = 5  # seconds per export request
+
+# Histogram buckets (seconds); mail delivery can take minutes
+DURATION_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_SAMPLES = 10000  # durations kept per step for the quantiles
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+
+
+def new_correlation_id():
+    """Random 128-bit ID (OTLP trace ID format) identifying one account run"""
+    return uuid.uuid4().hex
+
+
+def new_span_id():
+    return uuid.uuid4().hex[:16]
+
+
+# =====================================================
+# SPANS
+# =====================================================
+
+class Span:
+    """One timed unit of work (an account run or a single step)"""
+
+    def __init__(self, name, correlation_id, parent_id=None, attributes=None):
+        self.name = name
+        self.correlation_id = correlation_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.error = ''
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def set_result(self, ok, error=''):
+        """Mark the span failed when a step returns a falsy result"""
+        if not ok:
+            self.status = STATUS_ERROR
+            self.error = error or self.error
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'correlation_id': self.correlation_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': self.start,
+            'end': self.end,
+            'duration': round(self.duration, 3),
+            'status': self.status,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Records spans and hands finished ones to exporters
+
+    Usage:
+        tracer = create_tracer()
+        with tracer.span('account', correlation_id, email=email) as root:
+            with tracer.span('register', correlation_id, parent=root) as span:
+                span.set_result(bot.register(account))
+        tracer.flush()
+    """
+
+    def __init__(self, exporters=None, log=True):
+        self.exporters = list(exporters or [])
+        self.log = log
+        self.finished = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, correlation_id, parent=None, **attributes):
+        span = Span(name, correlation_id, parent.span_id if parent else None, attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_result(False, str(e))
+            raise
+        finally:
+            span.end = time.time()
+            if self.log:
+                icon = "⏱" if span.status == STATUS_OK else "⏱❌"
+                print(f"   {icon} {name}: {span.duration:.1f}s")
+            with self.lock:
+                self.finished.append(span)
+
+    def flush(self):
+        """Export every finished span (call once per account)"""
+        with self.lock:
+            spans, self.finished = self.finished, []
+        if not spans:
+            return
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                print(f"⚠ Telemetry export failed ({type(exporter).__name__}): {e}")
+
+    def close(self):
+        self.flush()
+        for exporter in self.exporters:
+            exporter.close()
+
+
+# =====================================================
+# OTLP EXPORT
+# =====================================================
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OtlpHttpExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding"""
+
+    def __init__(self, endpoint=OTLP_ENDPOINT, service_name=SERVICE_NAME, timeout=OTLP_TIMEOUT,
+                 resource_attributes=None):
+        endpoint = endpoint.rstrip('/')
+        self.url = endpoint if endpoint.endswith('/v1/traces') else endpoint + '/v1/traces'
+        self.timeout = timeout
+        self.resource = {'service.name': service_name}
+        self.resource.update(resource_attributes or {})
+
+    def build_payload(self, spans):
+        otlp_spans = []
+        for span in spans:
+            attributes = dict(span.attributes)
+            attributes['worldposta.correlation_id'] = span.correlation_id
+            otlp_span = {
+                'traceId': span.correlation_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # SPAN_KIND_INTERNAL
+                'startTimeUnixNano': str(int(span.start * 1e9)),
+                'endTimeUnixNano': str(int(span.end * 1e9)),
+                'attributes': _otlp_attributes(attributes),
+                'status': {'code': 1} if span.status == STATUS_OK else {'code': 2, 'message': span.error},
+            }
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            otlp_spans.append(otlp_span)
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _otlp_attributes(self.resource)},
+                'scopeSpans': [{'scope': {'name': 'worldposta.telemetry'}, 'spans': otlp_spans}],
+            }]
+        }
+
+    def export(self, spans):
+        body = json.dumps(self.build_payload(spans)).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def close(self):
+        pass
+
+
+# =====================================================
+# PROMETHEUS TEXTFILE EXPORT
+# =====================================================
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class PrometheusTextfileExporter:
+    """
+    Keeps per-step duration histograms and rewrites a textfile-collector file
+
+    The file is replaced atomically after every export, so node_exporter
+    never reads a half-written file. Worker processes each write their own
+    file with a `worker` label; threads of one process (pipeline stages,
+    context slots, service jobs) share the exporter, so updates and writes
+    go through one lock.
+    """
+
+    def __init__(self, path=METRICS_FILE, buckets=DURATION_BUCKETS, labels=None):
+        self.path = path
+        self.buckets = buckets
+        self.labels = dict(labels or {})
+        self.bucket_counts = {}
+        self.sums = {}
+        self.counts = {}
+        self.samples = {}
+        self.outcomes = {}
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def observe(self, span):
+        with self.lock:
+            self._observe(span)
+
+    def _observe(self, span):
+        step = span.name
+        if step not in self.counts:
+            self.bucket_counts[step] = [0] * len(self.buckets)
+            self.sums[step] = 0.0
+            self.counts[step] = 0
+            self.samples[step] = deque(maxlen=MAX_SAMPLES)
+
+        duration = span.duration
+        for i, bound in enumerate(self.buckets):
+            if duration <= bound:
+                self.bucket_counts[step][i] += 1
+        self.sums[step] += duration
+        self.counts[step] += 1
+        self.samples[step].append(duration)
+
+        key = (step, span.status)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def _labels(self, **extra):
+        labels = dict(self.labels)
+        labels.update(extra)
+        return '{' + ','.join(f'{key}="{value}"' for key, value in labels.items()) + '}'
+
+    def render(self):
+        lines = [
+            "# HELP worldposta_step_duration_seconds Duration of each workflow step",
+            "# TYPE worldposta_step_duration_seconds histogram",
+        ]
+        for step in sorted(self.counts):
+            for bound, count in zip(self.buckets, self.bucket_counts[step]):
+                lines.append(f"worldposta_step_duration_seconds_bucket{self._labels(step=step, le=bound)} {count}")
+            lines.append(f"worldposta_step_duration_seconds_bucket{self._labels(step=step, le='+Inf')} {self.counts[step]}")
+            lines.append(f"worldposta_step_duration_seconds_sum{self._labels(step=step)} {self.sums[step]:.6f}")
+            lines.append(f"worldposta_step_duration_seconds_count{self._labels(step=step)} {self.counts[step]}")
+
+        lines += [
+            "# HELP worldposta_step_duration_quantile_seconds Step duration percentiles over recent accounts",
+            "# TYPE worldposta_step_duration_quantile_seconds gauge",
+        ]
+        for step in sorted(self.samples):
+            ordered = sorted(self.samples[step])
+            for q in QUANTILES:
+                lines.append(
+                    f"worldposta_step_duration_quantile_seconds{self._labels(step=step, quantile=q)} "
+                    f"{percentile(ordered, q):.6f}"
+                )
+
+        lines += [
+            "# HELP worldposta_step_total Finished workflow steps by outcome",
+            "# TYPE worldposta_step_total counter",
+        ]
+        for (step, status), count in sorted(self.outcomes.items()):
+            lines.append(f"worldposta_step_total{self._labels(step=step, status=status)} {count}")
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, spans):
+        with self.lock:
+            for span in spans:
+                self._observe(span)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+
+    def close(self):
+        pass
+
+
+def create_tracer(worker_id=None, otlp_endpoint=None, metrics_file=None, log=True):
+    """
+    Build a Tracer from the environment
+
+    Args:
+        worker_id: Batch worker number; adds a `worker` label and gives the
+                   worker its own metrics file
+        otlp_endpoint: Overrides WORLDPOSTA_OTLP_ENDPOINT
+        metrics_file: Overrides WORLDPOSTA_METRICS_FILE
+
+    Returns:
+        Tracer (spans are still timed and logged when nothing is exported)
+    """
+    otlp_endpoint = otlp_endpoint or OTLP_ENDPOINT
+    metrics_file = metrics_file or METRICS_FILE
+    exporters = []
+
+    if otlp_endpoint:
+        resource = {'worldposta.worker': str(worker_id)} if worker_id is not None else None
+        exporters.append(OtlpHttpExporter(otlp_endpoint, resource_attributes=resource))
+
+    if metrics_file:
+        labels = None
+        if worker_id is not None:
+            root, ext = os.path.splitext(metrics_file)
+            metrics_file = f"{root}_worker{worker_id}{ext}"
+            labels = {'worker': worker_id}
+        exporters.append(PrometheusTextfileExporter(metrics_file, labels=labels))
+
+    return Tracer(exporters, log=log)
+
+
+# =====================================================
+# LOCAL COLLECTOR STAND-IN
+# =====================================================
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    """Accepts OTLP/HTTP JSON trace exports and prints one line per span"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        for resource_spans in payload.get('resourceSpans', []):
+            self.server.resources.append(resource_spans.get('resource', {}))
+            for scope_spans in resource_spans.get('scopeSpans', []):
+                for span in scope_spans.get('spans', []):
+                    self.server.spans.append(span)
+                    duration = (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e9
+                    status = 'ok' if span.get('status', {}).get('code') != 2 else 'error'
+                    print(f"📡 {span['traceId'][:8]} {span['name']:<22} {duration:8.2f}s {status}")
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_collector(port=4318, host='127.0.0.1'):
+    """
+    Start an in-process OTLP/HTTP collector stand-in
+
+    Returns:
+        The server; received spans are in server.spans, their resources in server.resources
+    """
+    server = ThreadingHTTPServer((host, port), CollectorHandler)
+    server.spans = []
+    server.resources = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta telemetry tools")
+    parser.add_argument("--collector", type=int, metavar="PORT",
+                        help="Run a local OTLP/HTTP collector stand-in that prints received spans")
+    args = parser.parse_args()
+
+    if args.collector:
+        server = start_collector(args.collector)
+        print(f"📡 OTLP collector stand-in listening on http://127.0.0.1:{args.collector}/v1/traces")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
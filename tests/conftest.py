@@ -0,0 +1,30 @@
+"""
+Shared fixtures: the repo root on sys.path and a LocalStandin on free ports
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_standin import LocalStandin  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    """Admin portal, OWA, IMAP and RESP stand-ins on ports picked by the OS (welcome mail after 1 s)"""
+    server = LocalStandin(admin_port=0, mail_port=0, imap_port=0, redis_port=0, mail_delay=1.0).start()
+    yield server
+    server.stop()
+
+
+def register(standin, email, password="Secret@123"):
+    """Create an account on the stand-in the way the registration endpoint does"""
+    status, body = standin.state.register({
+        'FullName': "Test User", 'Email': email, 'Customer': "Acme", 'PhoneNumber': "+15551234567",
+        'Password': password, 'ConfirmPassword': password,
+    })
+    assert status == 200, body
+    return password
@@ -0,0 +1,72 @@
+"""
+Checkpoint resume: where an account restarts after failing at each step
+"""
+
+import pytest
+
+from checkpoints import CheckpointStore, resume_index
+
+BROWSER_MAIL_STEPS = ['register', 'email_login', 'find_email', 'extract_link',
+                      'confirm_email', 'website_login', 'post_login']
+PROTOCOL_MAIL_STEPS = [step for step in BROWSER_MAIL_STEPS if step != 'email_login']
+
+
+@pytest.mark.parametrize("failed_step, resume_at", [
+    ('register', 'register'),
+    ('email_login', 'email_login'),
+    ('find_email', 'email_login'),      # needs the OWA session again
+    ('extract_link', 'email_login'),    # ... and the opened message
+    ('confirm_email', 'confirm_email'),
+    ('website_login', 'website_login'),
+    ('post_login', 'website_login'),    # needs the site session again
+])
+def test_resume_with_browser_mailbox(failed_step, resume_at):
+    completed = set(BROWSER_MAIL_STEPS[:BROWSER_MAIL_STEPS.index(failed_step)])
+
+    assert BROWSER_MAIL_STEPS[resume_index(BROWSER_MAIL_STEPS, completed)] == resume_at
+
+
+@pytest.mark.parametrize("failed_step, resume_at", [
+    ('find_email', 'find_email'),       # no browser session to restore
+    ('extract_link', 'find_email'),
+    ('confirm_email', 'confirm_email'),
+])
+def test_resume_with_protocol_mailbox(failed_step, resume_at):
+    completed = set(PROTOCOL_MAIL_STEPS[:PROTOCOL_MAIL_STEPS.index(failed_step)])
+
+    assert PROTOCOL_MAIL_STEPS[resume_index(PROTOCOL_MAIL_STEPS, completed)] == resume_at
+
+
+def test_finished_account_resumes_past_the_end():
+    assert resume_index(BROWSER_MAIL_STEPS, set(BROWSER_MAIL_STEPS)) == len(BROWSER_MAIL_STEPS)
+
+
+def test_store_round_trip_resumes_at_the_failed_step(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    email = "resume@worldposta.com"
+    try:
+        store.record(email, 'register', True, {'submitted_at': 1700000000.0})
+        store.record(email, 'email_login', True)
+        store.record(email, 'find_email', True)
+        store.record(email, 'extract_link', True, {'verification_url': "https://example.test/confirm"})
+        store.record(email, 'confirm_email', False, error="timeout")
+
+        completed = store.completed_steps(email)
+        assert completed['extract_link'] == {'verification_url': "https://example.test/confirm"}
+        assert 'confirm_email' not in completed
+        assert BROWSER_MAIL_STEPS[resume_index(BROWSER_MAIL_STEPS, completed)] == 'confirm_email'
+        assert store.emails_with_step('register', [email, "other@worldposta.com"]) == {email}
+    finally:
+        store.close()
+
+
+def test_mixed_case_rows_from_older_runs_are_found(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    try:
+        store.record("John.Doe@WorldPosta.com", 'register', True, {'submitted_at': 1700000000.0})
+        store.record("John.Doe@WorldPosta.com", 'post_login', True)
+
+        assert 'register' in store.completed_steps("john.doe@worldposta.com")
+        assert store.emails_with_step('post_login', ["john.doe@worldposta.com"]) == {"john.doe@worldposta.com"}
+    finally:
+        store.close()
@@ -0,0 +1,80 @@
+"""
+HTTP registration engine against the stand-in's /api/auth/register
+"""
+
+import socket
+
+import pytest
+
+from http_registration import HttpRegistrationClient, register_over_http
+
+
+def account(email):
+    return {'full_name': "Test User", 'email': email, 'company': "Acme",
+            'phone': "+15551234567", 'password': "Secret@123"}
+
+
+@pytest.fixture
+def client(standin):
+    client = HttpRegistrationClient(standin.admin_url + '/api/auth/register')
+    yield client
+    client.close()
+
+
+def test_accepted_registration(standin, client):
+    result = client.register(account("new@worldposta.com"))
+
+    assert result.ok and result.status == 200 and not result.fallback
+    assert standin.state.account("new@worldposta.com") is not None
+    assert 'XSRF-TOKEN' in client._session()[1]
+    assert register_over_http(client, account("other@worldposta.com")) is True
+
+
+def test_taken_email_is_a_definitive_failure(client):
+    assert client.register(account("taken@worldposta.com")).ok
+
+    result = client.register(account("taken@worldposta.com"))
+
+    assert result.status == 400 and not result.ok and not result.fallback
+    assert result.errors == ["Email: Email 'taken@worldposta.com' is already taken."]
+    status_log = {}
+    assert register_over_http(client, account("taken@worldposta.com"), status_log) is False
+    assert "already taken" in status_log['error_message']
+
+
+def test_server_error_falls_back_to_the_browser(standin, client):
+    standin.faults.failures['register_api'] = 1.0
+
+    result = client.register(account("busy@worldposta.com"))
+
+    assert result.status == 503 and result.fallback
+    assert register_over_http(client, account("busy@worldposta.com")) is None
+    client.browser_fallback = False  # http engine: nothing to fall back to
+    assert register_over_http(client, account("busy@worldposta.com")) is False
+
+
+def test_non_json_response_falls_back_to_the_browser(standin):
+    # POST to a page route: an HTML 404 instead of a JSON answer
+    client = HttpRegistrationClient(standin.admin_url + '/auth/register')
+    try:
+        result = client.register(account("html@worldposta.com"))
+    finally:
+        client.close()
+
+    assert result.status == 404 and result.fallback
+    assert result.errors == ["HTTP 404: response is not JSON"]
+
+
+def test_keep_alive_connection_is_reused_and_reopened(standin, client):
+    assert client.register(account("first@worldposta.com")).ok
+    connection = client._session()[0]
+    assert client.register(account("second@worldposta.com")).ok
+    assert client._session()[0] is connection and client._session()[2] == 2
+
+    # The pooled connection dies while idle: the next request reconnects once
+    connection.sock.shutdown(socket.SHUT_RDWR)
+    result = client.register(account("third@worldposta.com"))
+
+    assert result.ok and not result.fallback
+    assert client._session()[0] is not connection and client._session()[2] == 1
+    assert standin.state.account("third@worldposta.com") is not None
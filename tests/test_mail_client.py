@@ -0,0 +1,65 @@
+"""
+IMAP receive path against the stand-in: SEARCH polling and IDLE push
+"""
+
+import time
+
+import pytest
+
+from conftest import register
+from local_standin import WELCOME_SUBJECT
+from mail_client import ImapMailboxClient, MailboxError
+
+
+def imap_client(standin, **options):
+    return ImapMailboxClient(standin.host, standin.imap_port, use_ssl=False, **options)
+
+
+def test_search_polling_finds_the_welcome_mail(standin):
+    password = register(standin, "poll@worldposta.com")
+    client = imap_client(standin, use_idle=False, poll_interval=0.2)
+
+    message = client.wait_for_message("poll@worldposta.com", password, WELCOME_SUBJECT, timeout=10)
+
+    assert message is not None
+    assert message.subject == WELCOME_SUBJECT
+    assert "/auth/ConfirmEmail?userId=" in message.html_body
+
+
+def test_idle_push_delivers_without_waiting_out_the_window(standin):
+    password = register(standin, "idle@worldposta.com")
+    client = imap_client(standin, idle_window=30)
+
+    start = time.time()
+    message = client.wait_for_message("idle@worldposta.com", password, WELCOME_SUBJECT, timeout=30)
+
+    assert message is not None and message.subject == WELCOME_SUBJECT
+    # Pushed when the mail lands (1 s), not at the end of the 30 s IDLE window
+    assert time.time() - start < 10
+
+
+def test_idle_reports_whether_mail_was_pushed(standin):
+    password = register(standin, "window@worldposta.com")
+    client = imap_client(standin)
+    conn = client.connect("window@worldposta.com", password)
+    try:
+        assert client.supports_idle(conn)
+        assert client.idle(conn, 10) is True
+        assert client.search(conn, WELCOME_SUBJECT)
+        assert client.idle(conn, 0.5) is False
+    finally:
+        conn.logout()
+
+
+def test_missing_mail_times_out(standin):
+    password = register(standin, "quiet@worldposta.com")
+    client = imap_client(standin, use_idle=False, poll_interval=0.2)
+
+    assert client.wait_for_message("quiet@worldposta.com", password, "No such subject", timeout=1) is None
+
+
+def test_wrong_password_is_a_mailbox_error(standin):
+    register(standin, "locked@worldposta.com")
+
+    with pytest.raises(MailboxError):
+        imap_client(standin).connect("locked@worldposta.com", "wrong")
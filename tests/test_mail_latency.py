@@ -0,0 +1,23 @@
+"""
+Mail-arrival samples: what a found mail says about registration-to-arrival latency
+"""
+
+from mail_latency import arrival_latency
+
+
+def test_fresh_submit_uses_the_midpoint_since_the_last_miss():
+    assert arrival_latency(100.0, None, 110.0) == 5.0
+    assert arrival_latency(100.0, 120.0, 130.0) == 25.0
+
+
+def test_checkpointed_submit_found_on_the_first_check_is_skipped():
+    # Submitted an hour before the outage ended; the mail was waiting all along
+    assert arrival_latency(100.0, None, 3700.0, restored=True) is None
+
+
+def test_checkpointed_submit_after_a_miss_in_this_run_still_counts():
+    assert arrival_latency(100.0, 3700.0, 3710.0, restored=True) == 3605.0
+
+
+def test_no_submit_time_gives_no_sample():
+    assert arrival_latency(None, None, 110.0) is None
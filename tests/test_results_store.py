@@ -0,0 +1,20 @@
+"""
+Results history lookups used to skip already registered accounts
+"""
+
+from results_store import ResultsStore
+
+
+def test_success_lookup_ignores_email_case(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.jsonl"), str(tmp_path / "results.db"), csv_path=None)
+    try:
+        store.add({'email': "John.Doe@WorldPosta.com", 'status': 'success'})
+        store.add({'email': "jane@worldposta.com", 'status': 'failed_registration'})
+        store.flush()
+
+        among = ["john.doe@worldposta.com", "jane@worldposta.com"]
+        assert store.emails_with_status('success', among=among) == {"john.doe@worldposta.com"}
+        assert store.emails_with_status('success') == {"john.doe@worldposta.com"}
+        assert store.latest("JOHN.DOE@worldposta.com")['status'] == 'success'
+    finally:
+        store.close()
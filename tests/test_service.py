@@ -0,0 +1,132 @@
+"""
+Job API of the resident service, with a fake browser pool and bot
+"""
+
+import json
+import threading
+import urllib.request
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+import service
+
+TOKEN = "s3cret"
+
+
+class FakePool:
+    @contextmanager
+    def lease(self, timeout=None):
+        yield object()
+
+
+class FakeBot:
+    """Runs until the test releases it; every account succeeds"""
+
+    gate = threading.Event()
+
+    def __init__(self, **options):
+        self.status_log = {}
+
+    def run_full_workflow(self, account):
+        FakeBot.gate.wait(10)
+        self.status_log = {'email': account['email'], 'status': 'success'}
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Base URL of a job API with 1 slot and room for 1 queued job"""
+    monkeypatch.chdir(tmp_path)  # results and screenshots land in the temp dir
+    monkeypatch.setattr(service, 'WorldPostaAutomationBot', FakeBot)
+    FakeBot.gate.clear()
+    jobs = service.JobService(FakePool(), slots=1, max_queued=1).start()
+    handler = type('ServiceHandler', (service.ServiceHandler,), {'service': jobs, 'token': TOKEN})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    FakeBot.gate.set()
+    server.shutdown()
+    server.server_close()
+    jobs.stop(timeout=5)
+
+
+def call(url, body=None, token=TOKEN):
+    """(status, JSON body) of a GET, or a POST when body is given"""
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(url, data=data, method='POST' if data is not None else 'GET')
+    if token:
+        request.add_header('Authorization', f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def account(email):
+    return {'account': {'full_name': "Test User", 'email': email, 'company': "Acme",
+                        'phone': "+15551234567", 'password': "Secret@123"}}
+
+
+def test_token_is_required_except_for_health(api):
+    assert call(api + '/jobs', token=None)[0] == 401
+    assert call(api + '/jobs', token="wrong")[0] == 401
+    assert call(api + '/health?probe=1', token=None)[0] == 200
+
+
+def test_job_runs_and_its_result_is_served(api):
+    status, job = call(api + '/jobs', account("one@worldposta.com"))
+    assert status == 202 and job['result_url'] == f"/jobs/{job['id']}/result"
+
+    status, running = call(api + f"/jobs/{job['id']}/result")
+    assert status == 202 and running['email'] == "one@worldposta.com"
+
+    FakeBot.gate.set()
+    for _ in range(50):
+        status, result = call(api + f"/jobs/{job['id']}/result")
+        if status == 200:
+            break
+        threading.Event().wait(0.1)
+    assert status == 200 and result['success'] is True
+    assert result['status_log']['status'] == 'success'
+    assert call(api + f"/jobs/{job['id']}")[1]['state'] == 'done'
+    assert call(api + '/jobs/unknown')[0] == 404
+
+
+def test_full_queue_is_refused(api):
+    assert call(api + '/jobs', account("running@worldposta.com"))[0] == 202
+    status, queued = call(api + '/jobs', account("queued@worldposta.com"))
+    assert status == 202
+
+    assert call(api + '/jobs', account("refused@worldposta.com"))[0] == 429
+    assert call(api + f"/jobs/{queued['id']}")[1]['position'] == 1
+
+
+def test_same_email_returns_the_active_job(api):
+    first = call(api + '/jobs', account("retry@worldposta.com"))[1]
+
+    status, again = call(api + '/jobs', account("Retry@WorldPosta.com"))
+
+    assert status == 200 and again['id'] == first['id']
+    assert len(call(api + '/jobs')[1]['jobs']) == 1
+
+
+@pytest.mark.parametrize("body, error", [
+    (b'not json', "not valid JSON"),
+    ([1, 2], "JSON object"),
+    ({'account': "x"}, "must be an object"),
+    ({'account': dict(account("null@worldposta.com")['account'], company=None)}, "account.company"),
+    ({'account': dict(account("num@worldposta.com")['account'], phone=15551234567)}, "account.phone"),
+    ({'account': dict(account("bad@worldposta.com")['account'], email="not-an-email")}, "invalid email"),
+    ({'callback_url': "ftp://example.test"}, "callback_url"),
+])
+def test_malformed_body_is_rejected(api, body, error):
+    status, reply = call(api + '/jobs', body)
+
+    assert status == 400 and error in reply['error']
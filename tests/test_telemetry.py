@@ -0,0 +1,66 @@
+"""
+Telemetry export: OTLP/HTTP spans to the collector stand-in, Prometheus textfile quantiles
+"""
+
+import pytest
+
+from telemetry import (Tracer, OtlpHttpExporter, PrometheusTextfileExporter, start_collector,
+                       new_correlation_id, SERVICE_NAME)
+
+
+@pytest.fixture
+def collector():
+    server = start_collector(port=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def attributes(otlp_attributes):
+    return {item['key']: next(iter(item['value'].values())) for item in otlp_attributes}
+
+
+def test_spans_reach_the_collector_with_attributes_and_parents(collector):
+    endpoint = f"http://127.0.0.1:{collector.server_address[1]}"
+    tracer = Tracer([OtlpHttpExporter(endpoint, resource_attributes={'worldposta.worker': '3'})], log=False)
+    correlation_id = new_correlation_id()
+
+    with tracer.span('account', correlation_id, email="a@worldposta.com") as root:
+        with tracer.span('register', correlation_id, parent=root) as step:
+            step.set_result(False, "HTTP 400")
+    tracer.flush()
+
+    assert attributes(collector.resources[0]['attributes']) == {
+        'service.name': SERVICE_NAME, 'worldposta.worker': '3',
+    }
+    spans = {span['name']: span for span in collector.spans}
+    assert set(spans) == {'account', 'register'}
+    assert all(span['traceId'] == correlation_id for span in spans.values())
+    assert 'parentSpanId' not in spans['account']
+    assert spans['register']['parentSpanId'] == spans['account']['spanId'] == root.span_id
+    assert attributes(spans['account']['attributes']) == {
+        'email': "a@worldposta.com", 'worldposta.correlation_id': correlation_id,
+    }
+    assert spans['account']['status'] == {'code': 1}
+    assert spans['register']['status'] == {'code': 2, 'message': "HTTP 400"}
+
+
+def test_textfile_quantiles_use_nearest_rank(tmp_path):
+    path = tmp_path / "metrics" / "steps.prom"
+    exporter = PrometheusTextfileExporter(str(path), labels={'worker': 1})
+    tracer = Tracer([exporter], log=False)
+    correlation_id = new_correlation_id()
+
+    for seconds in range(1, 101):
+        with tracer.span('find_email', correlation_id) as span:
+            pass
+        span.start, span.end = 0.0, float(seconds)
+    tracer.flush()
+
+    lines = path.read_text().splitlines()
+    assert "# TYPE worldposta_step_duration_quantile_seconds gauge" in lines
+    for quantile, value in ((0.5, 50), (0.95, 95), (0.99, 99)):
+        assert f'worldposta_step_duration_quantile_seconds{{worker="1",step="find_email",quantile="{quantile}"}} ' \
+               f'{value:.6f}' in lines
+    assert 'worldposta_step_duration_seconds_count{worker="1",step="find_email"} 100' in lines
+    assert 'worldposta_step_total{worker="1",step="find_email",status="ok"} 100' in lines
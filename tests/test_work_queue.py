@@ -0,0 +1,111 @@
+"""
+Work queue lease semantics on both backends (SQLite file, RESP stand-in)
+"""
+
+import time
+
+import pytest
+
+from work_queue import open_work_queue, QueueContended
+
+SHORT_LEASE = 0.2  # seconds; tests wait this out instead of LEASE_TIMEOUT
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def work_queue(request, tmp_path):
+    if request.param == 'sqlite':
+        queue = open_work_queue(f"sqlite:///{tmp_path / 'work_queue.db'}")
+    else:
+        standin = request.getfixturevalue('standin')
+        queue = open_work_queue(f"redis://{standin.host}:{standin.redis_port}/0")
+    yield queue
+    queue.close()
+
+
+def accounts(*names):
+    return [{'email': f"{name}@worldposta.com", 'password': "Secret@123"} for name in names]
+
+
+def test_enqueue_is_idempotent_per_email(work_queue):
+    assert work_queue.enqueue(accounts('a', 'b')) == (2, 0)
+    assert work_queue.enqueue(accounts('b', 'c')) == (1, 1)
+    assert work_queue.stats()['jobs']['queued'] == 3
+
+
+def test_duplicate_in_one_batch_is_queued_once(work_queue):
+    assert work_queue.enqueue(accounts('a', 'a', 'b')) == (2, 1)
+    assert [work_queue.claim('w1').email for _ in range(2)] == ["a@worldposta.com", "b@worldposta.com"]
+    assert work_queue.claim('w1') is None
+
+
+def test_claims_follow_enqueue_order_until_empty(work_queue):
+    work_queue.enqueue(accounts('a', 'b'))
+
+    assert work_queue.claim('w1').email == "a@worldposta.com"
+    assert work_queue.claim('w2').email == "b@worldposta.com"
+    assert work_queue.claim('w3') is None
+    assert work_queue.stats()['jobs']['leased'] == 2
+
+
+def test_expired_lease_is_reclaimed_and_stale_complete_is_dropped(work_queue):
+    work_queue.enqueue(accounts('a'))
+    first = work_queue.claim('w1', lease=SHORT_LEASE)
+    assert first.attempts == 1
+    assert work_queue.claim('w2') is None
+
+    time.sleep(SHORT_LEASE * 2)
+    second = work_queue.claim('w2')
+
+    assert second.email == first.email and second.attempts == 2
+    assert work_queue.heartbeat('w1', first) is False
+    assert work_queue.complete(first, 'w1', True) is False
+    assert work_queue.complete(second, 'w2', True) is True
+    counts = work_queue.stats()['jobs']
+    assert counts['done'] == 1 and counts['leased'] == 0 and counts['queued'] == 0
+
+
+def test_heartbeat_keeps_the_lease(work_queue):
+    work_queue.enqueue(accounts('a'))
+    job = work_queue.claim('w1', lease=SHORT_LEASE)
+
+    assert work_queue.heartbeat('w1', job, lease=30) is True
+    time.sleep(SHORT_LEASE * 2)
+
+    assert work_queue.claim('w2') is None
+    assert work_queue.complete(job, 'w1', False, {'status': 'failed_registration'}) is True
+    assert work_queue.stats()['jobs']['failed'] == 1
+
+
+def test_release_hands_the_job_back(work_queue):
+    work_queue.enqueue(accounts('a'))
+    job = work_queue.claim('w1')
+
+    work_queue.release(job, 'w1')
+
+    assert work_queue.claim('w2').email == job.email
+    assert work_queue.complete(job, 'w1', True) is False
+
+
+def test_job_is_parked_dead_after_max_attempts(work_queue):
+    work_queue.max_attempts = 2
+    work_queue.enqueue(accounts('a'))
+    work_queue.claim('w1', lease=SHORT_LEASE)
+    time.sleep(SHORT_LEASE * 2)
+    work_queue.claim('w2', lease=SHORT_LEASE)
+    time.sleep(SHORT_LEASE * 2)
+
+    assert work_queue.claim('w3') is None
+    assert work_queue.stats()['jobs']['dead'] == 1
+    assert work_queue.requeue_failed() == 1
+    assert work_queue.claim('w3').attempts == 1
+
+
+def test_contended_claim_is_not_reported_as_empty(standin, monkeypatch):
+    work_queue = open_work_queue(f"redis://{standin.host}:{standin.redis_port}/0")
+    work_queue.enqueue(accounts('a'))
+    # Every EXEC aborted, as if other workers kept taking the job first
+    monkeypatch.setattr(work_queue, '_transaction', lambda commands: None)
+
+    with pytest.raises(QueueContended):
+        work_queue.claim('w1')
+    work_queue.close()
@@ -0,0 +1,248 @@
+"""
+Wait layer for the WorldPosta bots
+Moves to the next step as soon as a concrete page condition holds, and
+scales the purely cosmetic (human-like) delays by a timing profile.
+"""
+
+import os
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, JavascriptException
+)
+
+
+# =====================================================
+# TIMING PROFILES
+# =====================================================
+
+# Multiplier applied to every cosmetic delay (random_delay, typing pauses)
+TIMING_PROFILES = {
+    'human': 1.0,    # original pacing, anti-detection friendly
+    'fast': 0.25,    # short pauses, still not robotic
+    'staging': 0.0,  # no cosmetic delays at all (internal test tenants)
+}
+
+DEFAULT_TIMING_PROFILE = os.environ.get("WORLDPOSTA_TIMING", "human")
+
+POLL_FREQUENCY = 0.1  # seconds between condition checks
+STEP_TIMEOUT = 30  # default upper bound for a step condition
+REQUESTS_QUIET_PERIOD = 0.5  # seconds without XHR/fetch activity = idle
+EVENT_RECHECK = 1.0  # seconds between safety-net polls while waiting for a CDP event
+
+_active_profile = DEFAULT_TIMING_PROFILE if DEFAULT_TIMING_PROFILE in TIMING_PROFILES else 'human'
+
+
+def set_timing_profile(name):
+    """Select the active timing profile (human, fast or staging)"""
+    global _active_profile
+    if name not in TIMING_PROFILES:
+        raise ValueError(f"Unknown timing profile '{name}', choose from {sorted(TIMING_PROFILES)}")
+    _active_profile = name
+    # Child processes (batch workers) inherit the choice
+    os.environ["WORLDPOSTA_TIMING"] = name
+
+
+def get_timing_profile():
+    """Name of the active timing profile"""
+    return _active_profile
+
+
+def delay_scale():
+    """Multiplier for cosmetic delays under the active profile"""
+    return TIMING_PROFILES[_active_profile]
+
+
+# =====================================================
+# REQUEST TRACKING
+# =====================================================
+
+# Counts in-flight XHR/fetch requests on every document the browser loads
+REQUEST_TRACKER_JS = """
+(function () {
+    if (window.__wpPendingRequests !== undefined) return;
+    window.__wpPendingRequests = 0;
+    function done() { window.__wpPendingRequests = Math.max(0, window.__wpPendingRequests - 1); }
+
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__wpPendingRequests++;
+        this.addEventListener('loadend', done);
+        return send.apply(this, arguments);
+    };
+
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            window.__wpPendingRequests++;
+            return origFetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; }
+            );
+        };
+    }
+})();
+"""
+
+
+def install_request_tracker(driver):
+    """
+    Register the XHR/fetch counter for every future document
+
+    Returns:
+        bool: True if the tracker was installed via CDP
+    """
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": REQUEST_TRACKER_JS})
+        return True
+    except Exception as e:
+        print(f"⚠ Request tracker not installed: {e}")
+        return False
+
+
+# =====================================================
+# CONDITIONS
+# =====================================================
+
+def document_ready(driver):
+    """Condition: document.readyState is 'complete'"""
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+class requests_idle:
+    """
+    Condition: no XHR/fetch in flight for `quiet` seconds
+
+    The quiet period is measured from the first check, so a request fired
+    right after a click is still picked up. Pages without the tracker fall
+    back to document_ready.
+    """
+
+    def __init__(self, quiet=REQUESTS_QUIET_PERIOD):
+        self.quiet = quiet
+        self.idle_since = None
+
+    def __call__(self, driver):
+        pending = driver.execute_script(
+            "return document.readyState === 'complete' ? "
+            "(window.__wpPendingRequests === undefined ? 0 : window.__wpPendingRequests) : -1"
+        )
+        now = time.time()
+        if pending != 0:
+            self.idle_since = None
+            return False
+        if self.idle_since is None:
+            self.idle_since = now
+        return now - self.idle_since >= self.quiet
+
+
+def url_changes(url):
+    """Condition: current URL differs from `url`"""
+    return EC.url_changes(url)
+
+
+def url_contains(fragment):
+    """Condition: current URL contains `fragment` (case-insensitive)"""
+    fragment = fragment.lower()
+    return lambda driver: fragment in driver.current_url.lower()
+
+
+def element_present(css_selector):
+    """Condition: an element matching `css_selector` exists"""
+    return EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+
+
+# =====================================================
+# WAITS
+# =====================================================
+
+def wait_until(driver, *conditions, timeout=STEP_TIMEOUT, description="condition"):
+    """
+    Wait until any of the given conditions holds
+
+    Args:
+        driver: Selenium driver
+        conditions: Callables taking the driver (expected_conditions style)
+        timeout: Maximum seconds to wait
+        description: Text used in the log line
+
+    Returns:
+        The first truthy condition result, or False on timeout
+    """
+    start = time.time()
+    try:
+        result = WebDriverWait(
+            driver, timeout, poll_frequency=POLL_FREQUENCY,
+            ignored_exceptions=(NoSuchElementException, StaleElementReferenceException, JavascriptException)
+        ).until(EC.any_of(*conditions))
+        print(f"   ⚡ {description} after {time.time() - start:.1f}s")
+        return result
+    except TimeoutException:
+        print(f"   ⌛ {description} not reached within {timeout}s, continuing")
+        return False
+
+
+def wait_for_page_ready(driver, timeout=STEP_TIMEOUT):
+    """Wait for the document to finish loading"""
+    return wait_until(driver, document_ready, timeout=timeout, description="page ready")
+
+
+def wait_for_requests_idle(driver, quiet=REQUESTS_QUIET_PERIOD, timeout=STEP_TIMEOUT):
+    """Wait until the page stops issuing XHR/fetch requests"""
+    return wait_until(driver, requests_idle(quiet), timeout=timeout, description="requests idle")
+
+
+def wait_for_event(driver, expectation, *conditions, timeout=STEP_TIMEOUT, description="condition"):
+    """
+    Wait for an armed CDP event (cdp_events.PageEvents.expect) instead of polling
+
+    The conditions are still checked every EVENT_RECHECK seconds as a
+    safety net for events that never arrive (e.g. a bfcache restore).
+    Without an expectation (CDP events off or unavailable) this is
+    wait_until(conditions).
+
+    Args:
+        driver: Selenium driver
+        expectation: cdp_events.Expectation armed before the action, or None
+        conditions: Polling fallback conditions (expected_conditions style)
+        timeout: Maximum seconds to wait
+        description: Text used in the log line
+
+    Returns:
+        The fired event's label or the first truthy condition result, or False on timeout
+    """
+    if expectation is None:
+        return wait_until(driver, *conditions, timeout=timeout, description=description)
+
+    start = time.time()
+    try:
+        while True:
+            remaining = timeout - (time.time() - start)
+            fired = expectation.wait(max(0, min(EVENT_RECHECK, remaining)))
+            if fired:
+                print(f"   ⚡ {description} after {time.time() - start:.2f}s ({fired})")
+                return fired
+            for condition in conditions:
+                try:
+                    result = condition(driver)
+                except (NoSuchElementException, StaleElementReferenceException, JavascriptException):
+                    result = False
+                if result:
+                    print(f"   ⚡ {description} after {time.time() - start:.1f}s (polled)")
+                    return result
+            if remaining <= 0:
+                print(f"   ⌛ {description} not reached within {timeout}s, continuing")
+                return False
+    finally:
+        expectation.cancel()
+
+
+def wait_for_navigation(driver, previous_url, timeout=STEP_TIMEOUT, expectation=None):
+    """Wait for the URL to change away from previous_url and the new page to load"""
+    changed = wait_for_event(driver, expectation, url_changes(previous_url), timeout=timeout,
+                             description="navigation")
+    if changed:
+        wait_for_page_ready(driver, timeout=timeout)
+    return bool(changed)
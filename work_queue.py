@@ -0,0 +1,679 @@
+"""
+Distributed work queue
+A producer enqueues accounts (batch_runner.py --enqueue URL) and worker
+daemons on any number of hosts claim them (worker_daemon.py --queue URL).
+Every claim is a lease: the worker's heartbeat extends it while the
+account runs, and a job whose lease runs out (dead host, killed process)
+goes back to the queue for the next claim. After MAX_ATTEMPTS claims a
+job is parked as dead instead of taking down worker after worker.
+
+Backends, picked by URL:
+    sqlite   sqlite:///work_queue.db     one host (all workers share the file)
+    redis    redis://host:6379/0         many hosts; any Redis-protocol server,
+                                         including the local stand-in
+
+Job states: queued -> leased -> done | failed, or dead. Enqueueing is
+idempotent per email, so the producer can be re-run on the same file.
+
+Usage:
+    work_queue = open_work_queue("redis://127.0.0.1:6379/0")
+    work_queue.enqueue(accounts)
+    job = work_queue.claim(worker_id)
+    ...
+    work_queue.complete(job, worker_id, success, status_log)
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+QUEUE_URL = os.environ.get("WORLDPOSTA_QUEUE", "sqlite:///work_queue.db")
+
+LEASE_TIMEOUT = 120  # seconds a claim lasts without a heartbeat
+HEARTBEAT_INTERVAL = 30  # seconds between worker heartbeats (well inside the lease)
+MAX_ATTEMPTS = 3  # claims per job before it is parked as dead
+ENQUEUE_BATCH = 500  # accounts written per round trip / transaction
+CLAIM_RETRIES = 20  # optimistic-transaction retries when workers race for a job
+KEY_PREFIX = "worldposta:queue"  # Redis key namespace
+
+JOB_STATES = ('queued', 'leased', 'done', 'failed', 'dead')
+
+
+class WorkQueueError(Exception):
+    """Queue backend unreachable or replied with an error"""
+
+
+class QueueContended(WorkQueueError):
+    """Other workers/producers kept winning the race; the queue is busy, not empty"""
+
+
+class Job:
+    """One claimed account"""
+
+    def __init__(self, job_id, account, attempts):
+        self.id = job_id
+        self.account = account
+        self.attempts = attempts
+
+    @property
+    def email(self):
+        return self.account['email']
+
+
+def now_text():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def worker_name(slot=None):
+    """host:pid[:slot], unique across the machines sharing a queue"""
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    return f"{name}:{slot}" if slot is not None else name
+
+
+class WorkQueue:
+    """Shared queue of accounts with leased claims"""
+
+    name = None
+
+    def enqueue(self, accounts):
+        """
+        Add accounts (an iterable, consumed in ENQUEUE_BATCH chunks)
+
+        Returns:
+            tuple: (added, already_queued) - emails already in the queue are skipped
+        """
+        added = skipped = 0
+        batch = []
+        for account in accounts:
+            batch.append(account)
+            if len(batch) >= ENQUEUE_BATCH:
+                new = self._enqueue_batch(batch)
+                added, skipped = added + new, skipped + len(batch) - new
+                batch = []
+        if batch:
+            new = self._enqueue_batch(batch)
+            added, skipped = added + new, skipped + len(batch) - new
+        return added, skipped
+
+    def _enqueue_batch(self, accounts):
+        """Insert one batch; returns how many were new"""
+        raise NotImplementedError
+
+    def claim(self, worker_id, lease=LEASE_TIMEOUT):
+        """
+        Next queued (or lease-expired) job, leased to worker_id; None if there is none
+
+        Raises:
+            QueueContended: jobs are there but other workers took each one first
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id, job=None, info=None, lease=LEASE_TIMEOUT):
+        """
+        Mark the worker alive and extend the lease of the job it runs
+
+        Returns:
+            bool: False if the job's lease was lost (re-queued and claimed elsewhere)
+        """
+        raise NotImplementedError
+
+    def complete(self, job, worker_id, success, result=None):
+        """
+        Report a finished job (done or failed) with its status log
+
+        Returns:
+            bool: False if the lease was lost and the report was dropped
+        """
+        raise NotImplementedError
+
+    def release(self, job, worker_id):
+        """Hand an unfinished job back to the queue right away (worker shutting down)"""
+        raise NotImplementedError
+
+    def requeue_failed(self):
+        """Put failed and dead jobs back in the queue; returns how many"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Job counts per state plus the workers seen recently"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Drop every job and worker record"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def idle(self):
+        """Nothing queued and nothing in progress"""
+        counts = self.stats()['jobs']
+        return counts['queued'] == 0 and counts['leased'] == 0
+
+
+def live_workers(workers, now=None):
+    """Workers whose last heartbeat is recent enough to count as alive"""
+    now = now or time.time()
+    return [w for w in workers if now - w.get('last_seen', 0) <= 3 * HEARTBEAT_INTERVAL]
+
+
+# =====================================================
+# SQLITE BACKEND
+# =====================================================
+
+class SqliteWorkQueue(WorkQueue):
+    """Queue in one SQLite file, for worker daemons on a single host"""
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # Autocommit; claims take the write lock explicitly with BEGIN IMMEDIATE
+        self.db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE,
+                account TEXT,
+                state TEXT,
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER DEFAULT 0,
+                result TEXT,
+                updated_at TEXT
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, id)")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                info TEXT,
+                last_seen REAL
+            )
+        """)
+
+    def _transaction(self, work):
+        with self.lock:
+            try:
+                self.db.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                raise WorkQueueError(f"Queue database unavailable: {e}")
+            try:
+                result = work()
+                self.db.execute("COMMIT")
+                return result
+            except BaseException as e:
+                self.db.execute("ROLLBACK")
+                if isinstance(e, sqlite3.Error):
+                    raise WorkQueueError(f"Queue database error: {e}")
+                raise
+
+    def _enqueue_batch(self, accounts):
+        def insert():
+            cursor = self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (email, account, state, updated_at) VALUES (?, ?, 'queued', ?)",
+                [(account['email'], json.dumps(account), now_text()) for account in accounts]
+            )
+            return cursor.rowcount
+        return self._transaction(insert)
+
+    def claim(self, worker_id, lease=LEASE_TIMEOUT):
+        def take():
+            now = time.time()
+            # Leases that ran out without a heartbeat: dead after MAX_ATTEMPTS, else queued again
+            self.db.execute(
+                "UPDATE jobs SET state = 'dead', worker = NULL, updated_at = ? "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now_text(), now, self.max_attempts)
+            )
+            requeued = self.db.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL, updated_at = ? "
+                "WHERE state = 'leased' AND lease_until < ?", (now_text(), now)
+            ).rowcount
+            if requeued:
+                print(f"♻️  Re-queued {requeued} jobs whose lease expired")
+
+            row = self.db.execute(
+                "SELECT id, account, attempts FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, account, attempts = row
+            self.db.execute(
+                "UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = ?, updated_at = ? "
+                "WHERE id = ?", (worker_id, now + lease, attempts + 1, now_text(), job_id)
+            )
+            return Job(job_id, json.loads(account), attempts + 1)
+        return self._transaction(take)
+
+    def heartbeat(self, worker_id, job=None, info=None, lease=LEASE_TIMEOUT):
+        def beat():
+            now = time.time()
+            self.db.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, info, last_seen) VALUES (?, ?, ?)",
+                (worker_id, json.dumps(info or {}), now)
+            )
+            if job is None:
+                return True
+            return self.db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                (now + lease, job.id, worker_id)
+            ).rowcount == 1
+        return self._transaction(beat)
+
+    def complete(self, job, worker_id, success, result=None):
+        def finish():
+            return self.db.execute(
+                "UPDATE jobs SET state = ?, result = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'",
+                ('done' if success else 'failed', json.dumps(result or {}), now_text(), job.id, worker_id)
+            ).rowcount == 1
+        return self._transaction(finish)
+
+    def release(self, job, worker_id):
+        def give_back():
+            self.db.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND state = 'leased'", (now_text(), job.id, worker_id)
+            )
+        self._transaction(give_back)
+
+    def requeue_failed(self):
+        def requeue():
+            return self.db.execute(
+                "UPDATE jobs SET state = 'queued', worker = NULL, attempts = 0, updated_at = ? "
+                "WHERE state IN ('failed', 'dead')", (now_text(),)
+            ).rowcount
+        return self._transaction(requeue)
+
+    def stats(self):
+        with self.lock:
+            try:
+                counts = dict(self.db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+                workers = [dict(json.loads(info), worker_id=worker_id, last_seen=last_seen)
+                           for worker_id, info, last_seen in self.db.execute("SELECT * FROM workers")]
+            except sqlite3.Error as e:
+                raise WorkQueueError(f"Queue database error: {e}")
+        return {'jobs': {state: counts.get(state, 0) for state in JOB_STATES}, 'workers': workers}
+
+    def clear(self):
+        def wipe():
+            self.db.execute("DELETE FROM jobs")
+            self.db.execute("DELETE FROM workers")
+        self._transaction(wipe)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+# =====================================================
+# REDIS BACKEND
+# =====================================================
+
+class RespConnection:
+    """
+    Minimal RESP2 client: commands, pipelined batches and error replies
+
+    A connection that failed mid-command is dropped and opened again on the
+    next call, so a caller can simply retry after a WorkQueueError.
+    """
+
+    def __init__(self, host, port, db=0, password=None, timeout=30):
+        self.address = (host, port, db, password, timeout)
+        self.sock = None
+        self.connect()
+
+    def connect(self):
+        host, port, db, password, timeout = self.address
+        try:
+            self.sock = socket.create_connection((host, port), timeout)
+        except OSError as e:
+            raise WorkQueueError(f"Cannot connect to {host}:{port}: {e}")
+        # Transactions are several small writes; don't let Nagle hold them back
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.call('AUTH', password)
+        if db:
+            self.call('SELECT', db)
+
+    @staticmethod
+    def encode(args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def read(self):
+        line = self.reader.readline()
+        if not line:
+            raise WorkQueueError("Connection closed by the queue server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise WorkQueueError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)[:-2]
+            return data.decode('utf-8')
+        if kind == b'*':
+            length = int(payload)
+            return None if length < 0 else [self.read() for _ in range(length)]
+        raise WorkQueueError(f"Unexpected reply {line!r}")
+
+    def call(self, *args):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands):
+        """
+        Send several commands in one write and read all replies
+
+        After a failure (or an error reply, which leaves later replies unread)
+        the connection is dropped; the next call reconnects.
+        """
+        if self.sock is None:
+            self.connect()
+        try:
+            self.sock.sendall(b"".join(self.encode(command) for command in commands))
+            return [self.read() for _ in commands]
+        except OSError as e:
+            self.close()
+            raise WorkQueueError(f"Queue server connection failed: {e}")
+        except WorkQueueError:
+            self.close()
+            raise
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Queue in a Redis-protocol server, shared by worker daemons on many hosts
+
+    Keys (under KEY_PREFIX):
+        schedule      sorted set of job ids, scored 0 while queued and by
+                      lease expiry while leased, so expired leases are
+                      claimable again without a separate reaper
+        job:<id>      hash: account, state, worker, attempts, result
+        emails        hash email -> job id (idempotent enqueue)
+        retry         set of failed/dead job ids
+        workers       hash worker id -> JSON heartbeat
+        seq, counts   id counter and per-state totals
+    Claims and lease updates are WATCH/MULTI/EXEC transactions.
+    """
+
+    name = 'redis'
+
+    def __init__(self, host, port, db=0, password=None, max_attempts=MAX_ATTEMPTS, prefix=KEY_PREFIX):
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.conn = RespConnection(host, port, db, password)
+
+    def key(self, *parts):
+        return ":".join((self.prefix,) + tuple(str(part) for part in parts))
+
+    @staticmethod
+    def member(job_id):
+        # Zero-padded so equal scores (every queued job) sort in enqueue order
+        return f"{int(job_id):012d}"
+
+    def _enqueue_batch(self, accounts):
+        emails = self.key('emails')
+        with self.lock:
+            for _ in range(CLAIM_RETRIES):
+                # Index entries and their jobs are written in one MULTI/EXEC, so a
+                # crash can't leave an email indexed without a job behind it
+                self.conn.call('WATCH', emails)
+                known = self.conn.call('HMGET', emails, *[account['email'] for account in accounts])
+                batch = {}
+                for account, job_id in zip(accounts, known):
+                    if job_id is None:
+                        batch.setdefault(account['email'], account)
+                if not batch:
+                    self.conn.call('UNWATCH')
+                    return 0
+                last = self.conn.call('INCRBY', self.key('seq'), len(batch))
+                commands = []
+                for job_id, account in enumerate(batch.values(), last - len(batch) + 1):
+                    commands.append(('HSET', self.key('job', job_id), 'account', json.dumps(account),
+                                     'state', 'queued', 'attempts', 0, 'updated_at', now_text()))
+                    commands.append(('ZADD', self.key('schedule'), 0, self.member(job_id)))
+                    commands.append(('HSET', emails, account['email'], job_id))
+                commands.append(('HINCRBY', self.key('counts'), 'queued', len(batch)))
+                if self._transaction(commands) is not None:
+                    return len(batch)
+                # Another producer indexed emails meanwhile; look them up again
+            raise QueueContended(f"Enqueue kept racing other producers ({CLAIM_RETRIES} tries)")
+
+    def _transaction(self, commands):
+        """MULTI/EXEC after a WATCH; None if a watched key changed"""
+        replies = self.conn.pipeline([('MULTI',)] + commands + [('EXEC',)])
+        return replies[-1]
+
+    def claim(self, worker_id, lease=LEASE_TIMEOUT):
+        schedule = self.key('schedule')
+        with self.lock:
+            for _ in range(CLAIM_RETRIES):
+                now = time.time()
+                self.conn.call('WATCH', schedule)
+                # Expired leases first (like the oldest ids in SQLite), then fresh jobs
+                due = self.conn.call('ZRANGEBYSCORE', schedule, '(0', now, 'WITHSCORES', 'LIMIT', 0, 1) \
+                    or self.conn.call('ZRANGEBYSCORE', schedule, 0, 0, 'WITHSCORES', 'LIMIT', 0, 1)
+                if not due:
+                    self.conn.call('UNWATCH')
+                    return None
+                member, score = due[0], float(due[1])
+                job_key = self.key('job', int(member))
+                account, attempts = self.conn.call('HMGET', job_key, 'account', 'attempts')
+                attempts = int(attempts or 0)
+                expired = score > 0
+
+                if expired and attempts >= self.max_attempts:
+                    # Its lease ran out MAX_ATTEMPTS times: park it instead of retrying forever
+                    self._transaction([
+                        ('ZREM', schedule, member),
+                        ('HSET', job_key, 'state', 'dead', 'worker', '', 'updated_at', now_text()),
+                        ('SADD', self.key('retry'), member),
+                        ('HINCRBY', self.key('counts'), 'leased', -1),
+                        ('HINCRBY', self.key('counts'), 'dead', 1),
+                    ])
+                    continue
+
+                moved = [('HINCRBY', self.key('counts'), 'queued', -1),
+                         ('HINCRBY', self.key('counts'), 'leased', 1)] if not expired else []
+                done = self._transaction([
+                    ('ZADD', schedule, now + lease, member),
+                    ('HSET', job_key, 'state', 'leased', 'worker', worker_id, 'attempts', attempts + 1,
+                     'updated_at', now_text()),
+                ] + moved)
+                if done is None:
+                    continue  # another worker took it first
+                if expired:
+                    print(f"♻️  Re-queued job {int(member)} whose lease expired")
+                return Job(int(member), json.loads(account), attempts + 1)
+            raise QueueContended(f"Every claim lost the race to another worker ({CLAIM_RETRIES} tries)")
+
+    def _owned(self, job, worker_id):
+        """WATCH the job and check it is still leased to worker_id"""
+        job_key = self.key('job', job.id)
+        self.conn.call('WATCH', job_key)
+        state, worker = self.conn.call('HMGET', job_key, 'state', 'worker')
+        if state != 'leased' or worker != worker_id:
+            self.conn.call('UNWATCH')
+            return None
+        return job_key
+
+    def heartbeat(self, worker_id, job=None, info=None, lease=LEASE_TIMEOUT):
+        with self.lock:
+            self.conn.call('HSET', self.key('workers'), worker_id,
+                           json.dumps(dict(info or {}, last_seen=time.time())))
+            if job is None:
+                return True
+            if self._owned(job, worker_id) is None:
+                return False
+            return self._transaction([
+                ('ZADD', self.key('schedule'), time.time() + lease, self.member(job.id)),
+            ]) is not None
+
+    def complete(self, job, worker_id, success, result=None):
+        state = 'done' if success else 'failed'
+        with self.lock:
+            job_key = self._owned(job, worker_id)
+            if job_key is None:
+                return False
+            commands = [
+                ('ZREM', self.key('schedule'), self.member(job.id)),
+                ('HSET', job_key, 'state', state, 'result', json.dumps(result or {}), 'updated_at', now_text()),
+                ('HINCRBY', self.key('counts'), 'leased', -1),
+                ('HINCRBY', self.key('counts'), state, 1),
+            ]
+            if not success:
+                commands.append(('SADD', self.key('retry'), self.member(job.id)))
+            return self._transaction(commands) is not None
+
+    def release(self, job, worker_id):
+        with self.lock:
+            job_key = self._owned(job, worker_id)
+            if job_key is None:
+                return
+            self._transaction([
+                ('ZADD', self.key('schedule'), 0, self.member(job.id)),
+                ('HSET', job_key, 'state', 'queued', 'worker', '', 'updated_at', now_text()),
+                ('HINCRBY', self.key('counts'), 'leased', -1),
+                ('HINCRBY', self.key('counts'), 'queued', 1),
+            ])
+
+    def requeue_failed(self):
+        with self.lock:
+            members = self.conn.call('SMEMBERS', self.key('retry')) or []
+            commands = []
+            for member in members:
+                job_key = self.key('job', int(member))
+                state = self.conn.call('HGET', job_key, 'state')
+                if state not in ('failed', 'dead'):
+                    continue
+                commands += [
+                    ('ZADD', self.key('schedule'), 0, member),
+                    ('HSET', job_key, 'state', 'queued', 'worker', '', 'attempts', 0, 'updated_at', now_text()),
+                    ('HINCRBY', self.key('counts'), state, -1),
+                    ('HINCRBY', self.key('counts'), 'queued', 1),
+                ]
+            commands.append(('DEL', self.key('retry')))
+            self.conn.pipeline(commands)
+            return (len(commands) - 1) // 4
+
+    def stats(self):
+        with self.lock:
+            counts, workers = self.conn.pipeline([
+                ('HGETALL', self.key('counts')),
+                ('HGETALL', self.key('workers')),
+            ])
+        counts = dict(zip(counts[::2], (int(value) for value in counts[1::2])))
+        workers = [dict(json.loads(info), worker_id=worker_id) for worker_id, info in zip(workers[::2], workers[1::2])]
+        return {'jobs': {state: counts.get(state, 0) for state in JOB_STATES}, 'workers': workers}
+
+    def clear(self):
+        with self.lock:
+            last = int(self.conn.call('GET', self.key('seq')) or 0)
+            for start in range(1, last + 1, ENQUEUE_BATCH):
+                self.conn.call('DEL', *[self.key('job', job_id) for job_id in range(start, min(last, start + ENQUEUE_BATCH - 1) + 1)])
+            self.conn.call('DEL', *[self.key(name) for name in ('schedule', 'emails', 'retry', 'workers', 'seq', 'counts')])
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# =====================================================
+# FACTORY
+# =====================================================
+
+QUEUE_BACKENDS = {
+    SqliteWorkQueue.name: SqliteWorkQueue,
+    RedisWorkQueue.name: RedisWorkQueue,
+}
+
+
+def open_work_queue(url=None):
+    """
+    Open the queue a URL points at
+
+    Args:
+        url: sqlite:///path/to/queue.db or redis://[:password@]host:port/db
+             (defaults to WORLDPOSTA_QUEUE / sqlite:///work_queue.db)
+
+    Returns:
+        WorkQueue
+    """
+    url = url or QUEUE_URL
+    parts = urlsplit(url)
+    if parts.scheme not in QUEUE_BACKENDS:
+        raise ValueError(f"Unknown queue backend in '{url}', choose from {sorted(QUEUE_BACKENDS)}")
+    if parts.scheme == 'sqlite':
+        return SqliteWorkQueue(parts.path[1:] if parts.path.startswith('/') else parts.path)
+    db = int(parts.path.strip('/') or 0)
+    return RedisWorkQueue(parts.hostname or '127.0.0.1', parts.port or 6379, db, parts.password)
+
+
+def print_stats(stats):
+    jobs = stats['jobs']
+    print("📊 Jobs: " + ", ".join(f"{state} {jobs[state]}" for state in JOB_STATES))
+    workers = live_workers(stats['workers'])
+    print(f"👷 Live workers: {len(workers)}")
+    for worker in sorted(workers, key=lambda w: w['worker_id']):
+        print(f"   {worker['worker_id']}: done {worker.get('done', 0)}, failed {worker.get('failed', 0)}"
+              + (f", running {worker['job']}" if worker.get('job') else ", idle"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta distributed work queue")
+    parser.add_argument("--queue", default=QUEUE_URL, help="Queue URL (sqlite:///file.db or redis://host:port/db)")
+    parser.add_argument("--requeue-failed", action="store_true", help="Put failed and dead jobs back in the queue")
+    parser.add_argument("--clear", action="store_true", help="Drop every job and worker record")
+    args = parser.parse_args()
+
+    work_queue = open_work_queue(args.queue)
+    try:
+        if args.clear:
+            work_queue.clear()
+            print("🧹 Queue cleared")
+            return
+        if args.requeue_failed:
+            print(f"♻️  Re-queued {work_queue.requeue_failed()} failed/dead jobs")
+        print_stats(work_queue.stats())
+    finally:
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Worker daemon for the distributed work queue
+Start one per runner host. Each of its slots is a process with its own
+Chrome that claims accounts from the shared queue (work_queue.py), runs
+run_full_workflow and reports the outcome. A heartbeat thread per slot
+extends the lease of the account in progress and shows the slot as alive,
+so if a host dies its accounts go back to the queue after LEASE_TIMEOUT
+and another host picks them up.
+
+Throughput grows with the number of hosts: every host adds `--slots`
+browsers pulling from the same queue.
+
+Usage:
+    python batch_runner.py --enqueue redis://queue-host:6379/0          # producer
+    python worker_daemon.py --queue redis://queue-host:6379/0 --slots 4 --headless
+    python work_queue.py --queue redis://queue-host:6379/0               # progress
+"""
+
+import time
+import random
+import argparse
+import threading
+import multiprocessing
+
+from worldposta_automation import WorldPostaAutomationBot, random_delay
+from batch_runner import DELAY_BETWEEN_ACCOUNTS, print_account_header
+from work_queue import open_work_queue, worker_name, WorkQueueError, QueueContended, QUEUE_URL, HEARTBEAT_INTERVAL
+from checkpoints import CheckpointStore, CHECKPOINT_DB
+from telemetry import create_tracer
+from waits import TIMING_PROFILES
+from form_fill import FILL_STRATEGIES
+from mail_client import MAILBOX_BACKENDS
+from http_registration import REGISTRATION_ENGINES
+from lean_profile import LOAD_PROFILES
+
+
+# =====================================================
+# CONFIGURATION
+# =====================================================
+
+DEFAULT_SLOTS = 1  # browsers (worker processes) per host
+IDLE_POLL_INTERVAL = 5  # seconds between claims while the queue is empty
+QUEUE_RETRY_DELAY = 5  # first wait after a failed queue call; doubles per failure
+QUEUE_RETRY_MAX = 120  # longest wait between retries
+CONTENDED_JITTER = 0.5  # longest random pause before retrying a claim other workers won
+
+
+class Heartbeat(threading.Thread):
+    """Background heartbeat for one slot: keeps its lease and worker record fresh"""
+
+    def __init__(self, work_queue, worker_id, interval=HEARTBEAT_INTERVAL):
+        super().__init__(name=f"heartbeat-{worker_id}", daemon=True)
+        self.work_queue = work_queue
+        self.worker_id = worker_id
+        self.interval = interval
+        self.job = None
+        self.counts = {'done': 0, 'failed': 0}
+        self.stopped = threading.Event()
+
+    def beat(self):
+        job = self.job
+        info = dict(self.counts, job=job.email if job else None)
+        try:
+            if not self.work_queue.heartbeat(self.worker_id, job, info) and job is not None:
+                print(f"⚠️  [{self.worker_id}] Lost the lease on {job.email}; another worker may run it")
+        except WorkQueueError as e:
+            print(f"⚠ [{self.worker_id}] Heartbeat failed: {e}")
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.beat()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def retry_queue(operation, worker_id, stop_event, action):
+    """
+    Run a work-queue call, retrying with back-off while the backend is unavailable
+
+    A Redis restart or a locked SQLite file should pause a slot, not end it.
+    A contended queue has work, so that is retried right away after a short
+    jitter instead. Gives up (re-raises) only once the daemon is stopping.
+    """
+    delay = QUEUE_RETRY_DELAY
+    while True:
+        try:
+            return operation()
+        except QueueContended:
+            if stop_event.is_set():
+                raise
+            stop_event.wait(random.uniform(0, CONTENDED_JITTER))
+        except WorkQueueError as e:
+            if stop_event.is_set():
+                raise
+            print(f"⚠ [{worker_id}] {action} failed: {e}; retrying in {delay}s")
+            stop_event.wait(delay)
+            delay = min(delay * 2, QUEUE_RETRY_MAX)
+
+
+def daemon_slot(slot, queue_url, headless, options, exit_when_idle, stop_event):
+    """
+    One slot: claim, run, report, until stopped (or the queue is drained)
+
+    Args:
+        slot: Slot number on this host (log lines and worker id)
+        queue_url: Work queue URL
+        headless: Run Chrome headless
+        options: Bot keyword options (timing_profile, fill_strategy, ...)
+        exit_when_idle: Stop once nothing is queued or in progress
+        stop_event: multiprocessing.Event set on shutdown
+    """
+    worker_id = worker_name(slot)
+    try:
+        work_queue = open_work_queue(queue_url)
+    except (WorkQueueError, ValueError) as e:
+        print(f"❌ [{worker_id}] Work queue unavailable: {e}")
+        return
+    checkpoint_db = options.pop('checkpoint_db', None)
+    checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+    heartbeat = Heartbeat(work_queue, worker_id)
+    heartbeat.beat()
+    heartbeat.start()
+    bot = None
+    job = None
+
+    try:
+        bot = WorldPostaAutomationBot(
+            headless=headless, tracer=create_tracer(worker_id=slot), checkpoints=checkpoints, **options
+        )
+        paced = True
+
+        while not stop_event.is_set():
+            # Pace this browser like the batch runner does; before claiming, so
+            # the lease is not ticking while this slot sleeps
+            if not paced:
+                random_delay(DELAY_BETWEEN_ACCOUNTS[0], DELAY_BETWEEN_ACCOUNTS[1])
+                paced = True
+                continue
+
+            job = retry_queue(lambda: work_queue.claim(worker_id), worker_id, stop_event, "Claim")
+            if job is None:
+                if exit_when_idle and retry_queue(work_queue.idle, worker_id, stop_event, "Queue check"):
+                    print(f"🏁 [{worker_id}] Queue drained")
+                    break
+                stop_event.wait(IDLE_POLL_INTERVAL)
+                continue
+
+            # Extend the lease right away, before anything slow happens
+            heartbeat.job = job
+            heartbeat.beat()
+            paced = False
+            print_account_header(job.id, None, job.account, worker_id)
+            if job.attempts > 1:
+                print(f"♻️  Attempt {job.attempts} (an earlier lease expired)")
+
+            try:
+                success = bot.run_full_workflow(job.account)
+            except Exception as e:
+                print(f"❌ [{worker_id}] {job.email} failed with error: {e}")
+                success = False
+
+            heartbeat.job = None
+            heartbeat.counts['done' if success else 'failed'] += 1
+            # The account has run: never hand it back, even if reporting fails
+            finished, job = job, None
+            result = dict(bot.status_log)
+            if retry_queue(lambda: work_queue.complete(finished, worker_id, success, result),
+                           worker_id, stop_event, f"Reporting {finished.email}"):
+                print(f"{'✅' if success else '❌'} [{worker_id}] {finished.email} "
+                      f"{'completed successfully' if success else bot.status_log.get('status', 'failed')}")
+            else:
+                print(f"⚠️  [{worker_id}] Lease on {finished.email} was lost; the result was not reported")
+
+    except KeyboardInterrupt:
+        pass
+    except WorkQueueError as e:
+        print(f"❌ [{worker_id}] Work queue unavailable: {e}")
+    except Exception as e:
+        print(f"❌ [{worker_id}] Worker crashed: {e}")
+    finally:
+        heartbeat.stop()
+        # An account cut short goes straight back instead of waiting out its lease
+        if job is not None:
+            try:
+                work_queue.release(job, worker_id)
+                print(f"↩️  [{worker_id}] Returned {job.email} to the queue")
+            except WorkQueueError:
+                pass
+        if bot:
+            bot.close()
+        if checkpoints:
+            checkpoints.close()
+        work_queue.close()
+
+
+def run_daemon(queue_url=QUEUE_URL, slots=DEFAULT_SLOTS, headless=True, exit_when_idle=False, **options):
+    """Run `slots` worker processes against the queue until Ctrl+C (or drained, with exit_when_idle)"""
+    print("="*60)
+    print("🛰️  WORLDPOSTA WORKER DAEMON")
+    print("="*60)
+    print(f"🧮 Queue: {queue_url}")
+    print(f"👷 Slots: {slots} ({worker_name()})")
+
+    stop_event = multiprocessing.Event()
+    processes = [
+        multiprocessing.Process(
+            target=daemon_slot, args=(slot, queue_url, headless, dict(options), exit_when_idle, stop_event),
+            name=f"worldposta-daemon-{slot}"
+        )
+        for slot in range(1, slots + 1)
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        print("\n⚠️  Stopping: accounts in progress go back to the queue")
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=60)
+            if process.is_alive():
+                process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WorldPosta worker daemon for the distributed work queue")
+    parser.add_argument("--queue", default=QUEUE_URL, help="Queue URL (sqlite:///file.db or redis://host:port/db)")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="Browsers (worker processes) on this host")
+    parser.add_argument("--headless", action="store_true", help="Run without UI")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="Exit once nothing is queued or in progress instead of waiting for more work")
+    parser.add_argument("--timing", choices=sorted(TIMING_PROFILES), default=None,
+                        help="Cosmetic delay profile (staging removes them entirely)")
+    parser.add_argument("--fill", choices=sorted(FILL_STRATEGIES), default=None,
+                        help="How form fields are filled (keystroke, bulk or script)")
+    parser.add_argument("--mailbox", choices=sorted(MAILBOX_BACKENDS), default=None,
+                        help="How the verification email is received (browser, imap or ews)")
+    parser.add_argument("--engine", choices=REGISTRATION_ENGINES, default=None,
+                        help="Registration engine: browser form, http endpoint, or auto (http, browser fallback)")
+    parser.add_argument("--profile", choices=LOAD_PROFILES, default=None,
+                        help="Resource loading: full, or lean (block images, fonts, media and analytics)")
+    parser.add_argument("--asset-cache", action="store_true", default=None,
+                        help="Serve scripts, styles and fonts from the on-disk cache shared by all slots")
+    parser.add_argument("--checkpoints", default=CHECKPOINT_DB,
+                        help="Checkpoint database on this host (a re-claimed account resumes here)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints")
+    args = parser.parse_args()
+
+    if args.slots < 1:
+        parser.error("--slots must be at least 1")
+
+    start = time.time()
+    run_daemon(
+        queue_url=args.queue, slots=args.slots, headless=args.headless, exit_when_idle=args.exit_when_idle,
+        timing_profile=args.timing, fill_strategy=args.fill, mailbox=args.mailbox,
+        registration_engine=args.engine, load_profile=args.profile, asset_cache=args.asset_cache,
+        checkpoint_db=None if args.no_resume else args.checkpoints
+    )
+    print(f"👋 Worker daemon stopped after {time.time() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,72 @@
 import time
 import random
 import os
-import csv
-import json
 from datetime import datetime
-from bs4 import BeautifulSoup
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
+from http_registration import create_registration_client, register_over_http
+from lean_profile import create_load_profile, LOAD_PROFILE, LEAN_CHROME_ARGS
+from asset_cache import ASSET_CACHE, attach_asset_cache
+from cdp_events import attach_page_events
+from form_fill import get_fill_strategy
+from inbox_scanner import shared_inbox_scanner
+from mail_latency import shared_mail_latency, sleep_until_next_poll, arrival_latency
+from link_extractor import extract_from_driver, extract_from_message
+from mail_client import create_mailbox_client, wait_for_verification_mail
+from results_store import ResultsStore
+from screenshots import ScreenshotService
+from screenshot_store import SCREENSHOT_DIR
+from telemetry import create_tracer, new_correlation_id
+from checkpoints import resume_index
+from waits import (
+    delay_scale, set_timing_profile, install_request_tracker,
+    wait_until, wait_for_page_ready, wait_for_requests_idle, wait_for_navigation, wait_for_event,
+    element_present, url_changes, requests_idle
+)
 
 
 # =====================================================
 # CONFIGURATION
 # =====================================================
 
+# Sites (override to run against local_standin.py)
+ADMIN_URL = os.environ.get("WORLDPOSTA_ADMIN_URL", "https://admin.worldposta.com")
+MAIL_URL = os.environ.get("WORLDPOSTA_MAIL_URL", "https://mail.worldposta.com")
+
 # Registration
-REGISTRATION_URL = "https://admin.worldposta.com/auth/register"
+REGISTRATION_URL = ADMIN_URL + "/auth/register"
 
 # Email Provider
-EMAIL_LOGIN_URL = "https://mail.worldposta.com/"
+EMAIL_LOGIN_URL = MAIL_URL + "/"
 EMAIL_DOMAIN = "@worldposta.com"
 
 # Login
-LOGIN_URL = "https://admin.worldposta.com/auth/login"
+LOGIN_URL = ADMIN_URL + "/auth/login"
+
+# Verification email
+EMAIL_SUBJECT_KEYWORD = "Welcome To WorldPosta Business Email"
 
 # Timeouts
 EMAIL_WAIT_TIMEOUT = 300  # seconds to wait for verification email
 DEFAULT_TIMEOUT = 30  # default WebDriverWait timeout
 
+# Page elements and endpoints used to detect step completion
+REGISTER_API_PATH = '/api/auth/register'
+LAUNCH_BUTTON_SELECTOR = 'button.launch-button'
+VERIFICATION_LINK_SELECTOR = 'a[href*="ConfirmEmail"]'
+VERIFICATION_LINK_CONDITIONS = (
+    element_present(VERIFICATION_LINK_SELECTOR),
+    EC.presence_of_element_located((By.XPATH, "//a[contains(text(), 'Confirm Email')]")),
+)
+
 # Output
-SCREENSHOT_DIR = r"C:\Users\olaaa\Desktop\Projects\Registeration\SS"
 CSV_FILE = "registration_results.csv"
-JSON_FILE = "registration_results.json"
+RESULTS_JSONL = "registration_results.jsonl"
+RESULTS_DB = "registration_results.db"
 
 
 # =====================================================
@@ -42,8 +74,10 @@ JSON_FILE = "registration_results.json"
 # =====================================================
 
 def random_delay(min_sec=1, max_sec=3):
-    """Random delay to mimic human behavior"""
-    time.sleep(random.uniform(min_sec, max_sec))
+    """Random delay to mimic human behavior (scaled by the timing profile)"""
+    scale = delay_scale()
+    if scale > 0:
+        time.sleep(random.uniform(min_sec, max_sec) * scale)
 
 
 def human_like_mouse_move(driver, element):
@@ -57,10 +91,12 @@ def human_like_mouse_move(driver, element):
 
 
 def human_like_typing(element, text):
-    """Type text character by character with random delays"""
+    """Type text character by character with random delays (see form_fill for other strategies)"""
+    scale = delay_scale()
     for char in text:
         element.send_keys(char)
-        time.sleep(random.uniform(0.05, 0.15))
+        if scale > 0:
+            time.sleep(random.uniform(0.05, 0.15) * scale)
 
 
 def generate_test_data():
@@ -89,11 +125,51 @@ def get_timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_screenshot_filename(email, status):
-    """Generate screenshot filename"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_email = email.replace("@", "_at_").replace(".", "_")
-    return f"{safe_email}_{status}_{timestamp}.png"
+def new_status_log(email=''):
+    """Create a fresh status record for one account"""
+    return {
+        'timestamp': get_timestamp(),
+        'email': email,
+        'status': 'unknown',
+        'error_message': '',
+        'screenshot_path': ''
+    }
+
+
+def create_driver(headless=False, load_profile=None):
+    """
+    Launch undetected Chrome with the bot's options
+
+    Args:
+        headless: Run Chrome without a window
+        load_profile: full or lean (lean also switches off Chrome's
+                      background services)
+
+    Returns:
+        Selenium driver with the request tracker installed
+    """
+    options = uc.ChromeOptions()
+
+    if not headless:
+        options.add_argument("--start-maximized")
+    else:
+        options.add_argument("--headless=new")
+
+    options.add_argument("--disable-blink-features=AutomationControlled")
+
+    if (load_profile or LOAD_PROFILE) == 'lean':
+        for argument in LEAN_CHROME_ARGS:
+            options.add_argument(argument)
+
+    # Random window size
+    window_width = random.randint(1200, 1920)
+    window_height = random.randint(800, 1080)
+    options.add_argument(f"--window-size={window_width},{window_height}")
+
+    driver = uc.Chrome(options=options, use_subprocess=True)
+    driver.set_page_load_timeout(60)
+    install_request_tracker(driver)
+    return driver
 
 
 # =====================================================
@@ -101,42 +177,90 @@ def get_screenshot_filename(email, status):
 # =====================================================
 
 class WorldPostaAutomationBot:
-    def __init__(self, headless=False):
-        """Initialize automation bot with undetected Chrome"""
-        print("🌐 Launching Chrome browser...")
+    def __init__(self, headless=False, timing_profile=None, fill_strategy=None, mailbox=None, results=None,
+                 driver=None, tracer=None, checkpoints=None, screenshots=None, registration_engine=None,
+                 load_profile=None, asset_cache=None):
+        """
+        Initialize automation bot with undetected Chrome
 
-        options = uc.ChromeOptions()
+        Args:
+            headless: Run Chrome without a window
+            timing_profile: Optional timing profile name (human, fast, staging)
+            fill_strategy: Optional field-fill strategy (keystroke, bulk, script)
+            mailbox: Optional MailboxClient or backend name (browser, imap, ews)
+                     used to receive the verification email without OWA
+            results: Optional results sink (e.g. QueueResultsSink in worker
+                     processes); defaults to a local ResultsStore
+            driver: Optional already-running driver (e.g. from a BrowserPool);
+                    a new Chrome is launched when omitted
+            tracer: Optional telemetry Tracer for per-step spans; defaults to
+                    one configured from the environment
+            checkpoints: Optional CheckpointStore; accounts resume at their
+                         first incomplete step
+            screenshots: Optional shared ScreenshotService; defaults to one
+                         writing to SCREENSHOT_DIR
+            registration_engine: browser, http or auto; http/auto submit the
+                                 registration to the backend endpoint first
+            load_profile: full or lean; lean blocks images, fonts, media and
+                          analytics per page (see lean_profile.py)
+            asset_cache: True, False or an AssetCache; serve scripts, styles
+                         and fonts from the shared on-disk cache (defaults
+                         to WORLDPOSTA_ASSET_CACHE)
+        """
+        if driver is None:
+            print("🌐 Launching Chrome browser...")
+
+        if timing_profile:
+            set_timing_profile(timing_profile)
+        self.fill_strategy = get_fill_strategy(fill_strategy)
+        self.mailbox = create_mailbox_client(mailbox) if mailbox is None or isinstance(mailbox, str) else mailbox
+        self.registration_client = create_registration_client(registration_engine)
+        self.lean = create_load_profile(load_profile)
+
+        # A driver handed in (e.g. leased from a BrowserPool) is not ours to quit
+        self.owns_driver = driver is None
+        self.driver = driver or create_driver(headless, load_profile)
+        self.wait = WebDriverWait(self.driver, DEFAULT_TIMEOUT)
 
-        if not headless:
-            options.add_argument("--start-maximized")
-        else:
-            options.add_argument("--headless=new")
+        # App bundles from the shared on-disk cache instead of the network
+        asset_cache = ASSET_CACHE if asset_cache is None else asset_cache
+        self.asset_interceptor = None
+        if asset_cache:
+            self.asset_interceptor = attach_asset_cache(self.driver, None if asset_cache is True else asset_cache)
 
-        options.add_argument("--disable-blink-features=AutomationControlled")
+        # Navigation, network and DOM events instead of polling (WORLDPOSTA_CDP_EVENTS=0 to poll)
+        self.events = attach_page_events(self.driver)
 
-        # Random window size
-        window_width = random.randint(1200, 1920)
-        window_height = random.randint(800, 1080)
-        options.add_argument(f"--window-size={window_width},{window_height}")
+        # Store account data (reset for every account in run_full_workflow)
+        self.account_data = None
+        self.status_log = new_status_log()
+        self.verification_message = None
+        self.email_session_open = False
+        self.verification_url = None
+        self.verification_link = None
+        self.correlation_id = None
+        self.registered_at = None  # registration submit time, for mail-arrival latency
+        self.registered_at_restored = False  # ... taken from an earlier run's checkpoint
 
-        self.driver = uc.Chrome(options=options, use_subprocess=True)
-        self.driver.set_page_load_timeout(60)
-        self.wait = WebDriverWait(self.driver, DEFAULT_TIMEOUT)
+        # Inbox polls follow the measured mail-arrival distribution
+        self.mail_latency = shared_mail_latency()
 
-        # Store account data
-        self.account_data = None
-        self.status_log = {
-            'timestamp': get_timestamp(),
-            'email': '',
-            'status': 'unknown',
-            'error_message': '',
-            'screenshot_path': ''
-        }
+        # Per-step spans (OTLP / Prometheus export configured by environment)
+        self.tracer = tracer or create_tracer()
+
+        # Optional CheckpointStore: completed steps are skipped on a rerun
+        self.checkpoints = checkpoints
 
-        # Ensure output directories exist
-        ensure_directory(SCREENSHOT_DIR)
+        # CDP screenshots written in the background, filtered by policy
+        self.owns_screenshots = screenshots is None
+        self.screenshots = screenshots or ScreenshotService(SCREENSHOT_DIR)
 
-        print("✅ Browser launched successfully")
+        # Results sink (the bot closes only a store it created itself)
+        self.owns_results = results is None
+        self.results = results or ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+
+        if self.owns_driver:
+            print("✅ Browser launched successfully")
 
 
     def register(self, account_data):
@@ -156,10 +280,18 @@ class WorldPostaAutomationBot:
         self.account_data = account_data
         self.status_log['email'] = account_data['email']
 
+        # Backend endpoint first; None means the browser form has to decide
+        if self.registration_client is not None:
+            self.registered_at = time.time()
+            self.registered_at_restored = False
+            registered = register_over_http(self.registration_client, account_data, self.status_log)
+            if registered is not None:
+                return registered
+
         try:
             print(f"🔗 Navigating to: {REGISTRATION_URL}")
-            self.driver.get(REGISTRATION_URL)
-            random_delay(3, 5)
+            self.open_page('register', REGISTRATION_URL)
+            wait_for_page_ready(self.driver)
 
             # Scroll to reveal form
             print("📜 Scrolling to registration form...")
@@ -167,74 +299,26 @@ class WorldPostaAutomationBot:
             self.driver.execute_script(f"window.scrollTo(0, {scroll_amount});")
             random_delay(1, 2)
 
-            # Fill Full Name
-            print(f"👤 Entering full name: {account_data['full_name']}")
-            full_name_input = self.wait.until(
+            # Fill the registration form
+            self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[formcontrolname="FullName"]'))
             )
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", full_name_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, full_name_input)
-            full_name_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(full_name_input, account_data['full_name'])
+            self.fill_strategy.fill_form(self.driver, [
+                ('input[formcontrolname="FullName"]', account_data['full_name'],
+                 f"👤 Entering full name: {account_data['full_name']}"),
+                ('input[formcontrolname="Email"]', account_data['email'],
+                 f"📧 Entering email: {account_data['email']}"),
+                ('input[formcontrolname="Customer"]', account_data['company'],
+                 f"🏢 Entering company: {account_data['company']}"),
+                ('input[formcontrolname="PhoneNumber"]', account_data['phone'],
+                 f"📱 Entering phone: {account_data['phone']}"),
+                ('input[formcontrolname="Password"]', account_data['password'],
+                 "🔑 Entering password"),
+                ('input[formcontrolname="ConfirmPassword"]', account_data['password'],
+                 "🔐 Confirming password"),
+            ])
             random_delay(0.5, 1)
 
-            # Fill Email
-            print(f"📧 Entering email: {account_data['email']}")
-            email_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Email"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", email_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, email_input)
-            email_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(email_input, account_data['email'])
-            random_delay(0.5, 1)
-
-            # Fill Company Name
-            print(f"🏢 Entering company: {account_data['company']}")
-            company_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Customer"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", company_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, company_input)
-            company_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(company_input, account_data['company'])
-            random_delay(0.5, 1)
-
-            # Fill Phone Number
-            print(f"📱 Entering phone: {account_data['phone']}")
-            phone_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="PhoneNumber"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", phone_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, phone_input)
-            phone_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(phone_input, account_data['phone'])
-            random_delay(0.5, 1)
-
-            # Fill Password
-            print(f"🔑 Entering password")
-            password_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Password"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", password_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, password_input)
-            password_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(password_input, account_data['password'])
-            random_delay(0.5, 1)
-
-            # Fill Confirm Password
-            print(f"🔐 Confirming password")
-            confirm_password_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="ConfirmPassword"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", confirm_password_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, confirm_password_input)
-            confirm_password_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(confirm_password_input, account_data['password'])
-            random_delay(1, 2)
-
             # Click Submit Button
             print("🚀 Clicking 'Create Account' button...")
             submit_button = self.wait.until(
@@ -244,10 +328,17 @@ class WorldPostaAutomationBot:
             random_delay(0.5, 1)
             human_like_mouse_move(self.driver, submit_button)
             random_delay(0.3, 0.7)
+            register_page_url = self.driver.current_url
+            submitted = self.expect(navigation_from=register_page_url, response=REGISTER_API_PATH)
+            self.registered_at = time.time()
+            self.registered_at_restored = False
             self.driver.execute_script("arguments[0].click();", submit_button)
 
             print("⏳ Waiting for registration to complete...")
-            random_delay(5, 8)
+            wait_for_event(
+                self.driver, submitted, url_changes(register_page_url), requests_idle(),
+                timeout=DEFAULT_TIMEOUT, description="registration submitted"
+            )
 
             # Check if registration was successful
             # Look for success indicators or if we're redirected
@@ -255,9 +346,7 @@ class WorldPostaAutomationBot:
             print(f"📍 Current URL: {current_url}")
 
             # Take screenshot of registration result
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(account_data['email'], 'registration'))
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot('registration')
 
             print("✅ Registration form submitted successfully")
             return True
@@ -269,10 +358,7 @@ class WorldPostaAutomationBot:
 
             # Take error screenshot
             try:
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(account_data['email'], 'registration_error'))
-                self.driver.save_screenshot(screenshot_path)
-                self.status_log['screenshot_path'] = screenshot_path
-                print(f"📸 Error screenshot saved: {screenshot_path}")
+                self.status_log['screenshot_path'] = self.capture_screenshot('registration_error', failure=True)
             except:
                 pass
 
@@ -296,49 +382,40 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Navigating to: {EMAIL_LOGIN_URL}")
-            self.driver.get(EMAIL_LOGIN_URL)
-            random_delay(3, 5)
+            self.open_page('owa', EMAIL_LOGIN_URL)
+            wait_for_page_ready(self.driver)
 
-            # Enter username
-            print(f"📧 Entering email: {email}")
-            username_input = self.wait.until(
+            # Enter credentials
+            self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input#username'))
             )
-            human_like_mouse_move(self.driver, username_input)
-            username_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(username_input, email)
+            self.fill_strategy.fill_form(self.driver, [
+                ('input#username', email, f"📧 Entering email: {email}"),
+                ('input#password', password, "🔑 Entering password"),
+            ])
             random_delay(0.5, 1)
 
-            # Enter password
-            print(f"🔑 Entering password")
-            password_input = self.driver.find_element(By.CSS_SELECTOR, 'input#password')
-            human_like_mouse_move(self.driver, password_input)
-            password_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(password_input, password)
-            random_delay(1, 2)
-
             # Click login button
             print("🔓 Clicking login button...")
             login_button = self.driver.find_element(By.CSS_SELECTOR, 'div.signinbutton[onclick="clkLgn()"]')
             human_like_mouse_move(self.driver, login_button)
             random_delay(0.3, 0.7)
+            owa_login_url = self.driver.current_url
+            signed_in = self.expect(navigation_from=owa_login_url)
             self.driver.execute_script("arguments[0].click();", login_button)
 
             print("⏳ Waiting for email inbox to load...")
-            random_delay(5, 8)
+            wait_for_navigation(self.driver, owa_login_url, expectation=signed_in)
 
             # Check if login successful
             current_url = self.driver.current_url
             print(f"📍 Current URL: {current_url}")
 
             # Take screenshot
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(email, 'email_login'))
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot('email_login')
 
             print("✅ Email login successful")
+            self.email_session_open = True
             return True
 
         except Exception as e:
@@ -348,10 +425,7 @@ class WorldPostaAutomationBot:
 
             # Take error screenshot
             try:
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(email, 'email_login_error'))
-                self.driver.save_screenshot(screenshot_path)
-                self.status_log['screenshot_path'] = screenshot_path
-                print(f"📸 Error screenshot saved: {screenshot_path}")
+                self.status_log['screenshot_path'] = self.capture_screenshot('email_login_error', failure=True)
             except:
                 pass
 
@@ -372,14 +446,44 @@ class WorldPostaAutomationBot:
         print("🔍 STEP 3: FINDING VERIFICATION EMAIL")
         print("="*60)
 
-        subject_keyword = "Welcome To WorldPosta Business Email"
+        subject_keyword = EMAIL_SUBJECT_KEYWORD
         print(f"🔎 Looking for email with subject containing: '{subject_keyword}'")
         print(f"⏱️  Maximum wait time: {timeout} seconds")
 
         start_time = time.time()
         attempt = 0
+        email = self.account_data['email']
+
+        # Protocol-level mailbox first, browser inbox poller as fallback
+        if self.mailbox is not None:
+            self.verification_message = wait_for_verification_mail(
+                self.mailbox, email, self.account_data['password'], subject_keyword, timeout
+            )
+            if self.verification_message is not None:
+                # A checkpointed submit can't be timed: the mail may predate this run
+                if self.registered_at and not self.registered_at_restored:
+                    self.mail_latency.record(email, time.time() - self.registered_at, self.mailbox.name)
+                return True
+
+            if time.time() - start_time < timeout:
+                print("🔁 Falling back to the browser inbox poller...")
+                if not self.email_session_open and not self.login_to_email(
+                        self.account_data['email'], self.account_data['password']):
+                    return False
+
+        # Poll around the expected arrival instead of at a fixed interval
+        schedule = self.mail_latency.schedule()
+        since = self.registered_at or start_time
+        deadline = start_time + timeout
+        last_miss = None
+        print(f"📈 Inbox polling: {schedule.describe()}")
 
         try:
+            lead_in = min(schedule.initial_delay(time.time() - since), deadline - time.time())
+            if lead_in > 0:
+                print(f"⏳ Mail expected later, first check in {lead_in:.0f}s...")
+                time.sleep(lead_in)
+
             while time.time() - start_time < timeout:
                 attempt += 1
                 elapsed = int(time.time() - start_time)
@@ -387,73 +491,62 @@ class WorldPostaAutomationBot:
 
                 # Refresh inbox
                 print("🔄 Refreshing inbox...")
+                checked_at = time.time()
                 self.driver.refresh()
-                random_delay(3, 5)
-
-                # Get page source and parse
-                html = self.driver.page_source
-                soup = BeautifulSoup(html, "html.parser")
-
-                # Try multiple selectors for email rows
-                email_selectors = [
-                    'div[role="listitem"]',
-                    'div[role="option"]',
-                    'div.ms-List-cell',
-                    'div._lvv_E',
-                    'tr[role="row"]',
-                    'div[data-convid]',
-                    'div.customScrollBar div[tabindex]'
-                ]
+
+                # Continue as soon as the message list has rendered (armed after the
+                # blocking refresh, so rows of the old document cannot match)
+                scanner = shared_inbox_scanner()
+                rendered = self.expect(selector=', '.join(scanner.ordered()))
+                wait_for_event(self.driver, rendered, scanner.rows_rendered, timeout=15, description="inbox rows")
+
+                # Every row selector is evaluated in the page; only matching rows come back
+                scan = scanner.scan(self.driver, subject_keyword)
+                print(f"   📋 Rows per selector: {', '.join(f'{s}={n}' for s, n in scan.counts.items())}")
 
                 email_found = False
 
-                for selector in email_selectors:
+                for row in scan.rows:
                     try:
-                        # Use Selenium to find elements
-                        email_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                        print(f"   📋 Found {len(email_elements)} elements with selector: {selector}")
-
-                        for idx, elem in enumerate(email_elements):
-                            try:
-                                elem_text = elem.text
-                                if subject_keyword.lower() in elem_text.lower():
-                                    print(f"✅ Found verification email!")
-                                    print(f"📧 Element text: {elem_text[:100]}...")
-
-                                    # Scroll to element
-                                    self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", elem)
-                                    random_delay(1, 2)
-
-                                    # Click to open
-                                    print("🖱️  Clicking to open email...")
-                                    human_like_mouse_move(self.driver, elem)
-                                    random_delay(0.5, 1)
-                                    elem.click()
-                                    random_delay(3, 5)
-
-                                    # Take screenshot
-                                    screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'email_found'))
-                                    self.driver.save_screenshot(screenshot_path)
-                                    print(f"📸 Screenshot saved: {screenshot_path}")
-
-                                    email_found = True
-                                    break
-                            except Exception as e:
-                                continue
-
-                        if email_found:
-                            break
-
+                        elem = row['element']
+                        print(f"✅ Found verification email! (selector: {scan.selector})")
+                        print(f"📧 {row['sender']} | {row['subject'][:100]} | {row['received']}")
+
+                        # Scroll to element
+                        self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", elem)
+                        random_delay(1, 2)
+
+                        # Click to open
+                        print("🖱️  Clicking to open email...")
+                        human_like_mouse_move(self.driver, elem)
+                        random_delay(0.5, 1)
+                        opened = self.expect(selector=VERIFICATION_LINK_SELECTOR)
+                        elem.click()
+                        wait_for_event(
+                            self.driver, opened, *VERIFICATION_LINK_CONDITIONS,
+                            timeout=15, description="email body"
+                        )
+
+                        # Take screenshot
+                        self.capture_screenshot('email_found')
+
+                        email_found = True
+                        break
                     except Exception as e:
                         continue
 
                 if email_found:
                     print("✅ Verification email opened successfully")
+                    # The mail landed between the last miss (or the submit) and this check
+                    latency = arrival_latency(self.registered_at, last_miss, checked_at, self.registered_at_restored)
+                    self.mail_latency.record(email, latency, 'owa')
                     return True
 
                 # Wait before next attempt
-                print(f"⏳ Email not found yet, waiting 15 seconds before retry...")
-                time.sleep(15)
+                last_miss = checked_at
+                print(f"⏳ Email not found yet, next check in "
+                      f"{schedule.next_delay(time.time() - since):.0f} seconds...")
+                sleep_until_next_poll(schedule, since, deadline)
 
             # Timeout reached
             error_msg = f"Verification email not found after {timeout} seconds"
@@ -480,67 +573,27 @@ class WorldPostaAutomationBot:
         print("="*60)
 
         try:
-            # Wait for email body to load
-            random_delay(3, 5)
-
-            # Get page source
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-
-            # Try to find verification link
-            # Look for link with "Confirm Email Address" text or href containing "ConfirmEmail"
-
             print("🔍 Searching for verification link in email body...")
-
-            # Method 1: Find by text
-            links = soup.find_all("a", string=lambda text: text and "Confirm Email" in text)
-            if links:
-                verification_url = links[0].get("href")
-                if verification_url:
-                    print(f"✅ Found verification link (by text)")
-                    print(f"🔗 URL: {verification_url}")
-                    return verification_url
-
-            # Method 2: Find by href pattern
-            links = soup.find_all("a", href=lambda href: href and "ConfirmEmail" in href)
-            if links:
-                verification_url = links[0].get("href")
-                if verification_url:
-                    print(f"✅ Found verification link (by href pattern)")
-                    print(f"🔗 URL: {verification_url}")
-                    return verification_url
-
-            # Method 3: Try using Selenium to find clickable link
-            print("🔍 Trying Selenium to find clickable link...")
-            try:
-                link_element = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Confirm Email')]")
-                verification_url = link_element.get_attribute("href")
-                if verification_url:
-                    print(f"✅ Found verification link (via Selenium)")
-                    print(f"🔗 URL: {verification_url}")
-                    return verification_url
-            except:
-                pass
-
-            # Method 4: Find any link with ConfirmEmail in href using Selenium
-            try:
-                link_element = self.driver.find_element(By.XPATH, "//a[contains(@href, 'ConfirmEmail')]")
-                verification_url = link_element.get_attribute("href")
-                if verification_url:
-                    print(f"✅ Found verification link (via Selenium href)")
-                    print(f"🔗 URL: {verification_url}")
-                    return verification_url
-            except:
-                pass
+            if self.verification_message is not None:
+                # Body was delivered by the mailbox client
+                link = extract_from_message(self.verification_message)
+            else:
+                # Wait for email body to load, then read only the reading pane
+                wait_until(self.driver, *VERIFICATION_LINK_CONDITIONS, timeout=15, description="verification link")
+                link = extract_from_driver(self.driver)
+
+            if link:
+                self.verification_link = link
+                print(f"✅ Found verification link: '{link.text}'")
+                print(f"🔗 URL: {link.url}")
+                return link.url
 
             error_msg = "Could not find verification link in email"
             print(f"❌ {error_msg}")
             self.status_log['error_message'] = error_msg
 
             # Take screenshot for debugging
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'no_link_found'))
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot('no_link_found', failure=True)
 
             return None
 
@@ -567,17 +620,15 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Navigating to verification URL...")
-            self.driver.get(verification_url)
-            random_delay(5, 8)
+            self.open_page('confirm', verification_url)
+            wait_for_requests_idle(self.driver, quiet=1.0)
 
             # Check result
             current_url = self.driver.current_url
             print(f"📍 Current URL: {current_url}")
 
             # Take screenshot
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'email_confirmed'))
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot('email_confirmed')
 
             print("✅ Email confirmation completed")
             return True
@@ -589,10 +640,7 @@ class WorldPostaAutomationBot:
 
             # Take error screenshot
             try:
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'confirmation_error'))
-                self.driver.save_screenshot(screenshot_path)
-                self.status_log['screenshot_path'] = screenshot_path
-                print(f"📸 Error screenshot saved: {screenshot_path}")
+                self.status_log['screenshot_path'] = self.capture_screenshot('confirmation_error', failure=True)
             except:
                 pass
 
@@ -616,32 +664,18 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Navigating to: {LOGIN_URL}")
-            self.driver.get(LOGIN_URL)
-            random_delay(3, 5)
+            self.open_page('login', LOGIN_URL)
+            wait_for_page_ready(self.driver)
 
-            # Enter email
-            print(f"📧 Entering email: {email}")
-            email_input = self.wait.until(
+            # Enter credentials
+            self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[formcontrolname="Email"]'))
             )
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", email_input)
+            self.fill_strategy.fill_form(self.driver, [
+                ('input[formcontrolname="Email"]', email, f"📧 Entering email: {email}"),
+                ('input[formcontrolname="Password"]', password, "🔑 Entering password"),
+            ])
             random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, email_input)
-            email_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(email_input, email)
-            random_delay(0.5, 1)
-
-            # Enter password
-            print(f"🔑 Entering password")
-            password_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Password"]')
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", password_input)
-            random_delay(0.5, 1)
-            human_like_mouse_move(self.driver, password_input)
-            password_input.click()
-            random_delay(0.3, 0.6)
-            human_like_typing(password_input, password)
-            random_delay(1, 2)
 
             # Click Sign In button
             print("🚀 Clicking 'Sign in' button...")
@@ -652,19 +686,19 @@ class WorldPostaAutomationBot:
             random_delay(0.5, 1)
             human_like_mouse_move(self.driver, signin_button)
             random_delay(0.3, 0.7)
+            login_page_url = self.driver.current_url
+            signed_in = self.expect(navigation_from=login_page_url)
             self.driver.execute_script("arguments[0].click();", signin_button)
 
             print("⏳ Waiting for dashboard to load...")
-            random_delay(5, 8)
+            wait_for_navigation(self.driver, login_page_url, expectation=signed_in)
 
             # Check if login successful
             current_url = self.driver.current_url
             print(f"📍 Current URL: {current_url}")
 
             # Take screenshot
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(email, 'website_login'))
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot('website_login')
 
             print("✅ Website login successful")
             return True
@@ -676,10 +710,7 @@ class WorldPostaAutomationBot:
 
             # Take error screenshot
             try:
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(email, 'website_login_error'))
-                self.driver.save_screenshot(screenshot_path)
-                self.status_log['screenshot_path'] = screenshot_path
-                print(f"📸 Error screenshot saved: {screenshot_path}")
+                self.status_log['screenshot_path'] = self.capture_screenshot('website_login_error', failure=True)
             except:
                 pass
 
@@ -699,7 +730,7 @@ class WorldPostaAutomationBot:
 
         try:
             # Wait for dashboard to fully load
-            random_delay(3, 5)
+            wait_until(self.driver, element_present(LAUNCH_BUTTON_SELECTOR), description="dashboard buttons")
 
             # Scroll to reveal buttons
             print("📜 Scrolling to reveal action buttons...")
@@ -709,7 +740,7 @@ class WorldPostaAutomationBot:
 
             # Find all launch buttons
             print("🔍 Finding launch buttons...")
-            launch_buttons = self.driver.find_elements(By.CSS_SELECTOR, 'button.launch-button')
+            launch_buttons = self.driver.find_elements(By.CSS_SELECTOR, LAUNCH_BUTTON_SELECTOR)
             print(f"   Found {len(launch_buttons)} launch buttons")
 
             if len(launch_buttons) < 2:
@@ -725,24 +756,30 @@ class WorldPostaAutomationBot:
                 random_delay(1, 2)
                 human_like_mouse_move(self.driver, posta_button)
                 random_delay(0.5, 1)
+                dashboard_url = self.driver.current_url
+                dashboard_handles = self.driver.window_handles
+                launched = self.expect(navigation_from=dashboard_url, new_window=True)
                 self.driver.execute_script("arguments[0].click();", posta_button)
                 print("✅ Clicked 'View Posta' button")
-                random_delay(3, 5)
+                wait_for_event(
+                    self.driver, launched, url_changes(dashboard_url), EC.new_window_is_opened(dashboard_handles),
+                    timeout=15, description="launch"
+                )
 
                 # Take screenshot
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'view_posta'))
-                self.driver.save_screenshot(screenshot_path)
-                print(f"📸 Screenshot saved: {screenshot_path}")
+                self.capture_screenshot('view_posta')
 
                 # Navigate back if needed
                 print("⬅️  Navigating back to dashboard...")
                 self.driver.back()
-                random_delay(3, 5)
+                dashboard = self.expect(selector=LAUNCH_BUTTON_SELECTOR)
+                wait_for_event(self.driver, dashboard, element_present(LAUNCH_BUTTON_SELECTOR),
+                               description="dashboard buttons")
 
             # Click second button (View CloudEdge)
             if len(launch_buttons) >= 2:
                 # Re-find buttons after navigation
-                launch_buttons = self.driver.find_elements(By.CSS_SELECTOR, 'button.launch-button')
+                launch_buttons = self.driver.find_elements(By.CSS_SELECTOR, LAUNCH_BUTTON_SELECTOR)
 
                 print("🖱️  Clicking 'View CloudEdge' button...")
                 cloudedge_button = launch_buttons[1]
@@ -750,14 +787,18 @@ class WorldPostaAutomationBot:
                 random_delay(1, 2)
                 human_like_mouse_move(self.driver, cloudedge_button)
                 random_delay(0.5, 1)
+                dashboard_url = self.driver.current_url
+                dashboard_handles = self.driver.window_handles
+                launched = self.expect(navigation_from=dashboard_url, new_window=True)
                 self.driver.execute_script("arguments[0].click();", cloudedge_button)
                 print("✅ Clicked 'View CloudEdge' button")
-                random_delay(3, 5)
+                wait_for_event(
+                    self.driver, launched, url_changes(dashboard_url), EC.new_window_is_opened(dashboard_handles),
+                    timeout=15, description="launch"
+                )
 
                 # Take screenshot
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'view_cloudedge'))
-                self.driver.save_screenshot(screenshot_path)
-                print(f"📸 Screenshot saved: {screenshot_path}")
+                self.capture_screenshot('view_cloudedge')
 
             print("✅ All post-login actions completed")
             return True
@@ -769,32 +810,49 @@ class WorldPostaAutomationBot:
 
             # Take error screenshot
             try:
-                screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'post_login_error'))
-                self.driver.save_screenshot(screenshot_path)
-                self.status_log['screenshot_path'] = screenshot_path
-                print(f"📸 Error screenshot saved: {screenshot_path}")
+                self.status_log['screenshot_path'] = self.capture_screenshot('post_login_error', failure=True)
             except:
                 pass
 
             return False
 
 
+    def open_page(self, page, url):
+        """Navigate to a workflow page, with the lean profile's blocking for it"""
+        if self.lean is not None:
+            email = self.account_data['email'] if self.account_data else ''
+            keeps_screenshots = self.screenshots.policy.should_capture(email)
+            self.lean.apply(self.driver, page, screenshots=keeps_screenshots)
+        self.driver.get(url)
+
+    def expect(self, **events):
+        """Arm a CDP event expectation before an action (None when events are off)"""
+        return self.events.expect(**events) if self.events is not None else None
+
+    def capture_screenshot(self, label, failure=False):
+        """
+        Screenshot the current page for this account through the screenshot service
+
+        Returns:
+            str: Image path, or '' when the policy skipped it
+        """
+        return self.screenshots.capture(self.driver, self.account_data['email'], label, failure) or ''
+
     def take_final_screenshot(self):
         """Take final screenshot after completing all steps"""
         print("\n📸 Taking final screenshot...")
         try:
-            screenshot_path = os.path.join(SCREENSHOT_DIR, get_screenshot_filename(self.account_data['email'], 'final_success'))
-            self.driver.save_screenshot(screenshot_path)
-            self.status_log['screenshot_path'] = screenshot_path
-            print(f"✅ Final screenshot saved: {screenshot_path}")
-            return screenshot_path
+            screenshot_path = self.capture_screenshot('final_success')
+            if screenshot_path:
+                self.status_log['screenshot_path'] = screenshot_path
+            return screenshot_path or None
         except Exception as e:
             print(f"⚠ Could not take final screenshot: {e}")
             return None
 
 
     def save_status(self):
-        """Save automation status to CSV and JSON"""
+        """Save automation status to the results store"""
         print("\n" + "="*60)
         print("💾 SAVING RESULTS")
         print("="*60)
@@ -803,29 +861,9 @@ class WorldPostaAutomationBot:
             # Update timestamp
             self.status_log['timestamp'] = get_timestamp()
 
-            # Save to CSV
-            csv_exists = os.path.exists(CSV_FILE)
-            with open(CSV_FILE, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['timestamp', 'email', 'status', 'error_message', 'screenshot_path'])
-                if not csv_exists:
-                    writer.writeheader()
-                writer.writerow(self.status_log)
-            print(f"✅ Status saved to CSV: {CSV_FILE}")
-
-            # Save to JSON
-            json_data = []
-            if os.path.exists(JSON_FILE):
-                with open(JSON_FILE, 'r', encoding='utf-8') as f:
-                    try:
-                        json_data = json.load(f)
-                    except:
-                        json_data = []
-
-            json_data.append(self.status_log)
-
-            with open(JSON_FILE, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
-            print(f"✅ Status saved to JSON: {JSON_FILE}")
+            # Append to CSV / JSONL / SQLite (constant time, safe for parallel runs)
+            self.results.add(dict(self.status_log))
+            print(f"✅ Status saved to: {CSV_FILE}, {RESULTS_JSONL}, {RESULTS_DB}")
 
         except Exception as e:
             print(f"⚠ Error saving status: {e}")
@@ -851,6 +889,8 @@ class WorldPostaAutomationBot:
                 print("🎲 Generating random test account data...")
                 account_data = generate_test_data()
 
+            self.begin_account(account_data)
+
             print(f"\n📋 Account Data:")
             print(f"   Full Name: {account_data['full_name']}")
             print(f"   Email: {account_data['email']}")
@@ -858,48 +898,21 @@ class WorldPostaAutomationBot:
             print(f"   Phone: {account_data['phone']}")
             print(f"   Password: {'*' * len(account_data['password'])}")
 
-            # Step 1: Register
-            if not self.register(account_data):
-                self.status_log['status'] = 'failed_registration'
-                self.save_status()
-                return False
-
-            # Step 2: Login to email
-            if not self.login_to_email(account_data['email'], account_data['password']):
-                self.status_log['status'] = 'failed_email_login'
-                self.save_status()
-                return False
-
-            # Step 3: Find verification email
-            if not self.find_verification_email():
-                self.status_log['status'] = 'failed_email_not_found'
-                self.save_status()
-                return False
-
-            # Step 4: Extract verification link
-            verification_url = self.extract_verification_link()
-            if not verification_url:
-                self.status_log['status'] = 'failed_no_verification_link'
-                self.save_status()
-                return False
-
-            # Step 5: Confirm email
-            if not self.confirm_email(verification_url):
-                self.status_log['status'] = 'failed_email_confirmation'
-                self.save_status()
-                return False
-
-            # Step 6: Login to website
-            if not self.login_to_website(account_data['email'], account_data['password']):
-                self.status_log['status'] = 'failed_website_login'
-                self.save_status()
-                return False
-
-            # Step 7: Perform post-login actions
-            if not self.perform_post_login_actions():
-                self.status_log['status'] = 'failed_post_login_actions'
-                self.save_status()
-                return False
+            # Resume after the last checkpointed step (0 without checkpoints)
+            steps = self.workflow_steps(account_data)
+            start = self.resume_point(account_data['email'], steps)
+            if start == len(steps):
+                print(f"⏩ All steps already completed for {account_data['email']}, skipping")
+                return True
+
+            # Steps 1-7, each timed as a span under the account's correlation ID
+            with self.tracer.span('account', self.correlation_id, email=account_data['email']) as account_span:
+                failed_status = self.run_steps(steps[start:], account_span)
+                if failed_status:
+                    account_span.set_result(False, failed_status)
+                    self.status_log['status'] = failed_status
+                    self.save_status()
+                    return False
 
             # Step 8: Take final screenshot
             self.take_final_screenshot()
@@ -922,15 +935,127 @@ class WorldPostaAutomationBot:
             self.save_status()
             return False
 
+        finally:
+            self.tracer.flush()
 
-    def close(self):
-        """Close browser and cleanup"""
+    def begin_account(self, account_data, correlation_id=None):
+        """
+        Start from clean per-account state so a reused bot never carries
+        errors or screenshots over from the previous account
+        """
+        self.account_data = account_data
+        self.status_log = new_status_log(account_data['email'])
+        self.verification_message = None
+        self.email_session_open = False
+        self.verification_url = None
+        self.verification_link = None
+        self.registered_at = None
+        self.registered_at_restored = False
+        self.correlation_id = correlation_id or new_correlation_id()
+        self.status_log['correlation_id'] = self.correlation_id
+
+    def run_steps(self, steps, parent_span=None):
+        """
+        Run workflow steps in order, each as a span, checkpointing every outcome
+
+        Args:
+            steps: (step_name, action, failed_status) tuples from workflow_steps()
+            parent_span: Optional span the step spans belong to
+
+        Returns:
+            str: failed_status of the first failing step, or None if all succeeded
+        """
+        for step, action, failed_status in steps:
+            with self.tracer.span(step, self.correlation_id, parent=parent_span,
+                                  email=self.account_data['email']) as span:
+                ok = action()
+                span.set_result(ok, failed_status)
+            self.save_checkpoint(step, ok, failed_status)
+
+            if not ok:
+                return failed_status
+        return None
+
+    def workflow_steps(self, account_data):
+        """
+        Ordered workflow steps
+
+        Returns:
+            List of (step_name, action, failed_status); action() returns a
+            truthy value on success
+        """
+        email, password = account_data['email'], account_data['password']
+        steps = [('register', lambda: self.register(account_data), 'failed_registration')]
+
+        # A protocol mailbox client needs no browser email session
+        if self.mailbox is None:
+            steps.append(('email_login', lambda: self.login_to_email(email, password), 'failed_email_login'))
+
+        steps += [
+            ('find_email', self.find_verification_email, 'failed_email_not_found'),
+            ('extract_link', self.extract_verification_step, 'failed_no_verification_link'),
+            ('confirm_email', lambda: self.confirm_email(self.verification_url), 'failed_email_confirmation'),
+            ('website_login', lambda: self.login_to_website(email, password), 'failed_website_login'),
+            ('post_login', self.perform_post_login_actions, 'failed_post_login_actions'),
+        ]
+        return steps
+
+    def resume_point(self, email, steps):
+        """Index of the first step to run for this account, restoring saved step data"""
+        if self.checkpoints is None:
+            return 0
+
+        completed = self.checkpoints.completed_steps(email)
+        self.verification_url = completed.get('extract_link', {}).get('verification_url')
+        self.registered_at = completed.get('register', {}).get('submitted_at')
+        self.registered_at_restored = self.registered_at is not None
+        start = resume_index([name for name, _, _ in steps], completed)
+        if 0 < start < len(steps):
+            print(f"⏩ Resuming {email} at step '{steps[start][0]}' ({len(completed)} steps checkpointed)")
+        return start
+
+    def save_checkpoint(self, step, ok, failed_status):
+        """Persist a step outcome; the verification URL is kept so confirm can resume alone"""
+        if self.checkpoints is None:
+            return
+        data = None
+        if step == 'extract_link' and ok:
+            data = {'verification_url': self.verification_url}
+        elif step == 'register' and ok and self.registered_at:
+            data = {'submitted_at': self.registered_at}
         try:
-            print("\n🔒 Closing browser...")
-            self.driver.quit()
-            print("✅ Browser closed")
+            self.checkpoints.record(self.account_data['email'], step, ok, data, '' if ok else failed_status)
         except Exception as e:
-            print(f"⚠ Error closing browser: {e}")
+            print(f"⚠ Could not save checkpoint for {step}: {e}")
+
+    def extract_verification_step(self):
+        """Extract the verification link and keep it for the confirm step"""
+        self.verification_url = self.extract_verification_link()
+        return bool(self.verification_url)
+
+    def close(self):
+        """Close browser and cleanup"""
+        if self.events is not None:
+            self.events.close()
+        if self.asset_interceptor is not None:
+            self.asset_interceptor.close()
+        if self.owns_driver:
+            try:
+                print("\n🔒 Closing browser...")
+                self.driver.quit()
+                print("✅ Browser closed")
+            except Exception as e:
+                print(f"⚠ Error closing browser: {e}")
+
+        if self.lean is not None:
+            self.lean.forget(self.driver)
+        if self.owns_screenshots:
+            self.screenshots.close()
+        if self.owns_results:
+            self.results.close()
+        if self.registration_client is not None:
+            self.registration_client.close()
+        self.tracer.close()
 
 
 # =====================================================
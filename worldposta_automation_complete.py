@@ -6,11 +6,9 @@ All-in-one script for registration, email verification, and login automation
 import time
 import random
 import os
-import csv
 import json
 import argparse
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 # Selenium / Driver
 import undetected_chromedriver as uc
@@ -22,14 +20,40 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 
+# Step completion waits / timing profiles
+from browser_pool import BrowserPool, DEFAULT_POOL_SIZE, MAX_USES
+from http_registration import REGISTRATION_ENGINES, create_registration_client, register_over_http
+from lean_profile import LOAD_PROFILE, LOAD_PROFILES, LEAN_CHROME_ARGS, create_load_profile
+from asset_cache import ASSET_CACHE, attach_asset_cache
+from cdp_events import attach_page_events
+from form_fill import FILL_STRATEGIES, get_fill_strategy
+from inbox_scanner import shared_inbox_scanner
+from mail_latency import shared_mail_latency, sleep_until_next_poll, arrival_latency
+from link_extractor import extract_from_driver, extract_from_message
+from mail_client import MAILBOX_BACKENDS, create_mailbox_client, wait_for_verification_mail
+from results_store import ResultsStore
+from screenshots import ScreenshotService
+from screenshot_store import SCREENSHOT_DIR
+from telemetry import create_tracer, new_correlation_id
+from checkpoints import resume_index
+from waits import (
+    TIMING_PROFILES, delay_scale, set_timing_profile, install_request_tracker,
+    wait_until, wait_for_page_ready, wait_for_requests_idle, wait_for_navigation, wait_for_event,
+    element_present, url_changes, url_contains, requests_idle
+)
+
 
 # =====================================================
 # CONFIGURATION
 # =====================================================
 
-REGISTRATION_URL = "https://admin.worldposta.com/auth/register"
-EMAIL_LOGIN_URL = "https://mail.worldposta.com/"
-LOGIN_URL = "https://admin.worldposta.com/auth/login"
+# Sites (override to run against local_standin.py)
+ADMIN_URL = os.environ.get("WORLDPOSTA_ADMIN_URL", "https://admin.worldposta.com")
+MAIL_URL = os.environ.get("WORLDPOSTA_MAIL_URL", "https://mail.worldposta.com")
+
+REGISTRATION_URL = ADMIN_URL + "/auth/register"
+EMAIL_LOGIN_URL = MAIL_URL + "/"
+LOGIN_URL = ADMIN_URL + "/auth/login"
 
 EMAIL_DOMAIN = "@worldposta.com"
 EMAIL_SUBJECT_KEYWORD = "Welcome To Worldposta"
@@ -37,11 +61,17 @@ EMAIL_SUBJECT_KEYWORD = "Welcome To Worldposta"
 EMAIL_WAIT_TIMEOUT = 300
 DEFAULT_TIMEOUT = 30
 
-# Save screenshots INSIDE repo
-SCREENSHOT_DIR = "screenshots"
+REGISTER_API_PATH = "/api/auth/register"
+LAUNCH_BUTTON_SELECTOR = "button.launch-button"
+VERIFICATION_LINK_SELECTOR = 'a[href*="ConfirmEmail"]'
+VERIFICATION_LINK_CONDITIONS = (
+    element_present(VERIFICATION_LINK_SELECTOR),
+    EC.presence_of_element_located((By.XPATH, "//a[contains(text(),'Confirm Email')]")),
+)
 
 CSV_FILE = "registration_results.csv"
-JSON_FILE = "registration_results.json"
+RESULTS_JSONL = "registration_results.jsonl"
+RESULTS_DB = "registration_results.db"
 
 CUSTOM_TEST_ACCOUNT = {
     'full_name': "AI dexter201",
@@ -57,7 +87,9 @@ CUSTOM_TEST_ACCOUNT = {
 # =====================================================
 
 def random_delay(min_sec=1, max_sec=3):
-    time.sleep(random.uniform(min_sec, max_sec))
+    scale = delay_scale()
+    if scale > 0:
+        time.sleep(random.uniform(min_sec, max_sec) * scale)
 
 
 def human_like_mouse_move(driver, element):
@@ -69,9 +101,11 @@ def human_like_mouse_move(driver, element):
 
 
 def human_like_typing(element, text):
+    scale = delay_scale()
     for char in text:
         element.send_keys(char)
-        time.sleep(random.uniform(0.05, 0.15))
+        if scale > 0:
+            time.sleep(random.uniform(0.05, 0.15) * scale)
 
 
 def generate_random_account():
@@ -95,10 +129,47 @@ def get_timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def get_screenshot_filename(email, status):
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe = email.replace("@", "_at_").replace(".", "_")
-    return f"{safe}_{status}_{ts}.png"
+# =====================================================
+# BROWSER LAUNCH
+# =====================================================
+
+BROWSER_EXECUTABLE_PATH = "/usr/bin/google-chrome"
+
+
+def create_driver(headless=False, load_profile=None):
+    options = uc.ChromeOptions()
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+
+    if headless:
+        options.add_argument("--headless=new")
+
+    # Lean profile: no background downloads/services (--disable-extensions is already set)
+    if (load_profile or LOAD_PROFILE) == 'lean':
+        for argument in LEAN_CHROME_ARGS:
+            if argument != "--disable-extensions":
+                options.add_argument(argument)
+
+    # ✅ FINAL WORKING LAUNCHER (only one)
+    driver = uc.Chrome(
+        options=options,
+        browser_executable_path=BROWSER_EXECUTABLE_PATH,
+        driver_executable_path=None,   # UC auto-installs matching driver
+        use_subprocess=True
+    )
+
+    driver.set_page_load_timeout(60)
+    install_request_tracker(driver)
+    return driver
+
+
+def create_browser_pool(size=DEFAULT_POOL_SIZE, headless=False, max_uses=MAX_USES, load_profile=None):
+    """Start a BrowserPool of pre-launched Chrome instances"""
+    return BrowserPool(lambda: create_driver(headless, load_profile), size=size, max_uses=max_uses).start()
 
 
 # =====================================================
@@ -106,36 +177,85 @@ def get_screenshot_filename(email, status):
 # =====================================================
 
 class WorldPostaAutomationBot:
-    def __init__(self, headless=False):
-        print("🌐 Launching Chrome (system installation)...")
-
-        ensure_directory(SCREENSHOT_DIR)
-
-        browser_executable_path = "/usr/bin/google-chrome"
-
-        options = uc.ChromeOptions()
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-
-        if headless:
-            options.add_argument("--headless=new")
-
-        # ✅ FINAL WORKING LAUNCHER (only one)
-        self.driver = uc.Chrome(
-            options=options,
-            browser_executable_path=browser_executable_path,
-            driver_executable_path=None,   # UC auto-installs matching driver
-            use_subprocess=True
-        )
+    def __init__(self, headless=False, timing_profile=None, fill_strategy=None, mailbox=None, results=None,
+                 driver=None, tracer=None, checkpoints=None, screenshots=None, registration_engine=None,
+                 load_profile=None, asset_cache=None):
+        if driver is None:
+            print("🌐 Launching Chrome (system installation)...")
+
+        if timing_profile:
+            set_timing_profile(timing_profile)
+
+        # None keeps the per-step defaults (typing on register, bulk on logins)
+        self.fill_strategy = get_fill_strategy(fill_strategy) if fill_strategy else None
+
+        # IMAP/EWS client for the verification email (None = OWA poller)
+        self.mailbox = create_mailbox_client(mailbox) if mailbox is None or isinstance(mailbox, str) else mailbox
+
+        # OWA row scanner (shared: remembers which row selector matched across accounts)
+        self.inbox_scanner = shared_inbox_scanner()
+
+        # Registration-to-mail latencies; inbox polls follow their distribution
+        self.mail_latency = shared_mail_latency()
+        self.registered_at = None
+        self.registered_at_restored = False  # submit time came from an earlier run's checkpoint
 
-        self.driver.set_page_load_timeout(60)
+        # Backend registration client (None = browser form only)
+        self.registration_client = create_registration_client(registration_engine)
+
+        # Per-page resource blocking (None = full loading)
+        self.lean = create_load_profile(load_profile)
+        self.verification_message = None
+        self.email_session_open = False
+        self.verification_url = None
+        self.verification_link = None
+        self.correlation_id = None
+
+        # Per-step spans (WORLDPOSTA_OTLP_ENDPOINT / WORLDPOSTA_METRICS_FILE)
+        self.tracer = tracer or create_tracer()
+
+        # Optional CheckpointStore: completed steps are skipped on a rerun
+        self.checkpoints = checkpoints
+
+        # Results sink (the bot closes only a store it created itself)
+        self.owns_results = results is None
+        self.results = results or ResultsStore(jsonl_path=RESULTS_JSONL, db_path=RESULTS_DB, csv_path=CSV_FILE)
+
+        # CDP screenshots, written in the background (WORLDPOSTA_SCREENSHOTS policy)
+        self.owns_screenshots = screenshots is None
+        self.screenshots = screenshots or ScreenshotService(SCREENSHOT_DIR)
+
+        # A driver leased from a BrowserPool is reset and reused, never quit here
+        self.owns_driver = driver is None
+        self.driver = driver or create_driver(headless, load_profile)
         self.wait = WebDriverWait(self.driver, DEFAULT_TIMEOUT)
 
-        print("✅ Chrome launched successfully using system installation")
+        # Scripts/styles/fonts from the shared on-disk cache (WORLDPOSTA_ASSET_CACHE)
+        asset_cache = ASSET_CACHE if asset_cache is None else asset_cache
+        self.asset_interceptor = None
+        if asset_cache:
+            self.asset_interceptor = attach_asset_cache(self.driver, None if asset_cache is True else asset_cache)
+
+        # Page/network/DOM events instead of polling (WORLDPOSTA_CDP_EVENTS=0 to poll)
+        self.events = attach_page_events(self.driver)
+
+        if self.owns_driver:
+            print("✅ Chrome launched successfully using system installation")
+
+    def open_page(self, page, url):
+        """Navigate to a workflow page, with the lean profile's blocking for it"""
+        if self.lean is not None:
+            email = self.account_data['email'] if self.account_data else ''
+            self.lean.apply(self.driver, page, screenshots=self.screenshots.policy.should_capture(email))
+        self.driver.get(url)
+
+    def expect(self, **events):
+        """Arm a CDP event expectation before an action (None when events are off)"""
+        return self.events.expect(**events) if self.events is not None else None
+
+    def get_fill_strategy(self, step_default):
+        """Run-wide fill strategy if one was chosen, else the step's default"""
+        return self.fill_strategy or get_fill_strategy(step_default)
 
     # =====================================================
     # STEP 1 — REGISTRATION
@@ -148,68 +268,53 @@ class WorldPostaAutomationBot:
         self.account_data = account_data
         self.status_log = {'email': account_data['email']}
 
+        # Backend endpoint first; None means the browser form has to decide
+        if self.registration_client is not None:
+            self.registered_at = time.time()
+            self.registered_at_restored = False
+            registered = register_over_http(self.registration_client, account_data, self.status_log)
+            if registered is not None:
+                return registered
+
         try:
             print(f"🔗 Navigating to: {REGISTRATION_URL}")
-            self.driver.get(REGISTRATION_URL)
-            random_delay(3, 5)
+            self.open_page('register', REGISTRATION_URL)
+            wait_for_page_ready(self.driver)
 
             print("📜 Scrolling to registration form...")
             self.driver.execute_script("window.scrollTo(0, 400);")
             random_delay(1, 2)
 
-            # Full name
-            full_name_input = self.wait.until(
+            self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[formcontrolname="FullName"]'))
             )
-            human_like_mouse_move(self.driver, full_name_input)
-            full_name_input.click()
-            human_like_typing(full_name_input, account_data['full_name'])
-
-            # Email
-            email_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Email"]')
-            human_like_mouse_move(self.driver, email_input)
-            email_input.click()
-            human_like_typing(email_input, account_data['email'])
-
-            # Company
-            company_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Customer"]')
-            human_like_mouse_move(self.driver, company_input)
-            company_input.click()
-            human_like_typing(company_input, account_data['company'])
-
-            # Phone
-            phone_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="PhoneNumber"]')
-            human_like_mouse_move(self.driver, phone_input)
-            phone_input.click()
-            human_like_typing(phone_input, account_data['phone'])
-
-            # Password
-            password_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Password"]')
-            human_like_mouse_move(self.driver, password_input)
-            password_input.click()
-            human_like_typing(password_input, account_data['password'])
-
-            confirm_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="ConfirmPassword"]')
-            human_like_mouse_move(self.driver, confirm_input)
-            confirm_input.click()
-            human_like_typing(confirm_input, account_data['password'])
+            self.get_fill_strategy('keystroke').fill_form(self.driver, [
+                ('input[formcontrolname="FullName"]', account_data['full_name'], "👤 Full name"),
+                ('input[formcontrolname="Email"]', account_data['email'], "📧 Email"),
+                ('input[formcontrolname="Customer"]', account_data['company'], "🏢 Company"),
+                ('input[formcontrolname="PhoneNumber"]', account_data['phone'], "📱 Phone"),
+                ('input[formcontrolname="Password"]', account_data['password'], "🔑 Password"),
+                ('input[formcontrolname="ConfirmPassword"]', account_data['password'], "🔐 Confirm password"),
+            ])
 
             # Submit
             submit_btn = self.wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button#create-account"))
             )
             human_like_mouse_move(self.driver, submit_btn)
+            register_page_url = self.driver.current_url
+            submitted = self.expect(navigation_from=register_page_url, response=REGISTER_API_PATH)
+            self.registered_at = time.time()
+            self.registered_at_restored = False
             self.driver.execute_script("arguments[0].click();", submit_btn)
 
-            random_delay(5, 7)
+            wait_for_event(
+                self.driver, submitted, url_changes(register_page_url), requests_idle(),
+                timeout=DEFAULT_TIMEOUT, description="registration submitted"
+            )
 
             # Screenshot
-            screenshot_path = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(account_data['email'], "registration")
-            )
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot("registration")
 
             return True
 
@@ -217,12 +322,7 @@ class WorldPostaAutomationBot:
             print(f"❌ Registration failed: {e}")
             self.status_log['error_message'] = str(e)
 
-            screenshot_path = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(account_data['email'], "registration_error")
-            )
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Error screenshot saved: {screenshot_path}")
+            self.capture_screenshot("registration_error", failure=True)
 
             return False
 
@@ -237,19 +337,21 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Opening: {EMAIL_LOGIN_URL}")
-            self.driver.get(EMAIL_LOGIN_URL)
-            random_delay(2, 4)
-
-            username = self.wait.until(EC.presence_of_element_located((By.ID, "username")))
-            username.clear()
-            username.send_keys(email)
-
-            pwd = self.driver.find_element(By.ID, "password")
-            pwd.clear()
-            pwd.send_keys(password)
-
-            pwd.send_keys("\n")
-            random_delay(3, 6)
+            self.open_page('owa', EMAIL_LOGIN_URL)
+            wait_for_page_ready(self.driver)
+
+            self.wait.until(EC.presence_of_element_located((By.ID, "username")))
+            self.get_fill_strategy('bulk').fill_form(self.driver, [
+                ("input#username", email, f"📧 Email: {email}"),
+                ("input#password", password, "🔑 Password"),
+            ])
+
+            signed_in = self.expect(url_contains=("/owa/", "languageselection"))
+            self.driver.find_element(By.ID, "password").send_keys("\n")
+            wait_for_event(
+                self.driver, signed_in, url_contains("/owa/"), url_contains("languageselection"),
+                timeout=DEFAULT_TIMEOUT, description="OWA sign-in"
+            )
 
             # Handle first-time timezone page
             self.handle_language_selection()
@@ -259,20 +361,12 @@ class WorldPostaAutomationBot:
 
             if "/owa/" not in self.driver.current_url.lower():
                 print("❌ Login did NOT reach inbox.")
-                screenshot_path = os.path.join(
-                    SCREENSHOT_DIR,
-                    get_screenshot_filename(email, "email_login_failed")
-                )
-                self.driver.save_screenshot(screenshot_path)
+                self.capture_screenshot("email_login_failed", failure=True)
                 return False
 
-            screenshot_path = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(email, "email_login")
-            )
-            self.driver.save_screenshot(screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            self.capture_screenshot("email_login")
 
+            self.email_session_open = True
             return True
 
         except Exception as e:
@@ -295,9 +389,11 @@ class WorldPostaAutomationBot:
             tz.select_by_value("Egypt Standard Time")
 
             save_btn = self.driver.find_element(By.XPATH, "//span[text()='Save']/parent::div")
+            saved = self.expect(url_contains="/owa/")
             save_btn.click()
 
-            WebDriverWait(self.driver, 20).until(EC.url_contains("/owa/"))
+            if not wait_for_event(self.driver, saved, url_contains("/owa/"), timeout=20, description="inbox after language"):
+                return False
             print("📬 Inbox loaded.")
             return True
 
@@ -329,80 +425,106 @@ class WorldPostaAutomationBot:
         SUBJECT = EMAIL_SUBJECT_KEYWORD.lower()
         start = time.time()
         attempt = 0
+        email = self.account_data['email']
+
+        # Protocol-level mailbox first, OWA poller as fallback
+        if self.mailbox is not None:
+            self.verification_message = wait_for_verification_mail(
+                self.mailbox, email, self.account_data['password'],
+                EMAIL_SUBJECT_KEYWORD, timeout
+            )
+            if self.verification_message is not None:
+                # A checkpointed submit can't be timed: the mail may predate this run
+                if self.registered_at and not self.registered_at_restored:
+                    self.mail_latency.record(email, time.time() - self.registered_at, self.mailbox.name)
+                return True
+
+            if time.time() - start < timeout:
+                print("🔁 Falling back to the OWA inbox poller...")
+                if not self.email_session_open and not self.login_to_email(
+                        self.account_data['email'], self.account_data['password']):
+                    return False
 
         # Outlook Classic UI selectors
         INBOX_CONTAINER = 'div[autoid="_lvv_8"][role="listbox"]'
         ROW = 'div[autoid="_lvv_3"][role="option"]'
-        SUBJECT_SPANS = 'span[autoid="_lvv_6"], span[autoid="_lvv_5"], span[autoid="_lvv_7"]'
+        scanner = self.inbox_scanner
+
+        # Dense polls around the expected arrival, back-off in the tail
+        schedule = self.mail_latency.schedule()
+        since = self.registered_at or start
+        deadline = start + timeout
+        last_miss = None
+        print(f"📈 {schedule.describe()}")
+
+        lead_in = min(schedule.initial_delay(time.time() - since), deadline - time.time())
+        if lead_in > 0:
+            print(f"⏳ Mail expected later — first check in {lead_in:.0f} sec...")
+            time.sleep(lead_in)
 
         while time.time() - start < timeout:
             attempt += 1
             elapsed = int(time.time() - start)
             print(f"\n🔄 Attempt {attempt} (elapsed {elapsed}s/{timeout}s)")
 
+            checked_at = time.time()
             self.driver.refresh()
-            time.sleep(3)
 
-            # 1️⃣ Inbox present?
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, INBOX_CONTAINER))
-                )
+            # 1️⃣ Inbox present? (DOM events armed after the blocking refresh)
+            listed = self.expect(selector=INBOX_CONTAINER)
+            if wait_for_event(self.driver, listed, element_present(INBOX_CONTAINER), timeout=15,
+                              description="inbox container"):
                 print("📦 Inbox container loaded.")
-            except:
+            else:
                 print("❌ Inbox container NOT found.")
-                time.sleep(6)
+                sleep_until_next_poll(schedule, since, deadline)
                 continue
 
             # 2️⃣ Rows present?
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ROW))
-                )
+            rendered = self.expect(selector=", ".join(scanner.ordered()))
+            if wait_for_event(self.driver, rendered, scanner.rows_rendered, timeout=15, description="inbox rows"):
                 print("📨 Email rows detected.")
-            except:
+            else:
                 print("📭 No rows yet — OWA still loading.")
-                time.sleep(7)
+                sleep_until_next_poll(schedule, since, deadline)
                 continue
 
-            # 3️⃣ Loop rows
-            rows = self.driver.find_elements(By.CSS_SELECTOR, ROW)
-            print(f"📩 Found {len(rows)} rows.")
+            # 3️⃣ Scan rows in the page (one call: subject/sender/time of matching rows only)
+            scan = scanner.scan(self.driver, SUBJECT)
+            print(f"📩 Found {scan.counts.get(scan.selector or ROW, 0)} rows, {len(scan.rows)} matching.")
 
-            for row in rows:
+            for row in scan.rows:
                 try:
-                    subjects = row.find_elements(By.CSS_SELECTOR, SUBJECT_SPANS)
-                    full_text = " ".join([s.text.strip() for s in subjects if s.text.strip()])
-
-                    print(f"   • Row text: {full_text[:80]}")
-
-                    if SUBJECT in full_text.lower():
-                        print("🎉 FOUND VERIFICATION EMAIL!")
+                    print(f"   • {row['sender']} | {row['subject'][:80]} | {row['received']}")
+                    print("🎉 FOUND VERIFICATION EMAIL!")
 
-                        self.driver.execute_script(
-                            "arguments[0].scrollIntoView({behavior:'smooth',block:'center'});",
-                            row
-                        )
-                        time.sleep(1)
+                    self.driver.execute_script(
+                        "arguments[0].scrollIntoView({behavior:'smooth',block:'center'});",
+                        row['element']
+                    )
+                    random_delay(0.5, 1)
 
-                        row.click()
-                        time.sleep(3)
+                    opened = self.expect(selector=VERIFICATION_LINK_SELECTOR)
+                    row['element'].click()
+                    wait_for_event(
+                        self.driver, opened, *VERIFICATION_LINK_CONDITIONS,
+                        timeout=15, description="email body"
+                    )
 
-                        screenshot = os.path.join(
-                            SCREENSHOT_DIR,
-                            get_screenshot_filename(self.account_data['email'], "email_found")
-                        )
-                        self.driver.save_screenshot(screenshot)
-                        print(f"📸 Saved screenshot: {screenshot}")
+                    self.capture_screenshot("email_found")
 
-                        return True
+                    # Arrival lies between the last miss (or the submit) and this check
+                    latency = arrival_latency(self.registered_at, last_miss, checked_at, self.registered_at_restored)
+                    self.mail_latency.record(email, latency, 'owa')
+                    return True
 
                 except Exception as e:
                     print(f"⚠ Row error: {e}")
 
             # Not found yet
-            print("⏳ Not found — retrying in 10 sec...")
-            time.sleep(10)
+            last_miss = checked_at
+            print(f"⏳ Not found — retrying in {schedule.next_delay(time.time() - since):.0f} sec...")
+            sleep_until_next_poll(schedule, since, deadline)
 
         print("❌ Verification email NOT found.")
         return False
@@ -418,55 +540,23 @@ class WorldPostaAutomationBot:
         print("="*60)
 
         try:
-            time.sleep(3)
-
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-
             print("🔍 Searching email body...")
-
-            # Method 1: clickable text
-            link = soup.find("a", string=lambda x: x and "Confirm Email" in x)
-            if link and link.get("href"):
-                url = link.get("href")
-                print(f"✅ Found verification link (by text): {url}")
-                return url
-
-            # Method 2: href contains ConfirmEmail
-            link = soup.find("a", href=lambda x: x and "ConfirmEmail" in x)
-            if link and link.get("href"):
-                url = link.get("href")
-                print(f"✅ Found verification link (by pattern): {url}")
-                return url
-
-            # Method 3: Selenium — text
-            try:
-                btn = self.driver.find_element(By.XPATH, "//a[contains(text(),'Confirm Email')]")
-                url = btn.get_attribute("href")
-                if url:
-                    print(f"✅ Found via Selenium: {url}")
-                    return url
-            except:
-                pass
-
-            # Method 4: Selenium — href pattern
-            try:
-                btn = self.driver.find_element(By.XPATH, "//a[contains(@href,'ConfirmEmail')]")
-                url = btn.get_attribute("href")
-                if url:
-                    print(f"✅ Found via href match: {url}")
-                    return url
-            except:
-                pass
+            if self.verification_message is not None:
+                # Body was delivered by the mailbox client
+                link = extract_from_message(self.verification_message)
+            else:
+                # Only the reading pane is read, never the whole OWA page_source
+                wait_until(self.driver, *VERIFICATION_LINK_CONDITIONS, timeout=15, description="verification link")
+                link = extract_from_driver(self.driver)
+
+            if link:
+                self.verification_link = link
+                print(f"✅ Found verification link ('{link.text}'): {link.url}")
+                return link.url
 
             # Not found
             print("❌ Could NOT find verification link.")
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(self.account_data['email'], "no_link_found")
-            )
-            self.driver.save_screenshot(screenshot)
-            print(f"📸 Saved screenshot: {screenshot}")
+            self.capture_screenshot("no_link_found", failure=True)
 
             return None
 
@@ -483,15 +573,10 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Opening verification URL...")
-            self.driver.get(verification_url)
-            time.sleep(5)
+            self.open_page('confirm', verification_url)
+            wait_for_requests_idle(self.driver, quiet=1.0)
 
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(self.account_data['email'], "email_confirmed")
-            )
-            self.driver.save_screenshot(screenshot)
-            print(f"📸 Saved screenshot: {screenshot}")
+            self.capture_screenshot("email_confirmed")
 
             print("✅ Email confirmation complete.")
             return True
@@ -499,11 +584,7 @@ class WorldPostaAutomationBot:
         except Exception as e:
             print(f"❌ Email confirmation failed: {e}")
 
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(self.account_data['email'], "confirm_error")
-            )
-            self.driver.save_screenshot(screenshot)
+            self.capture_screenshot("confirm_error", failure=True)
             return False
 
 
@@ -518,37 +599,30 @@ class WorldPostaAutomationBot:
 
         try:
             print(f"🔗 Going to login page: {LOGIN_URL}")
-            self.driver.get(LOGIN_URL)
-            time.sleep(3)
+            self.open_page('login', LOGIN_URL)
+            wait_for_page_ready(self.driver)
 
-            # Email field
-            email_input = self.wait.until(
+            # Email + password fields
+            self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[formcontrolname="Email"]'))
             )
-            email_input.clear()
-            email_input.send_keys(email)
-            time.sleep(1)
-
-            # Password field
-            pass_input = self.driver.find_element(By.CSS_SELECTOR, 'input[formcontrolname="Password"]')
-            pass_input.clear()
-            pass_input.send_keys(password)
-            time.sleep(1)
+            self.get_fill_strategy('bulk').fill_form(self.driver, [
+                ('input[formcontrolname="Email"]', email, f"📧 Email: {email}"),
+                ('input[formcontrolname="Password"]', password, "🔑 Password"),
+            ])
+            random_delay(0.5, 1)
 
             # Submit
             signin_btn = self.wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button#sign-in"))
             )
+            login_page_url = self.driver.current_url
+            signed_in = self.expect(navigation_from=login_page_url)
             signin_btn.click()
 
-            time.sleep(5)
+            wait_for_navigation(self.driver, login_page_url, expectation=signed_in)
 
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(email, "website_login")
-            )
-            self.driver.save_screenshot(screenshot)
-            print(f"📸 Screenshot saved: {screenshot}")
+            self.capture_screenshot("website_login")
 
             print("✅ Logged into website successfully.")
             return True
@@ -556,11 +630,7 @@ class WorldPostaAutomationBot:
         except Exception as e:
             print(f"❌ Website login failed: {e}")
 
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(email, "website_login_error")
-            )
-            self.driver.save_screenshot(screenshot)
+            self.capture_screenshot("website_login_error", failure=True)
             return False
 
 
@@ -574,15 +644,15 @@ class WorldPostaAutomationBot:
         print("="*60)
 
         try:
-            time.sleep(4)
+            wait_until(self.driver, element_present(LAUNCH_BUTTON_SELECTOR), description="dashboard buttons")
 
             # Scroll dashboard
             self.driver.execute_script("window.scrollTo(0, 600);")
-            time.sleep(2)
+            random_delay(1, 2)
 
             print("🔎 Searching for 'View Posta' and 'View CloudEdge' buttons...")
 
-            buttons = self.driver.find_elements(By.CSS_SELECTOR, "button.launch-button")
+            buttons = self.driver.find_elements(By.CSS_SELECTOR, LAUNCH_BUTTON_SELECTOR)
             print(f"   Found {len(buttons)} launch buttons")
 
             button_posta = None
@@ -601,21 +671,24 @@ class WorldPostaAutomationBot:
             if button_posta:
                 print("\n➡️ Opening Posta...")
                 self.driver.execute_script("arguments[0].scrollIntoView();", button_posta)
-                time.sleep(1)
+                random_delay(0.5, 1)
+                dashboard_url = self.driver.current_url
+                dashboard_handles = self.driver.window_handles
+                launched = self.expect(navigation_from=dashboard_url, new_window=True)
                 button_posta.click()
-                time.sleep(4)
-
-                screenshot = os.path.join(
-                    SCREENSHOT_DIR,
-                    get_screenshot_filename(self.account_data['email'], "view_posta")
+                wait_for_event(
+                    self.driver, launched, url_changes(dashboard_url), EC.new_window_is_opened(dashboard_handles),
+                    timeout=15, description="Posta launch"
                 )
-                self.driver.save_screenshot(screenshot)
-                print(f"📸 Screenshot saved: {screenshot}")
+
+                self.capture_screenshot("view_posta")
 
                 # Go back if still same tab
                 try:
                     self.driver.back()
-                    time.sleep(3)
+                    dashboard = self.expect(selector=LAUNCH_BUTTON_SELECTOR)
+                    wait_for_event(self.driver, dashboard, element_present(LAUNCH_BUTTON_SELECTOR),
+                                   description="dashboard buttons")
                 except:
                     pass
 
@@ -624,23 +697,24 @@ class WorldPostaAutomationBot:
             # ============================
             if button_cloud:
                 print("\n➡️ Opening CloudEdge...")
-                button_cloud = self.driver.find_elements(By.CSS_SELECTOR, "button.launch-button")
+                button_cloud = self.driver.find_elements(By.CSS_SELECTOR, LAUNCH_BUTTON_SELECTOR)
                 for btn in button_cloud:
                     if "View CloudEdge" in btn.text:
                         button_cloud = btn
                         break
 
                 self.driver.execute_script("arguments[0].scrollIntoView();", button_cloud)
-                time.sleep(1)
+                random_delay(0.5, 1)
+                dashboard_url = self.driver.current_url
+                dashboard_handles = self.driver.window_handles
+                launched = self.expect(navigation_from=dashboard_url, new_window=True)
                 button_cloud.click()
-                time.sleep(4)
-
-                screenshot = os.path.join(
-                    SCREENSHOT_DIR,
-                    get_screenshot_filename(self.account_data['email'], "view_cloudedge")
+                wait_for_event(
+                    self.driver, launched, url_changes(dashboard_url), EC.new_window_is_opened(dashboard_handles),
+                    timeout=15, description="CloudEdge launch"
                 )
-                self.driver.save_screenshot(screenshot)
-                print(f"📸 Screenshot saved: {screenshot}")
+
+                self.capture_screenshot("view_cloudedge")
 
             print("\n✅ Post-login actions finished.")
             return True
@@ -648,26 +722,23 @@ class WorldPostaAutomationBot:
         except Exception as e:
             print(f"❌ Post-login actions failed: {e}")
 
-            screenshot = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(self.account_data['email'], "post_login_error")
-            )
-            self.driver.save_screenshot(screenshot)
+            self.capture_screenshot("post_login_error", failure=True)
 
             return False
     # =====================================================
+    # SCREENSHOTS
+    # =====================================================
+    def capture_screenshot(self, label, failure=False):
+        return self.screenshots.capture(self.driver, self.account_data['email'], label, failure) or ''
+
+    # =====================================================
     # FINAL SCREENSHOT
     # =====================================================
     def take_final_screenshot(self):
         print("\n📸 Taking final screenshot...")
         try:
-            screenshot_path = os.path.join(
-                SCREENSHOT_DIR,
-                get_screenshot_filename(self.account_data['email'], 'final_success')
-            )
-            self.driver.save_screenshot(screenshot_path)
-            print(f"✅ Final screenshot saved: {screenshot_path}")
-            return screenshot_path
+            screenshot_path = self.capture_screenshot('final_success')
+            return screenshot_path or None
 
         except Exception as e:
             print(f"⚠ Could not take final screenshot: {e}")
@@ -676,7 +747,7 @@ class WorldPostaAutomationBot:
 
 
     # =====================================================
-    # SAVE STATUS (CSV + JSON)
+    # SAVE STATUS (CSV + JSONL + SQLite)
     # =====================================================
     def save_status(self):
         print("\n" + "="*60)
@@ -685,43 +756,15 @@ class WorldPostaAutomationBot:
 
         try:
             self.status_log['timestamp'] = get_timestamp()
+            self.status_log['correlation_id'] = self.correlation_id
 
-            # CSV WRITE
-            csv_exists = os.path.exists(CSV_FILE)
-            with open(CSV_FILE, 'a', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(
-                    f,
-                    fieldnames=['timestamp', 'email', 'status', 'error_message', 'screenshot_path']
-                )
-                if not csv_exists:
-                    writer.writeheader()
-                writer.writerow(self.status_log)
-
-            print(f"✅ Status saved to CSV: {CSV_FILE}")
+            # Append to CSV / JSONL / SQLite (constant time, safe for parallel runs)
+            self.results.add(dict(self.status_log))
+            print(f"✅ Status saved to: {CSV_FILE}, {RESULTS_JSONL}, {RESULTS_DB}")
 
-            # JSON WRITE
-            json_data = []
-            if os.path.exists(JSON_FILE):
-                try:
-                    with open(JSON_FILE, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                except:
-                    json_data = []
-
-            json_data.append(self.status_log)
-
-            with open(JSON_FILE, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
-
-            print(f"✅ Status saved to JSON: {JSON_FILE}")
-
-            # Display in Actions logs
+            # Display this run's record in Actions logs
             print("\n===== BEGIN_REGISTRATION_JSON =====")
-            try:
-                with open(JSON_FILE, 'r', encoding='utf-8') as f:
-                    print(f.read())
-            except Exception as e:
-                print(f"Cannot read {JSON_FILE}: {e}")
+            print(json.dumps([self.status_log], indent=2, ensure_ascii=False))
             print("===== END_REGISTRATION_JSON =====\n")
 
         except Exception as e:
@@ -737,6 +780,18 @@ class WorldPostaAutomationBot:
         print("🚀 STARTING FULL AUTOMATION WORKFLOW")
         print("="*60)
 
+        self.verification_message = None
+        self.email_session_open = False
+        self.verification_url = None
+        self.verification_link = None
+        self.registered_at = None
+        self.registered_at_restored = False
+        self.correlation_id = new_correlation_id()
+
+        # Set here as well as in register(), which a resumed account may skip
+        self.account_data = account_data
+        self.status_log = {'email': account_data['email']}
+
         try:
             print(f"\n📋 ACCOUNT DATA:")
             print(f"   Full Name : {account_data['full_name']}")
@@ -745,48 +800,27 @@ class WorldPostaAutomationBot:
             print(f"   Phone     : {account_data['phone']}")
             print(f"   Password  : {'*' * len(account_data['password'])}")
 
-            # Step 1 – Register
-            if not self.register(account_data):
-                self.status_log['status'] = 'failed_registration'
-                self.save_status()
-                return False
-
-            # Step 2 – Login to OWA
-            if not self.login_to_email(account_data['email'], account_data['password']):
-                self.status_log['status'] = 'failed_email_login'
-                self.save_status()
-                return False
-
-            # Step 3 – Find email
-            if not self.find_verification_email():
-                self.status_log['status'] = 'failed_email_not_found'
-                self.save_status()
-                return False
-
-            # Step 4 – Extract link
-            verification_url = self.extract_verification_link()
-            if not verification_url:
-                self.status_log['status'] = 'failed_no_link'
-                self.save_status()
-                return False
-
-            # Step 5 – Confirm
-            if not self.confirm_email(verification_url):
-                self.status_log['status'] = 'failed_confirmation'
-                self.save_status()
-                return False
-
-            # Step 6 – Login admin portal
-            if not self.login_to_website(account_data['email'], account_data['password']):
-                self.status_log['status'] = 'failed_website_login'
-                self.save_status()
-                return False
-
-            # Step 7 – Post-login actions
-            if not self.perform_post_login_actions():
-                self.status_log['status'] = 'failed_post_login_actions'
-                self.save_status()
-                return False
+            # Resume after the last checkpointed step (0 without checkpoints)
+            steps = self.workflow_steps(account_data)
+            start = self.resume_point(account_data['email'], steps)
+            if start == len(steps):
+                print(f"⏩ All steps already completed for {account_data['email']}, skipping")
+                return True
+
+            # Steps 1–7, each timed as a span under the account's correlation ID
+            with self.tracer.span('account', self.correlation_id, email=account_data['email']) as account_span:
+                for step, action, failed_status in steps[start:]:
+                    with self.tracer.span(step, self.correlation_id, parent=account_span,
+                                          email=account_data['email']) as span:
+                        ok = action()
+                        span.set_result(ok, failed_status)
+                    self.save_checkpoint(step, ok, failed_status)
+
+                    if not ok:
+                        account_span.set_result(False, failed_status)
+                        self.status_log['status'] = failed_status
+                        self.save_status()
+                        return False
 
             # Final screenshot
             self.take_final_screenshot()
@@ -804,26 +838,123 @@ class WorldPostaAutomationBot:
             self.save_status()
             return False
 
+        finally:
+            self.tracer.flush()
+
+    # =====================================================
+    # WORKFLOW STEPS
+    # =====================================================
+    def workflow_steps(self, account_data):
+        """Ordered (step_name, action, failed_status) table for run_full_workflow"""
+        email, password = account_data['email'], account_data['password']
+        steps = [('register', lambda: self.register(account_data), 'failed_registration')]
+
+        # Login to OWA (not needed with an IMAP/EWS mailbox client)
+        if self.mailbox is None:
+            steps.append(('email_login', lambda: self.login_to_email(email, password), 'failed_email_login'))
+
+        steps += [
+            ('find_email', self.find_verification_email, 'failed_email_not_found'),
+            ('extract_link', self.extract_verification_step, 'failed_no_link'),
+            ('confirm_email', lambda: self.confirm_email(self.verification_url), 'failed_confirmation'),
+            ('website_login', lambda: self.login_to_website(email, password), 'failed_website_login'),
+            ('post_login', self.perform_post_login_actions, 'failed_post_login_actions'),
+        ]
+        return steps
+
+    def resume_point(self, email, steps):
+        """Index of the first step to run for this account, restoring saved step data"""
+        if self.checkpoints is None:
+            return 0
+
+        completed = self.checkpoints.completed_steps(email)
+        self.verification_url = completed.get('extract_link', {}).get('verification_url')
+        self.registered_at = completed.get('register', {}).get('submitted_at')
+        self.registered_at_restored = self.registered_at is not None
+        start = resume_index([name for name, _, _ in steps], completed)
+        if 0 < start < len(steps):
+            print(f"⏩ Resuming {email} at step '{steps[start][0]}' ({len(completed)} steps checkpointed)")
+        return start
+
+    def save_checkpoint(self, step, ok, failed_status):
+        """Persist a step outcome; the verification URL is kept so confirm can resume alone"""
+        if self.checkpoints is None:
+            return
+        data = None
+        if step == 'extract_link' and ok:
+            data = {'verification_url': self.verification_url}
+        elif step == 'register' and ok and self.registered_at:
+            data = {'submitted_at': self.registered_at}
+        try:
+            self.checkpoints.record(self.account_data['email'], step, ok, data, '' if ok else failed_status)
+        except Exception as e:
+            print(f"⚠ Could not save checkpoint for {step}: {e}")
+
+    def extract_verification_step(self):
+        self.verification_url = self.extract_verification_link()
+        return bool(self.verification_url)
+
 
 
     # =====================================================
     # CLOSE BROWSER
     # =====================================================
     def close(self):
-        print("\n🔒 Closing browser...")
-        try:
-            self.driver.quit()
-            print("✅ Browser closed")
-        except:
-            print("⚠ Could not close browser")
+        if self.events is not None:
+            self.events.close()
+        if self.asset_interceptor is not None:
+            self.asset_interceptor.close()
+        if self.owns_driver:
+            print("\n🔒 Closing browser...")
+            try:
+                self.driver.quit()
+                print("✅ Browser closed")
+            except:
+                print("⚠ Could not close browser")
+
+        if self.lean is not None:
+            self.lean.forget(self.driver)
+        if self.owns_screenshots:
+            self.screenshots.close()
+        if self.owns_results:
+            self.results.close()
+        if self.registration_client is not None:
+            self.registration_client.close()
+        self.tracer.close()
 # =====================================================
 # WORKFLOW RUNNER
 # =====================================================
-def run_automation(headless=False, use_random=False):
+def run_automation(headless=False, use_random=False, timing_profile=None, fill_strategy=None, mailbox=None,
+                   pool=None, registration_engine=None, load_profile=None, asset_cache=None):
+    """
+    Register one account
+
+    With a BrowserPool the account runs on a warm, reset browser instead of
+    a freshly launched one.
+    """
+    if pool is not None:
+        with pool.lease() as driver:
+            return _run_account(driver, headless, use_random, timing_profile, fill_strategy, mailbox,
+                                registration_engine, load_profile, asset_cache)
+    return _run_account(None, headless, use_random, timing_profile, fill_strategy, mailbox, registration_engine,
+                        load_profile, asset_cache)
+
+
+def _run_account(driver, headless, use_random, timing_profile, fill_strategy, mailbox, registration_engine=None,
+                 load_profile=None, asset_cache=None):
     bot = None
 
     try:
-        bot = WorldPostaAutomationBot(headless=headless)
+        bot = WorldPostaAutomationBot(
+            headless=headless,
+            timing_profile=timing_profile,
+            fill_strategy=fill_strategy,
+            mailbox=mailbox,
+            driver=driver,
+            registration_engine=registration_engine,
+            load_profile=load_profile,
+            asset_cache=asset_cache
+        )
 
         # Decide account type
         if use_random:
@@ -851,22 +982,94 @@ def run_automation(headless=False, use_random=False):
 # =====================================================
 # MAIN ENTRY POINT
 # =====================================================
+def add_bot_options(parser, inherit=False):
+    """
+    Options shared by one-shot runs and `serve`
+
+    With inherit (the `serve` subparser) the copies have no defaults of their
+    own, so options given before `serve` are kept instead of being reset.
+    """
+    default = (lambda value: argparse.SUPPRESS) if inherit else (lambda value: value)
+    parser.add_argument("--headless", action="store_true", default=default(False), help="Run without UI")
+    parser.add_argument("--timing", choices=sorted(TIMING_PROFILES), default=default(None),
+                        help="Cosmetic delay profile (staging removes them entirely)")
+    parser.add_argument("--fill", choices=sorted(FILL_STRATEGIES), default=default(None),
+                        help="How form fields are filled (keystroke, bulk or script)")
+    parser.add_argument("--mailbox", choices=sorted(MAILBOX_BACKENDS), default=default(None),
+                        help="How the verification email is received (browser, imap or ews)")
+    parser.add_argument("--engine", choices=REGISTRATION_ENGINES, default=default(None),
+                        help="Registration engine: browser form, http endpoint, or auto (http, browser fallback)")
+    parser.add_argument("--profile", choices=LOAD_PROFILES, default=default(None),
+                        help="Resource loading: full, or lean (block images, fonts, media and analytics)")
+    parser.add_argument("--asset-cache", action="store_true", default=default(None),
+                        help="Serve scripts, styles and fonts from the shared on-disk asset cache")
+    parser.add_argument("--max-uses", type=int, default=default(MAX_USES),
+                        help="Accounts served by one pooled browser before it is relaunched")
+
+
 def main():
     parser = argparse.ArgumentParser(description="WorldPosta Automation Suite")
 
     parser.add_argument("--random", action="store_true", help="Use random account")
-    parser.add_argument("--headless", action="store_true", help="Run without UI")
+    add_bot_options(parser)
+    parser.add_argument("--count", type=int, default=1,
+                        help="Number of accounts to register (more than one implies --random)")
+    parser.add_argument("--pool-size", type=int, default=0,
+                        help="Pre-launch this many browsers and reuse them across accounts")
+
+    # `serve` keeps warm browsers resident and takes jobs over HTTP (service.py)
+    commands = parser.add_subparsers(dest="command", metavar="{serve}")
+    serve = commands.add_parser("serve", help="Keep warm browsers running and accept jobs over a local HTTP API")
+    add_bot_options(serve, inherit=True)
+    serve.add_argument("--host", default=None, help="Interface for the job API (default: WORLDPOSTA_SERVICE_HOST or 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=None, help="Port for the job API (default: WORLDPOSTA_SERVICE_PORT or 8090)")
+    serve.add_argument("--slots", type=int, default=None, help="Accounts running at once (warm browsers)")
+    serve.add_argument("--max-queued", type=int, default=None, help="Jobs allowed to wait for a slot before 429")
 
     args = parser.parse_args()
 
+    if args.command == "serve":
+        # Imported here: service.py builds on this module
+        import service
+        service.run_service(
+            host=args.host or service.SERVICE_HOST,
+            port=args.port or service.SERVICE_PORT,
+            slots=args.slots or service.DEFAULT_SLOTS,
+            max_queued=args.max_queued or service.MAX_QUEUED,
+            headless=args.headless,
+            max_uses=args.max_uses,
+            timing_profile=args.timing,
+            fill_strategy=args.fill,
+            mailbox=args.mailbox,
+            registration_engine=args.engine,
+            load_profile=args.profile,
+            asset_cache=args.asset_cache
+        )
+        return
+
     print("="*60)
     print("🚀 WORLDPOSTA AUTOMATION SUITE")
     print("="*60)
 
-    run_automation(
-        headless=args.headless,
-        use_random=args.random
-    )
+    pool = create_browser_pool(args.pool_size, args.headless, args.max_uses, args.profile) \
+        if args.pool_size > 0 else None
+
+    try:
+        for _ in range(args.count):
+            run_automation(
+                headless=args.headless,
+                use_random=args.random or args.count > 1,
+                timing_profile=args.timing,
+                fill_strategy=args.fill,
+                mailbox=args.mailbox,
+                pool=pool,
+                registration_engine=args.engine,
+                load_profile=args.profile,
+                asset_cache=args.asset_cache
+            )
+    finally:
+        if pool:
+            pool.close()
 
 
 if __name__ == "__main__":